@@ -0,0 +1,122 @@
+"""
+
+    EU Grid frequency scraper - benchmark of polling many targets concurrently.
+
+    Polls `--targets` targets every `--interval` seconds against a local API-stub (separate process)
+    with the async API-handler, the threshold-engine and in-memory alert-states, like `scraper.py --targets`.
+
+    # Script-Version: 1.0
+    # Python-Version: 3.10.12
+
+"""
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import multiprocessing
+from pathlib import Path
+#
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import stub_server
+from src.utils import timestamp_to_epoch_ms
+from src.latency import LatencyHistogram
+from src.thresholds import ThresholdEngine
+from src.alert_state import AlertStateMachine
+from src.async_api import AsyncHTTPClient, AsyncAPIHandler
+from src.custom_exceptions import APIError
+
+THRESHOLDS = ThresholdEngine(49.6, 49.85, 50.15, 50.4)
+
+def get_free_port() -> int:
+    with socket.socket() as _socket:
+        _socket.bind(("127.0.0.1", 0))
+        return _socket.getsockname()[1]
+
+async def wait_for_stub(port:int) -> None:
+    for _ in range(100):
+        try:
+            (_, writer) = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError("API-stub didn't start")
+
+async def poll(apihandler:AsyncAPIHandler, alerts:AlertStateMachine, interval:float, offset:float,
+               end:float, stats:dict) -> None:
+    loop = asyncio.get_running_loop()
+    next_deadline:float = loop.time() + offset
+    while next_deadline < end:
+        await asyncio.sleep(max(next_deadline - loop.time(), 0))
+        # Lateness of the poll compared to its deadline (event-loop saturation)
+        stats["lag"].add(max(loop.time() - next_deadline, 0))
+        try:
+            sample:tuple[float, str]|None = await apihandler.get_new_api_data()
+        except APIError:
+            stats["errors"] += 1
+        else:
+            if sample is not None:
+                alerts.update(timestamp_to_epoch_ms(sample[1]), sample[0])
+        next_deadline += interval
+        if next_deadline < loop.time():
+            stats["missed"] += 1
+            next_deadline = loop.time() + interval
+
+async def bench(port:int) -> None:
+    await wait_for_stub(port)
+    client = AsyncHTTPClient(timeout=5.0, max_connections_per_host=args.connections)
+    apihandlers:list[AsyncAPIHandler] = [
+        AsyncAPIHandler(api_url=f"http://127.0.0.1:{port}/target/{_index}", client=client)
+        for _index in range(args.targets)
+    ]
+    stats:dict = {"lag": LatencyHistogram(), "errors": 0, "missed": 0}
+    loop = asyncio.get_running_loop()
+    end:float = loop.time() + args.duration
+    _cpu_start:float = time.process_time()
+    _start:float = time.perf_counter()
+    await asyncio.gather(*(
+        poll(_apihandler, AlertStateMachine(None, THRESHOLDS), args.interval,
+             args.interval * _index / args.targets, end, stats)
+        for (_index, _apihandler) in enumerate(apihandlers)
+    ))
+    elapsed:float = time.perf_counter() - _start
+    cpu:float = time.process_time() - _cpu_start
+    client.close()
+    
+    latencies = LatencyHistogram()
+    for _apihandler in apihandlers:
+        latencies.merge(_apihandler.endpoint.latencies)
+    requests:int = sum(_apihandler.request_count for _apihandler in apihandlers)
+    expected:float = args.targets * args.duration / args.interval
+    print(f"""
+        >------------------------------------------<
+        > ASYNC TARGETS <
+        - Targets={args.targets} every {args.interval} seconds for {args.duration} seconds
+        - Requests={requests} ({requests / expected * 100:.1f}% of {expected:.0f} expected, {requests / elapsed:.0f}/sec)
+        - Errors={stats['errors']} | MissedDeadlines={stats['missed']}
+        - Connections={client.connect_count}
+        - Latency P50={latencies.quantile(0.5)*1000:.1f} ms | P99={latencies.quantile(0.99)*1000:.1f} ms
+        - Scheduling-lag P50={stats['lag'].quantile(0.5)*1000:.1f} ms | P99={stats['lag'].quantile(0.99)*1000:.1f} ms
+        - CPU={cpu / elapsed * 100:.0f}% of one core
+        >------------------------------------------<
+        """)
+
+if __name__ == '__main__':
+    filename:str = os.path.basename(__file__)
+    parser = argparse.ArgumentParser(filename)
+    parser.add_argument('-n', '--targets', help=f"Number of targets (Default=500)", type=int, default=500)
+    parser.add_argument('-i', '--interval', help=f"Poll-interval in seconds (Default=1.0)", type=float, default=1.0)
+    parser.add_argument('-d', '--duration', help=f"Duration in seconds (Default=10)", type=float, default=10.0)
+    parser.add_argument('-c', '--connections', help=f"Max. connections to the stub (Default=32)", type=int, default=32)
+    args:list = parser.parse_args()
+    
+    port:int = get_free_port()
+    stub = multiprocessing.Process(target=stub_server.run, args=("127.0.0.1", port), daemon=True)
+    stub.start()
+    try:
+        asyncio.run(bench(port))
+    finally:
+        stub.terminate()
@@ -0,0 +1,119 @@
+"""
+
+    EU Grid frequency scraper - benchmark of the logging-overhead per sample.
+
+    Times the log-calls of one sample in daemon-mode (API-response, parsed sample, frequency and iteration)
+    at INFO- and DEBUG-level, with eager f-strings and lazy `%`-arguments, for the synchronous and the queued
+    handler with the text- and JSON-format. Log-lines are written to `os.devnull`, optionally with a delay
+    per write to emulate a blocking stdout (e.g. a busy journald).
+
+    # Script-Version: 1.0
+    # Python-Version: 3.10.12
+
+"""
+import os
+import sys
+import time
+import queue
+import timeit
+import logging
+import argparse
+from pathlib import Path
+from logging.handlers import QueueListener
+#
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.logger_config import JSONFormatter, TEXT_FORMAT, TEXT_DATEFMT, _RecordQueueHandler
+
+api_logger:logging.Logger = logging.getLogger("APIHandler")
+scraper_logger:logging.Logger = logging.getLogger("scraper")
+(URL, STATUS, SIZE) = ("https://dat.netzfrequenzmessung.de:9080/frequenz.xml", 200, 52)
+(FREQUENCY, TIMESTAMP) = (50.043, "2026-02-11T15:05:08+00:00")
+(ITERATION, LATENCY, INTERVAL) = (1234, 0.0123, 1.0)
+
+def log_sample_eager() -> None:
+    api_logger.debug(f"Got response.status_code={STATUS} from '{URL}', {SIZE} bytes")
+    api_logger.debug(f"Parsed frequency={FREQUENCY} and timestamp={TIMESTAMP} from XML-API data of '{URL}'")
+    scraper_logger.info(f"Frequency={FREQUENCY} | Timestamp={TIMESTAMP}")
+    scraper_logger.debug(f"Iteration={ITERATION} | Latency={LATENCY*1000:.2f} ms | Interval={INTERVAL:.2f} s")
+
+def log_sample_lazy() -> None:
+    api_logger.debug("Got response.status_code=%s from '%s', %d bytes", STATUS, URL, SIZE)
+    api_logger.debug("Parsed frequency=%s and timestamp=%s from XML-API data of '%s'", FREQUENCY, TIMESTAMP, URL)
+    scraper_logger.info("Frequency=%s | Timestamp=%s", FREQUENCY, TIMESTAMP)
+    scraper_logger.debug("Iteration=%d | Latency=%.2f ms | Interval=%.2f s", ITERATION, LATENCY*1000, INTERVAL)
+
+class SlowStream:
+    """
+    Stream, that blocks every write for `delay` seconds before writing to `stream`.
+    """
+    def __init__(self, stream, delay:float) -> None:
+        self._stream = stream
+        self._delay:float = delay
+
+    def write(self, text:str) -> int:
+        time.sleep(self._delay)
+        return self._stream.write(text)
+
+    def flush(self) -> None:
+        self._stream.flush()
+
+def configure(level:int, log_format:str, use_queue:bool, stream) -> QueueListener|None:
+    """
+    Replace the handlers of the root-logger like `configure_logger()`, but writing to `stream`.
+    """
+    root:logging.Logger = logging.getLogger()
+    for _handler in list(root.handlers):
+        root.removeHandler(_handler)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JSONFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT, TEXT_DATEFMT))
+    root.setLevel(level)
+    if not use_queue:
+        root.addHandler(handler)
+        return None
+    log_queue:queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    root.addHandler(_RecordQueueHandler(log_queue))
+    return listener
+
+def bench(function, number:int, repeat:int) -> float:
+    """
+    Get the best time per call in nanoseconds (of the calling thread).
+    """
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1e9
+
+def main() -> None:
+    print(f"{'level':<6} {'handler':<12} {'eager':>12} {'lazy':>12} {'saved':>8}")
+    with open(os.devnull, "w") as _devnull:
+        stream = SlowStream(_devnull, args.write_delay) if args.write_delay > 0 else _devnull
+        for _level in (logging.INFO, logging.DEBUG):
+            for (_log_format, _use_queue) in (("text", False), ("json", False), ("text", True), ("json", True)):
+                listener:QueueListener|None = configure(_level, _log_format, _use_queue, stream)
+                try:
+                    eager_ns:float = bench(log_sample_eager, args.number, args.repeat)
+                    lazy_ns:float = bench(log_sample_lazy, args.number, args.repeat)
+                finally:
+                    if listener is not None:
+                        listener.stop()
+                handler_name:str = f"{_log_format}{'+queue' if _use_queue else ''}"
+                print(f"{logging.getLevelName(_level):<6} {handler_name:<12} {eager_ns:>9.0f} ns {lazy_ns:>9.0f} ns "
+                      f"{(1 - lazy_ns / eager_ns) * 100:>7.0f}%")
+
+if __name__ == '__main__':
+    filename:str = os.path.basename(__file__)
+    parser = argparse.ArgumentParser(filename)
+    parser.add_argument(
+        '-n', '--number', help=f"Samples per measurement (Default=20000)",
+        type=int, default=20_000
+    )
+    parser.add_argument(
+        '-r', '--repeat', help=f"Measurements, the best one is reported (Default=5)",
+        type=int, default=5
+    )
+    parser.add_argument(
+        '--write-delay', help=f"Delay of every write in seconds, to emulate a blocking stdout (Default=0)",
+        type=float, default=0.0
+    )
+    args:list = parser.parse_args()
+
+    main()
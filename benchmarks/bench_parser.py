@@ -0,0 +1,58 @@
+"""
+
+    EU Grid frequency scraper - benchmark of the API-parser.
+
+    # Script-Version: 1.0
+    # Python-Version: 3.10.12
+
+"""
+import os
+import sys
+import timeit
+import argparse
+from pathlib import Path
+#
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.api import parse_api_data, _parse_api_data_etree
+
+# Realistic payloads of the API (compact and pretty-printed)
+PAYLOADS:dict[str, bytes] = {
+    "compact": b"<r><f>50.043</f><z>2026-02-11T15:05:08+00:00</z></r>",
+    "pretty": b"<r>\n  <f>49.987</f>\n  <z>2026-02-11T15:05:09+00:00</z>\n</r>\n"
+}
+
+def parse_api_data_etree(content:bytes) -> tuple[float, str]:
+    """
+    Previous parser: full `ElementTree`-tree, `findtext` and `float`.
+    """
+    (frequency, timestamp) = _parse_api_data_etree(content)
+    return (float(frequency), timestamp)
+
+def bench(function, content:bytes, number:int, repeat:int) -> float:
+    """
+    Get the best time per call in nanoseconds.
+    """
+    return min(timeit.repeat(lambda: function(content), number=number, repeat=repeat)) / number * 1e9
+
+def main() -> None:
+    print(f"{'payload':<10} {'etree':>12} {'fast':>12} {'speedup':>9}")
+    for (_name, _content) in PAYLOADS.items():
+        assert parse_api_data(_content) == parse_api_data_etree(_content)
+        etree_ns:float = bench(parse_api_data_etree, _content, args.number, args.repeat)
+        fast_ns:float = bench(parse_api_data, _content, args.number, args.repeat)
+        print(f"{_name:<10} {etree_ns:>9.0f} ns {fast_ns:>9.0f} ns {etree_ns / fast_ns:>8.1f}x")
+
+if __name__ == '__main__':
+    filename:str = os.path.basename(__file__)
+    parser = argparse.ArgumentParser(filename)
+    parser.add_argument(
+        '-n', '--number', help=f"Calls per measurement (Default=100000)",
+        type=int, default=100_000
+    )
+    parser.add_argument(
+        '-r', '--repeat', help=f"Measurements, the best one is reported (Default=5)",
+        type=int, default=5
+    )
+    args:list = parser.parse_args()
+    
+    main()
@@ -0,0 +1,129 @@
+"""
+
+    EU Grid frequency scraper - benchmark of the cold start with an import-time report.
+
+    Measures the wall-time of fresh interpreters (best of `--repeat` runs): the bare interpreter, `scraper.py -s`
+    with the cached config-snapshot and `scraper.py -s --no-config-snapshot`, in a temporary working-directory
+    with a minimal dotenv-file. Then prints the slowest imports of `scraper.py -s` parsed from `python -X importtime`.
+
+    Save a baseline with `--save FILE` and compare against it with `--compare FILE` (same format as the
+    microbenchmark-suite), which exits with 1, when a measurement is more than `--max-regression` percent slower.
+
+    # Script-Version: 1.0
+    # Python-Version: 3.10.12
+
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+#
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from bench_suite import DOTENV, save_baseline, load_baseline, compare
+
+SCRAPER_FILEPATH:Path = Path(__file__).resolve().parent.parent / "scraper.py"
+# Name of the measurement and the arguments of the interpreter
+COMMANDS:dict[str, list[str]] = {
+    "startup.interpreter": ["-c", "pass"],
+    "startup.show_thresholds": [str(SCRAPER_FILEPATH), "-s", "-l", "WARNING"],
+    "startup.show_thresholds_no_snapshot": [str(SCRAPER_FILEPATH), "-s", "-l", "WARNING", "--no-config-snapshot"]
+}
+
+def measure(arguments:list[str], repeat:int) -> float:
+    """
+    Get the best wall-time of `repeat` runs of a fresh interpreter in nanoseconds.
+    """
+    elapsed:list[float] = []
+    for _ in range(repeat):
+        _start:float = time.perf_counter()
+        subprocess.run([sys.executable] + arguments, stdout=subprocess.DEVNULL, check=True)
+        elapsed.append(time.perf_counter() - _start)
+    return min(elapsed) * 1e9
+
+def import_times(arguments:list[str]) -> list[tuple[str, int, int]]:
+    """
+    Get the module-name, self- and cumulative time in microseconds of every import (`-X importtime`).
+    """
+    process = subprocess.run([sys.executable, "-X", "importtime"] + arguments,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    imports:list[tuple[str, int, int]] = []
+    for _line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not _line.startswith("import time:") or "imported package" in _line:
+            continue
+        (self_us, cumulative_us, name) = _line[len("import time:"):].split("|", 2)
+        imports.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return imports
+
+def print_import_report(imports:list[tuple[str, int, int]], top:int) -> None:
+    """
+    Print the `top` slowest imports by cumulative time, indented like the import-tree.
+    """
+    total_us:int = sum(_self_us for (_, _self_us, _) in imports)
+    print(f"\n{len(imports)} imports in {total_us / 1000:.1f} ms, slowest {top} by cumulative time:")
+    print(f"{'module':<48} {'self':>10} {'cumulative':>12}")
+    for (_name, _self_us, _cumulative_us) in sorted(imports, key=lambda _import: _import[2], reverse=True)[:top]:
+        print(f"{_name:<48} {_self_us / 1000:>7.1f} ms {_cumulative_us / 1000:>9.1f} ms")
+
+def main() -> None:
+    # Baselines are resolved before changing into the temporary working-directory
+    save_filepath:Path|None = Path(args.save).resolve() if args.save else None
+    compare_filepath:Path|None = Path(args.compare).resolve() if args.compare else None
+    baseline:dict[str, float] = load_baseline(compare_filepath) if compare_filepath is not None else {}
+
+    results:dict[str, float] = {}
+    cwd:str = os.getcwd()
+    with tempfile.TemporaryDirectory() as _tmp_dirpath:
+        os.chdir(_tmp_dirpath)
+        try:
+            Path(".env").write_text(DOTENV)
+            # Write the config-snapshot and warm the page-cache, so every run is a cold start of the interpreter only
+            for _arguments in COMMANDS.values():
+                measure(_arguments, 1)
+            for (_name, _arguments) in COMMANDS.items():
+                results[_name] = measure(_arguments, args.repeat)
+                print(f"{_name:<40} {results[_name] / 1e6:>8.1f} ms")
+            imports:list[tuple[str, int, int]] = import_times(COMMANDS["startup.show_thresholds"])
+        finally:
+            os.chdir(cwd)
+    print_import_report(imports, args.top)
+
+    if save_filepath is not None:
+        save_baseline(save_filepath, results)
+        print(f"\nSaved baseline to '{save_filepath}'")
+    if compare_filepath is not None:
+        regressions:list[str] = compare(results, baseline, args.max_regression)
+        if regressions:
+            print(f"\n{len(regressions)} measurement(s) regressed by more than {args.max_regression}%: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\nNo measurement regressed by more than {args.max_regression}%")
+
+if __name__ == '__main__':
+    filename:str = os.path.basename(__file__)
+    parser = argparse.ArgumentParser(filename)
+    parser.add_argument(
+        '--save', help=f"Write the results as JSON-baseline to FILE",
+        metavar="FILE", default=None
+    )
+    parser.add_argument(
+        '--compare', help=f"Compare the results with the JSON-baseline FILE and exit with 1 on a regression",
+        metavar="FILE", default=None
+    )
+    parser.add_argument(
+        '--max-regression', help=f"Allowed slowdown in percent compared to the baseline (Default=20)",
+        type=float, default=20.0
+    )
+    parser.add_argument(
+        '--top', help=f"Number of the slowest imports in the report (Default=20)",
+        type=int, default=20
+    )
+    parser.add_argument(
+        '-r', '--repeat', help=f"Runs per measurement, the best one is reported (Default=10)",
+        type=int, default=10
+    )
+    args:list = parser.parse_args()
+
+    main()
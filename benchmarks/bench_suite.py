@@ -0,0 +1,277 @@
+"""
+
+    EU Grid frequency scraper - microbenchmark-suite of the hot paths with JSON-baselines.
+
+    Measures offline and in-process: parsing of the API-payload, classifying frequencies (single and batch),
+    `check_frequency_thresholds` with an in-memory alert-state, `load_config()` (with and without the config-snapshot)
+    formatting notifications, publishing/reading the shared latest sample and appending a sample to the spool.
+
+    Save a baseline with `--save FILE` and compare against it with `--compare FILE`, which exits with 1,
+    when a benchmark is more than `--max-regression` percent slower than in the baseline.
+
+    # Script-Version: 1.0
+    # Python-Version: 3.10.12
+
+"""
+import os
+import sys
+import json
+import timeit
+import random
+import logging
+import argparse
+import platform
+import tempfile
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Callable
+#
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import scraper
+from src.api import parse_api_data
+from src.ntfy import NTFYMessage
+from src.config import load_config
+from src.replay import CountingNotifier
+from src.thresholds import ThresholdEngine
+from src.alert_state import AlertStateMachine
+from src.shared_sample import SharedSamplePublisher, SharedSampleReader
+from src.spool import Spool
+from src.store import RECORD_STRUCT
+
+# Version of the format of the baseline-files
+BASELINE_VERSION:int = 1
+# Thresholds of the `.sample.env`
+THRESHOLDS:ThresholdEngine = ThresholdEngine(critical_min=49.8, warning_min=49.9, warning_max=50.1, critical_max=50.2)
+# Minimal dotenv-file, so `load_config()` doesn't depend on the local `.env`
+DOTENV:str = (
+    'NETZFREQUENZ_DE_API_URL="https://netzfrequenz.invalid/frequenz.xml"\n'
+    'ENABLE_NTFY="false"\n'
+    'CRITICAL_MIN_HZ_ALERT_THRESHOLD="49.8"\n'
+    'WARNING_MIN_HZ_ALERT_THRESHOLD="49.9"\n'
+    'WARNING_MAX_HZ_ALERT_THRESHOLD="50.1"\n'
+    'CRITICAL_MAX_HZ_ALERT_THRESHOLD="50.2"\n'
+)
+# Frequencies per call of the batch-benchmark
+BATCH_SIZE:int = 10_000
+START_MS:int = 1770822308000 # 2026-02-11T15:05:08+00:00
+
+def random_frequencies(size:int, seed:int=42) -> list[float]:
+    """
+    Get a reproducible random walk around 50 Hz, that crosses the thresholds now and then.
+    """
+    rng = random.Random(seed)
+    frequencies:list[float] = []
+    frequency:float = 50.0
+    for _ in range(size):
+        frequency = min(max(frequency + rng.gauss(0, 0.02) - (frequency - 50.0) * 0.01, 49.7), 50.3)
+        frequencies.append(round(frequency, 3))
+    return frequencies
+
+#
+# Benchmarks: setup-functions, that return the function to time and the number of operations per call
+#
+def setup_parse_fast() -> tuple[Callable[[], object], int]:
+    content:bytes = b"<r><f>50.043</f><z>2026-02-11T15:05:08+00:00</z></r>"
+    return (lambda: parse_api_data(content), 1)
+
+def setup_parse_etree() -> tuple[Callable[[], object], int]:
+    # The XML-declaration isn't handled by the fast-path, so `parse_api_data` falls back to `ElementTree`
+    content:bytes = b'<?xml version="1.0"?>\n<r>\n  <f>49.987</f>\n  <z>2026-02-11T15:05:09+00:00</z>\n</r>\n'
+    return (lambda: parse_api_data(content), 1)
+
+def setup_classify() -> tuple[Callable[[], object], int]:
+    frequencies:list[float] = random_frequencies(BATCH_SIZE)
+    classify = THRESHOLDS.classify
+    return (lambda: [classify(_frequency) for _frequency in frequencies], BATCH_SIZE)
+
+def setup_classify_batch() -> tuple[Callable[[], object], int]:
+    frequencies:list[float] = random_frequencies(BATCH_SIZE)
+    return (lambda: THRESHOLDS.classify_batch(frequencies), BATCH_SIZE)
+
+def setup_check_thresholds() -> tuple[Callable[[], object], int]:
+    frequencies:list[float] = random_frequencies(BATCH_SIZE)
+    alerts = AlertStateMachine(state_filepath=None, thresholds=THRESHOLDS, hysteresis=0.01, debounce_ms=2000)
+    notifier = CountingNotifier()
+    timestamp_ms:list[int] = [START_MS]
+
+    def _check() -> None:
+        for _frequency in frequencies:
+            timestamp_ms[0] += 1000
+            scraper.check_frequency_thresholds(_frequency, "2026-02-11T15:05:08+00:00", timestamp_ms[0],
+                                               alerts, notifier, thresholds=THRESHOLDS)
+    return (_check, BATCH_SIZE)
+
+def setup_load_config() -> tuple[Callable[[], object], int]:
+    # Runs in the temporary working-directory of `run_benchmarks`, which contains `DOTENV`
+    return (load_config, 1)
+
+def setup_load_config_snapshot() -> tuple[Callable[[], object], int]:
+    # The first load writes the snapshot, all measured loads reuse it
+    load_config(snapshot_filepath=".env.snapshot.json")
+    return (lambda: load_config(snapshot_filepath=".env.snapshot.json"), 1)
+
+def setup_format_alert() -> tuple[Callable[[], object], int]:
+    notifier = CountingNotifier()
+    return (lambda: scraper.send_alert("CRITICAL", "MIN", 49.789, 49.8, "2026-02-11T15:05:08+00:00", notifier), 1)
+
+def setup_format_recovery() -> tuple[Callable[[], object], int]:
+    notifier = CountingNotifier()
+    return (lambda: scraper.send_recovery("WARNING", "MAX", 50.05, 50.1, "2026-02-11T15:05:08+00:00", notifier), 1)
+
+def setup_coalesce() -> tuple[Callable[[], object], int]:
+    first = NTFYMessage("Title", "Message", "urgent", "rotating_light", "CRITICAL-LOW", 49.79, True)
+    other = NTFYMessage("Title", "Other message", "urgent", "rotating_light", "CRITICAL-LOW", 49.78, True)
+    return (lambda: first.merge(other), 1)
+
+def setup_shared_publish() -> tuple[Callable[[], object], int]:
+    publisher = SharedSamplePublisher("latest.sample")
+    return (lambda: publisher.publish(50.01, 1770768000000, 0), 1)
+
+def setup_shared_read() -> tuple[Callable[[], object], int]:
+    SharedSamplePublisher("latest.sample").publish(50.01, 1770768000000, 0)
+    reader = SharedSampleReader("latest.sample")
+    return (reader.read, 1)
+
+def setup_spool_append() -> tuple[Callable[[], object], int]:
+    # The batched fsync is not part of the hot path
+    spool = Spool("spool", sync_interval=3600)
+    record:bytes = RECORD_STRUCT.pack(1770768000000, 50.01)
+    return (lambda: spool.append(record), 1)
+
+BENCHMARKS:dict[str, Callable[[], tuple[Callable[[], object], int]]] = {
+    "parse.fast": setup_parse_fast,
+    "parse.etree": setup_parse_etree,
+    "thresholds.classify": setup_classify,
+    "thresholds.classify_batch": setup_classify_batch,
+    "thresholds.check": setup_check_thresholds,
+    "config.load": setup_load_config,
+    "config.load_snapshot": setup_load_config_snapshot,
+    "notify.format_alert": setup_format_alert,
+    "notify.format_recovery": setup_format_recovery,
+    "notify.coalesce": setup_coalesce,
+    "shared.publish": setup_shared_publish,
+    "shared.read": setup_shared_read,
+    "spool.append": setup_spool_append
+}
+
+def measure(function:Callable[[], object], operations:int, repeat:int) -> float:
+    """
+    Get the best time per operation in nanoseconds.
+
+    The calls per measurement are chosen by `timeit`, so that one measurement takes at least 0.2 seconds.
+    """
+    timer = timeit.Timer(function)
+    (number, elapsed) = timer.autorange()
+    return min([elapsed] + timer.repeat(repeat=repeat - 1, number=number)) / number / operations * 1e9
+
+def run_benchmarks(names:list[str], repeat:int) -> dict[str, float]:
+    """
+    Run the benchmarks in a temporary working-directory with a minimal dotenv-file.
+
+    Returns the nanoseconds per operation by benchmark-name.
+    """
+    results:dict[str, float] = {}
+    cwd:str = os.getcwd()
+    with tempfile.TemporaryDirectory() as _tmp_dirpath:
+        os.chdir(_tmp_dirpath)
+        try:
+            Path(".env").write_text(DOTENV)
+            for _name in names:
+                (function, operations) = BENCHMARKS[_name]()
+                results[_name] = measure(function, operations, repeat)
+                print(f"{_name:<28} {results[_name]:>12.1f} ns/op {1e9 / results[_name]:>14,.0f} op/s")
+        finally:
+            os.chdir(cwd)
+    return results
+
+def save_baseline(filepath:Path, results:dict[str, float]) -> None:
+    filepath.write_text(json.dumps({
+        "version": BASELINE_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {_name: {"ns_per_op": round(_ns, 3)} for (_name, _ns) in results.items()}
+    }, indent=2) + "\n")
+
+def load_baseline(filepath:Path) -> dict[str, float]:
+    """
+    Get the nanoseconds per operation by benchmark-name of a baseline-file.
+    """
+    baseline:dict = json.loads(filepath.read_text())
+    if baseline.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Unsupported baseline-version '{baseline.get('version')}' in '{filepath}'")
+    return {_name: float(_result["ns_per_op"]) for (_name, _result) in baseline["results"].items()}
+
+def compare(results:dict[str, float], baseline:dict[str, float], max_regression:float) -> list[str]:
+    """
+    Print the change of every benchmark compared to the baseline.
+
+    Returns the names of the benchmarks, that are more than `max_regression` percent slower.
+    """
+    regressions:list[str] = []
+    width:int = max([28] + [len(_name) + 1 for _name in results])
+    print(f"\n{'benchmark':<{width}} {'baseline':>13} {'current':>13} {'change':>9}")
+    for (_name, _ns) in results.items():
+        if _name not in baseline:
+            print(f"{_name:<{width}} {'-':>13} {_ns:>10.1f} ns {'new':>9}")
+            continue
+        change:float = (_ns / baseline[_name] - 1) * 100
+        regressed:bool = change > max_regression
+        if regressed:
+            regressions.append(_name)
+        print(f"{_name:<{width}} {baseline[_name]:>10.1f} ns {_ns:>10.1f} ns {change:>+8.1f}%{' REGRESSION' if regressed else ''}")
+    return regressions
+
+def main() -> None:
+    names:list[str] = [_name for _name in BENCHMARKS if any(_name.startswith(_prefix) for _prefix in args.only)] \
+        if args.only else list(BENCHMARKS)
+    if not names:
+        print(f"No benchmarks match {args.only}, available: {', '.join(BENCHMARKS)}")
+        sys.exit(2)
+    # Baselines are resolved before changing into the temporary working-directory
+    save_filepath:Path|None = Path(args.save).resolve() if args.save else None
+    compare_filepath:Path|None = Path(args.compare).resolve() if args.compare else None
+    baseline:dict[str, float] = load_baseline(compare_filepath) if compare_filepath is not None else {}
+
+    results:dict[str, float] = run_benchmarks(names, args.repeat)
+
+    if save_filepath is not None:
+        save_baseline(save_filepath, results)
+        print(f"\nSaved baseline to '{save_filepath}'")
+    if compare_filepath is not None:
+        regressions:list[str] = compare(results, baseline, args.max_regression)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.max_regression}%: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\nNo benchmark regressed by more than {args.max_regression}%")
+
+if __name__ == '__main__':
+    filename:str = os.path.basename(__file__)
+    parser = argparse.ArgumentParser(filename)
+    parser.add_argument(
+        '--save', help=f"Write the results as JSON-baseline to FILE",
+        metavar="FILE", default=None
+    )
+    parser.add_argument(
+        '--compare', help=f"Compare the results with the JSON-baseline FILE and exit with 1 on a regression",
+        metavar="FILE", default=None
+    )
+    parser.add_argument(
+        '--max-regression', help=f"Allowed slowdown in percent compared to the baseline (Default=20)",
+        type=float, default=20.0
+    )
+    parser.add_argument(
+        '--only', help=f"Only run the benchmarks, whose name starts with one of the prefixes (e.g. 'parse' 'notify')",
+        nargs="+", metavar="PREFIX", default=None
+    )
+    parser.add_argument(
+        '-r', '--repeat', help=f"Measurements per benchmark, the best one is reported (Default=5)",
+        type=int, default=5
+    )
+    args:list = parser.parse_args()
+
+    # `scraper.py` configures its logger in `__main__`, the events of the alerts are discarded like below INFO-level
+    scraper.logger = logging.getLogger("scraper")
+    scraper.logger.setLevel(logging.WARNING)
+
+    main()
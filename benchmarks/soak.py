@@ -0,0 +1,304 @@
+"""
+
+    EU Grid frequency scraper - end-to-end load- and soak-test against local stubs of the API and NTFY.
+
+    Runs `scraper.py` (daemon-mode or `--targets`) as subprocess for `--duration` seconds against the stubs of
+    `stub_server.py` and reports the end-to-end sample-latency (publication until served to the scraper),
+    missed samples, the longest gap between two polls, the alert-delivery-latency (sample-timestamp until
+    received by the NTFY-sink), the RSS-growth and the CPU-usage of the scraper.
+
+    Reading RSS and CPU of the scraper requires Linux (`/proc`).
+
+    # Script-Version: 1.0
+    # Python-Version: 3.10.12
+
+"""
+import os
+import sys
+import json
+import math
+import time
+import signal
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+#
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import stub_server
+from src.utils import timestamp_to_epoch_ms
+
+SCRAPER_FILEPATH:Path = Path(__file__).resolve().parent.parent / "scraper.py"
+CLOCK_TICKS:int = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE:int = os.sysconf("SC_PAGE_SIZE")
+
+def percentile(values:list[float], q:float) -> float:
+    """
+    Get the nearest-rank `q`-percentile (0 < q <= 1), `nan` without values.
+    """
+    if not values:
+        return math.nan
+    ordered:list[float] = sorted(values)
+    return ordered[max(math.ceil(q * len(ordered)), 1) - 1]
+
+def format_percentiles(values:list[float]) -> str:
+    """
+    Format P50, P90, P99 and max. of latencies (in seconds) in milliseconds.
+    """
+    return " | ".join(f"{_name}={percentile(values, _q) * 1000:.1f} ms"
+                      for (_name, _q) in (("P50", 0.5), ("P90", 0.9), ("P99", 0.99), ("Max", 1.0)))
+
+def read_process_usage(pid:int) -> tuple[float, int]:
+    """
+    Get the CPU-time (user and system, in seconds) and the RSS (in bytes) of a process.
+    """
+    with open(f"/proc/{pid}/stat", "r") as _file:
+        # The process-name can contain spaces, the fields after it are separated by spaces
+        fields:list[str] = _file.read().rsplit(")", 1)[1].split()
+    with open(f"/proc/{pid}/statm", "r") as _file:
+        rss_pages:int = int(_file.read().split()[1])
+    return ((int(fields[11]) + int(fields[12])) / CLOCK_TICKS, rss_pages * PAGE_SIZE)
+
+def write_workdir(workdir:Path, api_urls:list[str], ntfy_url:str) -> list[str]:
+    """
+    Write the `.env` (and the targets-file) of the scraper into its working-directory.
+
+    Returns the arguments of the scraper.
+    """
+    env:dict[str, str] = {
+        "NETZFREQUENZ_DE_API_URL": api_urls[0],
+        "ENABLE_NTFY": "true",
+        "NTFY_TOPIC_URL": ntfy_url,
+        "NTFY_AUTH_TOKEN": "soak",
+        "NTFY_HTTP_REQUEST_TIMEOUT": "5",
+        "CRITICAL_MIN_HZ_ALERT_THRESHOLD": "49.8",
+        "WARNING_MIN_HZ_ALERT_THRESHOLD": "49.9",
+        "WARNING_MAX_HZ_ALERT_THRESHOLD": "50.1",
+        "CRITICAL_MAX_HZ_ALERT_THRESHOLD": "50.2",
+        "DAEMON_POLL_INTERVAL": str(args.interval)
+    }
+    for _override in args.env:
+        (_key, _value) = _override.split("=", 1)
+        env[_key] = _value
+    (workdir / ".env").write_text("".join(f'{_key}="{_value}"\n' for (_key, _value) in env.items()))
+
+    scraper_args:list[str] = ["-l", args.loglevel]
+    if args.mode == "targets":
+        targets:list[dict] = [{"name": f"target-{_index}", "url": _url, "interval": args.interval}
+                              for (_index, _url) in enumerate(api_urls)]
+        (workdir / "targets.json").write_text(json.dumps(targets, indent=2))
+        scraper_args += ["--targets", "targets.json"]
+    else:
+        scraper_args += ["-d"]
+    return scraper_args
+
+def count_log_levels(log_filepath:Path) -> dict[str, int]:
+    counts:dict[str, int] = {"WARNING": 0, "ERROR": 0, "CRITICAL": 0}
+    with open(log_filepath, "r", errors="replace") as _file:
+        for _line in _file:
+            for _level in counts:
+                if f") [{_level}] " in _line:
+                    counts[_level] += 1
+    return counts
+
+def soak(workdir:Path) -> dict:
+    stub = stub_server.APIStub(
+        trace=stub_server.load_trace(args.trace),
+        sample_interval=args.sample_interval,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate
+    )
+    sink = stub_server.NTFYSink(delay=args.ntfy_delay, error_rate=args.ntfy_error_rate)
+    api_server = stub_server.ServerThread(stub.handle_connection)
+    ntfy_server = stub_server.ServerThread(sink.handle_connection)
+    api_server.start()
+    ntfy_server.start()
+
+    api_urls:list[str] = [f"http://127.0.0.1:{api_server.port}/target-{_index}/frequenz.xml"
+                          for _index in range(args.targets if args.mode == "targets" else 1)]
+    scraper_args:list[str] = write_workdir(workdir, api_urls, f"http://127.0.0.1:{ntfy_server.port}/soak")
+    log_filepath:Path = workdir / "scraper.log"
+
+    print(f"Running '{SCRAPER_FILEPATH.name} {' '.join(scraper_args)}' for {args.duration:.0f} seconds in '{workdir}'")
+    usage:list[tuple[float, float, int]] = []
+    with open(log_filepath, "w") as _log_file:
+        process = subprocess.Popen([sys.executable, str(SCRAPER_FILEPATH)] + scraper_args, cwd=workdir,
+                                   stdout=_log_file, stderr=subprocess.STDOUT)
+        start:float = time.time()
+        try:
+            while time.time() - start < args.duration and process.poll() is None:
+                (cpu_time, rss) = read_process_usage(process.pid)
+                usage.append((time.time(), cpu_time, rss))
+                time.sleep(1.0)
+        finally:
+            end:float = time.time()
+            process.send_signal(signal.SIGTERM)
+            try:
+                exit_code:int = process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                exit_code = process.wait()
+    # Let the last notifications arrive, before the stubs are stopped
+    time.sleep(0.5)
+    api_server.stop()
+    ntfy_server.stop()
+
+    # Samples between the warm-up and the last poll-interval (which might not have been polled yet)
+    warmed_up:float = start + args.warmup
+    published:list[int] = stub.published(warmed_up, end - args.interval - args.latency - 1)
+    latencies:list[float] = []
+    missed:int = 0
+    poll_gaps:list[float] = []
+    for _url in api_urls:
+        served:dict[int, float] = stub.served.get("/" + _url.split("/", 3)[3], {})
+        for _timestamp in published:
+            if _timestamp in served:
+                latencies.append(served[_timestamp] - _timestamp)
+            else:
+                missed += 1
+        served_times:list[float] = sorted(_time for _time in served.values() if _time >= warmed_up)
+        poll_gaps += [_later - _earlier for (_earlier, _later) in zip(served_times, served_times[1:])]
+
+    alert_latencies:list[float] = []
+    priorities:dict[str, int] = {}
+    for (_arrival, _headers, _message) in sink.received:
+        priority:str = _headers.get("priority", "default")
+        priorities[priority] = priorities.get(priority, 0) + 1
+        for _line in _message.splitlines():
+            if "Timestamp=" in _line:
+                alert_latencies.append(_arrival - timestamp_to_epoch_ms(_line.split("Timestamp=", 1)[1].strip()) / 1000)
+
+    # RSS and CPU after the warm-up, CPU per sampling-interval
+    steady:list[tuple[float, float, int]] = [_usage for _usage in usage if _usage[0] >= warmed_up] or usage
+    cpu_usages:list[float] = [(_later[1] - _earlier[1]) / (_later[0] - _earlier[0])
+                              for (_earlier, _later) in zip(steady, steady[1:])]
+    (rss_start, rss_end) = (steady[0][2], steady[-1][2]) if steady else (0, 0)
+    steady_duration:float = steady[-1][0] - steady[0][0] if len(steady) > 1 else 0.0
+    return {
+        "mode": args.mode,
+        "targets": len(api_urls),
+        "duration": end - start,
+        "exit_code": exit_code,
+        "log_levels": count_log_levels(log_filepath),
+        "samples": {
+            "published": len(published) * len(api_urls),
+            "missed": missed,
+            "latency_p50": percentile(latencies, 0.5),
+            "latency_p90": percentile(latencies, 0.9),
+            "latency_p99": percentile(latencies, 0.99),
+            "latency_max": percentile(latencies, 1.0),
+            "max_poll_gap": max(poll_gaps, default=math.nan)
+        },
+        "api_stub": {"requests": stub.request_count, "errors": stub.error_count, "malformed": stub.malformed_count},
+        "alerts": {
+            "delivered": len(sink.received),
+            "failed": sink.failed_count,
+            "priorities": priorities,
+            "latency_p50": percentile(alert_latencies, 0.5),
+            "latency_p90": percentile(alert_latencies, 0.9),
+            "latency_p99": percentile(alert_latencies, 0.99),
+            "latency_max": percentile(alert_latencies, 1.0)
+        },
+        "rss": {
+            "start": rss_start,
+            "end": rss_end,
+            "max": max((_usage[2] for _usage in steady), default=0),
+            "growth_per_hour": (rss_end - rss_start) / steady_duration * 3600 if steady_duration else math.nan
+        },
+        "cpu": {
+            "mean": (steady[-1][1] - steady[0][1]) / steady_duration if steady_duration else math.nan,
+            "max": max(cpu_usages, default=math.nan)
+        },
+        "_latencies": latencies,
+        "_alert_latencies": alert_latencies
+    }
+
+def print_report(report:dict) -> None:
+    samples:dict = report["samples"]
+    alerts:dict = report["alerts"]
+    missed_percent:float = samples["missed"] / samples["published"] * 100 if samples["published"] else math.nan
+    priorities:str = ", ".join(f"{_priority}={_count}" for (_priority, _count) in sorted(alerts["priorities"].items()))
+    mebibyte:int = 1024 * 1024
+    print(f"""
+        >------------------------------------------<
+        > Soak-test ({report['mode']}, {report['targets']} target(s), {report['duration']:.0f} s) <
+        - Scraper: Exit-code={report['exit_code']} | Warnings={report['log_levels']['WARNING']} | Errors={report['log_levels']['ERROR'] + report['log_levels']['CRITICAL']}
+        - API-stub: Requests={report['api_stub']['requests']} | 503={report['api_stub']['errors']} | Malformed={report['api_stub']['malformed']}
+        - Samples: Published={samples['published']} | Missed={samples['missed']} ({missed_percent:.1f}%) | Max. poll-gap={samples['max_poll_gap']:.2f} s
+        - Sample-latency: {format_percentiles(report['_latencies'])}
+        - Alerts: Delivered={alerts['delivered']} ({priorities or '-'}) | Failed={alerts['failed']}
+        - Alert-latency: {format_percentiles(report['_alert_latencies'])}
+        - RSS: Start={report['rss']['start'] / mebibyte:.1f} MiB | End={report['rss']['end'] / mebibyte:.1f} MiB | Max={report['rss']['max'] / mebibyte:.1f} MiB | Growth={report['rss']['growth_per_hour'] / mebibyte:+.1f} MiB/h
+        - CPU: Mean={report['cpu']['mean'] * 100:.1f}% | Max={report['cpu']['max'] * 100:.1f}% of one core
+        >------------------------------------------<
+        """)
+
+def main() -> None:
+    if args.workdir is not None:
+        workdir:Path = Path(args.workdir).resolve()
+        workdir.mkdir(parents=True, exist_ok=True)
+        report:dict = soak(workdir)
+    else:
+        with tempfile.TemporaryDirectory(prefix="soak-") as _tmp_dirpath:
+            report = soak(Path(_tmp_dirpath))
+    print_report(report)
+
+    if args.report is not None:
+        Path(args.report).write_text(json.dumps({_key: _value for (_key, _value) in report.items()
+                                                 if not _key.startswith("_")}, indent=2) + "\n")
+    failures:list[str] = []
+    if report["exit_code"] != 0:
+        failures.append(f"scraper exited with {report['exit_code']}")
+    if args.max_rss_growth is not None and report["rss"]["growth_per_hour"] > args.max_rss_growth * 1024 * 1024:
+        failures.append(f"RSS grew by more than {args.max_rss_growth} MiB/h")
+    if args.max_poll_gap is not None and report["samples"]["max_poll_gap"] > args.max_poll_gap:
+        failures.append(f"a poll-gap exceeded {args.max_poll_gap} seconds")
+    if failures:
+        print(f"Soak-test failed: {'; '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    filename:str = os.path.basename(__file__)
+    parser = argparse.ArgumentParser(filename)
+    parser.add_argument('-d', '--duration', help=f"Duration in seconds (Default=60)", type=float, default=60.0)
+    parser.add_argument('-m', '--mode', help=f"Run the scraper in daemon-mode or with --targets (Default=daemon)",
+                        choices=("daemon", "targets"), default="daemon")
+    parser.add_argument('-n', '--targets', help=f"Number of targets in targets-mode (Default=10)", type=int, default=10)
+    parser.add_argument('-i', '--interval', help=f"Poll-interval of the scraper in seconds (Default=1.0)",
+                        type=float, default=1.0)
+    parser.add_argument('--warmup', help=f"Seconds at the start, that are excluded from the statistics (Default=5)",
+                        type=float, default=5.0)
+    parser.add_argument('--trace', help=f"Frequency-trace of the API-stub: {', '.join(stub_server.TRACES)} or a "
+                                        f"recording (Default=sine)", default="sine")
+    parser.add_argument('--sample-interval', help=f"Seconds between two samples of the API-stub (Default=1)",
+                        type=int, default=1)
+    parser.add_argument('--latency', help=f"Response-latency of the API-stub in seconds (Default=0)", type=float, default=0.0)
+    parser.add_argument('--jitter', help=f"Standard-deviation of the jitter of the API-stub in seconds (Default=0)",
+                        type=float, default=0.0)
+    parser.add_argument('--error-rate', help=f"Fraction of 503-responses of the API-stub (Default=0)",
+                        type=float, default=0.0)
+    parser.add_argument('--malformed-rate', help=f"Fraction of malformed XML-payloads of the API-stub (Default=0)",
+                        type=float, default=0.0)
+    parser.add_argument('--ntfy-delay', help=f"Response-delay of the NTFY-sink in seconds (Default=0)",
+                        type=float, default=0.0)
+    parser.add_argument('--ntfy-error-rate', help=f"Fraction of 500-responses of the NTFY-sink (Default=0)",
+                        type=float, default=0.0)
+    parser.add_argument('-e', '--env', help=f"Additional setting of the scraper's `.env`, e.g. ENABLE_ADAPTIVE_POLLING=true",
+                        metavar="KEY=VALUE", action="append", default=[])
+    parser.add_argument('-l', '--loglevel', help=f"Log level of the scraper (Default=INFO)", default="INFO")
+    parser.add_argument('--workdir', help=f"Keep the `.env`, log and state-files of the scraper in this directory "
+                                          f"(Default: temporary directory)", default=None)
+    parser.add_argument('--report', help=f"Also write the report as JSON to FILE", metavar="FILE", default=None)
+    parser.add_argument('--max-rss-growth', help=f"Fail, if the RSS grows faster than this (MiB per hour)",
+                        type=float, default=None)
+    parser.add_argument('--max-poll-gap', help=f"Fail, if two polls are further apart than this (seconds)",
+                        type=float, default=None)
+    args:list = parser.parse_args()
+    for _override in args.env:
+        if "=" not in _override:
+            parser.error(f"Invalid --env '{_override}', expected KEY=VALUE")
+
+    main()
@@ -0,0 +1,301 @@
+"""
+
+    EU Grid frequency scraper - stubs of the Netzfrequenz-API and of NTFY for benchmarks and soak-tests.
+
+    The API-stub publishes a new sample every `--sample-interval` seconds from a scriptable frequency-trace
+    and can add latency, jitter, 5xx-errors and malformed XML. The NTFY-sink records all POSTs and can be
+    made slow or failing. Both record what they served/received, e.g. for `soak.py`.
+
+    # Script-Version: 1.0
+    # Python-Version: 3.10.12
+
+"""
+import os
+import sys
+import math
+import time
+import random
+import asyncio
+import argparse
+import threading
+from pathlib import Path
+from http import HTTPStatus
+from typing import Callable
+from datetime import datetime, timezone
+#
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.replay import iter_replay_samples
+
+# Built-in frequency-traces by name, which get the index of the sample
+TRACES:dict[str, Callable[[int], float]] = {
+    # Noise around 50 Hz, reproducible per sample, so repeated requests of a sample return the same frequency
+    "random": lambda index: round(random.Random(index).gauss(50.0, 0.03), 3),
+    # Slow oscillation, that crosses the WARNING- and CRITICAL-thresholds of the `.sample.env` every 2 minutes
+    "sine": lambda index: round(50.0 + 0.25 * math.sin(2 * math.pi * index / 120), 3),
+    # Noise with a dip to 49.75 Hz for 10 samples every 60 samples
+    "dip": lambda index: 49.75 if index % 60 >= 50 else round(random.Random(index).gauss(50.0, 0.03), 3)
+}
+
+def load_trace(name_or_filepath:str) -> Callable[[int], float]:
+    """
+    Get a built-in trace or a trace, that loops over the frequencies of a recording (see `--replay` of `scraper.py`).
+    """
+    if name_or_filepath in TRACES:
+        return TRACES[name_or_filepath]
+    frequencies:list[float] = [_frequency for (_frequency, _) in iter_replay_samples(Path(name_or_filepath))]
+    if not frequencies:
+        raise ValueError(f"Recording '{name_or_filepath}' doesn't contain any samples")
+    return lambda index: frequencies[index % len(frequencies)]
+
+def format_timestamp(epoch_s:int) -> str:
+    return datetime.fromtimestamp(epoch_s, timezone.utc).isoformat()
+
+async def read_request(reader:asyncio.StreamReader) -> tuple[str, str, dict[str, str], bytes]:
+    """
+    Read method, path, headers (lowercase names) and body of the next request of a keep-alive connection.
+    """
+    head:list[str] = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    (method, path) = head[0].split(" ")[:2]
+    headers:dict[str, str] = {}
+    for _line in head[1:]:
+        if ":" in _line:
+            (_name, _value) = _line.split(":", 1)
+            headers[_name.strip().lower()] = _value.strip()
+    body:bytes = await reader.readexactly(int(headers.get("content-length", "0")))
+    return (method, path, headers, body)
+
+async def write_response(writer:asyncio.StreamWriter, status:int, body:bytes, keep_alive:bool,
+                         content_type:str = "application/xml") -> None:
+    connection:str = "" if keep_alive else "Connection: close\r\n"
+    writer.write(
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\nContent-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n{connection}\r\n".encode() + body
+    )
+    await writer.drain()
+
+class APIStub:
+    """
+    Stand-in of the Netzfrequenz-API, that answers requests on any path.
+
+    Sample `i` is published at `start + i * sample_interval` (whole seconds, like the API) with the frequency `trace(i)`.
+    Every response is delayed by `latency` plus the absolute of a normal distributed `jitter` (seconds),
+    `error_rate` of the requests get a `503` and `malformed_rate` of them truncated XML.
+    """
+    def __init__(self, trace:Callable[[int], float] = TRACES["random"], sample_interval:int = 1, latency:float = 0.0,
+                 jitter:float = 0.0, error_rate:float = 0.0, malformed_rate:float = 0.0, seed:int|None = None) -> None:
+        if sample_interval < 1:
+            raise ValueError("sample_interval must be >= 1 second")
+        self._trace:Callable[[int], float] = trace
+        self._sample_interval:int = sample_interval
+        self._latency:float = latency
+        self._jitter:float = jitter
+        self._error_rate:float = error_rate
+        self._malformed_rate:float = malformed_rate
+        self._random = random.Random(seed)
+        self._start:int = int(time.time())
+        self._served:dict[str, dict[int, float]] = {}
+        self._request_count:int = 0
+        self._error_count:int = 0
+        self._malformed_count:int = 0
+
+    @property
+    def served(self) -> dict[str, dict[int, float]]:
+        """
+        Time (epoch-seconds), when each sample (by its timestamp in epoch-seconds) has been served first, by path.
+        """
+        return self._served
+
+    @property
+    def request_count(self) -> int:
+        return self._request_count
+
+    @property
+    def error_count(self) -> int:
+        return self._error_count
+
+    @property
+    def malformed_count(self) -> int:
+        return self._malformed_count
+
+    def sample_at(self, now:float) -> tuple[int, float]:
+        """
+        Get the timestamp (epoch-seconds) and frequency of the sample, that is current at `now`.
+        """
+        index:int = max(int(now - self._start), 0) // self._sample_interval
+        return (self._start + index * self._sample_interval, self._trace(index))
+
+    def published(self, since:float, until:float) -> list[int]:
+        """
+        Get the timestamps (epoch-seconds) of all samples, that have been published between `since` and `until`.
+        """
+        first:int = max(math.ceil((since - self._start) / self._sample_interval), 0)
+        last:int = math.floor((until - self._start) / self._sample_interval)
+        return [self._start + _index * self._sample_interval for _index in range(first, last + 1)]
+
+    async def handle_connection(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                (method, path, headers, body) = await read_request(reader)
+                self._request_count += 1
+                keep_alive:bool = headers.get("connection", "").lower() != "close"
+                (timestamp, frequency) = self.sample_at(time.time())
+                delay:float = self._latency + (abs(self._random.gauss(0, self._jitter)) if self._jitter > 0 else 0.0)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                draw:float = self._random.random()
+                if draw < self._error_rate:
+                    self._error_count += 1
+                    await write_response(writer, 503, b"", keep_alive)
+                elif draw < self._error_rate + self._malformed_rate:
+                    self._malformed_count += 1
+                    await write_response(writer, 200, f"<r><f>{frequency:.3f}</f><z>".encode(), keep_alive)
+                else:
+                    await write_response(writer, 200, f"<r><f>{frequency:.3f}</f><z>{format_timestamp(timestamp)}</z></r>".encode(),
+                                         keep_alive)
+                    self._served.setdefault(path, {}).setdefault(timestamp, time.time())
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+class NTFYSink:
+    """
+    Stand-in of an NTFY-topic, that records every POST (arrival-time, headers and message).
+
+    Every response is delayed by `delay` seconds and `error_rate` of the POSTs get a `500` and aren't recorded.
+    """
+    def __init__(self, delay:float = 0.0, error_rate:float = 0.0, seed:int|None = None) -> None:
+        self._delay:float = delay
+        self._error_rate:float = error_rate
+        self._random = random.Random(seed)
+        self._received:list[tuple[float, dict[str, str], str]] = []
+        self._failed_count:int = 0
+
+    @property
+    def received(self) -> list[tuple[float, dict[str, str], str]]:
+        return self._received
+
+    @property
+    def failed_count(self) -> int:
+        return self._failed_count
+
+    async def handle_connection(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                (method, path, headers, body) = await read_request(reader)
+                arrival:float = time.time()
+                keep_alive:bool = headers.get("connection", "").lower() != "close"
+                if self._delay > 0:
+                    await asyncio.sleep(self._delay)
+                if method != "POST":
+                    await write_response(writer, 405, b"", keep_alive, content_type="application/json")
+                elif self._random.random() < self._error_rate:
+                    self._failed_count += 1
+                    await write_response(writer, 500, b'{"error":"stub"}', keep_alive, content_type="application/json")
+                else:
+                    self._received.append((arrival, headers, body.decode(errors="replace")))
+                    await write_response(writer, 200, b'{"id":"stub"}', keep_alive, content_type="application/json")
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+class ServerThread:
+    """
+    Serve a connection-handler (e.g. of `APIStub` or `NTFYSink`) with asyncio in a background-thread.
+    """
+    def __init__(self, handler:Callable, host:str = "127.0.0.1", port:int = 0) -> None:
+        self._handler:Callable = handler
+        self._host:str = host
+        self._port:int = port
+        self._loop:asyncio.AbstractEventLoop|None = None
+        self._thread:threading.Thread|None = None
+
+    @property
+    def port(self) -> int:
+        """
+        Bound port (after `start()`, also with port `0`).
+        """
+        return self._port
+
+    def start(self) -> None:
+        started = threading.Event()
+
+        async def _serve() -> None:
+            server = await asyncio.start_server(self._handler, self._host, self._port, backlog=1024)
+            self._port = server.sockets[0].getsockname()[1]
+            started.set()
+            async with server:
+                await server.serve_forever()
+
+        def _run() -> None:
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(_serve())
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self._loop.close()
+
+        self._thread = threading.Thread(target=_run, name=f"ServerThread-{self._host}", daemon=True)
+        self._thread.start()
+        if not started.wait(timeout=5):
+            raise OSError(f"Couldn't start server on {self._host}:{self._port}")
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+        for _task in asyncio.all_tasks(self._loop):
+            self._loop.call_soon_threadsafe(_task.cancel)
+        self._thread.join(timeout=5)
+
+async def serve(host:str, port:int, stub:APIStub|None = None, sink:NTFYSink|None = None, ntfy_port:int|None = None) -> None:
+    servers:list = [await asyncio.start_server((stub or APIStub()).handle_connection, host, port, backlog=1024)]
+    if ntfy_port is not None:
+        servers.append(await asyncio.start_server((sink or NTFYSink()).handle_connection, host, ntfy_port, backlog=1024))
+    await asyncio.gather(*(_server.serve_forever() for _server in servers))
+
+def run(host:str, port:int, stub:APIStub|None = None, sink:NTFYSink|None = None, ntfy_port:int|None = None) -> None:
+    """
+    Run the stubs until the process is terminated (e.g. as `multiprocessing.Process`).
+    """
+    try:
+        asyncio.run(serve(host, port, stub, sink, ntfy_port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    filename:str = os.path.basename(__file__)
+    parser = argparse.ArgumentParser(filename)
+    parser.add_argument('--host', help=f"Listen address (Default=127.0.0.1)", default="127.0.0.1")
+    parser.add_argument('--port', help=f"Listen port of the API-stub (Default=8080)", type=int, default=8080)
+    parser.add_argument('--trace', help=f"Frequency-trace: {', '.join(TRACES)} or a recording (Default=random)",
+                        default="random")
+    parser.add_argument('--sample-interval', help=f"Seconds between two samples (Default=1)", type=int, default=1)
+    parser.add_argument('--latency', help=f"Response-latency in seconds (Default=0)", type=float, default=0.0)
+    parser.add_argument('--jitter', help=f"Standard-deviation of the added jitter in seconds (Default=0)",
+                        type=float, default=0.0)
+    parser.add_argument('--error-rate', help=f"Fraction of 503-responses (Default=0)", type=float, default=0.0)
+    parser.add_argument('--malformed-rate', help=f"Fraction of malformed XML-payloads (Default=0)", type=float, default=0.0)
+    parser.add_argument('--ntfy-port', help=f"Also run the NTFY-sink on this port", type=int, default=None)
+    parser.add_argument('--ntfy-delay', help=f"Response-delay of the NTFY-sink in seconds (Default=0)",
+                        type=float, default=0.0)
+    parser.add_argument('--ntfy-error-rate', help=f"Fraction of 500-responses of the NTFY-sink (Default=0)",
+                        type=float, default=0.0)
+    args:list = parser.parse_args()
+
+    print(f"Serving the API-stub on http://{args.host}:{args.port}/ (any path)")
+    if args.ntfy_port is not None:
+        print(f"Serving the NTFY-sink on http://{args.host}:{args.ntfy_port}/ (any topic)")
+    run(
+        args.host, args.port,
+        stub=APIStub(load_trace(args.trace), args.sample_interval, args.latency, args.jitter, args.error_rate,
+                     args.malformed_rate),
+        sink=NTFYSink(args.ntfy_delay, args.ntfy_error_rate),
+        ntfy_port=args.ntfy_port
+    )
@@ -0,0 +1,124 @@
+"""
+
+    EU Grid frequency scraper - read the latest sample, that is published by the daemon.
+
+    # Script-Version: 1.0
+    # Python-Version: 3.10.12
+
+"""
+import os
+import json
+import time
+import logging
+import argparse
+from datetime import datetime, timezone
+#
+import src.utils as utils
+from src.shared_sample import SharedSampleReader, LatestSample
+from src.thresholds import SEVERITY_NAMES
+from src.custom_exceptions import *
+from src.logger_config import configure_logger
+
+def format_sample(sample:LatestSample) -> dict:
+    return {
+        "frequency": sample.frequency,
+        "timestamp": datetime.fromtimestamp(sample.timestamp_ms / 1000, tz=timezone.utc).isoformat(timespec="milliseconds"),
+        "severity": SEVERITY_NAMES.get(sample.severity, str(sample.severity)),
+        "sequence": sample.sequence,
+        "age": round(sample.age, 3)
+    }
+
+def print_sample(sample:LatestSample) -> None:
+    result:dict = format_sample(sample)
+    if args.format == "json":
+        print(json.dumps(result), flush=True)
+        return
+
+    lines:str = "\n".join(f"        > {_key}={_value}" for (_key, _value) in result.items())
+    print(f"""
+        >------------------------------------------<
+{lines}
+        >------------------------------------------<
+        """, flush=True)
+
+def watch(reader:SharedSampleReader) -> None:
+    """
+    Print every new sample until SIGINT.
+    """
+    sequence:int = -1
+    try:
+        while True:
+            sample:LatestSample|None = reader.read()
+            if sample is not None and sample.sequence != sequence:
+                sequence = sample.sequence
+                print_sample(sample)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+def main() -> None:
+    try:
+        with SharedSampleReader(filepath) as _reader:
+            if args.watch:
+                watch(_reader)
+                return
+            _read_start:float = time.perf_counter()
+            sample:LatestSample|None = _reader.read()
+            logger.debug("ReadTime=%.3f us", (time.perf_counter() - _read_start) * 1e6)
+    except SharedSampleError:
+        logger.exception("Couldn't read shared sample.")
+        quit(1)
+
+    if sample is None:
+        logger.error("No sample has been published to '%s' yet.", filepath)
+        quit(1)
+    print_sample(sample)
+    if args.max_age is not None and sample.age > args.max_age:
+        logger.error("The latest sample is older than %s seconds.", args.max_age)
+        quit(1)
+
+if __name__ == '__main__':
+    filename:str = os.path.basename(__file__)
+    parser = argparse.ArgumentParser(filename)
+    DEFAULT_LOGLEVEL:str = "WARNING"
+    parser.add_argument(
+        '-l', '--loglevel', help=f"Log level (Default={DEFAULT_LOGLEVEL})",
+        default=DEFAULT_LOGLEVEL
+    )
+    parser.add_argument(
+        '-F', '--file', help=f"File of the shared sample, the dotenv-file is only read without it (Default=`SHARED_SAMPLE_FILEPATH`)",
+        default=None
+    )
+    parser.add_argument(
+        '-f', '--format', help=f"Output format",
+        choices=["text", "json"], default="text"
+    )
+    parser.add_argument(
+        '-w', '--watch', help=f"Print every new sample until SIGINT.",
+        action="store_true"
+    )
+    parser.add_argument(
+        '-i', '--interval', help=f"Seconds between two reads of --watch (Default=0.1)",
+        type=float, default=0.1
+    )
+    parser.add_argument(
+        '--max-age', help=f"Exit with 1, when the latest sample has been published more than SECONDS ago "
+                          f"(e.g. the daemon is stopped).",
+        metavar="SECONDS", type=float, default=None
+    )
+    args:list = parser.parse_args()
+
+    configure_logger(args.loglevel.upper())
+    logger:logging.Logger = logging.getLogger(__name__)
+
+    filepath:str|None = args.file
+    if filepath is None:
+        from src.config import load_config, get_config_snapshot_filepath
+        try:
+            logger.debug("Using dotenv-filepath '%s'", utils.get_dotenv_filepath().absolute())
+            filepath = load_config(snapshot_filepath=get_config_snapshot_filepath()).shared_sample_filepath
+        except ConfigError:
+            logger.exception("Got invalid configuration.")
+            quit(1)
+
+    main()
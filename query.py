@@ -0,0 +1,164 @@
+"""
+
+    EU Grid frequency scraper - query stored samples.
+
+    # Script-Version: 1.0
+    # Python-Version: 3.10.12
+
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime, timezone
+#
+import src.utils as utils
+from src.store import SampleStore
+from src.query import query_range
+from src.rollup import RollupStore
+from src.thresholds import ThresholdEngine
+from src.custom_exceptions import *
+from src.config import load_config, Config
+from src.logger_config import configure_logger
+
+def format_epoch_ms(timestamp_ms:int) -> str:
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).isoformat(timespec="milliseconds")
+
+def parse_range_timestamp(timestamp:str) -> int:
+    """
+    Parse an ISO-8601 timestamp of the CLI into epoch-milliseconds (UTC, when no timezone is given).
+    """
+    parsed:datetime = datetime.fromisoformat(timestamp)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return round(parsed.timestamp() * 1000)
+
+def query_samples(directory:Path, start_ms:int, end_ms:int) -> dict:
+    """
+    Query min/max (with timestamps) and mean of the raw samples.
+    """
+    store = SampleStore(directory=directory)
+    stats = query_range(store, start_ms, end_ms)
+    if stats is None:
+        return {"count": 0}
+    return {
+        "count": stats.count,
+        "first": format_epoch_ms(stats.first_timestamp_ms),
+        "last": format_epoch_ms(stats.last_timestamp_ms),
+        "min": stats.min_frequency,
+        "min_timestamp": format_epoch_ms(stats.min_timestamp_ms),
+        "max": stats.max_frequency,
+        "max_timestamp": format_epoch_ms(stats.max_timestamp_ms),
+        "mean": round(stats.mean_frequency, 6)
+    }
+
+def query_rollups(directory:Path, start_ms:int, end_ms:int) -> dict:
+    """
+    Query aggregates from the coarsest fitting rollups.
+    """
+    rollups = RollupStore(
+        directory=directory,
+        thresholds=ThresholdEngine.from_config(config)
+    )
+    bucket = rollups.aggregate(start_ms, min(end_ms + 1, sys.maxsize))
+    if bucket is None:
+        return {"count": 0}
+    return {
+        "count": bucket.count,
+        "min": bucket.min_frequency,
+        "max": bucket.max_frequency,
+        "mean": round(bucket.mean_frequency, 6),
+        "stddev": round(bucket.stddev_frequency, 6),
+        "seconds_below_critical_min": bucket.below_critical_min_ms / 1000,
+        "seconds_below_warning_min": bucket.below_warning_min_ms / 1000,
+        "seconds_above_warning_max": bucket.above_warning_max_ms / 1000,
+        "seconds_above_critical_max": bucket.above_critical_max_ms / 1000
+    }
+
+def main() -> None:
+    try:
+        start_ms:int = parse_range_timestamp(args.start) if args.start else 0
+        end_ms:int = parse_range_timestamp(args.end) if args.end else sys.maxsize - 1
+    except ValueError:
+        logger.exception("Got invalid range-timestamp.")
+        quit(1)
+
+    directory = Path(args.directory or config.store_directory)
+    try:
+        _query_start:float = time.perf_counter()
+        if args.rollups:
+            stats:dict = query_rollups(directory, start_ms, end_ms)
+        else:
+            stats:dict = query_samples(directory, start_ms, end_ms)
+        query_time:float = time.perf_counter() - _query_start
+    except StoreError:
+        logger.exception("Couldn't query sample-store.")
+        quit(1)
+
+    logger.debug("QueryTime=%.3f ms", query_time*1000)
+
+    result:dict = {
+        "start": format_epoch_ms(start_ms) if args.start else None,
+        "end": format_epoch_ms(end_ms) if args.end else None,
+        **stats
+    }
+
+    if args.format == "json":
+        print(json.dumps(result))
+        return
+
+    if not result["count"]:
+        print("No samples within the given range.")
+        return
+
+    lines:str = "\n".join(f"        > {_key}={_value}" for (_key, _value) in result.items() if _value is not None)
+    print(f"""
+        >------------------------------------------<
+{lines}
+        >------------------------------------------<
+        """)
+
+if __name__ == '__main__':
+    filename:str = os.path.basename(__file__)
+    parser = argparse.ArgumentParser(filename)
+    DEFAULT_LOGLEVEL:str = "WARNING"
+    parser.add_argument(
+        '-l', '--loglevel', help=f"Log level (Default={DEFAULT_LOGLEVEL})",
+        default=DEFAULT_LOGLEVEL
+    )
+    parser.add_argument(
+        '--start', help=f"Start of the range as ISO-8601 timestamp (UTC if no timezone is given). Default: first sample",
+        default=None
+    )
+    parser.add_argument(
+        '--end', help=f"End of the range as ISO-8601 timestamp (UTC if no timezone is given). Default: last sample",
+        default=None
+    )
+    parser.add_argument(
+        '-D', '--directory', help=f"Store-directory (Default=`STORE_DIRECTORY`)",
+        default=None
+    )
+    parser.add_argument(
+        '-r', '--rollups', help=f"Answer from the rollups (adds stddev and time below/above the thresholds, but no min/max-timestamps)",
+        action="store_true"
+    )
+    parser.add_argument(
+        '-f', '--format', help=f"Output format",
+        choices=["text", "json"], default="text"
+    )
+    args:list = parser.parse_args()
+
+    configure_logger(args.loglevel.upper())
+    logger:logging.Logger = logging.getLogger(__name__)
+
+    try:
+        logger.debug("Using dotenv-filepath '%s'", utils.get_dotenv_filepath().absolute())
+        config:Config = load_config()
+    except ConfigError:
+        logger.exception("Got invalid configuration.")
+        quit(1)
+
+    main()
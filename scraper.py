@@ -6,41 +6,112 @@
     # Python-Version: 3.10.12
 
 """
+from __future__ import annotations
 import os
 import time
+import signal
 import logging
 import argparse
+import threading
+from pathlib import Path
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
 #
 import src.utils as utils
-from src.api import APIHandler
-from src.ntfy import NTFYHandler
+from src.alert_state import AlertStateMachine, AlertTransition
+from src.tracing import traced, add_hook, remove_hook, log_span
+from src.thresholds import ThresholdEngine, CRITICAL_LOW, WARNING_LOW, NOMINAL, WARNING_HIGH, CRITICAL_HIGH
 from src.custom_exceptions import *
-from src.config import load_config, Config
-from src.logger_config import configure_logger
+from src.config import load_config, get_config_snapshot_filepath, Config
+from src.logger_config import configure_logger, LOG_FORMATS
 
-def send_alert(level:str, min_or_max:str, frequency:float, threshold:float, timestamp:str, ntfy:None|NTFYHandler) -> bool:
+# Modules, that are only needed by some modes (e.g. `requests` for the API and NTFY, `asyncio` for `--targets`),
+# are imported where they are used, so `-s`, `--replay` etc. start without loading them
+if TYPE_CHECKING:
+    import asyncio
+    import requests
+    from src.api import APIHandler
+    from src.async_api import AsyncAPIHandler
+    from src.targets import Target
+    from src.ntfy import NTFYHandler
+    from src.notifiers import Notifier, NotificationDispatcher
+    from src.store import SampleStore
+    from src.rollup import RollupStore
+    from src.report import DailyReport
+    from src.scheduler import AdaptivePollScheduler
+    from src.rocof import RocofWindow
+    from src.metrics import MetricsExporter
+    from src.shared_sample import SharedSamplePublisher
+    from src.spool import Spool
+
+@traced("alert.send")
+def send_alert(level:str, min_or_max:str, frequency:float, threshold:float, timestamp:str,
+               notifier:None|Notifier, source:str|None = None,
+               quantity:str = "frequency", unit:str = "Hz") -> bool:
     """
-    Log and send NTFY alert if NTFY is enabled.
+    Log and queue the alert for the notification-channels (e.g. NTFY), if any is enabled.
+    
+    The title is prefixed with the `source` (target-name), when multiple targets are monitored.
+    `quantity` and `unit` describe the value, that reached the threshold (e.g. `RoCoF` in `Hz/s`).
+    Returns `False` if the alert has been dropped.
     """
+    title_quantity:str = quantity[:1].upper() + quantity[1:]
     direction:str = "LOW" if min_or_max.lower() == "min" else "HIGH"
     breach_type:str = "fell below" if direction == "LOW" else "exceeded"
-    msg:str = f"Grid frequency has {breach_type} the {level.lower()} {direction} threshold."
-    logger.info(f"[EVENT] {msg}")
-    if config.enable_ntfy:
-        try:
-            ntfy.send_notification(
-                title=f"{level.upper()} - Grid Frequency {direction} Threshold {breach_type.upper()}",
-                message=f"{msg}\n\n>Threshold={threshold}Hz\n> Current Frequency={frequency}Hz\n> Timestamp={timestamp}",
-                priority="urgent" if level.upper() == "CRITICAL" else "high",
-                tags="rotating_light" if level.upper() == "CRITICAL" else "warning"
-            )
-        except NTFYError:
-            logger.exception("Couldn't send alert to NTFY-instance!")
-            return False
+    prefix:str = f"[{source}] " if source else ""
+    msg:str = f"Grid {quantity} has {breach_type} the {level.lower()} {direction} threshold."
+    logger.info("[EVENT] %s%s", prefix, msg)
+    if notifier is not None:
+        # Queued for every channel, bursts of the same alert are coalesced by NTFY
+        return notifier.notify(
+            title=f"{prefix}{level.upper()} - Grid {title_quantity} {direction} Threshold {breach_type.upper()}",
+            message=f"{msg}\n\n>Threshold={threshold}{unit}\n> Current {title_quantity}={frequency}{unit}\n> Timestamp={timestamp}",
+            priority="urgent" if level.upper() == "CRITICAL" else "high",
+            tags="rotating_light" if level.upper() == "CRITICAL" else "warning",
+            coalesce_key=f"{prefix}{quantity.upper()}-{level.upper()}-{direction}",
+            value=frequency,
+            lower_is_extreme=direction == "LOW",
+            unit=unit
+        )
     
     return True
 
-def check_frequency_thresholds(frequency:float, timestamp:str, ntfy:None|NTFYHandler) -> None:
+def send_recovery(level:str, min_or_max:str, frequency:float, threshold:float, timestamp:str,
+                  notifier:None|Notifier, source:str|None = None,
+                  quantity:str = "frequency", unit:str = "Hz") -> bool:
+    """
+    Log and queue the notification, that the frequency recovered from an alert-threshold, if any channel is enabled.
+    
+    Returns `False` if the notification has been dropped.
+    """
+    title_quantity:str = quantity[:1].upper() + quantity[1:]
+    direction:str = "LOW" if min_or_max.lower() == "min" else "HIGH"
+    prefix:str = f"[{source}] " if source else ""
+    msg:str = f"Grid {quantity} has recovered from the {level.lower()} {direction} threshold."
+    logger.info("[EVENT] %s%s", prefix, msg)
+    if notifier is not None:
+        return notifier.notify(
+            title=f"{prefix}RECOVERED - Grid {title_quantity} back {'above' if direction == 'LOW' else 'below'} {level.upper()} {min_or_max.upper()} Threshold",
+            message=f"{msg}\n\n>Threshold={threshold}{unit}\n> Current {title_quantity}={frequency}{unit}\n> Timestamp={timestamp}",
+            priority="default",
+            tags="white_check_mark",
+            coalesce_key=f"{prefix}RECOVERED-{quantity.upper()}-{level.upper()}-{direction}"
+        )
+    
+    return True
+
+# Alert level and MIN/MAX threshold of every (non-nominal) severity
+SEVERITY_ALERTS:dict[int, tuple[str, str]] = {
+    CRITICAL_LOW: ("CRITICAL", "MIN"),
+    CRITICAL_HIGH: ("CRITICAL", "MAX"),
+    WARNING_LOW: ("WARNING", "MIN"),
+    WARNING_HIGH: ("WARNING", "MAX")
+}
+
+@traced("alert.check")
+def check_frequency_thresholds(frequency:float, timestamp:str, timestamp_ms:int|None, alerts:None|AlertStateMachine,
+                               notifier:None|Notifier, thresholds:ThresholdEngine|None = None,
+                               source:str|None = None) -> int:
     """
     Check if MIN-Hz or MAX-Hz WARNING/CRITICAL frequency thresholds have been reached.
     
@@ -55,60 +126,697 @@ def check_frequency_thresholds(frequency:float, timestamp:str, ntfy:None|NTFYHan
     In short:
         Inner bracket -> WARNING  (early deviation)
         Outer bracket -> CRITICAL (serious deviation)
+    
+    With an alert-state, alerts are only sent when the (debounced) state changes and a
+    recovery is sent when the state goes back to a less severe one.
+    Without an alert-state (or timestamp), every WARNING/CRITICAL frequency is alerted.
+    
+    `thresholds` and `source` are given for targets with their own thresholds (Default: configured thresholds).
+    
+    Returns the severity of the frequency.
     """
-    #
-    # CRITICAL
-    #
-    if frequency < config.critical_min_hz_alert_threshold:
-        if not send_alert(
-                level="CRITICAL",
-                min_or_max="MIN",
-                frequency=frequency,
-                threshold=config.critical_min_hz_alert_threshold,
-                timestamp=timestamp,
-                ntfy=ntfy
-            ):
-            logger.critical("Couldn't send alert!")
-            quit(1)
+    if thresholds is None:
+        thresholds = threshold_engine
+    severity:int = thresholds.classify(frequency)
+    if alerts is None or timestamp_ms is None:
+        if severity != NOMINAL:
+            notify_transition(AlertTransition(NOMINAL, severity, frequency, timestamp_ms), thresholds, timestamp,
+                              notifier, source=source)
+        return severity
     
-    elif frequency > config.critical_max_hz_alert_threshold:
-        if not send_alert(
-                level="CRITICAL",
-                min_or_max="MAX",
-                frequency=frequency,
-                threshold=config.critical_max_hz_alert_threshold,
-                timestamp=timestamp,
-                ntfy=ntfy
-            ):
-            logger.critical("Couldn't send alert!")
-            quit(1)
+    transition:AlertTransition|None = alerts.update(timestamp_ms, frequency)
+    if transition is not None and not notify_transition(transition, thresholds, timestamp, notifier, source=source):
+        # Alert again with the next sample
+        alerts.revert()
+    try:
+        # Only after the notification has been queued (or spooled)
+        alerts.save()
+    except AlertStateError:
+        logger.exception("Couldn't save alert-state.")
     
-    #
-    # WARNING
-    #
-    elif frequency <= config.warning_min_hz_alert_threshold:
-        if not send_alert(
-                level="WARNING",
-                min_or_max="MIN",
-                frequency=frequency,
-                threshold=config.warning_min_hz_alert_threshold,
-                timestamp=timestamp,
-                ntfy=ntfy
-            ):
-            logger.critical("Couldn't send alert!")
-            quit(1)
+    return severity
+
+def notify_transition(transition:AlertTransition, thresholds:ThresholdEngine, timestamp:str,
+                      notifier:None|Notifier, source:str|None = None,
+                      quantity:str = "frequency", unit:str = "Hz") -> bool:
+    """
+    Send the alert (or recovery) of an alert-state-transition.
+    
+    Returns `False` if it couldn't be sent.
+    """
+    if transition.is_recovery:
+        (level, min_or_max) = SEVERITY_ALERTS[transition.previous]
+        sent:bool = send_recovery(
+            level=level,
+            min_or_max=min_or_max,
+            frequency=transition.frequency,
+            threshold=thresholds.threshold(transition.previous),
+            timestamp=timestamp,
+            notifier=notifier,
+            source=source,
+            quantity=quantity,
+            unit=unit
+        )
+    else:
+        (level, min_or_max) = SEVERITY_ALERTS[transition.severity]
+        sent = send_alert(
+            level=level,
+            min_or_max=min_or_max,
+            frequency=transition.frequency,
+            threshold=thresholds.threshold(transition.severity),
+            timestamp=timestamp,
+            notifier=notifier,
+            source=source,
+            quantity=quantity,
+            unit=unit
+        )
+    if not sent:
+        logger.error("Couldn't send alert!")
+    return sent
+
+def check_rocof_thresholds(frequency:float, timestamp:str, timestamp_ms:int, window:RocofWindow,
+                           alerts:AlertStateMachine, notifier:None|Notifier) -> int|None:
+    """
+    Add the sample to the RoCoF-window and check the RoCoF (in Hz/s) against the `ROCOF_WARNING`/`ROCOF_CRITICAL`
+    thresholds of the alert-state (falling is LOW, rising is HIGH).
+    
+    A fast change of the frequency is alerted, before it reaches the absolute frequency-thresholds.
+    
+    Returns the severity of the RoCoF, or `None` if the window has too few samples yet.
+    """
+    if not window.push(timestamp_ms, frequency):
+        return None
+    rocof:float|None = window.rocof
+    if rocof is None:
+        return None
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("RoCoF=%.4f Hz/s | Mean=%.4f Hz | StdDev=%.4f Hz | Samples=%d",
+                     rocof, window.mean, window.variance ** 0.5, len(window))
+    
+    transition:AlertTransition|None = alerts.update(timestamp_ms, round(rocof, 4))
+    if transition is not None and not notify_transition(transition, alerts.thresholds, timestamp, notifier,
+                                                        quantity="RoCoF", unit="Hz/s"):
+        alerts.revert()
+    try:
+        alerts.save()
+    except AlertStateError:
+        logger.exception("Couldn't save RoCoF alert-state.")
+    
+    return alerts.thresholds.classify(rocof)
+
+@dataclass
+class Pipeline:
+    """
+    Everything a sample passes through after it has been received from the API.
+    """
+    notifier: None|Notifier = None
+    store: None|SampleStore = None
+    rollups: None|RollupStore = None
+    report: None|DailyReport = None
+    alerts: None|AlertStateMachine = None
+    rocof: None|RocofWindow = None
+    rocof_alerts: None|AlertStateMachine = None
+    latest: None|SharedSamplePublisher = None
+    
+    def close(self) -> None:
+        """
+        Flush the sample-store and rollups, checkpoint the daily-report and unmap the shared sample.
+        """
+        for _storage in (self.store, self.rollups):
+            if _storage is None:
+                continue
+            try:
+                _storage.close()
+            except StoreError:
+                logger.exception("Couldn't flush %s.", _storage.__class__.__name__)
+        if self.report is not None:
+            try:
+                self.report.checkpoint()
+            except ReportError:
+                logger.exception("Couldn't checkpoint daily-report.")
+        if self.latest is not None:
+            self.latest.close()
+
+def store_sample(frequency:float, timestamp_ms:int, store:SampleStore, rollups:None|RollupStore) -> None:
+    """
+    Append the parsed frequency and timestamp to the sample-store and update the rollups.
+    """
+    try:
+        if store.append(timestamp_ms, frequency) and rollups is not None:
+            rollups.add(timestamp_ms, frequency)
+    except StoreError:
+        logger.exception("Couldn't store sample!")
+
+def update_daily_report(frequency:float, timestamp_ms:int, report:DailyReport,
+                        notifier:None|Notifier) -> None:
+    """
+    Add the sample to the daily-report and send the (low priority) summary, when a day has been finished.
+    """
+    try:
+        summary:dict|None = report.add(timestamp_ms, frequency)
+    except ReportError:
+        logger.exception("Couldn't checkpoint daily-report.")
+        return
+    if summary is not None:
+        send_daily_report(summary, report, notifier)
+
+def roll_over_daily_report(report:DailyReport, notifier:None|Notifier) -> None:
+    """
+    Send the summary of the finished day, when the UTC-day has changed on the clock (even without a new sample).
+    """
+    try:
+        summary:dict|None = report.roll_over(int(time.time() * 1000))
+    except ReportError:
+        logger.exception("Couldn't checkpoint daily-report.")
+        return
+    if summary is not None:
+        send_daily_report(summary, report, notifier)
+
+def send_daily_report(summary:dict, report:DailyReport, notifier:None|Notifier) -> None:
+    """
+    Log and queue the (low priority) summary of a finished day.
+    """
+    (title, message) = report.format_summary(summary)
+    logger.info("[REPORT] %s: %s", title, message)
+    if notifier is not None and not notifier.notify(title=title, message=message, priority="low", tags="bar_chart"):
+        logger.error("Couldn't send daily-report!")
+
+def rebuild_rollups() -> None:
+    """
+    Rebuild all rollups from the raw samples of the sample-store.
+    """
+    from src.store import SampleStore
+    from src.rollup import RollupStore
+    
+    try:
+        store = SampleStore(directory=config.store_directory)
+        rollups = RollupStore(directory=config.store_directory, thresholds=threshold_engine)
+        _rebuild_start:float = time.perf_counter()
+        count:int = rollups.rebuild(store.iter_samples())
+    except StoreError:
+        logger.exception("Couldn't rebuild rollups.")
+        quit(1)
+    logger.info("Rebuilt rollups from %d samples in %.3f seconds", count, time.perf_counter()-_rebuild_start)
+
+def create_alert_state_machine(state_filepath:None|str|Path,
+                               thresholds:ThresholdEngine|None = None) -> AlertStateMachine:
+    """
+    Create the alert-state-machine with the configured hysteresis and debounce.
+    """
+    return AlertStateMachine(
+        state_filepath=state_filepath,
+        thresholds=thresholds if thresholds is not None else threshold_engine,
+        hysteresis=config.alert_hysteresis_hz,
+        debounce_ms=round(config.alert_debounce_seconds * 1000)
+    )
+
+def create_rocof_alert_state_machine(state_filepath:None|str|Path) -> AlertStateMachine:
+    """
+    Create the alert-state-machine of the RoCoF with the configured thresholds and debounce.
+    """
+    from src.rocof import rocof_threshold_engine
     
-    elif frequency >= config.warning_max_hz_alert_threshold:
-        if not send_alert(
-                level="WARNING",
-                min_or_max="MAX",
-                frequency=frequency,
-                threshold=config.warning_max_hz_alert_threshold,
-                timestamp=timestamp,
-                ntfy=ntfy
-            ):
-            logger.critical("Couldn't send alert!")
+    return AlertStateMachine(
+        state_filepath=state_filepath,
+        thresholds=rocof_threshold_engine(config.rocof_warning, config.rocof_critical),
+        debounce_ms=round(config.alert_debounce_seconds * 1000)
+    )
+
+def process_sample(frequency:float, timestamp:str, pipeline:Pipeline) -> int:
+    """
+    Store the sample, update the daily-report, check the alert thresholds (and RoCoF-thresholds)
+    and publish it as shared latest sample.
+    
+    Returns the severity of the frequency.
+    """
+    timestamp_ms:int|None = None
+    if pipeline.store is not None or pipeline.report is not None or pipeline.alerts is not None \
+            or pipeline.rocof is not None or pipeline.latest is not None:
+        try:
+            timestamp_ms = utils.timestamp_to_epoch_ms(timestamp)
+        except ValueError:
+            logger.exception("Couldn't convert timestamp '%s' of API-data!", timestamp)
+        else:
+            if pipeline.store is not None:
+                store_sample(frequency, timestamp_ms, pipeline.store, pipeline.rollups)
+            if pipeline.report is not None:
+                update_daily_report(frequency, timestamp_ms, pipeline.report, pipeline.notifier)
+            if pipeline.rocof is not None:
+                check_rocof_thresholds(frequency, timestamp, timestamp_ms, pipeline.rocof,
+                                       pipeline.rocof_alerts, pipeline.notifier)
+
+    severity:int = check_frequency_thresholds(frequency, timestamp, timestamp_ms, pipeline.alerts, pipeline.notifier)
+    if pipeline.latest is not None and timestamp_ms is not None:
+        pipeline.latest.publish(frequency, timestamp_ms, severity)
+    
+    return severity
+
+def run_replay(filepath:Path) -> None:
+    """
+    Pass recorded samples through the threshold and alert logic as fast as possible
+    and report the alerts, that would have been sent.
+    """
+    from src.rocof import RocofWindow
+    from src.replay import iter_replay_samples, CountingNotifier
+    
+    sink = CountingNotifier()
+    # In-memory alert-state, so the replay neither depends on nor changes the live alert-state
+    pipeline = Pipeline(notifier=sink, alerts=create_alert_state_machine(state_filepath=None))
+    if config.enable_rocof_alerts:
+        pipeline.rocof = RocofWindow(window_ms=round(config.rocof_window_seconds * 1000))
+        pipeline.rocof_alerts = create_rocof_alert_state_machine(state_filepath=None)
+    severities:dict[int, int] = {}
+    count:int = 0
+    
+    logger.info("Replaying '%s'", filepath)
+    _replay_start:float = time.perf_counter()
+    try:
+        for (_frequency, _timestamp) in iter_replay_samples(filepath):
+            severity:int = process_sample(_frequency, _timestamp, pipeline)
+            severities[severity] = severities.get(severity, 0) + 1
+            count += 1
+    except ReplayError:
+        logger.exception("Replay failed after %d samples!", count)
+        quit(1)
+    elapsed:float = time.perf_counter() - _replay_start
+    
+    print(f"""
+        >------------------------------------------<
+        > REPLAY <
+        - File={filepath}
+        - Samples={count}
+        - Runtime={elapsed:.3f} seconds ({count / elapsed if elapsed else 0:.0f} samples/sec)
+        
+        > SAMPLES <
+        - CRITICAL LOW={severities.get(CRITICAL_LOW, 0)}
+        - WARNING LOW={severities.get(WARNING_LOW, 0)}
+        - WARNING HIGH={severities.get(WARNING_HIGH, 0)}
+        - CRITICAL HIGH={severities.get(CRITICAL_HIGH, 0)}
+        
+        > NOTIFICATIONS <
+        - Alerts={sink.counts.get("urgent", 0) + sink.counts.get("high", 0)}
+        - Recoveries={sink.counts.get("default", 0)}
+        - Total={sink.total}
+        >------------------------------------------<
+        """)
+
+def poll_once(apihandler:APIHandler, pipeline:Pipeline) -> bool:
+    """
+    Get the current frequency from the API and pass it through the pipeline.
+    Samples, that have already been processed (unchanged timestamp or `304`), are skipped.
+    
+    Returns `False` if no data could be received from the API.
+    """
+    try:
+        sample:tuple[float, str]|None = apihandler.get_new_api_data()
+    except APICircuitOpenError as _e:
+        # Expected during an outage, skip the traceback
+        logger.warning("Couldn't get frequency and timestamp from API: %s", _e)
+        return False
+    except APIError:
+        logger.exception("Couldn't get frequency and timestamp from API!")
+        return False
+    
+    if sample is None:
+        logger.debug("No new data since Timestamp=%s", apihandler.last_sample[1])
+        return True
+    
+    (frequency, timestamp) = sample
+    
+    logger.info("Frequency=%s | Timestamp=%s", frequency, timestamp)
+    
+    process_sample(frequency, timestamp, pipeline)
+    
+    return True
+
+def create_spool(name:str) -> Spool:
+    """
+    Open the spool `name` (e.g. `samples` or a notification-channel) in the spool-directory.
+    """
+    from src.spool import Spool
+    
+    try:
+        return Spool(
+            directory=Path(config.spool_directory) / name,
+            sync_interval=config.spool_sync_interval,
+            max_size=config.spool_max_size_mb * 1024 * 1024
+        )
+    except SpoolError:
+        logger.exception("Couldn't open spool '%s'.", name)
+        quit(1)
+
+def create_notifier(ntfy:None|NTFYHandler) -> None|NotificationDispatcher:
+    """
+    Create the dispatcher of all enabled notification-channels (NTFY, webhook, syslog and alert-file).
+    
+    Returns `None` if no channel is enabled.
+    """
+    from src.notifiers import NotificationDispatcher, SyslogNotifier, FileNotifier
+    
+    channels:list[Notifier] = [ntfy] if ntfy is not None else []
+    if config.enable_webhook:
+        from src.webhook import WebhookNotifier
+        channels.append(WebhookNotifier(
+            url=config.webhook_url,
+            auth_token=config.webhook_auth_token,
+            requests_timeout=config.webhook_http_request_timeout,
+            requests_cert_verify=config.webhook_http_request_cert_verify,
+            session=utils.create_http_session()
+        ))
+    if config.enable_syslog:
+        try:
+            channels.append(SyslogNotifier(address=config.syslog_address, facility=config.syslog_facility))
+        except NotifierError:
+            logger.exception("Couldn't open syslog.")
             quit(1)
+    if config.enable_alert_file:
+        channels.append(FileNotifier(filepath=config.alert_filepath))
+    if not channels:
+        return None
+    if config.enable_spool:
+        for _channel in channels:
+            _channel.attach_spool(create_spool(_channel.name))
+    
+    delivery_timeouts:dict[str, float] = {
+        "ntfy": config.ntfy_delivery_timeout,
+        "webhook": config.webhook_delivery_timeout,
+        "syslog": config.syslog_delivery_timeout,
+        "file": config.alert_file_delivery_timeout
+    }
+    logger.debug("Delivering notifications to %s", ", ".join(_channel.name for _channel in channels))
+    return NotificationDispatcher(channels, max_pending=config.notifier_queue_size, delivery_timeouts={
+        _channel.name: delivery_timeouts[_channel.name] for _channel in channels
+    })
+
+def stop_notifications(notifier:NotificationDispatcher) -> bool:
+    """
+    Deliver the queued notifications to all channels and stop them.
+    
+    Returns `False` if notifications have been dropped or couldn't be delivered by any channel.
+    """
+    # Enough for the delivery in flight and the next one of every channel, the remaining notifications are spooled
+    delivered:bool = notifier.stop(timeout=2 * max(notifier.delivery_timeouts.values()))
+    for _channel in notifier.channels:
+        p50:float|None = _channel.latencies.quantile(0.5)
+        p99:float|None = _channel.latencies.quantile(0.99)
+        logger.debug("Channel '%s': Sent=%d | Failed=%d | Dropped=%d | Spooled=%d | Replayed=%d%s",
+                     _channel.name, _channel.sent_count, _channel.failed_count,
+                     notifier.dropped_counts[_channel.name] + _channel.dropped_count,
+                     _channel.spooled_count, _channel.replayed_count,
+                     f" | P50={p50*1000:.1f} ms | P99={p99*1000:.1f} ms" if p50 is not None else "")
+    ntfy:NTFYHandler|None = notifier.channel("ntfy")
+    if ntfy is not None:
+        logger.debug("NTFY: Sent=%d | Coalesced=%d | Failed=%d | Dropped=%d | Queued=%d | "
+                     "Circuit=%s (Opened=%d, ShortCircuited=%d)",
+                     ntfy.sent_count, ntfy.coalesced_count, ntfy.failed_count, ntfy.dropped_count, ntfy.queue_depth,
+                     ntfy.breaker.state, ntfy.breaker.open_count, ntfy.breaker.rejected_count)
+    notifier.close()
+    return delivered
+
+def create_apihandler(session:requests.Session) -> APIHandler:
+    """
+    Create the API-handler with the configured endpoints, fetch-mode, circuit-breakers and timeouts.
+    """
+    from src.api import APIHandler
+    
+    return APIHandler(
+        api_url=config.api_url,
+        requests_timeout=config.api_http_request_timeout,
+        requests_cert_verify=config.api_http_request_cert_verify,
+        session=session,
+        fallback_urls=config.api_fallback_urls,
+        fetch_mode=config.api_fetch_mode,
+        hedge_percentile=config.api_hedge_percentile,
+        hedge_delay=config.api_hedge_delay,
+        breaker_failure_threshold=config.circuit_breaker_failure_threshold,
+        breaker_reset_timeout=config.circuit_breaker_reset_timeout,
+        adaptive_timeout=config.enable_adaptive_timeouts
+    )
+
+def run_profile(iterations:int, output:Path) -> None:
+    """
+    Run `iterations` polls of the fetch/parse/alert path under `cProfile` (without a pause in between)
+    and write the statistics to `<output>.pstats` and a report, sorted by cumulative time, to `<output>.txt`.
+    
+    Alerts use an in-memory alert-state and are only counted, so profiling neither changes the live alert-state
+    nor sends notifications.
+    """
+    import pstats
+    import cProfile
+    from src.tracing import PhaseStats
+    from src.replay import CountingNotifier
+    
+    session = utils.create_http_session()
+    apihandler:APIHandler = create_apihandler(session)
+    sink = CountingNotifier()
+    pipeline = Pipeline(notifier=sink, alerts=create_alert_state_machine(state_filepath=None))
+    phases = PhaseStats()
+    add_hook(phases)
+    profiler = cProfile.Profile()
+    
+    logger.info("Profiling %d iterations", iterations)
+    _profile_start:float = time.perf_counter()
+    profiler.enable()
+    try:
+        for _ in range(iterations):
+            poll_once(apihandler, pipeline)
+    finally:
+        profiler.disable()
+        remove_hook(phases)
+        apihandler.close()
+        session.close()
+    elapsed:float = time.perf_counter() - _profile_start
+    
+    output.parent.mkdir(parents=True, exist_ok=True)
+    pstats_filepath:Path = output.with_name(output.name + ".pstats")
+    report_filepath:Path = output.with_name(output.name + ".txt")
+    profiler.dump_stats(pstats_filepath)
+    with open(report_filepath, "w") as _file:
+        pstats.Stats(profiler, stream=_file).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(50)
+    
+    print(f"""
+        >------------------------------------------<
+        > PROFILE <
+        - Iterations={iterations}
+        - Runtime={elapsed:.3f} seconds ({elapsed / iterations * 1000:.3f} ms/iteration)
+        - Requests={apihandler.request_count} | Duplicates={apihandler.duplicate_count} | Stale={apihandler.stale_count} | Alerts={sink.total}
+        - Stats='{pstats_filepath}'
+        - Report='{report_filepath}'
+        
+        > PHASES (ms) <
+""" + "\n".join(f"        {_line}" for _line in phases.format_table().splitlines()) + """
+        >------------------------------------------<
+        """)
+
+def create_metrics_exporter(apihandler:APIHandler, notifier:None|NotificationDispatcher) -> MetricsExporter:
+    """
+    Serve the metrics of the API-handler, the notification-channels and their circuit-breakers
+    on the configured host and port.
+    """
+    from src.metrics import MetricsExporter, api_collector, notifier_collector, ntfy_collector, circuit_collector
+    
+    exporter = MetricsExporter(host=config.metrics_host, port=config.metrics_port)
+    exporter.add_collector(api_collector(apihandler, threshold_engine))
+    breakers:list = [_endpoint.breaker for _endpoint in apihandler.endpoints]
+    if notifier is not None:
+        exporter.add_collector(notifier_collector(notifier))
+        ntfy:NTFYHandler|None = notifier.channel("ntfy")
+        if ntfy is not None:
+            exporter.add_collector(ntfy_collector(ntfy))
+            breakers.append(ntfy.breaker)
+    exporter.add_collector(circuit_collector(breakers))
+    try:
+        exporter.start()
+    except OSError:
+        logger.exception("Couldn't serve metrics on %s:%d.", config.metrics_host, config.metrics_port)
+        quit(1)
+    return exporter
+
+def run_daemon(apihandler:APIHandler, pipeline:Pipeline, interval:float,
+               scheduler:AdaptivePollScheduler|None = None, shutdown_event:threading.Event|None = None) -> None:
+    """
+    Poll the API every `interval` seconds until SIGTERM/SIGINT has been received (or `shutdown_event` is set).
+    With a scheduler, the interval is picked after every poll from the last sample instead.
+    
+    The deadlines are based on the monotonic clock, so slow iterations don't let the loop drift.
+    """
+    if shutdown_event is None:
+        shutdown_event = threading.Event()
+    
+    def _handle_signal(signum:int, frame) -> None:
+        logger.info("Received signal %s, shutting down.", signal.Signals(signum).name)
+        shutdown_event.set()
+    
+    signal.signal(signal.SIGTERM, _handle_signal)
+    signal.signal(signal.SIGINT, _handle_signal)
+    
+    if scheduler is not None:
+        interval = scheduler.min_interval
+        logger.info("Running in daemon-mode with an adaptive poll-interval of %s-%s seconds",
+                    scheduler.min_interval, scheduler.max_interval)
+    else:
+        logger.info("Running in daemon-mode with a poll-interval of %s seconds", interval)
+    
+    iteration:int = 0
+    _daemon_start:float = time.monotonic()
+    next_deadline:float = _daemon_start
+    while not shutdown_event.is_set():
+        iteration += 1
+        _iteration_start:float = time.monotonic()
+        
+        poll_once(apihandler, pipeline)
+        if pipeline.report is not None:
+            # Also finishes the day of a restored report at startup
+            roll_over_daily_report(pipeline.report, pipeline.notifier)
+        
+        if scheduler is not None and apihandler.last_sample is not None:
+            (frequency, timestamp) = apihandler.last_sample
+            try:
+                scheduler.observe(utils.timestamp_to_epoch_ms(timestamp), frequency)
+            except ValueError:
+                logger.warning("Couldn't convert timestamp '%s' for the poll-scheduler", timestamp)
+            interval = scheduler.next_interval()
+        
+        _now:float = time.monotonic()
+        latency:float = _now - _iteration_start
+        if pipeline.notifier is not None:
+            logger.debug("Iteration=%d | Latency=%.2f ms | Interval=%.2f s | Notifications-queued=%d | Notifications-dropped=%d",
+                         iteration, latency*1000, interval, pipeline.notifier.queue_depth, pipeline.notifier.dropped_count)
+        else:
+            logger.debug("Iteration=%d | Latency=%.2f ms | Interval=%.2f s", iteration, latency*1000, interval)
+        if latency > interval:
+            logger.warning("Iteration %d took %.3f seconds, which is longer than the poll-interval of %s seconds",
+                           iteration, latency, interval)
+        
+        # Skip missed deadlines instead of bursting to catch up
+        next_deadline += interval
+        if next_deadline < _now:
+            next_deadline = _now + interval - ((_now - next_deadline) % interval)
+        shutdown_event.wait(next_deadline - _now)
+    
+    logger.info("Daemon stopped after %d iterations (mean poll-interval %.2f seconds).",
+                iteration, (time.monotonic() - _daemon_start) / iteration)
+    logger.info("API: Requests=%d | Duplicates=%d (NotModified=%d) | Stale=%d | Hedged=%d | BytesSaved=%d | ShortCircuited=%d",
+                apihandler.request_count, apihandler.duplicate_count, apihandler.not_modified_count, apihandler.stale_count,
+                apihandler.hedged_count, apihandler.bytes_saved, apihandler.short_circuited_count)
+    for _endpoint in apihandler.endpoints:
+        p50:float|None = _endpoint.latencies.quantile(0.5)
+        p99:float|None = _endpoint.latencies.quantile(0.99)
+        if p50 is not None:
+            logger.info("API '%s': Requests=%d | P50=%.1f ms | P99=%.1f ms | Circuit=%s (Opened=%d) | Timeout=%.3f s",
+                        _endpoint.url, _endpoint.latencies.count, p50*1000, p99*1000, _endpoint.breaker.state,
+                        _endpoint.breaker.open_count, apihandler.request_timeout(_endpoint))
+
+async def poll_target(target:Target, apihandler:AsyncAPIHandler, alerts:AlertStateMachine,
+                      notifier:None|Notifier, shutdown_event:asyncio.Event, offset:float) -> int:
+    """
+    Poll a target every `target.interval` seconds (starting after `offset` seconds) until the shutdown-event is set
+    and pass new samples through its thresholds and the alert logic.
+    
+    Returns the number of missed deadlines.
+    """
+    import asyncio
+    
+    loop = asyncio.get_running_loop()
+    missed:int = 0
+    next_deadline:float = loop.time() + offset
+    while True:
+        try:
+            await asyncio.wait_for(shutdown_event.wait(), timeout=max(next_deadline - loop.time(), 0))
+            return missed
+        except asyncio.TimeoutError:
+            pass
+        
+        try:
+            sample:tuple[float, str]|None = await apihandler.get_new_api_data()
+        except APIError as _e:
+            logger.warning("[%s] Couldn't get frequency and timestamp: %s", target.name, _e)
+            sample = None
+        
+        if sample is not None:
+            (frequency, timestamp) = sample
+            logger.debug("[%s] Frequency=%s | Timestamp=%s", target.name, frequency, timestamp)
+            try:
+                timestamp_ms:int|None = utils.timestamp_to_epoch_ms(timestamp)
+            except ValueError:
+                logger.warning("[%s] Couldn't convert timestamp '%s'", target.name, timestamp)
+                timestamp_ms = None
+            check_frequency_thresholds(frequency, timestamp, timestamp_ms, alerts, notifier,
+                                       thresholds=target.thresholds, source=target.name)
+        
+        # Skip missed deadlines instead of bursting to catch up
+        next_deadline += target.interval
+        _now:float = loop.time()
+        if next_deadline < _now:
+            skipped:int = int((_now - next_deadline) // target.interval) + 1
+            missed += skipped
+            next_deadline += skipped * target.interval
+
+async def run_targets_async(targets:list[Target], notifier:None|Notifier) -> None:
+    import asyncio
+    from src.async_api import AsyncHTTPClient, AsyncAPIHandler
+    
+    shutdown_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for _signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(_signum, shutdown_event.set)
+    
+    client = AsyncHTTPClient(timeout=config.api_http_request_timeout, verify=config.api_http_request_cert_verify)
+    apihandlers:list[AsyncAPIHandler] = [
+        AsyncAPIHandler(
+            api_url=_target.url,
+            client=client,
+            breaker_failure_threshold=config.circuit_breaker_failure_threshold,
+            breaker_reset_timeout=config.circuit_breaker_reset_timeout,
+            adaptive_timeout=config.enable_adaptive_timeouts
+        )
+        for _target in targets
+    ]
+    state_filepath = Path(config.alert_state_filepath)
+    alerts:list[AlertStateMachine] = [
+        create_alert_state_machine(
+            state_filepath=state_filepath.with_name(f"{state_filepath.stem}-{_target.name}{state_filepath.suffix}"),
+            thresholds=_target.thresholds
+        )
+        for _target in targets
+    ]
+    
+    logger.info("Polling %d targets concurrently", len(targets))
+    try:
+        # Spread the first polls over the interval, so the targets don't poll in bursts
+        missed:list[int] = await asyncio.gather(*(
+            poll_target(_target, _apihandler, _alerts, notifier, shutdown_event, offset=_target.interval * _index / len(targets))
+            for (_index, (_target, _apihandler, _alerts)) in enumerate(zip(targets, apihandlers, alerts))
+        ))
+    finally:
+        client.close()
+    
+    for (_target, _apihandler, _missed) in zip(targets, apihandlers, missed):
+        p50:float|None = _apihandler.endpoint.latencies.quantile(0.5)
+        p99:float|None = _apihandler.endpoint.latencies.quantile(0.99)
+        logger.info("[%s] Requests=%d | Duplicates=%d | Stale=%d | MissedDeadlines=%d | ShortCircuited=%d%s",
+                    _target.name, _apihandler.request_count, _apihandler.duplicate_count, _apihandler.stale_count, _missed,
+                    _apihandler.endpoint.breaker.rejected_count, f" | P50={p50*1000:.1f} ms | P99={p99*1000:.1f} ms" if p50 else "")
+    logger.info("Stopped polling after %d requests on %d connections.",
+                sum(_h.request_count for _h in apihandlers), client.connect_count)
+
+def run_targets(filepath:Path, notifier:None|Notifier) -> None:
+    """
+    Poll all targets of the given JSON-file concurrently until SIGTERM/SIGINT has been received.
+    """
+    import asyncio
+    from src.targets import load_targets
+    
+    try:
+        targets:list[Target] = load_targets(filepath, config.daemon_poll_interval, threshold_engine)
+    except InvalidConfigError:
+        logger.exception("Got invalid targets.")
+        quit(1)
+    try:
+        asyncio.run(run_targets_async(targets, notifier))
+    except AlertStateError:
+        logger.exception("Couldn't restore alert-state.")
+        quit(1)
 
 def main() -> None:
     if args.show_alert_thresholds:
@@ -127,15 +835,46 @@ def main() -> None:
         print(thresholds)
         quit(0)
     
+    if args.rebuild_rollups:
+        rebuild_rollups()
+        quit(0)
+    
+    if args.replay:
+        run_replay(Path(args.replay))
+        quit(0)
+    
+    if args.profile is not None:
+        if args.profile <= 0:
+            logger.critical("The number of profiled iterations must be > 0")
+            quit(1)
+        run_profile(args.profile, Path(args.profile_output))
+        quit(0)
+    
+    if args.trace:
+        add_hook(log_span)
+    
+    # Keep-alive connection-pool for the API (NTFY gets its own, since it's used by its background-worker)
+    session = utils.create_http_session()
+    
     ntfy = None
     if config.enable_ntfy:
+        from src.ntfy import NTFYHandler
         ntfy = NTFYHandler(
             topic_url=config.ntfy_topic_url,
             auth_token=config.ntfy_auth_token,
             requests_timeout=config.ntfy_http_request_timeout,
-            requests_cert_verify=config.ntfy_http_request_cert_verify
+            requests_cert_verify=config.ntfy_http_request_cert_verify,
+            session=utils.create_http_session(),
+            queue_size=config.ntfy_queue_size,
+            max_retries=config.ntfy_max_retries,
+            retry_backoff=config.ntfy_retry_backoff,
+            coalesce_window=config.ntfy_coalesce_window,
+            breaker_failure_threshold=config.circuit_breaker_failure_threshold,
+            breaker_reset_timeout=config.circuit_breaker_reset_timeout,
+            adaptive_timeout=config.enable_adaptive_timeouts,
+            delivery_timeout=config.ntfy_delivery_timeout
         )
-        logger.debug(f"Using NTFY '{ntfy.topic_url}' for notifications")
+        logger.debug("Using NTFY '%s' for notifications", ntfy.topic_url)
     else:
         logger.warning("NTFY is disabled.")
     
@@ -150,24 +889,133 @@ def main() -> None:
     elif args.test_ntfy and not config.enable_ntfy:
         logger.critical("Cannot test NTFY-configuration, when NTFY is disabled!")
         quit(1)
-        
-    apihandler = APIHandler(
-        api_url=config.api_url,
-        requests_timeout=config.api_http_request_timeout,
-        requests_cert_verify=config.api_http_request_cert_verify
-    )
     
+    notifier:NotificationDispatcher|None = create_notifier(ntfy)
+    if args.test_notifiers and notifier is not None:
+        logger.info("Test all notification-channels and exit.")
+        if not notifier.test_config():
+            logger.critical("At least one notification-channel failed.")
+            quit(1)
+        logger.info("All notification-channels seem fine.")
+        quit(0)
+    elif args.test_notifiers:
+        logger.critical("Cannot test notification-channels, when none is enabled!")
+        quit(1)
+    
+    if notifier is not None:
+        notifier.start()
+    
+    if args.targets:
+        try:
+            run_targets(Path(args.targets), notifier)
+        finally:
+            if notifier is not None:
+                stop_notifications(notifier)
+        return
+    
+    apihandler:APIHandler = create_apihandler(session)
+    if apihandler.fetch_mode != "single":
+        logger.debug("Fetching from %d API-endpoints in %s-mode", len(apihandler.endpoints), apihandler.fetch_mode)
+    
+    pipeline = Pipeline(notifier=notifier)
     try:
-        (frequency, timestamp) = apihandler.get_api_data()
-    except APIError:
-        logger.exception("Couldn't get frequency and timestamp from API!")
+        pipeline.alerts = create_alert_state_machine(state_filepath=config.alert_state_filepath)
+        if config.enable_rocof_alerts and args.daemon:
+            from src.rocof import RocofWindow
+            state_filepath = Path(config.alert_state_filepath)
+            pipeline.rocof = RocofWindow(window_ms=round(config.rocof_window_seconds * 1000))
+            pipeline.rocof_alerts = create_rocof_alert_state_machine(
+                state_filepath=state_filepath.with_name(f"{state_filepath.stem}-rocof{state_filepath.suffix}")
+            )
+        elif config.enable_rocof_alerts:
+            logger.warning("RoCoF-alerts need consecutive samples and are only checked in daemon-mode.")
+    except AlertStateError:
+        logger.exception("Couldn't restore alert-state.")
         quit(1)
+    if config.enable_store:
+        from src.store import SampleStore
+        from src.rollup import RollupStore
+        try:
+            # A single run flushes its sample right away, only the daemon buffers samples, that could be lost.
+            # With the spool, the daemon writes every sample to its segment right away instead and syncs it like
+            # the spool, so the segments are the crash-safe log and only samples, that couldn't be written, are spooled.
+            spool:bool = config.enable_spool and args.daemon
+            pipeline.store = SampleStore(
+                directory=config.store_directory,
+                flush_size=1 if spool else 60,
+                spool=create_spool("samples") if spool else None,
+                sync_interval=config.spool_sync_interval if spool else None
+            )
+            if config.enable_rollups:
+                pipeline.rollups = RollupStore(directory=config.store_directory, thresholds=threshold_engine)
+        except StoreError:
+            logger.exception("Couldn't open sample-store.")
+            quit(1)
+        logger.debug("Storing samples in '%s'", pipeline.store.directory.absolute())
     
-    logger.info(f"Frequency={frequency} | Timestamp={timestamp}")
-
-    check_frequency_thresholds(frequency, timestamp, ntfy)
+    if config.enable_daily_report:
+        from src.report import DailyReport
+        try:
+            pipeline.report = DailyReport(
+                state_filepath=config.daily_report_state_filepath,
+                thresholds=threshold_engine,
+                # Checkpoint every sample, when the process exits after one sample anyway
+                checkpoint_interval=60.0 if args.daemon else 0.0
+            )
+        except ReportError:
+            logger.exception("Couldn't restore daily-report.")
+            quit(1)
     
-    logger.debug(f"Runtime={time.time()-_start} seconds")
+    if config.enable_shared_sample and args.daemon:
+        from src.shared_sample import SharedSamplePublisher
+        try:
+            pipeline.latest = SharedSamplePublisher(config.shared_sample_filepath)
+        except SharedSampleError:
+            logger.exception("Couldn't open shared sample.")
+            quit(1)
+    elif config.enable_shared_sample:
+        logger.warning("The shared sample is only published in daemon-mode.")
+    
+    if args.daemon:
+        interval:float = args.interval if args.interval is not None else config.daemon_poll_interval
+        if interval <= 0:
+            logger.critical("The poll-interval must be > 0")
+            quit(1)
+        # An explicit `--interval` always polls at a fixed interval
+        scheduler:AdaptivePollScheduler|None = None
+        if config.enable_adaptive_polling and args.interval is None:
+            from src.scheduler import AdaptivePollScheduler
+            scheduler = AdaptivePollScheduler(
+                thresholds=threshold_engine,
+                min_interval=config.daemon_min_poll_interval,
+                max_interval=config.daemon_max_poll_interval,
+                distance_scale=config.adaptive_polling_distance_hz
+            )
+        exporter:MetricsExporter|None = None
+        if config.enable_metrics:
+            exporter = create_metrics_exporter(apihandler, notifier)
+        try:
+            run_daemon(apihandler, pipeline, interval, scheduler)
+        finally:
+            if exporter is not None:
+                exporter.stop()
+            pipeline.close()
+            apihandler.close()
+            session.close()
+            if notifier is not None:
+                stop_notifications(notifier)
+        return
+    
+    success:bool = poll_once(apihandler, pipeline)
+    apihandler.close()
+    pipeline.close()
+    if notifier is not None and not stop_notifications(notifier):
+        logger.critical("Couldn't send alert!")
+        quit(1)
+    if not success:
+        quit(1)
+    
+    logger.debug("Runtime=%s seconds", time.time()-_start)
 
 if __name__ == '__main__':
     _start:float = time.time()
@@ -179,24 +1027,81 @@ if __name__ == '__main__':
         '-l', '--loglevel', help=f"Log level (Default={DEFAULT_LOGLEVEL})",
         default=DEFAULT_LOGLEVEL
     )
+    parser.add_argument(
+        '--log-format', help=f"Format of the log-lines: {' or '.join(LOG_FORMATS)} (one JSON-object per line, "
+                             f"e.g. for journald) (Default=text)",
+        choices=LOG_FORMATS, default="text"
+    )
+    parser.add_argument(
+        '--async-logging', help=f"Format and write log-lines in a background-thread instead of the sampling-thread.",
+        action="store_true"
+    )
     parser.add_argument(
         '-t', '--test-ntfy', help=f"Test NTFY-configuration by sending a test-notification.",
         action="store_true"
     )
+    parser.add_argument(
+        '--test-notifiers', help=f"Test all enabled notification-channels (NTFY, webhook, syslog, alert-file) "
+                                 f"by sending a test-notification to each.",
+        action="store_true"
+    )
     parser.add_argument(
         '-s', '--show-alert-thresholds', help=f"Show CRITICAL/WARNING MIN/MAX alert thresholds and exit.",
         action="store_true"
     )
+    parser.add_argument(
+        '-d', '--daemon', help=f"Keep running and poll the API periodically until SIGTERM/SIGINT.",
+        action="store_true"
+    )
+    parser.add_argument(
+        '-i', '--interval', help=f"Fixed poll-interval in seconds for daemon-mode, disables adaptive polling (Default=`DAEMON_POLL_INTERVAL`)",
+        type=float, default=None
+    )
+    parser.add_argument(
+        '--rebuild-rollups', help=f"Rebuild all rollups from the raw samples of the sample-store and exit.",
+        action="store_true"
+    )
+    parser.add_argument(
+        '--replay', help=f"Replay recorded samples (XML-payloads, CSV or sample-store) through the alert logic "
+                         f"without sending notifications and exit.",
+        metavar="FILE", default=None
+    )
+    parser.add_argument(
+        '--targets', help=f"Poll all targets of the given JSON-file concurrently (each with its own URL, interval "
+                          f"and thresholds) until SIGTERM/SIGINT.",
+        metavar="FILE", default=None
+    )
+    parser.add_argument(
+        '--trace', help=f"Log the duration of every phase (API-request, parse, threshold-check, alert, NTFY-request) "
+                        f"on DEBUG-level.",
+        action="store_true"
+    )
+    parser.add_argument(
+        '--profile', help=f"Poll the API N times without pause under cProfile, write a sorted report and a pstats-file "
+                          f"and exit.",
+        metavar="N", type=int, default=None
+    )
+    parser.add_argument(
+        '--profile-output', help=f"Path-prefix of the '.pstats' and '.txt' files of --profile (Default=profile)",
+        metavar="PREFIX", default="profile"
+    )
+    parser.add_argument(
+        '--no-config-snapshot', help=f"Parse and validate the dotenv-file on every start, instead of reusing "
+                                     f"the cached config-snapshot '{get_config_snapshot_filepath()}'.",
+        action="store_true"
+    )
     args:list = parser.parse_args()
     
-    configure_logger(args.loglevel.upper())
+    configure_logger(args.loglevel.upper(), log_format=args.log_format, use_queue=args.async_logging)
     logger:logging.Logger = logging.getLogger(__name__)
     
     try:
-        logger.debug(f"Using dotenv-filepath '{utils.get_dotenv_filepath().absolute()}'")
-        config:Config = load_config()
+        logger.debug("Using dotenv-filepath '%s'", utils.get_dotenv_filepath().absolute())
+        config:Config = load_config(snapshot_filepath=None if args.no_config_snapshot else get_config_snapshot_filepath())
     except ConfigError:
         logger.exception("Got invalid configuration.")
         quit(1)
+    threshold_engine:ThresholdEngine = ThresholdEngine.from_config(config)
+    logger.debug("Startup=%.1f ms", (time.time()-_start)*1000)
     
     main()
\ No newline at end of file
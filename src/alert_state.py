@@ -0,0 +1,169 @@
+import os
+import json
+import logging
+from pathlib import Path
+from typing import NamedTuple
+#
+from src.custom_exceptions import AlertStateError
+from src.thresholds import ThresholdEngine, NOMINAL, SEVERITY_NAMES
+
+class AlertTransition(NamedTuple):
+    """
+    Change of the alert-state, caused by the sample `frequency` at `timestamp_ms`.
+    """
+    previous: int
+    severity: int
+    frequency: float
+    timestamp_ms: int
+
+    @property
+    def is_recovery(self) -> bool:
+        """
+        Whether the frequency went back to a less severe band on the same side (or NOMINAL).
+        """
+        return abs(self.severity) < abs(self.previous) and self.severity * self.previous >= 0
+
+class AlertStateMachine:
+    """
+    Persisted alert-state, so alerts are only sent on state-transitions instead of every sample.
+
+    - Hysteresis: a less severe state is only entered, once the frequency is `hysteresis` Hz
+      inside of its band (e.g. WARNING_LOW -> NOMINAL above WARNING MIN + hysteresis).
+    - Debounce: a new state is only entered, once it has been held for at least `debounce_ms`
+      (measured by the sample-timestamps, so it also works with one process per sample).
+
+    The state has to be written to `state_filepath` with `save()` after it changed, so it survives restarts.
+    Without `state_filepath` the state is only kept in memory (e.g. for replays).
+    A transition, whose notification couldn't be queued, is undone with `revert()` before saving,
+    so the next sample triggers it again instead of losing the alert.
+    """
+    def __init__(self, state_filepath:Path|None, thresholds:ThresholdEngine,
+                 hysteresis:float=0.0, debounce_ms:int=0) -> None:
+        self.logger:logging.Logger = logging.getLogger(__class__.__name__)
+        #
+        self._state_filepath:Path|None = Path(state_filepath) if state_filepath is not None else None
+        self._thresholds:ThresholdEngine = thresholds
+        self._hysteresis:float = hysteresis
+        self._debounce_ms:int = debounce_ms
+        self._state:dict = {
+            "severity": NOMINAL,
+            "since_ms": None,
+            "pending_severity": None,
+            "pending_since_ms": None,
+            "last_timestamp_ms": None
+        }
+        self._dirty:bool = False
+        # State before the last transition
+        self._reverted_state:dict|None = None
+        self._load()
+
+    @property
+    def state_filepath(self) -> Path|None:
+        return self._state_filepath
+
+    @property
+    def thresholds(self) -> ThresholdEngine:
+        return self._thresholds
+
+    @property
+    def severity(self) -> int:
+        return self._state["severity"]
+
+    @property
+    def pending_severity(self) -> int|None:
+        return self._state["pending_severity"]
+
+    def _load(self) -> None:
+        if self._state_filepath is None:
+            return
+        try:
+            with open(self._state_filepath, "r") as _file:
+                data:dict = json.load(_file)
+            if data["severity"] not in SEVERITY_NAMES:
+                raise ValueError(f"Unknown severity {data['severity']}")
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError) as _e:
+            raise AlertStateError(f"Couldn't load alert-state '{self._state_filepath}'") from _e
+        self._state.update(data)
+        self.logger.debug("Restored alert-state %s", SEVERITY_NAMES[self.severity])
+
+    def save(self) -> None:
+        """
+        Write the current state to disk (atomically), if it changed since the last save.
+        """
+        if self._state_filepath is None or not self._dirty:
+            return
+        tmp_filepath:Path = self._state_filepath.with_name(self._state_filepath.name + ".tmp")
+        try:
+            self._state_filepath.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_filepath, "w") as _file:
+                json.dump(self._state, _file)
+            os.replace(tmp_filepath, self._state_filepath)
+        except OSError as _e:
+            raise AlertStateError(f"Couldn't write alert-state '{self._state_filepath}'") from _e
+        self._dirty = False
+
+    def _target_severity(self, frequency:float) -> int:
+        """
+        Classify the frequency with the hysteresis applied towards less severe states.
+        """
+        severity:int = self._thresholds.classify(frequency)
+        current:int = self._state["severity"]
+        if severity * current < 0:
+            # Switched sides
+            return severity
+        if current < NOMINAL and severity > current:
+            return max(current, self._thresholds.classify(frequency - self._hysteresis))
+        if current > NOMINAL and severity < current:
+            return min(current, self._thresholds.classify(frequency + self._hysteresis))
+        return severity
+
+    def update(self, timestamp_ms:int, frequency:float) -> AlertTransition|None:
+        """
+        Feed a sample into the state-machine.
+
+        Returns the transition, when the sample changed the alert-state.
+        Samples older than the last one are ignored.
+        """
+        state:dict = self._state
+        if state["last_timestamp_ms"] is not None and timestamp_ms < state["last_timestamp_ms"]:
+            self.logger.debug("Ignored sample older than the last one (%d < %d)", timestamp_ms, state["last_timestamp_ms"])
+            return None
+        state["last_timestamp_ms"] = timestamp_ms
+        self._reverted_state = None
+
+        target:int = self._target_severity(frequency)
+        transition:AlertTransition|None = None
+        if target == state["severity"]:
+            self._dirty |= state["pending_severity"] is not None
+            (state["pending_severity"], state["pending_since_ms"]) = (None, None)
+        else:
+            if state["pending_severity"] != target:
+                (state["pending_severity"], state["pending_since_ms"]) = (target, timestamp_ms)
+                self._dirty = True
+            if timestamp_ms - state["pending_since_ms"] >= self._debounce_ms:
+                self._reverted_state = {**state, "last_timestamp_ms": timestamp_ms}
+                transition = AlertTransition(
+                    previous=state["severity"],
+                    severity=target,
+                    frequency=frequency,
+                    timestamp_ms=timestamp_ms
+                )
+                (state["severity"], state["since_ms"]) = (target, timestamp_ms)
+                (state["pending_severity"], state["pending_since_ms"]) = (None, None)
+                self._dirty = True
+                self.logger.debug("Alert-state %s -> %s", SEVERITY_NAMES[transition.previous], SEVERITY_NAMES[target])
+
+        return transition
+
+    def revert(self) -> None:
+        """
+        Undo the last transition, which is triggered again by the next sample (its debounce has already passed).
+        """
+        if self._reverted_state is None:
+            return
+        self._state.update(self._reverted_state)
+        self._reverted_state = None
+        self._dirty = True
+        self.logger.debug("Reverted alert-state to %s", SEVERITY_NAMES[self.severity])
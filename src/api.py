@@ -1,16 +1,152 @@
+import re
+import math
+import time
 import logging
 import requests
+import statistics
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 #
+from src.utils import timestamp_to_epoch_ms
+from src.latency import LatencyHistogram
+from src.circuit_breaker import CircuitBreaker
+from src.tracing import span, traced, is_enabled as tracing_enabled
 from src.custom_exceptions import *
 
+FETCH_MODES:tuple[str, ...] = ("single", "hedged", "quorum")
+
+# Expected payload of the API, everything else is parsed by `ElementTree`
+API_PAYLOAD_PATTERN:re.Pattern = re.compile(rb"\s*<r>\s*<f>([^<&]*)</f>\s*<z>([^<&]*)</z>\s*</r>\s*")
+
+def _parse_api_data_etree(content:bytes) -> tuple[str|None, str|None]:
+    """
+    Get the text of the `f` and `z` elements by parsing the whole XML-tree.
+    """
+    try:
+        api_data = ET.fromstring(content)
+    except ET.ParseError as _e:
+        raise APIParseError("Couldn't parse API XML-data") from _e
+    return (api_data.findtext('f'), api_data.findtext('z'))
+
+def _parse_api_data_fast(content:bytes) -> tuple[bytes, str]|None:
+    """
+    Get the text of the `f` and `z` elements by matching the bytes of the payload.
+    
+    Only handles the exact shape `<r><f>..</f><z>..</z></r>` (whitespace between the elements is allowed).
+    Returns `None` for everything else (attributes, comments, entities, declarations, ...).
+    """
+    match:re.Match|None = API_PAYLOAD_PATTERN.fullmatch(content)
+    if match is None:
+        return None
+    try:
+        return (match[1], match[2].decode())
+    except UnicodeDecodeError:
+        return None
+
+def parse_api_data(content:bytes) -> tuple[float, str]:
+    """
+    Parse frequency and timestamp of the Netzfrequenz-XML-API data.
+    
+    The expected payload is scanned directly, anything else falls back to `ElementTree`.
+    
+    Raises `APIParseError` if failed.
+    """
+    fast_result:tuple[bytes, str]|None = _parse_api_data_fast(content)
+    if fast_result is not None:
+        (frequency, timestamp) = fast_result
+    else:
+        (frequency, timestamp) = _parse_api_data_etree(content)
+        if frequency is None or timestamp is None:
+            raise APIParseError(f"API XML-data doesn't contain expected keys: {content!r}")
+
+    try:
+        frequency:float = float(frequency)
+    except ValueError as _e:
+        raise APIParseError("Invalid frequency value") from _e
+    if not math.isfinite(frequency):
+        raise APIParseError(f"Invalid frequency value: {frequency}")
+    
+    return (frequency, timestamp)
+
+class APIEndpoint:
+    """
+    URL of the API with the validators, content and sample of its last response, its latency-histogram
+    and its circuit-breaker.
+    """
+    def __init__(self, url:str, failure_threshold:int=5, reset_timeout:float=30.0) -> None:
+        self.url:str = url
+        self.etag:str|None = None
+        self.last_modified:str|None = None
+        self.last_content:bytes|None = None
+        self.last_sample:tuple[float, str]|None = None
+        self.latencies:LatencyHistogram = LatencyHistogram()
+        self.breaker:CircuitBreaker = CircuitBreaker(url, failure_threshold, reset_timeout)
+    
+    def conditional_headers(self) -> dict:
+        """
+        Get the `If-None-Match`/`If-Modified-Since`-headers for the validators of the last response.
+        """
+        headers:dict = {}
+        if self.etag is not None:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified is not None:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+    
+    def update(self, content:bytes, etag:str|None, last_modified:str|None) -> tuple[float, str]|None:
+        """
+        Parse the content of a (non-`304`) response and remember it with its validators.
+        
+        Returns `None` if the content is identical to the last one (without parsing it again).
+        
+        Raises `APIParseError` if failed.
+        """
+        if content == self.last_content:
+            return None
+        sample:tuple[float, str] = parse_api_data(content)
+        # Only remember validators of parsable responses, so a `304` always refers to a known sample
+        (self.etag, self.last_modified) = (etag, last_modified)
+        (self.last_content, self.last_sample) = (content, sample)
+        return sample
+
 class APIHandler:
-    def __init__(self, api_url:str, requests_timeout:int, requests_cert_verify:bool) -> None:
+    def __init__(self, api_url:str, requests_timeout:int, requests_cert_verify:bool,
+                 session:requests.Session|None = None, fallback_urls:tuple[str, ...] = (),
+                 fetch_mode:str = "hedged", hedge_percentile:float = 0.95, hedge_delay:float = 1.0,
+                 breaker_failure_threshold:int = 5, breaker_reset_timeout:float = 30.0,
+                 adaptive_timeout:bool = True) -> None:
         self.logger:logging.Logger = logging.getLogger(__class__.__name__)
         #
+        if fetch_mode not in FETCH_MODES:
+            raise ValueError(f"Unknown fetch-mode '{fetch_mode}', must be one of {FETCH_MODES}")
         self._api_url:str = api_url
         self._requests_timeout:int = requests_timeout
         self._requests_cert_verify:bool = requests_cert_verify
+        # Reuse keep-alive connections across requests
+        self._session:requests.Session = session if session is not None else requests.Session()
+        #
+        # Primary endpoint first
+        self._endpoints:list[APIEndpoint] = [
+            APIEndpoint(_url, breaker_failure_threshold, breaker_reset_timeout) for _url in (api_url, *fallback_urls)
+        ]
+        self._fetch_mode:str = fetch_mode if len(self._endpoints) > 1 else "single"
+        self._hedge_percentile:float = hedge_percentile
+        self._hedge_delay:float = hedge_delay
+        self._adaptive_timeout:bool = adaptive_timeout
+        self._executor:ThreadPoolExecutor|None = None
+        #
+        self._last_sample:tuple[float, str]|None = None
+        # Epoch-milliseconds of the newest sample, that has been returned
+        self._last_timestamp_ms:int|None = None
+        self._request_count:int = 0
+        self._not_modified_count:int = 0
+        self._duplicate_count:int = 0
+        self._stale_count:int = 0
+        self._hedged_count:int = 0
+        self._bytes_saved:int = 0
+        self._fetch_count:int = 0
+        self._error_counts:dict[str, int] = {}
+        self._parse_latencies:LatencyHistogram = LatencyHistogram()
         
     @property
     def api_url(self) -> str:
@@ -24,53 +160,333 @@ class APIHandler:
     def requests_cert_verify(self) -> bool:
         return self._requests_cert_verify
     
-    def get_api_data(self) -> tuple[float, str]:
+    @property
+    def session(self) -> requests.Session:
+        return self._session
+    
+    @property
+    def endpoints(self) -> list[APIEndpoint]:
+        return self._endpoints
+    
+    @property
+    def fetch_mode(self) -> str:
+        return self._fetch_mode
+    
+    @property
+    def last_sample(self) -> tuple[float, str]|None:
+        return self._last_sample
+    
+    @property
+    def request_count(self) -> int:
+        return self._request_count
+    
+    @property
+    def not_modified_count(self) -> int:
         """
-        Get data from Netzfrequenz-XML-API.
+        Number of `304 Not Modified`-responses to conditional requests.
+        """
+        return self._not_modified_count
+    
+    @property
+    def duplicate_count(self) -> int:
+        """
+        Number of responses (including `304`), that didn't contain a new sample.
+        """
+        return self._duplicate_count
+    
+    @property
+    def stale_count(self) -> int:
+        """
+        Number of samples, that have been dropped, because they are older than the last sample.
+        """
+        return self._stale_count
+    
+    @property
+    def hedged_count(self) -> int:
+        """
+        Number of hedged requests, sent because an endpoint didn't answer in time (or failed).
+        """
+        return self._hedged_count
+    
+    @property
+    def bytes_saved(self) -> int:
+        """
+        Number of response-bytes, that didn't have to be transferred thanks to `304`-responses.
+        """
+        return self._bytes_saved
+    
+    @property
+    def fetch_count(self) -> int:
+        """
+        Number of calls of `get_new_api_data` (including failed ones).
+        """
+        return self._fetch_count
+    
+    @property
+    def error_counts(self) -> dict[str, int]:
+        """
+        Number of failed calls of `get_new_api_data` by exception-class.
+        """
+        return self._error_counts
+    
+    @property
+    def parse_latencies(self) -> LatencyHistogram:
+        return self._parse_latencies
+    
+    @property
+    def short_circuited_count(self) -> int:
+        """
+        Number of requests, that weren't sent because the circuit of their endpoint was open.
+        """
+        return sum(_endpoint.breaker.rejected_count for _endpoint in self._endpoints)
+    
+    def request_timeout(self, endpoint:APIEndpoint) -> float:
+        """
+        Get the timeout of the next request to the given endpoint.
         
-        Expected XML-data from the API:
-        ```
-        <r>
-            <f>50.043</f>
-            <z>2026-02-11T15:05:08+00:00</z>
-        </r>
+        With adaptive timeouts a multiple of the P99-latency of the endpoint (at most the configured request-timeout).
+        The probe of a half-open circuit always gets the configured request-timeout, so a slow but working
+        endpoint can close its circuit again.
+        """
+        if not self._adaptive_timeout or endpoint.breaker.is_probing:
+            return self.requests_timeout
+        return endpoint.latencies.timeout(self.requests_timeout)
+    
+    def hedge_delay(self, endpoint:APIEndpoint) -> float:
+        """
+        Get the delay before hedging a request to the given endpoint.
+        
+        The configured latency-percentile of the endpoint, once enough latencies have been measured
+        (at most the request-timeout).
+        """
+        if endpoint.latencies.count < 20:
+            return self._hedge_delay
+        return min(endpoint.latencies.quantile(self._hedge_percentile), self.requests_timeout)
+    
+    def close(self) -> None:
+        """
+        Stop the threads of hedged/quorum requests (without waiting for pending requests).
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def _fetch(self, endpoint:APIEndpoint) -> tuple[float, str]|None:
+        """
+        Get and parse data of a single endpoint.
+        
+        Returns `None` if the endpoint has no new data (`304` or identical content), its last sample
+        is kept in `endpoint.last_sample`.
         
         Raises `APIError` if failed.
         """
+        # Fast-fail while the endpoint is down
+        if not endpoint.breaker.allow_request():
+            raise APICircuitOpenError(f"Circuit of '{endpoint.url}' is open, skipped request")
+        
         # Get data
+        self._request_count += 1
+        timeout:float = self.request_timeout(endpoint)
+        _request_start:float = time.perf_counter()
         try:
-            response = requests.get(
-                url=self.api_url, 
-                verify=self.requests_cert_verify,
-                timeout=self.requests_timeout
-            )
+            try:
+                with span("api.request") as _span:
+                    response = self.session.get(
+                        url=endpoint.url,
+                        headers=endpoint.conditional_headers(),
+                        verify=self.requests_cert_verify,
+                        timeout=timeout
+                    )
+                    if tracing_enabled():
+                        # `requests` doesn't expose DNS/TCP/TLS, `elapsed` covers everything until the headers were parsed
+                        _headers_seconds:float = response.elapsed.total_seconds()
+                        _span.set(url=endpoint.url, status=response.status_code, bytes=len(response.content),
+                                  headers_ms=round(_headers_seconds * 1000, 3),
+                                  body_ms=round((time.perf_counter() - _request_start - _headers_seconds) * 1000, 3))
+            finally:
+                # Failed requests (e.g. timeouts) count as well, so slow endpoints are hedged earlier
+                endpoint.latencies.add(time.perf_counter() - _request_start)
             response.raise_for_status()
             
-            self.logger.debug(f"Got response.status_code={response.status_code} from '{self.api_url}', "
-                              f"{len(response.content)} bytes")
+            self.logger.debug("Got response.status_code=%s from '%s', %d bytes",
+                              response.status_code, endpoint.url, len(response.content))
         
         except requests.RequestException as _e:
-            raise APIRequestError("API request-error") from _e
+            endpoint.breaker.record_failure()
+            raise APIRequestError(f"API request-error of '{endpoint.url}' (timeout={timeout:.3f}s)") from _e
+        endpoint.breaker.record_success()
+        
+        if response.status_code == 304 and endpoint.last_sample is not None:
+            self._not_modified_count += 1
+            self._bytes_saved += len(endpoint.last_content)
+            return None
         
         # Parse XML-data
+        _parse_start:float = time.perf_counter()
         try:
-            api_data = ET.fromstring(response.content)
-        except ET.ParseError as _e:
-            raise APIParseError("Couldn't parse API XML-data") from _e
-        frequency:str|None = api_data.findtext('f')
-        timestamp:str|None = api_data.findtext('z')
-        if frequency is None or timestamp is None:
-            self.logger.debug(f"Received XML-data: {response.content}")
-            raise APIParseError("API XML-data doesn't contain expected keys")
-
-        self.logger.debug(f"Received data from API: {api_data}, "
-                            f"parsed frequency={frequency} and timestamp={timestamp} from XML-API data")
-
+            with span("api.parse"):
+                sample:tuple[float, str]|None = endpoint.update(
+                    content=response.content,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified')
+                )
+        finally:
+            self._parse_latencies.add(time.perf_counter() - _parse_start)
+        if sample is not None:
+            self.logger.debug("Parsed frequency=%s and timestamp=%s from XML-API data of '%s'", sample[0], sample[1], endpoint.url)
+        
+        return sample
+    
+    def _log_fetch_error(self, endpoint:APIEndpoint, error:APIError) -> None:
+        # Skipped requests of open circuits would flood the log, their state-change is logged by the breaker
+        if isinstance(error, APICircuitOpenError):
+            self.logger.debug("Request to '%s' skipped: %s", endpoint.url, error)
+        else:
+            self.logger.warning("Request to '%s' failed: %s", endpoint.url, error)
+    
+    def _fetch_hedged(self) -> tuple[float, str]|None:
+        """
+        Request the primary endpoint and the next one, whenever the last requested endpoint didn't
+        answer within its hedge-delay (or failed). The first successful answer wins.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=len(self._endpoints), thread_name_prefix="APIHedge")
+        futures:dict[Future, APIEndpoint] = {}
+        pending:set[Future] = set()
+        errors:list[APIError] = []
+        
+        for (_index, _endpoint) in enumerate(self._endpoints):
+            if _index:
+                self._hedged_count += 1
+                self.logger.debug("Hedging request to '%s'", _endpoint.url)
+            future:Future = self._executor.submit(self._fetch, _endpoint)
+            futures[future] = _endpoint
+            pending.add(future)
+            # Wait for the hedge-delay of the last endpoint, or until the next request is due because one failed
+            deadline:float = time.monotonic() + self.hedge_delay(_endpoint)
+            while pending and (remaining := deadline - time.monotonic()) > 0:
+                (done, pending) = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for _future in done:
+                    try:
+                        return _future.result()
+                    except APIError as _e:
+                        errors.append(_e)
+                        self._log_fetch_error(futures[_future], _e)
+                if errors and not pending:
+                    break
+        
+        # All endpoints have been requested, wait for the first successful answer
+        while pending:
+            (done, pending) = wait(pending, return_when=FIRST_COMPLETED)
+            for _future in done:
+                try:
+                    return _future.result()
+                except APIError as _e:
+                    errors.append(_e)
+                    self._log_fetch_error(futures[_future], _e)
+        if all(isinstance(_e, APICircuitOpenError) for _e in errors):
+            raise APICircuitOpenError(f"Circuits of all {len(self._endpoints)} API-endpoints are open")
+        raise APIRequestError(f"All {len(self._endpoints)} API-endpoints failed") from errors[-1]
+    
+    def _fetch_quorum(self) -> tuple[float, str]:
+        """
+        Request all endpoints concurrently and take the median frequency and newest timestamp
+        of the answers of at least a majority of the endpoints.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=len(self._endpoints), thread_name_prefix="APIQuorum")
+        futures:dict[Future, APIEndpoint] = {
+            self._executor.submit(self._fetch, _endpoint): _endpoint for _endpoint in self._endpoints
+        }
+        samples:list[tuple[float, str]] = []
+        errors:list[APIError] = []
+        for _future in futures:
+            try:
+                _future.result()
+            except APIError as _e:
+                errors.append(_e)
+                self._log_fetch_error(futures[_future], _e)
+            else:
+                # The last sample of endpoints without new data still counts
+                samples.append(futures[_future].last_sample)
+        
+        quorum:int = len(self._endpoints) // 2 + 1
+        if len(samples) < quorum:
+            raise APIRequestError(f"Only {len(samples)} of {len(self._endpoints)} API-endpoints answered, "
+                                  f"{quorum} needed") from (errors[-1] if errors else None)
+        
+        frequency:float = statistics.median(_frequency for (_frequency, _) in samples)
         try:
-            frequency:float = float(frequency)
+            timestamp:str = max((_timestamp for (_, _timestamp) in samples), key=timestamp_to_epoch_ms)
         except ValueError as _e:
-            raise APIParseError("Invalid frequency value") from _e
-        
+            raise APIParseError(f"Invalid timestamp in API-data: {samples}") from _e
         return (frequency, timestamp)
+    
+    @traced("api.fetch")
+    def get_new_api_data(self) -> tuple[float, str]|None:
+        """
+        Get data from Netzfrequenz-XML-API, but only if it contains a new sample.
+        
+        Depending on the fetch-mode, the data is requested from:
+        - `single`: the primary endpoint
+        - `hedged`: the primary endpoint, and the next endpoints when it doesn't answer within its latency-percentile
+        - `quorum`: all endpoints concurrently, taking the median frequency
+        
+        Sends `If-None-Match`/`If-Modified-Since` when the API provided validators.
+        Returns `None` on a `304`-response or when the timestamp didn't change since the last sample,
+        without parsing the response again when its content is identical, and when the sample is older
+        than the last sample (e.g. of a lagging fallback-endpoint).
+        
+        Raises `APIError` if failed.
+        """
+        self._fetch_count += 1
+        try:
+            if self._fetch_mode == "quorum":
+                sample:tuple[float, str]|None = self._fetch_quorum()
+            elif self._fetch_mode == "hedged":
+                sample = self._fetch_hedged()
+            else:
+                sample = self._fetch(self._endpoints[0])
+        except APIError as _e:
+            error_name:str = _e.__class__.__name__
+            self._error_counts[error_name] = self._error_counts.get(error_name, 0) + 1
+            raise
+        
+        if sample is None or (self._last_sample is not None and sample[1] == self._last_sample[1]):
+            self._duplicate_count += 1
+            if self._last_sample is None:
+                # e.g. `304` of the winning endpoint, before any sample has been returned
+                self._last_sample = next((_endpoint.last_sample for _endpoint in self._endpoints
+                                          if _endpoint.last_sample is not None), None)
+            return None
+        try:
+            timestamp_ms:int = timestamp_to_epoch_ms(sample[1])
+        except ValueError as _e:
+            self._error_counts["APIParseError"] = self._error_counts.get("APIParseError", 0) + 1
+            raise APIParseError(f"Invalid timestamp in API-data: {sample[1]}") from _e
+        if self._last_timestamp_ms is not None and timestamp_ms <= self._last_timestamp_ms:
+            self._stale_count += 1
+            self.logger.debug("Dropped sample with timestamp=%s, which is older than the last sample", sample[1])
+            return None
+        self._last_sample = sample
+        self._last_timestamp_ms = timestamp_ms
+        
+        return sample
+    
+    def get_api_data(self) -> tuple[float, str]:
+        """
+        Get data from Netzfrequenz-XML-API.
+        
+        Expected XML-data from the API:
+        ```
+        <r>
+            <f>50.043</f>
+            <z>2026-02-11T15:05:08+00:00</z>
+        </r>
+        
+        Returns the last sample again, if the API has no new data.
         
-        
\ No newline at end of file
+        Raises `APIError` if failed.
+        """
+        sample:tuple[float, str]|None = self.get_new_api_data()
+        return sample if sample is not None else self._last_sample
@@ -0,0 +1,301 @@
+import ssl
+import time
+import zlib
+import asyncio
+import logging
+from urllib.parse import urlsplit, urljoin
+from urllib.request import getproxies
+#
+from src.api import APIEndpoint
+from src.utils import timestamp_to_epoch_ms
+from src.custom_exceptions import *
+
+USER_AGENT:str = "eu-grid-frequency-scraper"
+# Responses of the API are small, larger bodies (or endless chunks) are rejected instead of being buffered
+MAX_BODY_SIZE:int = 1024 * 1024
+MAX_REDIRECTS:int = 3
+REDIRECT_STATUS_CODES:tuple[int, ...] = (301, 302, 303, 307, 308)
+
+class AsyncHTTPClient:
+    """
+    Minimal asyncio HTTP/1.1-client for small `GET`-responses, with keep-alive connection-pools per host.
+
+    Supports `Content-Length`, chunked and close-delimited bodies of at most `MAX_BODY_SIZE` bytes, gzip-encoding
+    and up to `MAX_REDIRECTS` redirects. At most `max_connections_per_host` requests per host run concurrently,
+    further requests wait for a free connection. Malformed responses raise `APIRequestError` (like timeouts).
+
+    It only depends on the standard-library and doesn't support proxies (they are ignored with a warning).
+    """
+    def __init__(self, timeout:float, verify:bool=True, max_connections_per_host:int=32) -> None:
+        self.logger:logging.Logger = logging.getLogger(__class__.__name__)
+        #
+        self._timeout:float = timeout
+        self._ssl_context:ssl.SSLContext = ssl.create_default_context()
+        if not verify:
+            self._ssl_context.check_hostname = False
+            self._ssl_context.verify_mode = ssl.CERT_NONE
+        self._max_connections_per_host:int = max_connections_per_host
+        self._idle:dict[tuple[str, str, int], list[tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._limits:dict[tuple[str, str, int], asyncio.Semaphore] = {}
+        self._connect_count:int = 0
+        proxies:dict[str, str] = {_scheme: _url for (_scheme, _url) in getproxies().items() if _scheme in ("http", "https")}
+        if proxies:
+            self.logger.warning("Proxies are not supported by the async HTTP-client, ignoring %s", ", ".join(sorted(proxies)))
+
+    @property
+    def timeout(self) -> float:
+        return self._timeout
+
+    @property
+    def connect_count(self) -> int:
+        """
+        Number of opened connections (compared to the number of requests, it shows how well connections are reused).
+        """
+        return self._connect_count
+
+    async def _connect(self, key:tuple[str, str, int]) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        (scheme, host, port) = key
+        self._connect_count += 1
+        return await asyncio.open_connection(host, port, ssl=self._ssl_context if scheme == "https" else None)
+
+    @staticmethod
+    async def _read_response(reader:asyncio.StreamReader) -> tuple[int, dict[str, str], bytes, bool]:
+        """
+        Read status, headers and (decoded) body of a response.
+
+        Returns whether the connection can be reused as well.
+        Raises `ValueError` if the response is malformed or its body is larger than `MAX_BODY_SIZE`.
+        """
+        status_line:bytes = await reader.readuntil(b"\r\n")
+        (version, status) = status_line.split(None, 2)[:2]
+        headers:dict[str, str] = {}
+        while (line := await reader.readuntil(b"\r\n")) != b"\r\n":
+            (name, _, value) = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        status_code:int = int(status)
+        keep_alive:bool = version == b"HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if status_code in (204, 304) or 100 <= status_code < 200:
+            return (status_code, headers, b"", keep_alive)
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks:list[bytes] = []
+            length:int = 0
+            while size := int((await reader.readuntil(b"\r\n")).split(b";", 1)[0], 16):
+                length += size
+                if size < 0 or length > MAX_BODY_SIZE:
+                    raise ValueError(f"Invalid chunk-size {size}")
+                chunks.append(await reader.readexactly(size))
+                if await reader.readexactly(2) != b"\r\n":
+                    raise ValueError("Chunk isn't terminated by CRLF")
+            # Trailer-headers
+            while await reader.readuntil(b"\r\n") != b"\r\n":
+                pass
+            body:bytes = b"".join(chunks)
+        elif "content-length" in headers:
+            content_length:int = int(headers["content-length"])
+            if not 0 <= content_length <= MAX_BODY_SIZE:
+                raise ValueError(f"Invalid Content-Length {content_length}")
+            body = await reader.readexactly(content_length)
+        else:
+            # Close-delimited
+            body = await reader.read(MAX_BODY_SIZE + 1)
+            while len(body) <= MAX_BODY_SIZE and (data := await reader.read(MAX_BODY_SIZE + 1 - len(body))):
+                body += data
+            if len(body) > MAX_BODY_SIZE:
+                raise ValueError(f"Response-body is larger than {MAX_BODY_SIZE} bytes")
+            keep_alive = False
+        return (status_code, headers, AsyncHTTPClient._decode(body, headers.get("content-encoding", "")), keep_alive)
+
+    @staticmethod
+    def _decode(body:bytes, content_encoding:str) -> bytes:
+        if content_encoding.lower() in ("", "identity"):
+            return body
+        if content_encoding.lower() != "gzip":
+            raise ValueError(f"Unsupported Content-Encoding '{content_encoding}'")
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            decoded:bytes = decompressor.decompress(body, MAX_BODY_SIZE)
+        except zlib.error as _e:
+            raise ValueError("Invalid gzip-encoded body") from _e
+        if decompressor.unconsumed_tail:
+            raise ValueError(f"Decoded response-body is larger than {MAX_BODY_SIZE} bytes")
+        if not decompressor.eof:
+            raise ValueError("Truncated gzip-encoded body")
+        return decoded
+
+    async def _request(self, key:tuple[str, str, int], request:bytes) -> tuple[int, dict[str, str], bytes]:
+        """
+        Send the request on an idle (or new) connection of the host and read its response.
+        """
+        idle:list = self._idle.setdefault(key, [])
+        while True:
+            reused:bool = bool(idle)
+            (reader, writer) = idle.pop() if reused else await self._connect(key)
+            try:
+                writer.write(request)
+                await writer.drain()
+                (status_code, headers, body, keep_alive) = await self._read_response(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                writer.close()
+                # A reused connection may have been closed by the server meanwhile, retry with another one
+                if not reused:
+                    raise
+                continue
+            except BaseException:
+                writer.close()
+                raise
+            if keep_alive:
+                idle.append((reader, writer))
+            else:
+                writer.close()
+            return (status_code, headers, body)
+
+    async def get(self, url:str, headers:dict|None=None, timeout:float|None=None) -> tuple[int, dict[str, str], bytes]:
+        """
+        Send a `GET`-request and get the status-code, headers (lower-case names) and body of the response.
+        Redirects are followed (up to `MAX_REDIRECTS`), the `timeout` of the client is used for every request,
+        unless another one is given.
+
+        Raises `APIRequestError` if failed (including timeouts, malformed responses and status-codes >= 400).
+        """
+        for _redirect in range(MAX_REDIRECTS + 1):
+            (status_code, response_headers, body) = await self._get(url, headers, timeout)
+            if status_code not in REDIRECT_STATUS_CODES:
+                break
+            if "location" not in response_headers:
+                raise APIRequestError(f"API request-error of '{url}': HTTP {status_code} without Location")
+            url = urljoin(url, response_headers["location"])
+        else:
+            raise APIRequestError(f"API request-error of '{url}': more than {MAX_REDIRECTS} redirects")
+
+        if status_code >= 400:
+            raise APIRequestError(f"API request-error of '{url}': HTTP {status_code}")
+        return (status_code, response_headers, body)
+
+    async def _get(self, url:str, headers:dict|None, timeout:float|None) -> tuple[int, dict[str, str], bytes]:
+        parts = urlsplit(url)
+        scheme:str = parts.scheme.lower()
+        if scheme not in ("http", "https") or not parts.hostname:
+            raise APIRequestError(f"Unsupported URL '{url}'")
+        key:tuple[str, str, int] = (scheme, parts.hostname, parts.port or (443 if scheme == "https" else 80))
+        target:str = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        request:bytes = (
+            f"GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\nUser-Agent: {USER_AGENT}\r\n"
+            f"Accept: */*\r\nAccept-Encoding: gzip\r\nConnection: keep-alive\r\n"
+            + "".join(f"{_name}: {_value}\r\n" for (_name, _value) in (headers or {}).items())
+            + "\r\n"
+        ).encode("latin-1")
+
+        limit:asyncio.Semaphore = self._limits.setdefault(key, asyncio.Semaphore(self._max_connections_per_host))
+        async with limit:
+            try:
+                return await asyncio.wait_for(self._request(key, request), timeout if timeout is not None else self._timeout)
+            except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, asyncio.TimeoutError) as _e:
+                raise APIRequestError(f"API request-error of '{url}'") from _e
+
+    def close(self) -> None:
+        """
+        Close all idle connections.
+        """
+        for _connections in self._idle.values():
+            for (_, _writer) in _connections:
+                _writer.close()
+            _connections.clear()
+
+class AsyncAPIHandler:
+    """
+    Async variant of the `APIHandler` for a single endpoint, sharing the connection-pools of an `AsyncHTTPClient`.
+    """
+    def __init__(self, api_url:str, client:AsyncHTTPClient, breaker_failure_threshold:int=5,
+                 breaker_reset_timeout:float=30.0, adaptive_timeout:bool=True) -> None:
+        self.logger:logging.Logger = logging.getLogger(__class__.__name__)
+        #
+        self._endpoint:APIEndpoint = APIEndpoint(api_url, breaker_failure_threshold, breaker_reset_timeout)
+        self._client:AsyncHTTPClient = client
+        self._adaptive_timeout:bool = adaptive_timeout
+        self._last_sample:tuple[float, str]|None = None
+        self._last_timestamp_ms:int|None = None
+        self._request_count:int = 0
+        self._not_modified_count:int = 0
+        self._duplicate_count:int = 0
+        self._stale_count:int = 0
+        self._bytes_saved:int = 0
+
+    @property
+    def api_url(self) -> str:
+        return self._endpoint.url
+
+    @property
+    def endpoint(self) -> APIEndpoint:
+        return self._endpoint
+
+    @property
+    def last_sample(self) -> tuple[float, str]|None:
+        return self._last_sample
+
+    @property
+    def request_count(self) -> int:
+        return self._request_count
+
+    @property
+    def not_modified_count(self) -> int:
+        return self._not_modified_count
+
+    @property
+    def duplicate_count(self) -> int:
+        return self._duplicate_count
+
+    @property
+    def stale_count(self) -> int:
+        return self._stale_count
+
+    @property
+    def bytes_saved(self) -> int:
+        return self._bytes_saved
+
+    async def get_new_api_data(self) -> tuple[float, str]|None:
+        """
+        Get data from the endpoint, but only if it contains a new sample (see `APIHandler.get_new_api_data`).
+
+        Raises `APIError` if failed.
+        """
+        endpoint:APIEndpoint = self._endpoint
+        if not endpoint.breaker.allow_request():
+            raise APICircuitOpenError(f"Circuit of '{endpoint.url}' is open, skipped request")
+        self._request_count += 1
+        timeout:float = self._client.timeout
+        if self._adaptive_timeout and not endpoint.breaker.is_probing:
+            timeout = endpoint.latencies.timeout(timeout)
+        _request_start:float = time.perf_counter()
+        try:
+            (status_code, headers, content) = await self._client.get(endpoint.url, endpoint.conditional_headers(), timeout)
+        except APIRequestError:
+            endpoint.breaker.record_failure()
+            raise
+        finally:
+            endpoint.latencies.add(time.perf_counter() - _request_start)
+        endpoint.breaker.record_success()
+
+        if status_code == 304 and endpoint.last_sample is not None:
+            self._not_modified_count += 1
+            self._bytes_saved += len(endpoint.last_content)
+            sample:tuple[float, str]|None = None
+        else:
+            sample = endpoint.update(content, headers.get("etag"), headers.get("last-modified"))
+
+        if sample is None or (self._last_sample is not None and sample[1] == self._last_sample[1]):
+            self._duplicate_count += 1
+            if self._last_sample is None:
+                self._last_sample = endpoint.last_sample
+            return None
+        try:
+            timestamp_ms:int = timestamp_to_epoch_ms(sample[1])
+        except ValueError as _e:
+            raise APIParseError(f"Invalid timestamp in API-data: {sample[1]}") from _e
+        if self._last_timestamp_ms is not None and timestamp_ms <= self._last_timestamp_ms:
+            self._stale_count += 1
+            self.logger.debug("Dropped sample with timestamp=%s, which is older than the last sample", sample[1])
+            return None
+        self._last_sample = sample
+        self._last_timestamp_ms = timestamp_ms
+        return sample
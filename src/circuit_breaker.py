@@ -0,0 +1,112 @@
+import time
+import logging
+import threading
+from typing import Callable
+
+# States of the circuit-breaker
+CLOSED:str = "closed"
+OPEN:str = "open"
+HALF_OPEN:str = "half-open"
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit-breaker for the requests to a single service.
+
+    - `closed`: requests are allowed. After `failure_threshold` consecutive failures the circuit opens.
+    - `open`: requests are rejected immediately (fast-fail), until `reset_timeout` seconds have passed.
+    - `half-open`: a single probe-request is allowed. Its success closes the circuit, its failure opens it again.
+
+    A `failure_threshold` of `0` disables the circuit-breaker.
+    """
+    def __init__(self, name:str, failure_threshold:int=5, reset_timeout:float=30.0,
+                 clock:Callable[[], float]=time.monotonic) -> None:
+        self.logger:logging.Logger = logging.getLogger(__class__.__name__)
+        #
+        self._name:str = name
+        self._failure_threshold:int = failure_threshold
+        self._reset_timeout:float = reset_timeout
+        self._clock:Callable[[], float] = clock
+        self._state:str = CLOSED
+        self._failures:int = 0
+        self._opened_at:float = 0.0
+        self._probe_in_flight:bool = False
+        self._open_count:int = 0
+        self._rejected_count:int = 0
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def consecutive_failures(self) -> int:
+        return self._failures
+
+    @property
+    def open_count(self) -> int:
+        """
+        Number of times the circuit opened.
+        """
+        return self._open_count
+
+    @property
+    def rejected_count(self) -> int:
+        """
+        Number of requests, that were rejected while the circuit was open.
+        """
+        return self._rejected_count
+
+    def _transition(self, state:str) -> None:
+        previous:str = self._state
+        self._state = state
+        if state == OPEN:
+            self._opened_at = self._clock()
+            self._open_count += 1
+            self.logger.warning("Circuit of '%s' %s -> %s after %d consecutive failures, rejecting requests for %s seconds",
+                                self._name, previous, state, self._failures, self._reset_timeout)
+        else:
+            self.logger.info("Circuit of '%s' %s -> %s", self._name, previous, state)
+
+    def allow_request(self) -> bool:
+        """
+        Whether a request may be sent now. Every allowed request has to be followed by `record_success` or `record_failure`.
+        """
+        if self._failure_threshold <= 0:
+            return True
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self._reset_timeout:
+                self._transition(HALF_OPEN)
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._rejected_count += 1
+            return False
+
+    @property
+    def is_probing(self) -> bool:
+        """
+        Whether the current request is the probe of a half-open circuit.
+        """
+        return self._state == HALF_OPEN
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._failure_threshold <= 0:
+                return
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self._failure_threshold):
+                self._transition(OPEN)
@@ -1,13 +1,37 @@
 import os
+import json
+import hashlib
 import logging
-from dotenv import load_dotenv
-from dataclasses import dataclass
+from pathlib import Path
+from dataclasses import dataclass, asdict
 #
 from src.utils import get_dotenv_filepath
 from src.custom_exceptions import InvalidConfigError, InvalidMaxMinThresholdError
 
 logger:logging.Logger = logging.getLogger(__name__)
 
+# Version of the format of the config-snapshots
+SNAPSHOT_VERSION:int = 1
+# Environment-variables, that are read by `load_config()`
+CONFIG_ENV_NAMES:tuple[str, ...] = (
+    "ENABLE_NTFY", "NTFY_TOPIC_URL", "NTFY_AUTH_TOKEN", "NTFY_HTTP_REQUEST_TIMEOUT", "NTFY_HTTP_REQUEST_CERT_VERIFY",
+    "NTFY_QUEUE_SIZE", "NTFY_MAX_RETRIES", "NTFY_RETRY_BACKOFF", "NTFY_COALESCE_WINDOW",
+    "NTFY_DELIVERY_TIMEOUT", "ENABLE_WEBHOOK", "WEBHOOK_URL", "WEBHOOK_AUTH_TOKEN", "WEBHOOK_HTTP_REQUEST_TIMEOUT",
+    "WEBHOOK_HTTP_REQUEST_CERT_VERIFY", "WEBHOOK_DELIVERY_TIMEOUT", "ENABLE_SYSLOG", "SYSLOG_ADDRESS", "SYSLOG_FACILITY",
+    "SYSLOG_DELIVERY_TIMEOUT", "ENABLE_ALERT_FILE", "ALERT_FILEPATH", "ALERT_FILE_DELIVERY_TIMEOUT", "NOTIFIER_QUEUE_SIZE",
+    "WARNING_MIN_HZ_ALERT_THRESHOLD", "WARNING_MAX_HZ_ALERT_THRESHOLD", "CRITICAL_MIN_HZ_ALERT_THRESHOLD",
+    "CRITICAL_MAX_HZ_ALERT_THRESHOLD", "ALERT_HYSTERESIS_HZ", "ALERT_DEBOUNCE_SECONDS", "ALERT_STATE_FILEPATH",
+    "ENABLE_ROCOF_ALERTS", "ROCOF_WARNING", "ROCOF_CRITICAL", "ROCOF_WINDOW_SECONDS",
+    "NETZFREQUENZ_DE_API_URL", "API_HTTP_REQUEST_TIMEOUT", "API_HTTP_REQUEST_CERT_VERIFY", "API_FALLBACK_URLS",
+    "API_FETCH_MODE", "API_HEDGE_PERCENTILE", "API_HEDGE_DELAY",
+    "CIRCUIT_BREAKER_FAILURE_THRESHOLD", "CIRCUIT_BREAKER_RESET_TIMEOUT", "ENABLE_ADAPTIVE_TIMEOUTS",
+    "DAEMON_POLL_INTERVAL", "ENABLE_ADAPTIVE_POLLING", "DAEMON_MIN_POLL_INTERVAL", "DAEMON_MAX_POLL_INTERVAL",
+    "ADAPTIVE_POLLING_DISTANCE_HZ", "ENABLE_METRICS", "METRICS_HOST", "METRICS_PORT",
+    "ENABLE_STORE", "STORE_DIRECTORY", "ENABLE_ROLLUPS", "ENABLE_DAILY_REPORT", "DAILY_REPORT_STATE_FILEPATH",
+    "ENABLE_SHARED_SAMPLE", "SHARED_SAMPLE_FILEPATH", "ENABLE_SPOOL", "SPOOL_DIRECTORY", "SPOOL_SYNC_INTERVAL",
+    "SPOOL_MAX_SIZE_MB"
+)
+
 @dataclass(frozen=True)
 class Config:
     enable_ntfy: bool
@@ -15,23 +39,151 @@ class Config:
     ntfy_auth_token: str | None
     ntfy_http_request_timeout:int
     ntfy_http_request_cert_verify: bool
+    ntfy_queue_size: int
+    ntfy_max_retries: int
+    ntfy_retry_backoff: float
+    ntfy_coalesce_window: float
+    ntfy_delivery_timeout: float
+    enable_webhook: bool
+    webhook_url: str | None
+    webhook_auth_token: str | None
+    webhook_http_request_timeout: int
+    webhook_http_request_cert_verify: bool
+    webhook_delivery_timeout: float
+    enable_syslog: bool
+    syslog_address: str
+    syslog_facility: str
+    syslog_delivery_timeout: float
+    enable_alert_file: bool
+    alert_filepath: str
+    alert_file_delivery_timeout: float
+    notifier_queue_size: int
     warning_min_hz_alert_threshold: float
     warning_max_hz_alert_threshold: float
     critical_min_hz_alert_threshold: float
     critical_max_hz_alert_threshold: float
+    alert_hysteresis_hz: float
+    alert_debounce_seconds: float
+    alert_state_filepath: str
+    enable_rocof_alerts: bool
+    rocof_warning: float
+    rocof_critical: float
+    rocof_window_seconds: float
     api_url: str
     api_http_request_timeout: int
     api_http_request_cert_verify: bool
+    api_fallback_urls: tuple[str, ...]
+    api_fetch_mode: str
+    api_hedge_percentile: float
+    api_hedge_delay: float
+    circuit_breaker_failure_threshold: int
+    circuit_breaker_reset_timeout: float
+    enable_adaptive_timeouts: bool
+    daemon_poll_interval: float
+    enable_adaptive_polling: bool
+    daemon_min_poll_interval: float
+    daemon_max_poll_interval: float
+    adaptive_polling_distance_hz: float
+    enable_metrics: bool
+    metrics_host: str
+    metrics_port: int
+    enable_store: bool
+    store_directory: str
+    enable_rollups: bool
+    enable_daily_report: bool
+    daily_report_state_filepath: str
+    enable_shared_sample: bool
+    shared_sample_filepath: str
+    enable_spool: bool
+    spool_directory: str
+    spool_sync_interval: float
+    spool_max_size_mb: int
     
 
-def load_config() -> Config:
+def get_config_snapshot_filepath() -> Path:
+    """
+    Get filepath of the config-snapshot, next to the dotenv-file.
+    """
+    return get_dotenv_filepath().with_name(".env.snapshot.json")
+
+def _snapshot_key(dotenv_filepath:Path) -> str:
+    """
+    Get the key of a config-snapshot from the mtime and SHA-256 of the dotenv-file, the configuration-variables
+    of the environment and the mtime of this module.
+    """
+    digest = hashlib.sha256(f"{SNAPSHOT_VERSION}|{os.stat(__file__).st_mtime_ns}|".encode())
+    try:
+        digest.update(f"{dotenv_filepath.stat().st_mtime_ns}|".encode() + dotenv_filepath.read_bytes())
+    except OSError:
+        digest.update(b"-")
+    for _name in CONFIG_ENV_NAMES:
+        digest.update(f"|{_name}={os.environ.get(_name)}".encode())
+    return digest.hexdigest()
+
+def _read_snapshot(snapshot_filepath:Path, key:str) -> Config|None:
+    """
+    Get the config of a matching snapshot (and export the variables of its dotenv-file), `None` if there is none.
+    """
+    try:
+        with open(snapshot_filepath, "r") as _file:
+            snapshot:dict = json.load(_file)
+        if snapshot.get("key") != key:
+            return None
+        config = Config(**{_name: tuple(_value) if isinstance(_value, list) else _value
+                           for (_name, _value) in snapshot["config"].items()})
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        return None
+    os.environ.update(snapshot["environ"])
+    return config
+
+def _write_snapshot(snapshot_filepath:Path, key:str, environ:dict[str, str], config:Config) -> None:
+    """
+    Write the snapshot atomically and only readable by the owner, since it contains the secrets of the dotenv-file.
+    """
+    tmp_filepath:Path = snapshot_filepath.with_name(snapshot_filepath.name + ".tmp")
+    try:
+        _fd:int = os.open(tmp_filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(_fd, "w") as _file:
+            json.dump({"key": key, "environ": environ, "config": asdict(config)}, _file, separators=(",", ":"))
+        os.replace(tmp_filepath, snapshot_filepath)
+    except OSError as _e:
+        logger.debug("Couldn't write config-snapshot '%s': %s", snapshot_filepath, _e)
+
+def load_config(snapshot_filepath:str|Path|None = None) -> Config:
     """
     Load configuration of dotenv-file into dataclass-object.
     
+    With `snapshot_filepath` the validated config is cached as snapshot, which is reused (without parsing and
+    validating the dotenv-file again) until the dotenv-file (mtime or SHA-256), a configuration-variable
+    of the environment or this module changed.
+    
     Raises `InvalidConfigError` when an invalid config is given.
     """
-    load_dotenv(dotenv_path=get_dotenv_filepath(), override=True)
+    dotenv_filepath:Path = get_dotenv_filepath()
+    key:str|None = None
+    if snapshot_filepath is not None:
+        key = _snapshot_key(dotenv_filepath)
+        config:Config|None = _read_snapshot(Path(snapshot_filepath), key)
+        if config is not None:
+            logger.debug("Using config-snapshot '%s'", snapshot_filepath)
+            return config
     
+    # Like `load_dotenv(override=True)`, but the variables are also kept for the snapshot
+    from dotenv import dotenv_values
+    environ:dict[str, str] = {_name: _value for (_name, _value) in dotenv_values(dotenv_path=dotenv_filepath).items()
+                              if _value is not None}
+    os.environ.update(environ)
+    config = _parse_config()
+    if key is not None:
+        _write_snapshot(Path(snapshot_filepath), key, environ, config)
+    return config
+
+def _parse_config() -> Config:
+    """
+    Parse and validate the configuration of the environment.
+    
+    Raises `InvalidConfigError` when an invalid config is given.
+    """
     #
     # NTFY
     #
@@ -55,6 +207,118 @@ def load_config() -> Config:
     
     ntfy_http_request_cert_verify:bool = os.getenv('NTFY_HTTP_REQUEST_CERT_VERIFY', 'false').strip().upper() == "TRUE"
     
+    try:
+        ntfy_queue_size:int = int(os.getenv('NTFY_QUEUE_SIZE', '100'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'NTFY_QUEUE_SIZE'! Must be an integer.") from _e
+    
+    if ntfy_queue_size <= 0:
+        raise InvalidConfigError("'NTFY_QUEUE_SIZE' must be > 0")
+    
+    try:
+        ntfy_max_retries:int = int(os.getenv('NTFY_MAX_RETRIES', '3'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'NTFY_MAX_RETRIES'! Must be an integer.") from _e
+    
+    if ntfy_max_retries < 0:
+        raise InvalidConfigError("'NTFY_MAX_RETRIES' must be >= 0")
+    
+    try:
+        ntfy_retry_backoff:float = float(os.getenv('NTFY_RETRY_BACKOFF', '1.0'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'NTFY_RETRY_BACKOFF'! Must be a float.") from _e
+    
+    if ntfy_retry_backoff < 0:
+        raise InvalidConfigError("'NTFY_RETRY_BACKOFF' must be >= 0")
+    
+    try:
+        ntfy_coalesce_window:float = float(os.getenv('NTFY_COALESCE_WINDOW', '5.0'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'NTFY_COALESCE_WINDOW'! Must be a float.") from _e
+    
+    if ntfy_coalesce_window < 0:
+        raise InvalidConfigError("'NTFY_COALESCE_WINDOW' must be >= 0")
+    
+    try:
+        ntfy_delivery_timeout:float = float(os.getenv('NTFY_DELIVERY_TIMEOUT', '30.0'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'NTFY_DELIVERY_TIMEOUT'! Must be a float.") from _e
+    
+    if ntfy_delivery_timeout <= 0:
+        raise InvalidConfigError("'NTFY_DELIVERY_TIMEOUT' must be > 0")
+    
+    
+    #
+    # Notification channels
+    #
+    enable_webhook:bool = os.getenv('ENABLE_WEBHOOK', 'false').strip().upper() == "TRUE"
+    
+    webhook_url:str|None = os.getenv('WEBHOOK_URL', None)
+    if enable_webhook and not webhook_url:
+        raise InvalidConfigError("Missing 'WEBHOOK_URL', when 'ENABLE_WEBHOOK' is true!")
+    
+    webhook_auth_token:str|None = os.getenv('WEBHOOK_AUTH_TOKEN', None) or None
+    
+    try:
+        webhook_http_request_timeout:int = int(os.getenv('WEBHOOK_HTTP_REQUEST_TIMEOUT', '10'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'WEBHOOK_HTTP_REQUEST_TIMEOUT'! Must be an integer.") from _e
+    
+    if webhook_http_request_timeout <= 0:
+        raise InvalidConfigError("'WEBHOOK_HTTP_REQUEST_TIMEOUT' must be > 0")
+    
+    webhook_http_request_cert_verify:bool = os.getenv('WEBHOOK_HTTP_REQUEST_CERT_VERIFY', 'true').strip().upper() == "TRUE"
+    
+    try:
+        webhook_delivery_timeout:float = float(os.getenv('WEBHOOK_DELIVERY_TIMEOUT', '15.0'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'WEBHOOK_DELIVERY_TIMEOUT'! Must be a float.") from _e
+    
+    if webhook_delivery_timeout <= 0:
+        raise InvalidConfigError("'WEBHOOK_DELIVERY_TIMEOUT' must be > 0")
+    
+    enable_syslog:bool = os.getenv('ENABLE_SYSLOG', 'false').strip().upper() == "TRUE"
+    
+    syslog_address:str = os.getenv('SYSLOG_ADDRESS', '/dev/log').strip()
+    if enable_syslog and not syslog_address:
+        raise InvalidConfigError("Missing 'SYSLOG_ADDRESS', when 'ENABLE_SYSLOG' is true!")
+    
+    syslog_facility:str = os.getenv('SYSLOG_FACILITY', 'user').strip().lower()
+    if enable_syslog:
+        from logging.handlers import SysLogHandler
+        if syslog_facility not in SysLogHandler.facility_names:
+            raise InvalidConfigError(f"'SYSLOG_FACILITY' must be one of {', '.join(SysLogHandler.facility_names)}")
+    
+    try:
+        syslog_delivery_timeout:float = float(os.getenv('SYSLOG_DELIVERY_TIMEOUT', '5.0'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'SYSLOG_DELIVERY_TIMEOUT'! Must be a float.") from _e
+    
+    if syslog_delivery_timeout <= 0:
+        raise InvalidConfigError("'SYSLOG_DELIVERY_TIMEOUT' must be > 0")
+    
+    enable_alert_file:bool = os.getenv('ENABLE_ALERT_FILE', 'false').strip().upper() == "TRUE"
+    
+    alert_filepath:str = os.getenv('ALERT_FILEPATH', 'data/alerts.jsonl').strip()
+    if enable_alert_file and not alert_filepath:
+        raise InvalidConfigError("Missing 'ALERT_FILEPATH', when 'ENABLE_ALERT_FILE' is true!")
+    
+    try:
+        alert_file_delivery_timeout:float = float(os.getenv('ALERT_FILE_DELIVERY_TIMEOUT', '5.0'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'ALERT_FILE_DELIVERY_TIMEOUT'! Must be a float.") from _e
+    
+    if alert_file_delivery_timeout <= 0:
+        raise InvalidConfigError("'ALERT_FILE_DELIVERY_TIMEOUT' must be > 0")
+    
+    try:
+        notifier_queue_size:int = int(os.getenv('NOTIFIER_QUEUE_SIZE', '100'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'NOTIFIER_QUEUE_SIZE'! Must be an integer.") from _e
+    
+    if notifier_queue_size <= 0:
+        raise InvalidConfigError("'NOTIFIER_QUEUE_SIZE' must be > 0")
+    
     
     #
     # Alert
@@ -93,6 +357,49 @@ def load_config() -> Config:
 
     if critical_min_hz_alert_threshold >= critical_max_hz_alert_threshold:
         raise InvalidMaxMinThresholdError("'CRITICAL_MIN_HZ_ALERT_THRESHOLD' needs to be lower than 'CRITICAL_MAX_HZ_ALERT_THRESHOLD'!")
+    
+    try:
+        alert_hysteresis_hz:float = float(os.getenv('ALERT_HYSTERESIS_HZ', '0.010'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'ALERT_HYSTERESIS_HZ'! Must be a float.") from _e
+    
+    if alert_hysteresis_hz < 0:
+        raise InvalidConfigError("'ALERT_HYSTERESIS_HZ' must be >= 0")
+    
+    try:
+        alert_debounce_seconds:float = float(os.getenv('ALERT_DEBOUNCE_SECONDS', '0'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'ALERT_DEBOUNCE_SECONDS'! Must be a float.") from _e
+    
+    if alert_debounce_seconds < 0:
+        raise InvalidConfigError("'ALERT_DEBOUNCE_SECONDS' must be >= 0")
+    
+    alert_state_filepath:str = os.getenv('ALERT_STATE_FILEPATH', 'data/alert-state.json').strip()
+    if not alert_state_filepath:
+        raise InvalidConfigError("Missing 'ALERT_STATE_FILEPATH'!")
+    
+    
+    #
+    # RoCoF
+    #
+    enable_rocof_alerts:bool = os.getenv('ENABLE_ROCOF_ALERTS', 'false').strip().upper() == "TRUE"
+    
+    try:
+        rocof_warning:float = float(os.getenv('ROCOF_WARNING', '0.05'))
+        rocof_critical:float = float(os.getenv('ROCOF_CRITICAL', '0.1'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'ROCOF_WARNING' or 'ROCOF_CRITICAL'! Must be a float.") from _e
+    
+    if not 0 < rocof_warning < rocof_critical:
+        raise InvalidConfigError("'ROCOF_WARNING' must be > 0 and < 'ROCOF_CRITICAL'")
+    
+    try:
+        rocof_window_seconds:float = float(os.getenv('ROCOF_WINDOW_SECONDS', '5.0'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'ROCOF_WINDOW_SECONDS'! Must be a float.") from _e
+    
+    if rocof_window_seconds <= 0:
+        raise InvalidConfigError("'ROCOF_WINDOW_SECONDS' must be > 0")
 
 
     #
@@ -112,17 +419,227 @@ def load_config() -> Config:
     
     api_http_request_cert_verify:bool = os.getenv('API_HTTP_REQUEST_CERT_VERIFY', 'true').strip().upper() == "TRUE"
     
+    api_fallback_urls:tuple[str, ...] = tuple(
+        _url.strip() for _url in os.getenv('API_FALLBACK_URLS', '').split(',') if _url.strip()
+    )
+    
+    api_fetch_mode:str = os.getenv('API_FETCH_MODE', 'hedged').strip().lower()
+    if api_fetch_mode not in ("single", "hedged", "quorum"):
+        raise InvalidConfigError("Got an invalid 'API_FETCH_MODE'! Must be 'single', 'hedged' or 'quorum'.")
+    
+    try:
+        api_hedge_percentile:float = float(os.getenv('API_HEDGE_PERCENTILE', '0.95'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'API_HEDGE_PERCENTILE'! Must be a float.") from _e
+    
+    if not 0 < api_hedge_percentile <= 1:
+        raise InvalidConfigError("'API_HEDGE_PERCENTILE' must be > 0 and <= 1")
+    
+    try:
+        api_hedge_delay:float = float(os.getenv('API_HEDGE_DELAY', '1.0'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'API_HEDGE_DELAY'! Must be a float.") from _e
+    
+    if api_hedge_delay < 0:
+        raise InvalidConfigError("'API_HEDGE_DELAY' must be >= 0")
+    
+    
+    #
+    # Circuit-breaker
+    #
+    try:
+        circuit_breaker_failure_threshold:int = int(os.getenv('CIRCUIT_BREAKER_FAILURE_THRESHOLD', '5'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'CIRCUIT_BREAKER_FAILURE_THRESHOLD'! Must be an integer.") from _e
+    
+    if circuit_breaker_failure_threshold < 0:
+        raise InvalidConfigError("'CIRCUIT_BREAKER_FAILURE_THRESHOLD' must be >= 0")
+    
+    try:
+        circuit_breaker_reset_timeout:float = float(os.getenv('CIRCUIT_BREAKER_RESET_TIMEOUT', '30.0'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'CIRCUIT_BREAKER_RESET_TIMEOUT'! Must be a float.") from _e
+    
+    if circuit_breaker_reset_timeout <= 0:
+        raise InvalidConfigError("'CIRCUIT_BREAKER_RESET_TIMEOUT' must be > 0")
+    
+    enable_adaptive_timeouts:bool = os.getenv('ENABLE_ADAPTIVE_TIMEOUTS', 'true').strip().upper() == "TRUE"
+    
+    
+    #
+    # Daemon
+    #
+    try:
+        daemon_poll_interval:float = float(os.getenv('DAEMON_POLL_INTERVAL', '2.0'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'DAEMON_POLL_INTERVAL'! Must be a float.") from _e
+    
+    if daemon_poll_interval <= 0:
+        raise InvalidConfigError("'DAEMON_POLL_INTERVAL' must be > 0")
+    
+    enable_adaptive_polling:bool = os.getenv('ENABLE_ADAPTIVE_POLLING', 'false').strip().upper() == "TRUE"
+    
+    try:
+        daemon_min_poll_interval:float = float(os.getenv('DAEMON_MIN_POLL_INTERVAL', '1.0'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'DAEMON_MIN_POLL_INTERVAL'! Must be a float.") from _e
+    
+    if daemon_min_poll_interval <= 0:
+        raise InvalidConfigError("'DAEMON_MIN_POLL_INTERVAL' must be > 0")
+    
+    try:
+        daemon_max_poll_interval:float = float(os.getenv('DAEMON_MAX_POLL_INTERVAL', '30.0'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'DAEMON_MAX_POLL_INTERVAL'! Must be a float.") from _e
+    
+    if daemon_max_poll_interval < daemon_min_poll_interval:
+        raise InvalidConfigError("'DAEMON_MAX_POLL_INTERVAL' must be >= 'DAEMON_MIN_POLL_INTERVAL'")
+    
+    try:
+        adaptive_polling_distance_hz:float = float(os.getenv('ADAPTIVE_POLLING_DISTANCE_HZ', '0.05'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'ADAPTIVE_POLLING_DISTANCE_HZ'! Must be a float.") from _e
+    
+    if adaptive_polling_distance_hz <= 0:
+        raise InvalidConfigError("'ADAPTIVE_POLLING_DISTANCE_HZ' must be > 0")
+    
+    
+    #
+    # Metrics
+    #
+    enable_metrics:bool = os.getenv('ENABLE_METRICS', 'false').strip().upper() == "TRUE"
+    
+    metrics_host:str = os.getenv('METRICS_HOST', '127.0.0.1').strip()
+    
+    try:
+        metrics_port:int = int(os.getenv('METRICS_PORT', '9464'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'METRICS_PORT'! Must be an integer.") from _e
+    
+    if not 0 <= metrics_port <= 65535:
+        raise InvalidConfigError("'METRICS_PORT' must be >= 0 and <= 65535")
+    
+    
+    #
+    # Store
+    #
+    enable_store:bool = os.getenv('ENABLE_STORE', 'false').strip().upper() == "TRUE"
+    
+    store_directory:str = os.getenv('STORE_DIRECTORY', 'data').strip()
+    if enable_store and not store_directory:
+        raise InvalidConfigError("Missing 'STORE_DIRECTORY', when 'ENABLE_STORE' is true!")
+    
+    enable_rollups:bool = os.getenv('ENABLE_ROLLUPS', 'true').strip().upper() == "TRUE"
+    
+    
+    #
+    # Daily report
+    #
+    enable_daily_report:bool = os.getenv('ENABLE_DAILY_REPORT', 'false').strip().upper() == "TRUE"
+    
+    daily_report_state_filepath:str = os.getenv('DAILY_REPORT_STATE_FILEPATH', 'data/daily-report.json').strip()
+    if enable_daily_report and not daily_report_state_filepath:
+        raise InvalidConfigError("Missing 'DAILY_REPORT_STATE_FILEPATH', when 'ENABLE_DAILY_REPORT' is true!")
+    
+    
+    #
+    # Shared sample
+    #
+    enable_shared_sample:bool = os.getenv('ENABLE_SHARED_SAMPLE', 'false').strip().upper() == "TRUE"
+    
+    shared_sample_filepath:str = os.getenv('SHARED_SAMPLE_FILEPATH', '/dev/shm/eu-grid-frequency-scraper.sample').strip()
+    if enable_shared_sample and not shared_sample_filepath:
+        raise InvalidConfigError("Missing 'SHARED_SAMPLE_FILEPATH', when 'ENABLE_SHARED_SAMPLE' is true!")
+    
+    
+    #
+    # Spool
+    #
+    enable_spool:bool = os.getenv('ENABLE_SPOOL', 'false').strip().upper() == "TRUE"
+    
+    spool_directory:str = os.getenv('SPOOL_DIRECTORY', 'data/spool').strip()
+    if enable_spool and not spool_directory:
+        raise InvalidConfigError("Missing 'SPOOL_DIRECTORY', when 'ENABLE_SPOOL' is true!")
+    
+    try:
+        spool_sync_interval:float = float(os.getenv('SPOOL_SYNC_INTERVAL', '10.0'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'SPOOL_SYNC_INTERVAL'! Must be a float.") from _e
+    
+    if spool_sync_interval < 0:
+        raise InvalidConfigError("'SPOOL_SYNC_INTERVAL' must be >= 0")
+    
+    try:
+        spool_max_size_mb:int = int(os.getenv('SPOOL_MAX_SIZE_MB', '64'))
+    except ValueError as _e:
+        raise InvalidConfigError("Got an invalid 'SPOOL_MAX_SIZE_MB'! Must be an integer.") from _e
+    
+    if spool_max_size_mb <= 0:
+        raise InvalidConfigError("'SPOOL_MAX_SIZE_MB' must be > 0")
+    
     return Config(
         enable_ntfy=enable_ntfy,
         ntfy_topic_url=ntfy_topic_url,
         ntfy_auth_token=ntfy_auth_token,
         ntfy_http_request_timeout=ntfy_http_request_timeout,
         ntfy_http_request_cert_verify=ntfy_http_request_cert_verify,
+        ntfy_queue_size=ntfy_queue_size,
+        ntfy_max_retries=ntfy_max_retries,
+        ntfy_retry_backoff=ntfy_retry_backoff,
+        ntfy_coalesce_window=ntfy_coalesce_window,
+        ntfy_delivery_timeout=ntfy_delivery_timeout,
+        enable_webhook=enable_webhook,
+        webhook_url=webhook_url,
+        webhook_auth_token=webhook_auth_token,
+        webhook_http_request_timeout=webhook_http_request_timeout,
+        webhook_http_request_cert_verify=webhook_http_request_cert_verify,
+        webhook_delivery_timeout=webhook_delivery_timeout,
+        enable_syslog=enable_syslog,
+        syslog_address=syslog_address,
+        syslog_facility=syslog_facility,
+        syslog_delivery_timeout=syslog_delivery_timeout,
+        enable_alert_file=enable_alert_file,
+        alert_filepath=alert_filepath,
+        alert_file_delivery_timeout=alert_file_delivery_timeout,
+        notifier_queue_size=notifier_queue_size,
         warning_min_hz_alert_threshold=warning_min_hz_alert_threshold,
         warning_max_hz_alert_threshold=warning_max_hz_alert_threshold,
         critical_min_hz_alert_threshold=critical_min_hz_alert_threshold,
         critical_max_hz_alert_threshold=critical_max_hz_alert_threshold,
+        alert_hysteresis_hz=alert_hysteresis_hz,
+        alert_debounce_seconds=alert_debounce_seconds,
+        alert_state_filepath=alert_state_filepath,
+        enable_rocof_alerts=enable_rocof_alerts,
+        rocof_warning=rocof_warning,
+        rocof_critical=rocof_critical,
+        rocof_window_seconds=rocof_window_seconds,
         api_url=api_url,
         api_http_request_timeout=api_http_request_timeout,
-        api_http_request_cert_verify=api_http_request_cert_verify
+        api_http_request_cert_verify=api_http_request_cert_verify,
+        api_fallback_urls=api_fallback_urls,
+        api_fetch_mode=api_fetch_mode,
+        api_hedge_percentile=api_hedge_percentile,
+        api_hedge_delay=api_hedge_delay,
+        circuit_breaker_failure_threshold=circuit_breaker_failure_threshold,
+        circuit_breaker_reset_timeout=circuit_breaker_reset_timeout,
+        enable_adaptive_timeouts=enable_adaptive_timeouts,
+        daemon_poll_interval=daemon_poll_interval,
+        enable_adaptive_polling=enable_adaptive_polling,
+        daemon_min_poll_interval=daemon_min_poll_interval,
+        daemon_max_poll_interval=daemon_max_poll_interval,
+        adaptive_polling_distance_hz=adaptive_polling_distance_hz,
+        enable_metrics=enable_metrics,
+        metrics_host=metrics_host,
+        metrics_port=metrics_port,
+        enable_store=enable_store,
+        store_directory=store_directory,
+        enable_rollups=enable_rollups,
+        enable_daily_report=enable_daily_report,
+        daily_report_state_filepath=daily_report_state_filepath,
+        enable_shared_sample=enable_shared_sample,
+        shared_sample_filepath=shared_sample_filepath,
+        enable_spool=enable_spool,
+        spool_directory=spool_directory,
+        spool_sync_interval=spool_sync_interval,
+        spool_max_size_mb=spool_max_size_mb
     )
\ No newline at end of file
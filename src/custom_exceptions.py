@@ -39,9 +39,79 @@ class APIParseError(APIError):
     def __init__(self, *args) -> None:
         super().__init__(*args)
 
-class NTFYError(Exception):
+class APICircuitOpenError(APIRequestError):
+    """
+    Raise when a request to the API has been rejected, because its circuit-breaker is open.
+    """
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+
+class NotifierError(Exception):
+    """
+    Raise when a notification couldn't be delivered to a channel.
+    """
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+
+class NTFYError(NotifierError):
     """
     Raise when using NTFY failed.
     """
     def __init__(self, *args) -> None:
-        super().__init__(*args)
\ No newline at end of file
+        super().__init__(*args)
+
+class NTFYCircuitOpenError(NTFYError):
+    """
+    Raise when a request to NTFY has been rejected, because its circuit-breaker is open.
+    """
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+
+class WebhookError(NotifierError):
+    """
+    Raise when posting a notification to the webhook failed.
+    """
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+
+class StoreError(Exception):
+    """
+    Raise when reading from or writing to the sample-store failed.
+    """
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+
+class ReportError(Exception):
+    """
+    Raise when loading or checkpointing the daily-report state failed.
+    """
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+
+class ReplayError(Exception):
+    """
+    Raise when reading a recording for the replay failed.
+    """
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+
+class AlertStateError(Exception):
+    """
+    Raise when loading or saving the alert-state failed.
+    """
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+
+class SharedSampleError(Exception):
+    """
+    Raise when publishing or reading the shared latest sample failed.
+    """
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+
+class SpoolError(Exception):
+    """
+    Raise when appending to, reading from or acknowledging records of a spool failed.
+    """
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
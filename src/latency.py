@@ -0,0 +1,95 @@
+import math
+import threading
+
+class LatencyHistogram:
+    """
+    Thread-safe histogram of latencies (in seconds) with logarithmic buckets.
+
+    Bucket `i` covers `[min_latency * growth**(i-1), min_latency * growth**i)`, so quantiles are
+    accurate to `growth` (e.g. 10% with the default) at a constant memory, independent of the number of latencies.
+    """
+    def __init__(self, min_latency:float=0.001, max_latency:float=120.0, growth:float=1.1) -> None:
+        self._min_latency:float = min_latency
+        self._log_growth:float = math.log(growth)
+        self._growth:float = growth
+        self._counts:list[int] = [0] * (math.ceil(math.log(max_latency / min_latency) / self._log_growth) + 2)
+        self._count:int = 0
+        self._sum:float = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    @property
+    def mean(self) -> float|None:
+        return self._sum / self._count if self._count else None
+
+    def add(self, latency:float) -> None:
+        if latency < self._min_latency:
+            index:int = 0
+        else:
+            index = min(int(math.log(latency / self._min_latency) / self._log_growth) + 1, len(self._counts) - 1)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += latency
+
+    def merge(self, other:"LatencyHistogram") -> None:
+        """
+        Add the latencies of another histogram with the same buckets.
+        """
+        if len(other._counts) != len(self._counts) or other._growth != self._growth:
+            raise ValueError("Cannot merge histograms of different buckets")
+        with self._lock:
+            for (_index, _count) in enumerate(other._counts):
+                self._counts[_index] += _count
+            self._count += other._count
+            self._sum += other._sum
+
+    def quantile(self, q:float) -> float|None:
+        """
+        Get the approximate `q`-quantile (0 <= q <= 1) as upper bound of its bucket.
+        """
+        with self._lock:
+            if not self._count:
+                return None
+            rank:int = max(1, math.ceil(q * self._count))
+            seen:int = 0
+            for (_index, _count) in enumerate(self._counts):
+                seen += _count
+                if seen >= rank:
+                    return self._min_latency * self._growth ** _index
+        return None # pragma: no cover - unreachable, ranks are bounded by the count
+
+    def cumulative_counts(self, bounds:tuple[float, ...]) -> list[int]:
+        """
+        Get the number of latencies <= each of the ascending `bounds` (approximated by the upper bounds of the buckets),
+        e.g. for the `le`-buckets of a Prometheus-histogram.
+        """
+        counts:list[int] = []
+        seen:int = 0
+        index:int = 0
+        with self._lock:
+            for _bound in bounds:
+                # Upper bound of bucket `index` is `min_latency * growth**index`
+                while index < len(self._counts) and self._min_latency * self._growth ** index <= _bound * (1 + 1e-9):
+                    seen += self._counts[index]
+                    index += 1
+                counts.append(seen)
+        return counts
+
+    def timeout(self, max_timeout:float, percentile:float=0.99, multiplier:float=3.0,
+                min_timeout:float=0.5, min_count:int=20) -> float:
+        """
+        Get an adaptive request-timeout: `multiplier` times the latency-percentile, within `min_timeout` and `max_timeout`.
+        
+        `max_timeout` is used, until at least `min_count` latencies have been measured.
+        """
+        if self._count < min_count:
+            return max_timeout
+        return min(max(self.quantile(percentile) * multiplier, min_timeout), max_timeout)
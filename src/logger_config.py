@@ -1,25 +1,82 @@
 import sys
+import json
+import copy
+import queue
+import atexit
 import logging
-import requests
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 
-def configure_logger(log_level:str) -> None:
+# Supported values of the `log_format` of `configure_logger()`
+LOG_FORMATS:tuple[str, ...] = ("text", "json")
+TEXT_FORMAT:str = "(%(asctime)s) [%(levelname)s] [%(threadName)s] %(name)s.%(funcName)s: %(message)s"
+TEXT_DATEFMT:str = "%Y-%m-%dT%H:%M:%S%z"
+
+class JSONFormatter(logging.Formatter):
+    """
+    Format every record as compact JSON-line (e.g. for journald or log-shippers) with the keys
+    `ts` (ISO-8601, UTC), `level`, `logger`, `thread`, `func`, `msg` and `exc` (traceback, only if given).
+    """
+    def format(self, record:logging.LogRecord) -> str:
+        entry:dict = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "func": record.funcName,
+            "msg": record.getMessage()
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, separators=(",", ":"), ensure_ascii=False)
+
+class _RecordQueueHandler(QueueHandler):
+    """
+    Queue-handler, that only merges the arguments into the message and renders the traceback on the calling thread.
+
+    Unlike `QueueHandler.prepare()` the record isn't formatted, so the formatter of the listener
+    (e.g. `JSONFormatter`) still gets the message and the traceback separately.
+    """
+    def prepare(self, record:logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def configure_logger(log_level:str, log_format:str = "text", use_queue:bool = False) -> None:
     """
     Configure logging module for this project.
+
+    - `log_format`: `text` (human readable) or `json` (one JSON-object per line)
+    - `use_queue`: Records are only put into a queue by the logging thread, formatting and writing to stdout
+      happens in a background-thread (`QueueListener`), which is flushed at exit.
     """
     # Prevent adding multiple handlers if this function is called multiple times
     if logging.getLogger().handlers:
         return
-    
-    handlers:list[logging.StreamHandler] = [
-        logging.StreamHandler(sys.stdout)
-    ]
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Invalid log-format '{log_format}', must be one of {', '.join(LOG_FORMATS)}")
+
+    handler = logging.StreamHandler(sys.stdout)
+    if log_format == "json":
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(fmt=TEXT_FORMAT, datefmt=TEXT_DATEFMT))
+
+    handlers:list[logging.Handler] = [handler]
+    if use_queue:
+        log_queue:queue.SimpleQueue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        handlers = [_RecordQueueHandler(log_queue)]
 
     logging.basicConfig(
         level=log_level,
-        format="(%(asctime)s) [%(levelname)s] [%(threadName)s] %(name)s.%(funcName)s: %(message)s",
-        handlers=handlers,
-        datefmt="%Y-%m-%dT%H:%M:%S%z"
+        handlers=handlers
     )
-    
-    # Surpress requests TLS-warnings
-    requests.packages.urllib3.disable_warnings()
\ No newline at end of file
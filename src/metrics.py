@@ -0,0 +1,261 @@
+import math
+import time
+import logging
+import threading
+from typing import Callable, Iterable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+#
+from src.api import APIHandler
+from src.ntfy import NTFYHandler
+from src.notifiers import NotificationDispatcher
+from src.utils import timestamp_to_epoch_ms
+from src.latency import LatencyHistogram
+from src.thresholds import ThresholdEngine
+from src.circuit_breaker import CircuitBreaker, CLOSED, HALF_OPEN, OPEN
+
+# Content-type of the Prometheus text exposition format
+CONTENT_TYPE:str = "text/plain; version=0.0.4; charset=utf-8"
+# `le`-buckets (in seconds) of the exported latency-histograms
+LATENCY_BUCKETS:tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape_label_value(value:str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels:dict[str, str]|None) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{_name}="{_escape_label_value(str(_value))}"' for (_name, _value) in labels.items()) + "}"
+
+def _format_value(value:float) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+def metric_family(name:str, metric_type:str, help_text:str,
+                  samples:Iterable[tuple[dict[str, str]|None, float]]) -> list[str]:
+    """
+    Get the lines of a gauge- or counter-family with one sample per label-set.
+    """
+    lines:list[str] = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for (_labels, _value) in samples:
+        lines.append(f"{name}{_format_labels(_labels)} {_format_value(_value)}")
+    return lines
+
+def histogram_family(name:str, help_text:str, histograms:Iterable[tuple[dict[str, str]|None, LatencyHistogram]],
+                     buckets:tuple[float, ...] = LATENCY_BUCKETS) -> list[str]:
+    """
+    Get the lines of a histogram-family from latency-histograms (one per label-set).
+
+    The `le`-buckets are derived from the logarithmic buckets at scrape-time, so observing a latency stays as cheap as before.
+    """
+    lines:list[str] = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for (_labels, _histogram) in histograms:
+        labels:dict[str, str] = dict(_labels or {})
+        for (_bound, _count) in zip(buckets, _histogram.cumulative_counts(buckets)):
+            lines.append(f"{name}_bucket{_format_labels({**labels, 'le': _format_value(_bound)})} {_count}")
+        lines.append(f"{name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {_histogram.count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(_histogram.sum)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {_histogram.count}")
+    return lines
+
+class MetricsExporter:
+    """
+    Lightweight HTTP-endpoint, that serves metrics in the Prometheus/OpenMetrics text format on `/metrics`.
+
+    Metrics aren't updated on the hot path: every registered collector reads the counters and
+    histograms, that the components keep anyway, when the endpoint is scraped.
+    """
+    def __init__(self, host:str, port:int) -> None:
+        self.logger:logging.Logger = logging.getLogger(__class__.__name__)
+        #
+        self._host:str = host
+        self._port:int = port
+        self._collectors:list[Callable[[], list[str]]] = []
+        self._server:ThreadingHTTPServer|None = None
+        self._thread:threading.Thread|None = None
+        self._scrape_count:int = 0
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """
+        Host and (bound) port of the endpoint.
+        """
+        if self._server is not None:
+            return self._server.server_address[:2]
+        return (self._host, self._port)
+
+    @property
+    def scrape_count(self) -> int:
+        return self._scrape_count
+
+    def add_collector(self, collector:Callable[[], list[str]]) -> None:
+        """
+        Register a function, that returns the lines of its metric-families.
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> bytes:
+        _render_start:float = time.perf_counter()
+        lines:list[str] = []
+        for _collector in self._collectors:
+            try:
+                lines.extend(_collector())
+            except Exception:
+                self.logger.exception("Metrics-collector '%s' failed", getattr(_collector, "__name__", _collector))
+        self._scrape_count += 1
+        lines.extend(metric_family(
+            "gridfreq_metrics_render_seconds", "gauge", "Duration of rendering the metrics.",
+            [(None, time.perf_counter() - _render_start)]
+        ))
+        return ("\n".join(lines) + "\n").encode()
+
+    def start(self) -> None:
+        """
+        Serve the metrics in a background-thread.
+
+        Raises `OSError` if the port can't be bound.
+        """
+        exporter:MetricsExporter = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body:bytes = exporter.render()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format:str, *args) -> None:
+                exporter.logger.debug("%s %s", self.address_string(), format % args)
+
+        self._server = ThreadingHTTPServer((self._host, self._port), _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsExporter", daemon=True)
+        self._thread.start()
+        self.logger.info("Serving metrics on 'http://%s:%d/metrics'", self.address[0], self.address[1])
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        (self._server, self._thread) = (None, None)
+
+# Numeric value of the circuit-states
+CIRCUIT_STATE_VALUES:dict[str, int] = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+def api_collector(apihandler:APIHandler, thresholds:ThresholdEngine) -> Callable[[], list[str]]:
+    """
+    Get a collector of the last sample (frequency, severity and age), the request- and parse-latencies
+    and the counters of the API-handler.
+    """
+    def _collect() -> list[str]:
+        lines:list[str] = []
+        if apihandler.last_sample is not None:
+            (frequency, timestamp) = apihandler.last_sample
+            lines += metric_family("gridfreq_frequency_hz", "gauge", "Last grid frequency.", [(None, frequency)])
+            lines += metric_family("gridfreq_severity", "gauge", "Severity of the last grid frequency "
+                                   "(-2=CRITICAL_LOW, -1=WARNING_LOW, 0=NOMINAL, 1=WARNING_HIGH, 2=CRITICAL_HIGH).",
+                                   [(None, thresholds.classify(frequency))])
+            try:
+                age:float = time.time() - timestamp_to_epoch_ms(timestamp) / 1000
+            except ValueError:
+                age = math.nan
+            lines += metric_family("gridfreq_sample_age_seconds", "gauge",
+                                   "Local time minus the timestamp of the last sample.", [(None, age)])
+        
+        endpoints:list = [({"endpoint": _endpoint.url}, _endpoint) for _endpoint in apihandler.endpoints]
+        lines += histogram_family("gridfreq_api_request_seconds", "Latency of the HTTP-requests to the API.",
+                                  [(_labels, _endpoint.latencies) for (_labels, _endpoint) in endpoints])
+        lines += histogram_family("gridfreq_api_parse_seconds", "Latency of parsing the API-responses.",
+                                  [(None, apihandler.parse_latencies)])
+        
+        failed:int = sum(apihandler.error_counts.values())
+        lines += metric_family("gridfreq_api_fetches_total", "counter", "Fetches of API-data by result "
+                               "(success or exception-class).",
+                               [({"result": "success"}, apihandler.fetch_count - failed)]
+                               + [({"result": _name}, _count) for (_name, _count) in sorted(apihandler.error_counts.items())])
+        lines += metric_family("gridfreq_api_requests_total", "counter", "HTTP-requests to the API.",
+                               [(None, apihandler.request_count)])
+        lines += metric_family("gridfreq_api_not_modified_total", "counter", "304-responses of the API.",
+                               [(None, apihandler.not_modified_count)])
+        lines += metric_family("gridfreq_api_duplicates_total", "counter", "API-responses without a new sample.",
+                               [(None, apihandler.duplicate_count)])
+        lines += metric_family("gridfreq_api_stale_total", "counter", "Samples older than the last sample, that have been dropped.",
+                               [(None, apihandler.stale_count)])
+        lines += metric_family("gridfreq_api_hedged_total", "counter", "Hedged requests to fallback-endpoints.",
+                               [(None, apihandler.hedged_count)])
+        return lines
+    return _collect
+
+def ntfy_collector(ntfy:NTFYHandler) -> Callable[[], list[str]]:
+    """
+    Get a collector of the send-latencies, notification-counters and queue-depth of the NTFY-handler.
+    """
+    def _collect() -> list[str]:
+        lines:list[str] = []
+        lines += histogram_family("gridfreq_ntfy_send_seconds", "Latency of the HTTP-requests to NTFY.",
+                                  [(None, ntfy.latencies)])
+        lines += metric_family("gridfreq_ntfy_notifications_total", "counter", "Notifications by result.", [
+            ({"result": "sent"}, ntfy.sent_count),
+            ({"result": "failed"}, ntfy.failed_count),
+            ({"result": "dropped"}, ntfy.dropped_count),
+            ({"result": "coalesced"}, ntfy.coalesced_count)
+        ])
+        lines += metric_family("gridfreq_ntfy_errors_total", "counter", "Failed send-attempts by exception-class.",
+                               [({"exception": _name}, _count) for (_name, _count) in sorted(ntfy.error_counts.items())])
+        lines += metric_family("gridfreq_ntfy_queue_depth", "gauge", "Queued notifications.", [(None, ntfy.queue_depth)])
+        return lines
+    return _collect
+
+def notifier_collector(notifier:NotificationDispatcher) -> Callable[[], list[str]]:
+    """
+    Get a collector of the delivery-latencies and notification-counters of every notification-channel.
+    """
+    def _collect() -> list[str]:
+        lines:list[str] = []
+        lines += histogram_family("gridfreq_notifier_delivery_seconds", "Delivery-latency of the notifications by channel.",
+                                  [({"channel": _channel.name}, _channel.latencies) for _channel in notifier.channels])
+        samples:list = []
+        for _channel in notifier.channels:
+            samples += [
+                ({"channel": _channel.name, "result": "sent"}, _channel.sent_count),
+                ({"channel": _channel.name, "result": "failed"}, _channel.failed_count),
+                ({"channel": _channel.name, "result": "dropped"},
+                 notifier.dropped_counts[_channel.name] + _channel.dropped_count),
+                ({"channel": _channel.name, "result": "spooled"}, _channel.spooled_count),
+                ({"channel": _channel.name, "result": "replayed"}, _channel.replayed_count)
+            ]
+        lines += metric_family("gridfreq_notifier_notifications_total", "counter",
+                               "Notifications by channel and result.", samples)
+        lines += metric_family("gridfreq_notifier_errors_total", "counter",
+                               "Failed deliveries by channel and exception-class (`DeliveryTimeout` if abandoned).",
+                               [({"channel": _channel.name, "exception": _name}, _count) for _channel in notifier.channels
+                                for (_name, _count) in sorted(_channel.error_counts.items())])
+        lines += metric_family("gridfreq_notifier_queue_depth", "gauge", "Queued notifications of all channels.",
+                               [(None, notifier.queue_depth)])
+        lines += metric_family("gridfreq_notifier_spool_pending", "gauge", "Spooled notifications by channel.",
+                               [({"channel": _channel.name}, _channel.spool.pending_count)
+                                for _channel in notifier.channels if _channel.spool is not None])
+        return lines
+    return _collect
+
+def circuit_collector(breakers:list[CircuitBreaker]) -> Callable[[], list[str]]:
+    """
+    Get a collector of the state and counters of the circuit-breakers (labeled by their name).
+    """
+    def _collect() -> list[str]:
+        return (
+            metric_family("gridfreq_circuit_state", "gauge", "State of the circuit-breaker (0=closed, 1=half-open, 2=open).",
+                          [({"name": _breaker.name}, CIRCUIT_STATE_VALUES[_breaker.state]) for _breaker in breakers])
+            + metric_family("gridfreq_circuit_opened_total", "counter", "Number of times the circuit opened.",
+                            [({"name": _breaker.name}, _breaker.open_count) for _breaker in breakers])
+            + metric_family("gridfreq_circuit_short_circuited_total", "counter", "Requests skipped by the open circuit.",
+                            [({"name": _breaker.name}, _breaker.rejected_count) for _breaker in breakers])
+        )
+    return _collect
@@ -0,0 +1,614 @@
+import os
+import abc
+import json
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from logging.handlers import SysLogHandler
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+#
+from src.latency import LatencyHistogram
+from src.spool import Spool, SpoolBatch
+from src.custom_exceptions import NotifierError, SpoolError
+
+# Spooled notifications are replayed as one (bulk) notification of at most this many
+SPOOL_BATCH_SIZE:int = 20
+# Bytes of spooled notifications, that are replayed with one request (the default message-limit of NTFY)
+SPOOL_BATCH_MAX_BYTES:int = 4096
+# Error-name of deliveries, that exceeded the delivery-timeout of their channel
+DELIVERY_TIMEOUT_ERROR:str = "DeliveryTimeout"
+# Rank of the NTFY-priorities, a bulk-notification gets the highest priority of its notifications
+PRIORITY_RANKS:dict[str, int] = {"min": 1, "low": 2, "default": 3, "high": 4, "urgent": 5, "max": 5}
+
+class Notifier(abc.ABC):
+    """
+    Channel, that alerts are delivered to (e.g. NTFY, a webhook, syslog or a file).
+
+    Implementations send one notification in `send_notification()` and raise `NotifierError` (or a subclass),
+    when it couldn't be delivered. `notify()` sends it synchronously and counts the result and delivery-latency,
+    channels with their own queue and background-worker (like `NTFYHandler`) set `has_worker` and override
+    `notify()`, `start()` and `stop()`.
+
+    With a spool, notifications, that couldn't be delivered, are spooled and replayed in order (in bulk)
+    before the next notification is sent, so they survive an outage of the channel or a restart.
+    """
+    # Whether `notify()` only queues the notification for an own background-worker, which never blocks
+    has_worker:bool = False
+
+    def __init__(self, name:str, latencies:LatencyHistogram|None = None) -> None:
+        self.logger:logging.Logger = logging.getLogger(self.__class__.__name__)
+        #
+        self._name:str = name
+        self._latencies:LatencyHistogram = latencies if latencies is not None else LatencyHistogram()
+        self._sent_count:int = 0
+        self._failed_count:int = 0
+        self._error_counts:dict[str, int] = {}
+        self._spool:Spool|None = None
+        self._spool_lock = threading.Lock()
+        self._spooled_count:int = 0
+        self._replayed_count:int = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def latencies(self) -> LatencyHistogram:
+        """
+        Delivery-latencies of the notifications.
+        """
+        return self._latencies
+
+    @property
+    def sent_count(self) -> int:
+        return self._sent_count
+
+    @property
+    def failed_count(self) -> int:
+        return self._failed_count
+
+    @property
+    def dropped_count(self) -> int:
+        return 0
+
+    @property
+    def queue_depth(self) -> int:
+        return 0
+
+    @property
+    def error_counts(self) -> dict[str, int]:
+        """
+        Number of failed send-attempts by exception-class.
+        """
+        return self._error_counts
+
+    @property
+    def spool(self) -> Spool|None:
+        return self._spool
+
+    @property
+    def spooled_count(self) -> int:
+        """
+        Number of notifications, that have been spooled.
+        """
+        return self._spooled_count
+
+    @property
+    def replayed_count(self) -> int:
+        """
+        Number of spooled notifications, that have been delivered.
+        """
+        return self._replayed_count
+
+    @property
+    def spool_pending(self) -> bool:
+        return self._spool is not None and self._spool.pending_count > 0
+
+    def attach_spool(self, spool:Spool) -> None:
+        """
+        Spool the notifications, that couldn't be delivered, and replay them before the next notification.
+        """
+        self._spool = spool
+
+    def start(self) -> None:
+        pass
+
+    def stop(self, timeout:float|None = None) -> bool:
+        """
+        Returns `False` if notifications have been dropped, failed or are still spooled.
+        """
+        return not (self.failed_count or self.dropped_count or self.spool_pending)
+
+    def notify(self, title:str, message:str, priority:str, tags:str, coalesce_key:str|None = None,
+               value:float|None = None, lower_is_extreme:bool = False, unit:str = "Hz") -> bool:
+        """
+        Send the notification and return `False` if it couldn't be delivered.
+        """
+        if self.spool_pending and not self.replay_spool():
+            # Still down: keep the order by spooling it behind the older notifications
+            self.spool_notifications([self.spool_record(title, message, priority, tags)])
+            return False
+        _send_start:float = time.perf_counter()
+        try:
+            self.send_notification(title=title, message=message, priority=priority, tags=tags)
+        except NotifierError as _e:
+            error_name:str = _e.__class__.__name__
+            self._error_counts[error_name] = self._error_counts.get(error_name, 0) + 1
+            self._failed_count += 1
+            self.logger.error("Couldn't send notification '%s' to %s: %s", title, self._name, _e)
+            self.spool_notifications([self.spool_record(title, message, priority, tags)])
+            return False
+        finally:
+            self._latencies.add(time.perf_counter() - _send_start)
+        self._sent_count += 1
+        return True
+
+    @abc.abstractmethod
+    def send_notification(self, title:str, message:str, priority:str, tags:str) -> bool:
+        """
+        Send one notification, raises `NotifierError` if it couldn't be delivered.
+        """
+
+    def record_timeout(self, latency:float) -> None:
+        """
+        Count a delivery, that has been abandoned after `latency` seconds, because it exceeded its deadline.
+        """
+        self._error_counts[DELIVERY_TIMEOUT_ERROR] = self._error_counts.get(DELIVERY_TIMEOUT_ERROR, 0) + 1
+        self._latencies.add(latency)
+
+    def send_batch(self, notifications:list[dict]) -> bool:
+        """
+        Send several (spooled) notifications with one request: as one notification, that lists all of them.
+        """
+        if len(notifications) == 1:
+            return self.send_notification(**{_key: notifications[0][_key] for _key in ("title", "message", "priority", "tags")})
+        return self.send_notification(
+            title=f"{len(notifications)} delayed notifications",
+            message="\n\n".join(f"[{_notification['ts']}] {_notification['title']}\n{_notification['message']}"
+                                for _notification in notifications),
+            priority=max((_notification["priority"] for _notification in notifications),
+                         key=lambda _priority: PRIORITY_RANKS.get(_priority, 0)),
+            tags="inbox_tray"
+        )
+
+    @staticmethod
+    def spool_record(title:str, message:str, priority:str, tags:str) -> dict:
+        return {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "title": title,
+            "message": message,
+            "priority": priority,
+            "tags": tags
+        }
+
+    def spool_notifications(self, notifications:list[dict]) -> bool:
+        """
+        Append undelivered notifications to the spool (with one sync).
+
+        Returns `False` without a spool or if they couldn't be spooled.
+        """
+        if self._spool is None or not notifications:
+            return False
+        try:
+            for _notification in notifications:
+                self._spool.append(json.dumps(_notification, ensure_ascii=False).encode())
+            self._spool.sync()
+        except SpoolError:
+            self.logger.exception("Couldn't spool %d notifications of %s!", len(notifications), self._name)
+            return False
+        self._spooled_count += len(notifications)
+        self.logger.warning("Spooled %d notifications of %s (%d pending)", len(notifications), self._name,
+                            self._spool.pending_count)
+        return True
+
+    def replay_spool(self) -> bool:
+        """
+        Deliver the spooled notifications in order with `send_batch()`, at most `SPOOL_BATCH_SIZE`
+        and `SPOOL_BATCH_MAX_BYTES` (of the spooled JSON) at a time.
+
+        Returns `False` if notifications are still pending, because the channel is still unavailable.
+        """
+        if self._spool is None:
+            return True
+        with self._spool_lock:
+            while self._spool.pending_count:
+                try:
+                    batch:SpoolBatch = self._spool.read(limit=SPOOL_BATCH_SIZE, max_bytes=SPOOL_BATCH_MAX_BYTES)
+                    notifications:list[dict] = [json.loads(_payload) for _payload in batch.payloads]
+                except (SpoolError, ValueError):
+                    self.logger.exception("Couldn't read spool of %s!", self._name)
+                    return False
+                if notifications:
+                    try:
+                        self.send_batch(notifications)
+                    except NotifierError as _e:
+                        self.logger.warning("Couldn't replay %d spooled notifications to %s: %s",
+                                            self._spool.pending_count, self._name, _e)
+                        return False
+                try:
+                    self._spool.ack(batch)
+                except SpoolError:
+                    self.logger.exception("Couldn't acknowledge replayed notifications of %s!", self._name)
+                    return False
+                self._replayed_count += len(notifications)
+                self.logger.info("Replayed %d spooled notifications to %s (%d pending)",
+                                 len(notifications), self._name, self._spool.pending_count)
+        return True
+
+    def test_config(self) -> bool:
+        """
+        Test the configuration by sending a test-notification.
+        """
+        try:
+            self.send_notification(
+                title="Test notification",
+                message="This is just a test notification of the eu-grid-frequency-scraper script.",
+                priority="urgent",
+                tags="warning"
+            )
+            return True
+        except NotifierError:
+            self.logger.exception("Test notification failed!")
+            return False
+
+    def close(self) -> None:
+        if self._spool is not None:
+            self._spool.close()
+
+# Severity of the syslog-messages by NTFY-priority
+SYSLOG_PRIORITIES:dict[str, int] = {
+    "urgent": logging.CRITICAL,
+    "high": logging.WARNING,
+    "default": logging.INFO,
+    "low": logging.INFO
+}
+
+class _RaisingSysLogHandler(SysLogHandler):
+    """
+    Syslog-handler, that raises the error of `emit()` instead of printing it to stderr.
+    """
+    def handleError(self, record:logging.LogRecord) -> None:
+        raise
+
+class SyslogNotifier(Notifier):
+    """
+    Log notifications to the local syslog (e.g. `/dev/log`) or a remote syslog-server (`host:port`, UDP).
+    """
+    def __init__(self, address:str = "/dev/log", facility:str = "user", timeout:float = 5.0) -> None:
+        super().__init__(name="syslog", latencies=LatencyHistogram(min_latency=0.00001))
+        #
+        self._address:str = address
+        try:
+            if ":" in address and not address.startswith("/"):
+                (host, port) = address.rsplit(":", 1)
+                self._handler = _RaisingSysLogHandler(address=(host, int(port)),
+                                                      facility=SysLogHandler.facility_names[facility])
+            else:
+                self._handler = _RaisingSysLogHandler(address=address, facility=SysLogHandler.facility_names[facility])
+        except (OSError, ValueError, KeyError) as _e:
+            raise NotifierError(f"Couldn't open syslog '{address}' (facility '{facility}')") from _e
+        try:
+            # Don't block the thread of the channel, when the syslog-daemon doesn't read (e.g. a stuck journald)
+            self._handler.socket.settimeout(timeout)
+        except (AttributeError, OSError):
+            # Not connected yet, `emit()` connects again
+            pass
+        self._handler.ident = "eu-grid-frequency-scraper: "
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+
+    @property
+    def address(self) -> str:
+        return self._address
+
+    def send_notification(self, title:str, message:str, priority:str, tags:str) -> bool:
+        # Syslog-messages are single lines
+        line:str = f"{title}: {' | '.join(_line.strip('> ') for _line in message.splitlines() if _line.strip())}"
+        record = logging.LogRecord("alerts", SYSLOG_PRIORITIES.get(priority, logging.INFO), __file__, 0, line, None, None)
+        try:
+            self._handler.emit(record)
+        except Exception as _e:
+            # Any error of `emit()`, e.g. an unavailable `/dev/log`
+            raise NotifierError(f"Couldn't log to syslog '{self._address}'") from _e
+        return True
+
+    def send_batch(self, notifications:list[dict]) -> bool:
+        """
+        Log every spooled notification as its own line (with its original timestamp).
+        """
+        for _notification in notifications:
+            self.send_notification(title=f"[{_notification['ts']}] {_notification['title']}",
+                                   message=_notification["message"], priority=_notification["priority"],
+                                   tags=_notification["tags"])
+        return True
+
+    def close(self) -> None:
+        self._handler.close()
+        super().close()
+
+class FileNotifier(Notifier):
+    """
+    Append every notification as JSON-line (`ts`, `title`, `message`, `priority` and `tags`) to a file.
+
+    Every line is flushed and synced, since alerts are rare, but must not be lost on a crash.
+    """
+    def __init__(self, filepath:str) -> None:
+        super().__init__(name="file", latencies=LatencyHistogram(min_latency=0.00001))
+        #
+        self._filepath:str = filepath
+        self._lock = threading.Lock()
+
+    @property
+    def filepath(self) -> str:
+        return self._filepath
+
+    def send_notification(self, title:str, message:str, priority:str, tags:str) -> bool:
+        return self.send_batch([self.spool_record(title, message, priority, tags)])
+
+    def send_batch(self, notifications:list[dict]) -> bool:
+        """
+        Append the notifications (with their original timestamps) with one write and sync.
+        """
+        lines:str = "".join(json.dumps(_notification, ensure_ascii=False) + "\n" for _notification in notifications)
+        try:
+            with self._lock:
+                os.makedirs(os.path.dirname(self._filepath) or ".", exist_ok=True)
+                with open(self._filepath, "a", encoding="utf-8") as _file:
+                    _file.write(lines)
+                    _file.flush()
+                    os.fsync(_file.fileno())
+        except OSError as _e:
+            raise NotifierError(f"Couldn't append notification to '{self._filepath}'") from _e
+        return True
+
+class NotificationDispatcher(Notifier):
+    """
+    Deliver every notification to all channels in parallel, without blocking the caller.
+
+    Every channel has its own bounded queue (`max_pending`), which is drained in order by at most one thread
+    of the pool, so a slow or failing channel neither delays the others nor the sampling.
+    Every delivery of a channel with a delivery-timeout (`delivery_timeouts` by channel-name) runs on another
+    thread of the pool and is abandoned at the deadline: the timeout is counted by the channel and the draining
+    thread moves on. The next notifications of the channel wait (again at most the delivery-timeout) for the
+    abandoned delivery and are spooled (or dropped), while it is still blocked. So every channel has at most
+    one draining thread and one delivery in flight and the pool is bounded by twice the number of channels.
+    When the queue of a channel with a spool is full, the queue is spilled to the spool instead of dropping.
+
+    Channels with their own background-worker (`has_worker`, e.g. NTFY with its coalescing and retries)
+    are not queued a second time: `notify()` hands the notification directly to their queue, which never blocks,
+    and they enforce their delivery-timeout themselves.
+    """
+    def __init__(self, channels:list[Notifier], max_pending:int = 100,
+                 delivery_timeouts:dict[str, float]|None = None) -> None:
+        super().__init__(name="dispatcher")
+        #
+        self._channels:list[Notifier] = list(channels)
+        self._max_pending:int = max(1, max_pending)
+        self._pending:dict[str, deque] = {_channel.name: deque() for _channel in self._channels}
+        self._busy:set[str] = set()
+        self._dropped_counts:dict[str, int] = {_channel.name: 0 for _channel in self._channels}
+        self._delivery_timeouts:dict[str, float] = dict(delivery_timeouts or {})
+        # Deliveries by channel, that exceeded the delivery-timeout and haven't finished yet
+        self._blocked:dict[str, Future] = {}
+        self._executor:ThreadPoolExecutor|None = None
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+    @property
+    def channels(self) -> list[Notifier]:
+        return self._channels
+
+    @property
+    def delivery_timeouts(self) -> dict[str, float]:
+        return self._delivery_timeouts
+
+    def channel(self, name:str) -> Notifier|None:
+        return next((_channel for _channel in self._channels if _channel.name == name), None)
+
+    @property
+    def sent_count(self) -> int:
+        return sum(_channel.sent_count for _channel in self._channels)
+
+    @property
+    def failed_count(self) -> int:
+        return sum(_channel.failed_count for _channel in self._channels)
+
+    @property
+    def dropped_count(self) -> int:
+        return sum(self._dropped_counts.values()) + sum(_channel.dropped_count for _channel in self._channels)
+
+    @property
+    def spooled_count(self) -> int:
+        return sum(_channel.spooled_count for _channel in self._channels)
+
+    @property
+    def dropped_counts(self) -> dict[str, int]:
+        """
+        Number of notifications by channel, that have been dropped, because the queue of the channel was full.
+        """
+        return self._dropped_counts
+
+    @property
+    def queue_depth(self) -> int:
+        with self._lock:
+            pending:int = sum(len(_queue) for _queue in self._pending.values())
+        return pending + sum(_channel.queue_depth for _channel in self._channels)
+
+    def start(self) -> None:
+        """
+        Start the channels and the thread-pool, which delivers the notifications.
+        """
+        if self._executor is not None:
+            return
+        for _channel in self._channels:
+            _channel.start()
+        # A draining thread and a delivery per channel
+        self._executor = ThreadPoolExecutor(max_workers=max(1, 2 * len(self._channels)), thread_name_prefix="Notifier")
+        with self._lock:
+            for _channel in self._channels:
+                if _channel.spool_pending and not _channel.has_worker:
+                    # Replay the notifications, that have been spooled by the last run
+                    self._pending[_channel.name].append(None)
+                    self._busy.add(_channel.name)
+                    self._executor.submit(self._drain, _channel)
+
+    def stop(self, timeout:float|None = None) -> bool:
+        """
+        Deliver all queued notifications and stop the thread-pool and the channels.
+
+        Returns `False` if notifications have been dropped, failed or are still queued (or spooled) after `timeout`.
+        """
+        delivered:bool = True
+        deadline:float|None = time.monotonic() + timeout if timeout is not None else None
+        if self._executor is not None:
+            with self._idle:
+                if not self._idle.wait_for(lambda: not self._busy, timeout):
+                    self.logger.warning("Channels %s didn't finish within %s seconds", ", ".join(sorted(self._busy)), timeout)
+                    delivered = False
+                    for _channel in self._channels:
+                        self._spill(_channel)
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        blocked:list[str] = [_name for (_name, _delivery) in self._blocked.items() if not _delivery.done()]
+        if blocked:
+            self.logger.warning("Deliveries to %s are still blocked after their delivery-timeout", ", ".join(sorted(blocked)))
+            delivered = False
+        for _channel in self._channels:
+            remaining:float|None = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+            delivered = _channel.stop(remaining) and delivered
+        return delivered and not self.dropped_count
+
+    def notify(self, title:str, message:str, priority:str, tags:str, coalesce_key:str|None = None,
+               value:float|None = None, lower_is_extreme:bool = False, unit:str = "Hz") -> bool:
+        """
+        Queue the notification for every channel without blocking.
+
+        Delivers to one channel after the other, if the dispatcher hasn't been started.
+        Returns `False` if it has been dropped by a channel (or couldn't be delivered without the thread-pool).
+        """
+        kwargs:dict = dict(title=title, message=message, priority=priority, tags=tags, coalesce_key=coalesce_key,
+                           value=value, lower_is_extreme=lower_is_extreme, unit=unit)
+        if self._executor is None:
+            return all([_channel.notify(**kwargs) for _channel in self._channels])
+
+        queued:bool = True
+        for _channel in self._channels:
+            if _channel.has_worker:
+                queued = _channel.notify(**kwargs) and queued
+        with self._lock:
+            for _channel in self._channels:
+                if _channel.has_worker:
+                    continue
+                pending:deque = self._pending[_channel.name]
+                if len(pending) >= self._max_pending:
+                    pending.append(kwargs)
+                    if self._spill(_channel):
+                        continue
+                    pending.pop()
+                    self._dropped_counts[_channel.name] += 1
+                    self.logger.error("Queue of %s is full, dropped notification '%s'", _channel.name, title)
+                    queued = False
+                    continue
+                pending.append(kwargs)
+                if _channel.name not in self._busy:
+                    self._busy.add(_channel.name)
+                    self._executor.submit(self._drain, _channel)
+        return queued
+
+    def _spill(self, channel:Notifier) -> bool:
+        """
+        Move the queued notifications of the channel to its spool (the lock must be held).
+
+        Returns `False` if the channel has no spool or they couldn't be spooled.
+        """
+        pending:deque = self._pending[channel.name]
+        notifications:list[dict] = [
+            Notifier.spool_record(_kwargs["title"], _kwargs["message"], _kwargs["priority"], _kwargs["tags"])
+            for _kwargs in pending if _kwargs is not None
+        ]
+        if not notifications or not channel.spool_notifications(notifications):
+            return False
+        pending.clear()
+        return True
+
+    def _drain(self, channel:Notifier) -> None:
+        """
+        Deliver the queued notifications of the channel in order, until its queue is empty.
+
+        `None` is queued to replay the spool of the channel.
+        """
+        pending:deque = self._pending[channel.name]
+        while True:
+            with self._lock:
+                if not pending:
+                    self._busy.discard(channel.name)
+                    self._idle.notify_all()
+                    return
+                kwargs:dict|None = pending.popleft()
+            if channel.name in self._delivery_timeouts:
+                self._deliver_within_timeout(channel, kwargs)
+            else:
+                self._deliver(channel, kwargs)
+
+    def _deliver(self, channel:Notifier, kwargs:dict|None) -> None:
+        try:
+            if kwargs is None:
+                channel.replay_spool()
+            else:
+                channel.notify(**kwargs)
+        except Exception:
+            # Never lose the thread of a channel
+            self.logger.exception("Unexpected error of %s", channel.name)
+
+    def _deliver_within_timeout(self, channel:Notifier, kwargs:dict|None) -> None:
+        """
+        Deliver the notification by another thread of the pool and abandon it, when it exceeds the delivery-timeout
+        of the channel.
+        """
+        timeout:float = self._delivery_timeouts[channel.name]
+        _start:float = time.monotonic()
+        blocked:Future|None = self._blocked.pop(channel.name, None)
+        if blocked is not None:
+            try:
+                blocked.result(timeout)
+            except FutureTimeoutError:
+                # The channel is still blocked by an earlier delivery
+                self._blocked[channel.name] = blocked
+                channel.record_timeout(time.monotonic() - _start)
+                if kwargs is None:
+                    return
+                self.logger.error("%s is still blocked after %s seconds, couldn't deliver notification '%s'",
+                                  channel.name, timeout, kwargs["title"])
+                if not channel.spool_notifications([Notifier.spool_record(kwargs["title"], kwargs["message"],
+                                                                          kwargs["priority"], kwargs["tags"])]):
+                    with self._lock:
+                        self._dropped_counts[channel.name] += 1
+                return
+        delivery:Future = self._executor.submit(self._deliver, channel, kwargs)
+        try:
+            delivery.result(max(0.0, timeout - (time.monotonic() - _start)))
+        except FutureTimeoutError:
+            self._blocked[channel.name] = delivery
+            channel.record_timeout(time.monotonic() - _start)
+            self.logger.error("Delivery of '%s' to %s exceeded the delivery-timeout of %s seconds",
+                              kwargs["title"] if kwargs is not None else "spooled notifications", channel.name, timeout)
+
+    def send_notification(self, title:str, message:str, priority:str, tags:str) -> bool:
+        """
+        Deliver the notification synchronously to every channel, raises `NotifierError` if any channel failed.
+        """
+        if not all([_channel.notify(title=title, message=message, priority=priority, tags=tags)
+                    for _channel in self._channels]):
+            raise NotifierError("Couldn't deliver notification to every channel")
+        return True
+
+    def test_config(self) -> bool:
+        """
+        Send a test-notification to every channel.
+        """
+        return all([_channel.test_config() for _channel in self._channels])
+
+    def close(self) -> None:
+        for _channel in self._channels:
+            _channel.close()
@@ -1,16 +1,83 @@
+import time
+import queue
 import requests
-import logging
+import threading
+from dataclasses import dataclass
 #
-from src.custom_exceptions import NTFYError
+from src.notifiers import Notifier
+from src.circuit_breaker import CircuitBreaker
+from src.tracing import traced
+from src.custom_exceptions import NTFYError, NTFYCircuitOpenError
 
-class NTFYHandler:
-    def __init__(self, topic_url:str, auth_token:str, requests_timeout:int, requests_cert_verify:bool) -> None:
-        self.logger:logging.Logger = logging.getLogger(__class__.__name__)
+@dataclass
+class NTFYMessage:
+    """
+    Queued notification.
+    
+    The first message of a `coalesce_key` is sent right away, the following messages with the same key
+    within the coalesce-window are merged into one summary, which contains their number and the most extreme `value`
+    (in `unit`).
+    """
+    title: str
+    message: str
+    priority: str
+    tags: str
+    coalesce_key: str|None = None
+    value: float|None = None
+    lower_is_extreme: bool = False
+    unit: str = "Hz"
+    count: int = 1
+    
+    def merge(self, other:"NTFYMessage") -> None:
+        if other.value is not None and (self.value is None or \
+                (other.value < self.value if self.lower_is_extreme else other.value > self.value)):
+            (self.message, self.value) = (other.message, other.value)
+        self.count += other.count
+
+class NTFYHandler(Notifier):
+    """
+    Notification-channel of a NTFY-topic with its own background-worker (queue, coalescing and retries).
+
+    With a spool, the worker replays the spooled notifications, when it is idle, right after NTFY is reachable again
+    and otherwise at most every `breaker_reset_timeout` seconds. While notifications are spooled (or the queue is full),
+    new notifications are spooled behind them, so they are delivered in order.
+
+    Under the `NotificationDispatcher`, notifications are put directly into the queue of the worker
+    (see `has_worker`), which coalesces and retries them.
+
+    With a `delivery_timeout`, the worker gives up a notification (and spools it), when the next retry wouldn't
+    finish within this many seconds after the first attempt, so the retries and their backoff can't block it longer.
+    """
+    def __init__(self, topic_url:str, auth_token:str, requests_timeout:int, requests_cert_verify:bool,
+                 session:requests.Session|None = None, queue_size:int = 100, max_retries:int = 3,
+                 retry_backoff:float = 1.0, coalesce_window:float = 0.0, breaker_failure_threshold:int = 5,
+                 breaker_reset_timeout:float = 30.0, adaptive_timeout:bool = True,
+                 delivery_timeout:float|None = None) -> None:
+        super().__init__(name="ntfy")
         #
         self._topic_url:str = topic_url
         self._auth_token:str = auth_token
         self._requests_timeout:int = requests_timeout
         self._requests_cert_verify:bool = requests_cert_verify
+        # Reuse keep-alive connections across requests
+        self._session:requests.Session = session if session is not None else requests.Session()
+        self._breaker:CircuitBreaker = CircuitBreaker(topic_url, breaker_failure_threshold, breaker_reset_timeout)
+        self._adaptive_timeout:bool = adaptive_timeout
+        #
+        # Background-worker
+        self._queue:queue.Queue[NTFYMessage] = queue.Queue(maxsize=queue_size)
+        self._max_retries:int = max_retries
+        self._retry_backoff:float = retry_backoff
+        self._coalesce_window:float = coalesce_window
+        self._delivery_timeout:float|None = delivery_timeout
+        self._worker:threading.Thread|None = None
+        self._stop_event = threading.Event()
+        self._dropped_count:int = 0
+        self._coalesced_count:int = 0
+        # Open coalesce-windows by key: end of the window and the summary of the following messages
+        self._windows:dict[str, tuple[float, NTFYMessage|None]] = {}
+        self._replay_interval:float = breaker_reset_timeout
+        self._next_replay:float = 0.0
     
     @property
     def topic_url(self) -> str:
@@ -28,10 +95,255 @@ class NTFYHandler:
     def requests_cert_verify(self) -> bool:
         return self._requests_cert_verify
     
+    @property
+    def session(self) -> requests.Session:
+        return self._session
+    
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+    
+    @property
+    def has_worker(self) -> bool:
+        return self._worker is not None
+    
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+    
+    @property
+    def dropped_count(self) -> int:
+        return self._dropped_count
+    
+    @property
+    def coalesced_count(self) -> int:
+        return self._coalesced_count
+    
+    def start(self) -> None:
+        """
+        Start the background-worker, which sends queued notifications.
+        """
+        if self._worker is not None:
+            return
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._run_worker, name="NTFYWorker", daemon=True)
+        self._worker.start()
+    
+    def stop(self, timeout:float|None = None) -> bool:
+        """
+        Send all queued notifications and stop the background-worker.
+        
+        Returns `False` if notifications have been dropped, failed or are still queued (or spooled) after `timeout`.
+        """
+        if self._worker is not None:
+            self._stop_event.set()
+            self._worker.join(timeout)
+            if self._worker.is_alive():
+                self.logger.warning("NTFY-worker didn't finish within %s seconds, %d notifications are still queued",
+                                    timeout, self.queue_depth)
+                self._spill()
+                return False
+            self._worker = None
+        return not (self._failed_count or self._dropped_count or self.queue_depth or self.spool_pending)
+    
+    def notify(self, title:str, message:str, priority:str, tags:str, coalesce_key:str|None = None,
+               value:float|None = None, lower_is_extreme:bool = False, unit:str = "Hz") -> bool:
+        """
+        Queue a notification for the background-worker without blocking.
+        
+        Sends the notification synchronously if the worker hasn't been started.
+        Returns `False` if the queue is full and the notification has been dropped.
+        """
+        ntfy_message = NTFYMessage(
+            title=title,
+            message=message,
+            priority=priority,
+            tags=tags,
+            coalesce_key=coalesce_key,
+            value=value,
+            lower_is_extreme=lower_is_extreme,
+            unit=unit
+        )
+        if self._worker is None:
+            if self.spool_pending and not self.replay_spool():
+                self.spool_notifications([self.spool_record(title, message, priority, tags)])
+                return False
+            return self._send_with_retries(ntfy_message)
+        if self.spool_pending:
+            # Keep the order: the worker replays the spool, once NTFY is reachable again
+            return self.spool_notifications([self.spool_record(title, message, priority, tags)])
+        try:
+            self._queue.put_nowait(ntfy_message)
+        except queue.Full:
+            if self._spill(ntfy_message):
+                return True
+            self._dropped_count += 1
+            self.logger.error("NTFY-queue is full, dropped notification '%s' (%d dropped so far)",
+                              title, self._dropped_count)
+            return False
+        return True
+    
+    def _spill(self, ntfy_message:NTFYMessage|None = None) -> bool:
+        """
+        Move the queued notifications (and `ntfy_message`) to the spool, returns `False` without a spool.
+        """
+        if self._spool is None:
+            return False
+        ntfy_messages:list[NTFYMessage] = []
+        while True:
+            try:
+                ntfy_messages.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if ntfy_message is not None:
+            ntfy_messages.append(ntfy_message)
+        return self.spool_notifications([
+            self.spool_record(_ntfy_message.title, _ntfy_message.message, _ntfy_message.priority, _ntfy_message.tags)
+            for _ntfy_message in ntfy_messages
+        ])
+    
+    def _coalesce(self, ntfy_message:NTFYMessage) -> bool:
+        """
+        Merge the message into the summary of the open coalesce-window of its key.
+        
+        Returns `False` if it has to be sent right away, since it's the first message of a new window.
+        """
+        if self._coalesce_window <= 0 or ntfy_message.coalesce_key is None:
+            return False
+        window:tuple[float, NTFYMessage|None]|None = self._windows.get(ntfy_message.coalesce_key)
+        if window is None or time.monotonic() >= window[0]:
+            self._windows[ntfy_message.coalesce_key] = (time.monotonic() + self._coalesce_window, None)
+            return False
+        (deadline, summary) = window
+        if summary is None:
+            summary = ntfy_message
+        else:
+            summary.merge(ntfy_message)
+            self._coalesced_count += 1
+        self._windows[ntfy_message.coalesce_key] = (deadline, summary)
+        return True
+    
+    def _send_summaries(self, force:bool = False) -> None:
+        """
+        Send the summaries of the coalesce-windows, that have ended (or all with `force`).
+        """
+        _now:float = time.monotonic()
+        for (_key, (_deadline, _summary)) in list(self._windows.items()):
+            if not force and _now < _deadline:
+                continue
+            del self._windows[_key]
+            if _summary is None:
+                continue
+            if _summary.count > 1:
+                _summary.title = f"{_summary.title} (x{_summary.count})"
+                _summary.message += (f"\n\n> Coalesced {_summary.count} alerts within {self._coalesce_window} seconds "
+                                     "after the first one")
+                if _summary.value is not None:
+                    _summary.message += f", extreme value={_summary.value}{_summary.unit}"
+            self._deliver(_summary)
+    
+    def _deliver(self, ntfy_message:NTFYMessage) -> None:
+        if not self._try_replay():
+            # Keep the order behind the spooled notifications
+            self.spool_notifications([self.spool_record(ntfy_message.title, ntfy_message.message,
+                                                        ntfy_message.priority, ntfy_message.tags)])
+            return
+        self._send_with_retries(ntfy_message)
+    
+    def _run_worker(self) -> None:
+        while not (self._stop_event.is_set() and self._queue.empty()):
+            # Wake up for the end of the next coalesce-window
+            timeout:float = min([0.1] + [_deadline - time.monotonic() for (_deadline, _summary) in self._windows.values()])
+            try:
+                ntfy_message:NTFYMessage|None = self._queue.get(timeout=max(0.0, timeout))
+            except queue.Empty:
+                ntfy_message = None
+            if ntfy_message is not None and not self._coalesce(ntfy_message):
+                self._deliver(ntfy_message)
+            self._send_summaries(force=self._stop_event.is_set())
+            if ntfy_message is None:
+                self._try_replay()
+        self._send_summaries(force=True)
+        self._try_replay()
+    
+    def _try_replay(self) -> bool:
+        """
+        Replay the spool, unless the last replay failed less than the replay-interval ago.
+        
+        Returns `False` if notifications are still spooled.
+        """
+        if not self.spool_pending:
+            return True
+        if time.monotonic() < self._next_replay:
+            return False
+        if self.replay_spool():
+            return True
+        self._next_replay = time.monotonic() + self._replay_interval
+        return False
+    
+    def _send_with_retries(self, ntfy_message:NTFYMessage) -> bool:
+        """
+        Send a notification with exponential backoff between the retries, within the delivery-timeout.
+        """
+        _start:float = time.monotonic()
+        for _attempt in range(self._max_retries + 1):
+            try:
+                self.send_notification(
+                    title=ntfy_message.title,
+                    message=ntfy_message.message,
+                    priority=ntfy_message.priority,
+                    tags=ntfy_message.tags
+                )
+                self._sent_count += 1
+                # NTFY is reachable (again), replay the spool, once the worker is idle
+                self._next_replay = 0.0
+                return True
+            except NTFYError as _e:
+                error_name:str = _e.__class__.__name__
+                self._error_counts[error_name] = self._error_counts.get(error_name, 0) + 1
+                if isinstance(_e, NTFYCircuitOpenError):
+                    # Retrying within the reset-timeout of the circuit would only delay the worker
+                    break
+                if _attempt == self._max_retries:
+                    break
+                delay:float = self._retry_backoff * (2 ** _attempt)
+                elapsed:float = time.monotonic() - _start
+                if self._delivery_timeout is not None and elapsed + delay + self.request_timeout() > self._delivery_timeout:
+                    self.record_timeout(elapsed)
+                    self.logger.warning("Retrying notification '%s' would exceed the delivery-timeout of %s seconds",
+                                        ntfy_message.title, self._delivery_timeout)
+                    break
+                self.logger.warning("Sending notification '%s' failed, retrying in %s seconds (%d/%d)",
+                                    ntfy_message.title, delay, _attempt + 1, self._max_retries)
+                time.sleep(delay)
+        self._failed_count += 1
+        self.logger.error("Couldn't send notification '%s' after %d attempts (circuit %s)!",
+                          ntfy_message.title, _attempt + 1, self._breaker.state)
+        self._next_replay = time.monotonic() + self._replay_interval
+        self.spool_notifications([self.spool_record(ntfy_message.title, ntfy_message.message,
+                                                    ntfy_message.priority, ntfy_message.tags)])
+        return False
+    
+    def request_timeout(self) -> float:
+        """
+        Get the timeout of the next request, a multiple of the P99-latency with adaptive timeouts
+        (at most the configured request-timeout, which is always used for the probe of a half-open circuit).
+        """
+        if not self._adaptive_timeout or self._breaker.is_probing:
+            return self.requests_timeout
+        return self._latencies.timeout(self.requests_timeout)
+    
+    @traced("ntfy.send")
     def send_notification(self, title:str, message:str, priority:str, tags:str) -> bool:
         """
         Send HTTP-Post request to configured NTFY-topic-URL
+        
+        Raises `NTFYCircuitOpenError` without sending the request, while the circuit is open.
         """
+        if not self._breaker.allow_request():
+            raise NTFYCircuitOpenError(f"Circuit of '{self.topic_url}' is open, skipped request")
+        timeout:float = self.request_timeout()
+        _request_start:float = time.perf_counter()
         try:
             headers:dict = {
                 'Title': title,
@@ -39,33 +351,21 @@ class NTFYHandler:
                 'Tags': tags,
                 'Authorization': f"Bearer {self.auth_token}"
             }
-            response = requests.post(
+            response = self.session.post(
                 url=self.topic_url,
                 data=message,
                 headers=headers,
                 verify=self.requests_cert_verify,
-                timeout=self.requests_timeout
+                timeout=timeout
             )
             response.raise_for_status()
             
-            self.logger.debug(f"Sent out alert to '{self.topic_url}' with HTTP-response-code={response.status_code}")
+            self.logger.debug("Sent out alert to '%s' with HTTP-response-code=%s", self.topic_url, response.status_code)
             
+            self._breaker.record_success()
             return True
         except requests.RequestException as _e:
-            raise NTFYError("NTFY request-error") from _e
-        
-    def test_config(self) -> bool:
-        """
-        Test given NTFY topic-URL and authentication-token.
-        """
-        try:
-            self.send_notification(
-                title="Test notification",
-                message="This is just a test notification of the eu-grid-frequency-scraper script.",
-                priority="urgent",
-                tags="warning"
-            )
-            return True
-        except NTFYError:
-            self.logger.exception("Test notification failed!")
-            return False
\ No newline at end of file
+            self._breaker.record_failure()
+            raise NTFYError(f"NTFY request-error (timeout={timeout:.3f}s)") from _e
+        finally:
+            self._latencies.add(time.perf_counter() - _request_start)
@@ -0,0 +1,67 @@
+import bisect
+import logging
+#
+from src.store import SampleStore, Segment, SegmentStats, BLOCK_SIZE
+
+logger:logging.Logger = logging.getLogger(__name__)
+
+def _merge(result:SegmentStats|None, part:SegmentStats|None) -> SegmentStats|None:
+    if result is None:
+        return part
+    return result.merge(part)
+
+def _query_segment(store:SampleStore, segment:Segment, start_ms:int, end_ms:int) -> SegmentStats|None:
+    """
+    Get the stats of the records of a segment, that only partially overlaps the range.
+
+    The edges of the range are found by binary-searching the sorted timestamp-column.
+    Full blocks between the edges are answered from the block-index, so at most
+    `2 * BLOCK_SIZE` records have to be read.
+    """
+    timestamps:memoryview = segment.timestamps
+    first:int = bisect.bisect_left(timestamps, start_ms)
+    last:int = bisect.bisect_right(timestamps, end_ms)
+    if first >= last:
+        return None
+
+    first_block:int = -(-first // BLOCK_SIZE)
+    last_block:int = last // BLOCK_SIZE
+    if first_block >= last_block:
+        return SegmentStats.from_columns(timestamps[first:last], segment.frequencies[first:last])
+
+    logger.debug("Reading records [%d:%d] and [%d:%d] of segment '%s'",
+                 first, first_block * BLOCK_SIZE, last_block * BLOCK_SIZE, last, segment.filepath.name)
+    result:SegmentStats|None = SegmentStats.from_columns(
+        timestamps[first:first_block * BLOCK_SIZE],
+        segment.frequencies[first:first_block * BLOCK_SIZE]
+    )
+    for _block in store.block_index(segment)[first_block:last_block]:
+        result = _merge(result, _block)
+    return _merge(result, SegmentStats.from_columns(
+        timestamps[last_block * BLOCK_SIZE:last],
+        segment.frequencies[last_block * BLOCK_SIZE:last]
+    ))
+
+def query_range(store:SampleStore, start_ms:int, end_ms:int) -> SegmentStats|None:
+    """
+    Get count, min/max (with timestamps), sum and mean of all samples within `[start_ms, end_ms]`.
+
+    Segments outside the range are skipped and segments completely inside the range are
+    answered from the sparse segment-index. Only the (at most two) segments at the edges
+    of the range are opened.
+
+    Returns `None` if there are no samples within the range.
+    """
+    result:SegmentStats|None = None
+    for _name, _stats in store.segment_index().items():
+        if _stats.last_timestamp_ms < start_ms or _stats.first_timestamp_ms > end_ms:
+            continue
+
+        if start_ms <= _stats.first_timestamp_ms and _stats.last_timestamp_ms <= end_ms:
+            result = _merge(result, _stats)
+            continue
+
+        with store.open_segment(store.directory / _name) as _segment:
+            result = _merge(result, _query_segment(store, _segment, start_ms, end_ms))
+
+    return result
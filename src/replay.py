@@ -0,0 +1,128 @@
+import csv
+import functools
+import logging
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Iterator
+#
+from src.api import parse_api_data
+from src.store import SampleStore, SEGMENT_SUFFIX
+from src.notifiers import Notifier
+from src.custom_exceptions import ReplayError, APIParseError, StoreError
+
+logger:logging.Logger = logging.getLogger(__name__)
+
+XML_PAYLOAD_END:bytes = b"</r>"
+
+@functools.lru_cache(maxsize=8)
+def _day_prefix(day:int) -> str:
+    return datetime.fromtimestamp(day * 86400, tz=timezone.utc).strftime("%Y-%m-%dT")
+
+def format_epoch_ms(timestamp_ms:int) -> str:
+    """
+    Format epoch-milliseconds like the timestamps of the API (e.g. `2026-02-11T15:05:08+00:00`).
+
+    Only the date is formatted by `datetime` (cached per day), which makes this
+    several times faster than `datetime.isoformat()` for replaying millions of samples.
+    """
+    (day, ms_of_day) = divmod(timestamp_ms, 86_400_000)
+    (seconds, milliseconds) = divmod(ms_of_day, 1000)
+    (hours, seconds) = divmod(seconds, 3600)
+    (minutes, seconds) = divmod(seconds, 60)
+    if milliseconds:
+        return f"{_day_prefix(day)}{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}+00:00"
+    return f"{_day_prefix(day)}{hours:02d}:{minutes:02d}:{seconds:02d}+00:00"
+
+def iter_xml_samples(filepath:Path, chunk_size:int=1 << 20) -> Iterator[tuple[float, str]]:
+    """
+    Stream samples of a file with recorded (concatenated) XML-payloads of the API.
+    """
+    pending:bytes = b""
+    with open(filepath, "rb") as _file:
+        while chunk := _file.read(chunk_size):
+            pending += chunk
+            payloads:list[bytes] = pending.split(XML_PAYLOAD_END)
+            pending = payloads.pop()
+            for _payload in payloads:
+                yield parse_api_data(_payload + XML_PAYLOAD_END)
+    if pending.strip():
+        raise APIParseError(f"Incomplete XML-payload at the end of '{filepath}'")
+
+def iter_csv_samples(filepath:Path) -> Iterator[tuple[float, str]]:
+    """
+    Stream samples of a CSV-file with `timestamp,frequency` rows (optional header).
+
+    Timestamps can either be ISO-8601 timestamps or epoch-milliseconds.
+    """
+    with open(filepath, "r", newline="") as _file:
+        for (_line, _row) in enumerate(csv.reader(_file), start=1):
+            if not _row:
+                continue
+            try:
+                (timestamp, frequency) = (_row[0].strip(), float(_row[1]))
+            except (ValueError, IndexError) as _e:
+                if _line == 1:
+                    # Header
+                    continue
+                raise ReplayError(f"Invalid CSV-row {_line} in '{filepath}': {_row}") from _e
+            if timestamp.isdigit():
+                timestamp = format_epoch_ms(int(timestamp))
+            yield (frequency, timestamp)
+
+def iter_store_samples(path:Path) -> Iterator[tuple[float, str]]:
+    """
+    Stream samples of the native sample-store (store-directory or single segment-file).
+    """
+    if path.is_dir():
+        samples:Iterator[tuple[int, float]] = SampleStore(directory=path).iter_samples()
+    else:
+        samples = SampleStore(directory=path.parent).iter_segment_samples(path)
+    for (_timestamp_ms, _frequency) in samples:
+        yield (_frequency, format_epoch_ms(_timestamp_ms))
+
+def iter_replay_samples(path:Path) -> Iterator[tuple[float, str]]:
+    """
+    Stream `(frequency, timestamp)`-samples of a recording, detected by its file-type:
+
+    - store-directory or `.seg`-file -> native sample-store
+    - `.csv`-file -> CSV
+    - everything else -> recorded XML-payloads of the API
+
+    Raises `ReplayError` if the recording couldn't be read.
+    """
+    path = Path(path)
+    try:
+        if path.is_dir() or path.suffix == SEGMENT_SUFFIX:
+            logger.debug("Replaying native sample-store '%s'", path)
+            yield from iter_store_samples(path)
+        elif path.suffix.lower() == ".csv":
+            logger.debug("Replaying CSV-file '%s'", path)
+            yield from iter_csv_samples(path)
+        else:
+            logger.debug("Replaying XML-payloads of '%s'", path)
+            yield from iter_xml_samples(path)
+    except (OSError, StoreError, APIParseError) as _e:
+        raise ReplayError(f"Couldn't replay '{path}'") from _e
+
+class CountingNotifier(Notifier):
+    """
+    Notification-sink, that only counts the notifications by priority instead of sending them.
+    """
+    def __init__(self) -> None:
+        super().__init__(name="counting")
+        self._counts:dict[str, int] = {}
+
+    @property
+    def counts(self) -> dict[str, int]:
+        return self._counts
+
+    @property
+    def total(self) -> int:
+        return sum(self._counts.values())
+
+    def send_notification(self, title:str, message:str, priority:str, tags:str) -> bool:
+        self._counts[priority] = self._counts.get(priority, 0) + 1
+        return True
+
+    def notify(self, title:str, message:str, priority:str, tags:str, **kwargs) -> bool:
+        return self.send_notification(title=title, message=message, priority=priority, tags=tags)
@@ -0,0 +1,245 @@
+import os
+import json
+import math
+import time
+import logging
+from pathlib import Path
+from datetime import datetime, timezone
+#
+from src.custom_exceptions import ReportError
+from src.thresholds import ThresholdEngine, CRITICAL_LOW, WARNING_LOW, NOMINAL, WARNING_HIGH, CRITICAL_HIGH
+
+class QuantileSketch:
+    """
+    Mergeable histogram-sketch for approximate quantiles of frequencies.
+
+    Frequencies are counted in fixed bins of `resolution` Hz (sparse), so the memory
+    is bounded by the number of bins within the measured range, independent of the number of samples.
+    """
+    def __init__(self, resolution:float=0.001) -> None:
+        self._resolution:float = resolution
+        self._bins:dict[int, int] = {}
+        self._count:int = 0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def add(self, value:float) -> None:
+        key:int = round(value / self._resolution)
+        self._bins[key] = self._bins.get(key, 0) + 1
+        self._count += 1
+
+    def merge(self, other:"QuantileSketch") -> None:
+        if other._resolution != self._resolution:
+            raise ValueError("Cannot merge sketches of different resolutions")
+        for (_key, _count) in other._bins.items():
+            self._bins[_key] = self._bins.get(_key, 0) + _count
+        self._count += other._count
+
+    def quantile(self, q:float) -> float|None:
+        """
+        Get the approximate `q`-quantile (0 <= q <= 1, nearest-rank), accurate to `resolution`.
+        """
+        if not self._count:
+            return None
+        rank:int = max(1, math.ceil(q * self._count))
+        seen:int = 0
+        for _key in sorted(self._bins):
+            seen += self._bins[_key]
+            if seen >= rank:
+                return round(_key * self._resolution, 6)
+        return round(max(self._bins) * self._resolution, 6)
+
+    def to_dict(self) -> dict:
+        return {"resolution": self._resolution, "bins": self._bins}
+
+    @classmethod
+    def from_dict(cls, data:dict) -> "QuantileSketch":
+        sketch = cls(resolution=data["resolution"])
+        sketch._bins = {int(_key): _count for (_key, _count) in data["bins"].items()}
+        sketch._count = sum(sketch._bins.values())
+        return sketch
+
+class DailyReport:
+    """
+    Streaming end-of-day aggregation of the sampled frequencies.
+
+    Tracks the min/max (with timestamps), the number of WARNING/CRITICAL excursions,
+    the time spent outside of each band and a quantile-sketch for the current UTC-day.
+    The state is periodically checkpointed to disk, so it survives restarts.
+
+    A day is finished by the first sample of the next day or, when no sample arrives, by `roll_over()` on the clock.
+    """
+    def __init__(self, state_filepath:Path, thresholds:ThresholdEngine,
+                 max_gap_ms:int=300_000, checkpoint_interval:float=60.0) -> None:
+        self.logger:logging.Logger = logging.getLogger(__class__.__name__)
+        #
+        self._state_filepath:Path = Path(state_filepath)
+        self._thresholds:ThresholdEngine = thresholds
+        self._max_gap_ms:int = max_gap_ms
+        self._checkpoint_interval:float = checkpoint_interval
+        self._last_checkpoint:float = time.monotonic()
+        self._state:dict|None = None
+        self._sketch:QuantileSketch = QuantileSketch()
+        self._load()
+
+    @property
+    def state_filepath(self) -> Path:
+        return self._state_filepath
+
+    @property
+    def day(self) -> str|None:
+        return self._state["day"] if self._state is not None else None
+
+    def _load(self) -> None:
+        try:
+            with open(self._state_filepath, "r") as _file:
+                data:dict = json.load(_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError) as _e:
+            raise ReportError(f"Couldn't load daily-report state '{self._state_filepath}'") from _e
+        self._sketch = QuantileSketch.from_dict(data.pop("sketch"))
+        self._state = data
+        self.logger.debug("Restored daily-report of %s with %d samples", self.day, self._state["count"])
+
+    def checkpoint(self) -> None:
+        """
+        Write the current state to disk (atomically).
+        """
+        self._last_checkpoint = time.monotonic()
+        if self._state is None:
+            return
+        tmp_filepath:Path = self._state_filepath.with_name(self._state_filepath.name + ".tmp")
+        try:
+            self._state_filepath.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_filepath, "w") as _file:
+                json.dump({**self._state, "sketch": self._sketch.to_dict()}, _file)
+            os.replace(tmp_filepath, self._state_filepath)
+        except OSError as _e:
+            raise ReportError(f"Couldn't write daily-report state '{self._state_filepath}'") from _e
+
+    def roll_over(self, now_ms:int, grace_ms:int=60_000) -> dict|None:
+        """
+        Finish the reported day, when the UTC-day of `now_ms` (minus `grace_ms` for late samples) has begun,
+        and checkpoint the empty report of the new day.
+
+        Returns the summary of the finished day, if it has any samples.
+        """
+        day:str = datetime.fromtimestamp((now_ms - grace_ms) / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+        if self._state is None or self._state["day"] >= day:
+            return None
+        finished:dict|None = self.summary() if self._state["count"] else None
+        self._state = self._new_state(day)
+        self._sketch = QuantileSketch()
+        self.checkpoint()
+        return finished
+
+    def _new_state(self, day:str) -> dict:
+        return {
+            "day": day,
+            "count": 0,
+            "min": None, "min_timestamp_ms": None,
+            "max": None, "max_timestamp_ms": None,
+            "warning_excursions": 0,
+            "critical_excursions": 0,
+            "below_critical_min_ms": 0,
+            "below_warning_min_ms": 0,
+            "above_warning_max_ms": 0,
+            "above_critical_max_ms": 0,
+            "last_sample": None
+        }
+
+    def add(self, timestamp_ms:int, frequency:float) -> dict|None:
+        """
+        Add a sample to the report of its UTC-day.
+
+        Returns the summary of the previous day, when the sample belongs to a new day.
+        """
+        day:str = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+        finished:dict|None = None
+        if self._state is not None and self._state["day"] != day:
+            if day < self._state["day"]:
+                self.logger.debug("Ignored sample of %s, while reporting %s", day, self._state["day"])
+                return None
+            finished = self.summary()
+            self._state = None
+        if self._state is None:
+            self._state = self._new_state(day)
+            self._sketch = QuantileSketch()
+
+        state:dict = self._state
+        last_sample:list|None = state["last_sample"]
+        previous_severity:int = NOMINAL
+        if last_sample is not None:
+            (last_timestamp_ms, last_frequency) = last_sample
+            held_ms:int = min(max(timestamp_ms - last_timestamp_ms, 0), self._max_gap_ms)
+            previous_severity = self._thresholds.classify(last_frequency)
+            if previous_severity == CRITICAL_LOW:
+                state["below_critical_min_ms"] += held_ms
+            if previous_severity <= WARNING_LOW:
+                state["below_warning_min_ms"] += held_ms
+            if previous_severity >= WARNING_HIGH:
+                state["above_warning_max_ms"] += held_ms
+            if previous_severity == CRITICAL_HIGH:
+                state["above_critical_max_ms"] += held_ms
+
+        severity:int = self._thresholds.classify(frequency)
+        if severity != previous_severity and severity != NOMINAL:
+            # A new excursion starts when leaving the nominal band, switching sides or escalating
+            switched_sides:bool = severity * previous_severity < 0
+            if severity in (CRITICAL_LOW, CRITICAL_HIGH) and (abs(previous_severity) < CRITICAL_HIGH or switched_sides):
+                state["critical_excursions"] += 1
+            if previous_severity == NOMINAL or switched_sides:
+                state["warning_excursions"] += 1
+
+        if state["min"] is None or frequency < state["min"]:
+            (state["min"], state["min_timestamp_ms"]) = (frequency, timestamp_ms)
+        if state["max"] is None or frequency > state["max"]:
+            (state["max"], state["max_timestamp_ms"]) = (frequency, timestamp_ms)
+        state["count"] += 1
+        state["last_sample"] = [timestamp_ms, frequency]
+        self._sketch.add(frequency)
+
+        if time.monotonic() - self._last_checkpoint >= self._checkpoint_interval:
+            self.checkpoint()
+
+        return finished
+
+    def summary(self) -> dict|None:
+        """
+        Get the summary of the current day.
+        """
+        if self._state is None:
+            return None
+        summary:dict = {_key: _value for (_key, _value) in self._state.items() if _key != "last_sample"}
+        summary.update({
+            "p1": self._sketch.quantile(0.01),
+            "p50": self._sketch.quantile(0.50),
+            "p99": self._sketch.quantile(0.99)
+        })
+        return summary
+
+    @staticmethod
+    def format_summary(summary:dict) -> tuple[str, str]:
+        """
+        Get the title and message of a notification about the given summary.
+        """
+        def _time(timestamp_ms:int) -> str:
+            return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).strftime("%H:%M:%S")
+
+        title:str = f"Daily Grid Frequency Report - {summary['day']}"
+        message:str = (
+            f"Samples={summary['count']}\n\n"
+            f"> Lowest Frequency={summary['min']}Hz ({_time(summary['min_timestamp_ms'])} UTC)\n"
+            f"> Highest Frequency={summary['max']}Hz ({_time(summary['max_timestamp_ms'])} UTC)\n"
+            f"> P1={summary['p1']}Hz | P50={summary['p50']}Hz | P99={summary['p99']}Hz\n\n"
+            f"> WARNING excursions={summary['warning_excursions']}\n"
+            f"> CRITICAL excursions={summary['critical_excursions']}\n"
+            f"> Time below WARNING MIN={summary['below_warning_min_ms'] / 1000:.0f}s "
+            f"(CRITICAL MIN={summary['below_critical_min_ms'] / 1000:.0f}s)\n"
+            f"> Time above WARNING MAX={summary['above_warning_max_ms'] / 1000:.0f}s "
+            f"(CRITICAL MAX={summary['above_critical_max_ms'] / 1000:.0f}s)"
+        )
+        return (title, message)
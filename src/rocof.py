@@ -0,0 +1,122 @@
+from array import array
+#
+from src.thresholds import ThresholdEngine
+
+class RocofWindow:
+    """
+    Sliding time-window of recent samples in a fixed-size ring buffer, with the rate of change
+    of frequency (RoCoF, in Hz/s) and the mean and variance of the frequencies in the window.
+
+    The RoCoF is the least-squares slope of the frequencies over their timestamps, so irregular
+    sample spacing is handled. All statistics are kept as running sums, which makes every sample O(1)
+    (amortized, the sums are recomputed every `capacity` samples to limit rounding errors).
+    Samples older than `window_ms` before the newest one, or beyond the `capacity`, are dropped.
+    """
+    def __init__(self, window_ms:int=5000, capacity:int=64) -> None:
+        if window_ms <= 0 or capacity < 2:
+            raise ValueError("window_ms must be > 0 and capacity >= 2")
+        self._window_ms:int = window_ms
+        self._capacity:int = capacity
+        self._timestamps:array = array("q", [0]) * capacity
+        self._frequencies:array = array("d", [0.0]) * capacity
+        self._head:int = 0
+        self._size:int = 0
+        self._pushes:int = 0
+        # Running sums of the time (seconds since `_t0`) and frequency (relative to `_f0`)
+        self._t0:int = 0
+        self._f0:float = 0.0
+        self._sum_t:float = 0.0
+        self._sum_f:float = 0.0
+        self._sum_tt:float = 0.0
+        self._sum_tf:float = 0.0
+        self._sum_ff:float = 0.0
+
+    @property
+    def window_ms(self) -> int:
+        return self._window_ms
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _accumulate(self, timestamp_ms:int, frequency:float, sign:int) -> None:
+        t:float = (timestamp_ms - self._t0) / 1000
+        f:float = frequency - self._f0
+        self._sum_t += sign * t
+        self._sum_f += sign * f
+        self._sum_tt += sign * t * t
+        self._sum_tf += sign * t * f
+        self._sum_ff += sign * f * f
+
+    def _rebase(self) -> None:
+        """
+        Recompute the running sums relative to the oldest sample.
+        """
+        (self._sum_t, self._sum_f, self._sum_tt, self._sum_tf, self._sum_ff) = (0.0, 0.0, 0.0, 0.0, 0.0)
+        self._pushes = 0
+        if not self._size:
+            return
+        (self._t0, self._f0) = (self._timestamps[self._head], self._frequencies[self._head])
+        for _offset in range(self._size):
+            _index:int = (self._head + _offset) % self._capacity
+            self._accumulate(self._timestamps[_index], self._frequencies[_index], 1)
+
+    def push(self, timestamp_ms:int, frequency:float) -> bool:
+        """
+        Add a sample. Returns `False` if it's not newer than the last one and has been ignored.
+        """
+        if self._size:
+            last:int = (self._head + self._size - 1) % self._capacity
+            if timestamp_ms <= self._timestamps[last]:
+                return False
+        # Evict samples, that fell out of the window
+        while self._size and (timestamp_ms - self._timestamps[self._head] > self._window_ms
+                              or self._size == self._capacity):
+            self._accumulate(self._timestamps[self._head], self._frequencies[self._head], -1)
+            self._head = (self._head + 1) % self._capacity
+            self._size -= 1
+        if not self._size:
+            (self._t0, self._f0) = (timestamp_ms, frequency)
+            self._rebase()
+
+        _index:int = (self._head + self._size) % self._capacity
+        (self._timestamps[_index], self._frequencies[_index]) = (timestamp_ms, frequency)
+        self._size += 1
+        self._accumulate(timestamp_ms, frequency, 1)
+        self._pushes += 1
+        if self._pushes >= self._capacity:
+            self._rebase()
+        return True
+
+    @property
+    def mean(self) -> float|None:
+        if not self._size:
+            return None
+        return self._f0 + self._sum_f / self._size
+
+    @property
+    def variance(self) -> float|None:
+        """
+        Population-variance of the frequencies in the window.
+        """
+        if not self._size:
+            return None
+        return max(self._sum_ff / self._size - (self._sum_f / self._size) ** 2, 0.0)
+
+    @property
+    def rocof(self) -> float|None:
+        """
+        Rate of change of frequency in Hz/s (least-squares slope), `None` with less than two samples.
+        """
+        n:int = self._size
+        if n < 2:
+            return None
+        denominator:float = n * self._sum_tt - self._sum_t ** 2
+        if denominator <= 0:
+            return None
+        return (n * self._sum_tf - self._sum_t * self._sum_f) / denominator
+
+def rocof_threshold_engine(warning:float, critical:float) -> ThresholdEngine:
+    """
+    Get a threshold-engine, that classifies RoCoF-values (falling is LOW, rising is HIGH).
+    """
+    return ThresholdEngine(critical_min=-critical, warning_min=-warning, warning_max=warning, critical_max=critical)
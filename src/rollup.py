@@ -0,0 +1,257 @@
+import json
+import mmap
+import bisect
+import struct
+import logging
+from pathlib import Path
+from typing import Iterable, NamedTuple
+#
+from src.custom_exceptions import StoreError
+from src.thresholds import ThresholdEngine, CRITICAL_LOW, WARNING_LOW, WARNING_HIGH, CRITICAL_HIGH
+
+# Bucket-widths in seconds, from the finest to the coarsest resolution
+RESOLUTIONS:tuple[int, ...] = (1, 60, 3600, 86400)
+# start-ms, count, min, max, sum, sum of squares and milliseconds below/above each threshold
+BUCKET_STRUCT:struct.Struct = struct.Struct("<qqddddqqqq")
+BUCKET_SLOTS:int = BUCKET_STRUCT.size // 8
+STATE_FILENAME:str = "rollup-state.json"
+
+def rollup_filename(resolution:int) -> str:
+    return f"rollup-{resolution}s.bin"
+
+class RollupBucket(NamedTuple):
+    """
+    Aggregate of all samples within `[start_ms, start_ms + resolution)`.
+
+    The time below/above a threshold is the time the frequency of a sample has been held
+    until the next sample (capped at the max. gap) and is attributed to the bucket of that sample.
+    """
+    start_ms: int
+    count: int
+    min_frequency: float
+    max_frequency: float
+    sum_frequency: float
+    sum_squares: float
+    below_critical_min_ms: int
+    below_warning_min_ms: int
+    above_warning_max_ms: int
+    above_critical_max_ms: int
+
+    def merge(self, other:"RollupBucket") -> "RollupBucket":
+        return RollupBucket(
+            start_ms=min(self.start_ms, other.start_ms),
+            count=self.count + other.count,
+            min_frequency=min(self.min_frequency, other.min_frequency),
+            max_frequency=max(self.max_frequency, other.max_frequency),
+            sum_frequency=self.sum_frequency + other.sum_frequency,
+            sum_squares=self.sum_squares + other.sum_squares,
+            below_critical_min_ms=self.below_critical_min_ms + other.below_critical_min_ms,
+            below_warning_min_ms=self.below_warning_min_ms + other.below_warning_min_ms,
+            above_warning_max_ms=self.above_warning_max_ms + other.above_warning_max_ms,
+            above_critical_max_ms=self.above_critical_max_ms + other.above_critical_max_ms
+        )
+
+    @property
+    def mean_frequency(self) -> float:
+        return self.sum_frequency / self.count
+
+    @property
+    def stddev_frequency(self) -> float:
+        variance:float = self.sum_squares / self.count - self.mean_frequency ** 2
+        return max(variance, 0.0) ** 0.5
+
+class RollupStore:
+    """
+    Incrementally maintained rollups (1 s / 1 min / 1 h / 1 day) of the stored samples.
+
+    Closed buckets are appended as fixed-width records to one file per resolution.
+    The open buckets and the last sample are kept in a small state-file, so the
+    rollups can be continued by the next (one-shot) run.
+    """
+    def __init__(self, directory:Path, thresholds:ThresholdEngine,
+                 max_gap_ms:int=300_000, flush_size:int=60) -> None:
+        self.logger:logging.Logger = logging.getLogger(__class__.__name__)
+        #
+        self._directory:Path = Path(directory)
+        self._thresholds:ThresholdEngine = thresholds
+        self._max_gap_ms:int = max_gap_ms
+        self._flush_size:int = max(1, flush_size)
+        self._open:dict[int, list] = {}
+        self._buffers:dict[int, bytearray] = {_resolution: bytearray() for _resolution in RESOLUTIONS}
+        self._last_sample:tuple[int, float]|None = None
+
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+        except OSError as _e:
+            raise StoreError(f"Couldn't create rollup-directory '{self._directory}'") from _e
+        self._load_state()
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    def _load_state(self) -> None:
+        try:
+            with open(self._directory / STATE_FILENAME, "r") as _file:
+                state:dict = json.load(_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            self.logger.warning("Ignoring invalid rollup-state, rollups should be rebuilt.")
+            return
+        self._open = {int(_resolution): _bucket for (_resolution, _bucket) in state["open"].items()}
+        self._last_sample = tuple(state["last_sample"]) if state["last_sample"] else None
+
+    def _save_state(self) -> None:
+        try:
+            with open(self._directory / STATE_FILENAME, "w") as _file:
+                json.dump({"open": self._open, "last_sample": self._last_sample}, _file)
+        except OSError as _e:
+            raise StoreError("Couldn't write rollup-state") from _e
+
+    def add(self, timestamp_ms:int, frequency:float) -> None:
+        """
+        Update the buckets of every resolution with a new sample.
+
+        Samples must be added in chronological order, like they are appended to the `SampleStore`.
+        """
+        held_ms:int = 0
+        held:tuple[int, int, int, int] = (0, 0, 0, 0)
+        if self._last_sample is not None:
+            (last_timestamp_ms, last_frequency) = self._last_sample
+            held_ms = min(timestamp_ms - last_timestamp_ms, self._max_gap_ms)
+            severity:int = self._thresholds.classify(last_frequency)
+            held = (
+                held_ms if severity == CRITICAL_LOW else 0,
+                held_ms if severity <= WARNING_LOW else 0,
+                held_ms if severity >= WARNING_HIGH else 0,
+                held_ms if severity == CRITICAL_HIGH else 0
+            )
+
+        for _resolution in RESOLUTIONS:
+            bucket:list|None = self._open.get(_resolution)
+            if bucket is not None and held_ms > 0:
+                # The time since the last sample belongs to the bucket of the last sample
+                bucket[6] += held[0]
+                bucket[7] += held[1]
+                bucket[8] += held[2]
+                bucket[9] += held[3]
+
+            start_ms:int = timestamp_ms - timestamp_ms % (_resolution * 1000)
+            if bucket is None or bucket[0] != start_ms:
+                if bucket is not None:
+                    self._buffers[_resolution] += BUCKET_STRUCT.pack(*bucket)
+                self._open[_resolution] = [start_ms, 1, frequency, frequency, frequency, frequency * frequency, 0, 0, 0, 0]
+                continue
+
+            bucket[1] += 1
+            if frequency < bucket[2]:
+                bucket[2] = frequency
+            if frequency > bucket[3]:
+                bucket[3] = frequency
+            bucket[4] += frequency
+            bucket[5] += frequency * frequency
+
+        self._last_sample = (timestamp_ms, frequency)
+        if len(self._buffers[RESOLUTIONS[0]]) >= self._flush_size * BUCKET_STRUCT.size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Append closed buckets to their rollup-files and save the open buckets.
+        """
+        for (_resolution, _buffer) in self._buffers.items():
+            if not _buffer:
+                continue
+            filepath:Path = self._directory / rollup_filename(_resolution)
+            try:
+                with open(filepath, "ab") as _file:
+                    _file.write(_buffer)
+            except OSError as _e:
+                raise StoreError(f"Couldn't write to rollup-file '{filepath}'") from _e
+            _buffer.clear()
+        self._save_state()
+
+    def close(self) -> None:
+        self.flush()
+
+    def rebuild(self, samples:Iterable[tuple[int, float]]) -> int:
+        """
+        Rebuild all rollups from the given (raw) samples.
+
+        Returns the number of processed samples.
+        """
+        for _resolution in RESOLUTIONS:
+            (self._directory / rollup_filename(_resolution)).unlink(missing_ok=True)
+            self._buffers[_resolution].clear()
+        self._open = {}
+        self._last_sample = None
+
+        count:int = 0
+        for (_timestamp_ms, _frequency) in samples:
+            self.add(_timestamp_ms, _frequency)
+            count += 1
+        self.flush()
+        return count
+
+    def _read_buckets(self, resolution:int, start_ms:int, end_ms:int) -> RollupBucket|None:
+        """
+        Merge all buckets of the given resolution starting within `[start_ms, end_ms)`.
+        """
+        result:RollupBucket|None = None
+        filepath:Path = self._directory / rollup_filename(resolution)
+        size:int = filepath.stat().st_size if filepath.exists() else 0
+        length:int = size // BUCKET_STRUCT.size
+        if length:
+            with open(filepath, "rb") as _file, \
+                    mmap.mmap(_file.fileno(), 0, access=mmap.ACCESS_READ) as _mmap:
+                view:memoryview = memoryview(_mmap)[:length * BUCKET_STRUCT.size]
+                starts:memoryview = view.cast("q")[0::BUCKET_SLOTS]
+                first:int = bisect.bisect_left(starts, start_ms)
+                last:int = bisect.bisect_left(starts, end_ms)
+                for _bucket in BUCKET_STRUCT.iter_unpack(view[first * BUCKET_STRUCT.size:last * BUCKET_STRUCT.size]):
+                    bucket = RollupBucket._make(_bucket)
+                    result = bucket if result is None else result.merge(bucket)
+                starts.release()
+                view.release()
+
+        # Closed buckets, that haven't been flushed yet, and the open bucket aren't in the rollup-file
+        for _bucket in BUCKET_STRUCT.iter_unpack(self._buffers[resolution]):
+            if start_ms <= _bucket[0] < end_ms:
+                bucket = RollupBucket._make(_bucket)
+                result = bucket if result is None else result.merge(bucket)
+        open_bucket:list|None = self._open.get(resolution)
+        if open_bucket is not None and start_ms <= open_bucket[0] < end_ms:
+            bucket = RollupBucket._make(open_bucket)
+            result = bucket if result is None else result.merge(bucket)
+        return result
+
+    def aggregate(self, start_ms:int, end_ms:int) -> RollupBucket|None:
+        """
+        Get the aggregate of all samples within `[start_ms, end_ms)`, using the coarsest
+        resolution that fits into every part of the range.
+
+        The range is widened to whole seconds. Returns `None` if there are no samples.
+        """
+        start_ms -= start_ms % 1000
+        end_ms += -end_ms % 1000
+        return self._aggregate(start_ms, end_ms, len(RESOLUTIONS) - 1)
+
+    def _aggregate(self, start_ms:int, end_ms:int, level:int) -> RollupBucket|None:
+        if start_ms >= end_ms or level < 0:
+            return None
+        width_ms:int = RESOLUTIONS[level] * 1000
+        inner_start_ms:int = start_ms + (-start_ms % width_ms)
+        inner_end_ms:int = end_ms - end_ms % width_ms
+        if inner_start_ms >= inner_end_ms:
+            return self._aggregate(start_ms, end_ms, level - 1)
+
+        result:RollupBucket|None = None
+        for _part in (
+            self._aggregate(start_ms, inner_start_ms, level - 1),
+            self._read_buckets(RESOLUTIONS[level], inner_start_ms, inner_end_ms),
+            self._aggregate(inner_end_ms, end_ms, level - 1)
+        ):
+            if _part is not None:
+                result = _part if result is None else result.merge(_part)
+        return result
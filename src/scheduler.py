@@ -0,0 +1,77 @@
+import logging
+from collections import deque
+#
+from src.thresholds import ThresholdEngine
+
+class AdaptivePollScheduler:
+    """
+    Pick the delay until the next poll from the distance of the last frequency to the nearest threshold
+    and the recent rate of change, within `[min_interval, max_interval]`.
+
+    - Distance: the delay grows linearly from `min_interval` at a threshold up to `max_interval`
+      at a distance of `distance_scale` Hz (or more).
+    - Rate of change: the delay is at most the time, the frequency needs to cover half of the
+      distance to the nearest threshold at its recent rate (the steepest of the last `window` samples).
+
+    Rates are measured by the sample-timestamps, so repeated samples of the API don't count.
+    """
+    def __init__(self, thresholds:ThresholdEngine, min_interval:float, max_interval:float,
+                 distance_scale:float=0.05, window:int=5) -> None:
+        self.logger:logging.Logger = logging.getLogger(__class__.__name__)
+        #
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("Poll-intervals must be 0 < min_interval <= max_interval")
+        self._thresholds:ThresholdEngine = thresholds
+        self._min_interval:float = min_interval
+        self._max_interval:float = max_interval
+        self._distance_scale:float = distance_scale
+        self._samples:deque[tuple[int, float]] = deque(maxlen=window)
+
+    @property
+    def min_interval(self) -> float:
+        return self._min_interval
+
+    @property
+    def max_interval(self) -> float:
+        return self._max_interval
+
+    def observe(self, timestamp_ms:int, frequency:float) -> None:
+        """
+        Add a sample, samples that aren't newer than the last one are ignored.
+        """
+        if self._samples and timestamp_ms <= self._samples[-1][0]:
+            return
+        self._samples.append((timestamp_ms, frequency))
+
+    def distance(self) -> float|None:
+        """
+        Get the distance (in Hz) of the last frequency to the nearest threshold.
+        """
+        if not self._samples:
+            return None
+        frequency:float = self._samples[-1][1]
+        return min(abs(frequency - _threshold) for _threshold in self._thresholds.thresholds)
+
+    def rate(self) -> float:
+        """
+        Get the steepest absolute rate of change (in Hz/s) between the recent samples.
+        """
+        samples:list[tuple[int, float]] = list(self._samples)
+        return max(
+            (abs(_f2 - _f1) * 1000 / (_t2 - _t1) for ((_t1, _f1), (_t2, _f2)) in zip(samples, samples[1:])),
+            default=0.0
+        )
+
+    def next_interval(self) -> float:
+        """
+        Get the delay (in seconds) until the next poll. `min_interval` until a sample has been observed.
+        """
+        distance:float|None = self.distance()
+        if distance is None:
+            return self._min_interval
+        interval:float = self._min_interval + (self._max_interval - self._min_interval) \
+            * min(distance / self._distance_scale, 1.0)
+        rate:float = self.rate()
+        if rate > 0:
+            interval = min(interval, distance / 2 / rate)
+        return min(max(interval, self._min_interval), self._max_interval)
@@ -0,0 +1,166 @@
+import os
+import mmap
+import time
+import struct
+import logging
+from pathlib import Path
+from typing import NamedTuple
+#
+from src.custom_exceptions import SharedSampleError
+
+# Fixed layout of the file (one cache-line): header, seqlock-counter and the payload of the latest sample
+MAGIC:bytes = b"EUGF"
+LAYOUT_VERSION:int = 1
+HEADER_STRUCT:struct.Struct = struct.Struct("<4sI")
+# The counter is odd while the payload is written, so readers retry instead of blocking the writer
+SEQUENCE_STRUCT:struct.Struct = struct.Struct("<Q")
+SEQUENCE_OFFSET:int = HEADER_STRUCT.size
+# frequency in Hz, epoch-milliseconds of the sample, epoch-nanoseconds of the publication, severity
+PAYLOAD_STRUCT:struct.Struct = struct.Struct("<dqqq")
+PAYLOAD_OFFSET:int = SEQUENCE_OFFSET + SEQUENCE_STRUCT.size
+FILE_SIZE:int = 64
+
+class LatestSample(NamedTuple):
+    """
+    The latest sample, that has been published by the daemon.
+
+    `sequence` counts the published samples, so a reader can tell a new sample from a repeated read.
+    """
+    frequency: float
+    timestamp_ms: int
+    severity: int
+    sequence: int
+    published_ns: int
+
+    @property
+    def age(self) -> float:
+        """
+        Seconds since the sample has been published.
+        """
+        return (time.time_ns() - self.published_ns) / 1e9
+
+class SharedSamplePublisher:
+    """
+    Writer of the latest sample into a small memory-mapped file (e.g. in `/dev/shm`) for local consumers.
+
+    Publishing never blocks: a seqlock-counter is incremented before and after the payload is written,
+    readers retry while it is odd or changed during their read. There must only be one writer per file.
+    The file is kept on close, so readers still get the last sample (with its age) while the daemon is stopped.
+    """
+    def __init__(self, filepath:str|Path) -> None:
+        self.logger:logging.Logger = logging.getLogger(__class__.__name__)
+        #
+        self._filepath:Path = Path(filepath)
+        self._fd:int|None = None
+        self._mmap:mmap.mmap|None = None
+        self._sequence_counter:int = 0
+
+        try:
+            self._filepath.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(self._filepath, os.O_RDWR | os.O_CREAT, 0o644)
+            if os.fstat(self._fd).st_size != FILE_SIZE:
+                os.ftruncate(self._fd, FILE_SIZE)
+            self._mmap = mmap.mmap(self._fd, FILE_SIZE, access=mmap.ACCESS_WRITE)
+        except OSError as _e:
+            self.close()
+            raise SharedSampleError(f"Couldn't open shared sample '{self._filepath}'") from _e
+
+        if HEADER_STRUCT.unpack_from(self._mmap, 0) == (MAGIC, LAYOUT_VERSION):
+            # Continue the sequence of the last run, an odd counter means the last write has been interrupted
+            (counter,) = SEQUENCE_STRUCT.unpack_from(self._mmap, SEQUENCE_OFFSET)
+            self._sequence_counter = counter + (counter & 1)
+            SEQUENCE_STRUCT.pack_into(self._mmap, SEQUENCE_OFFSET, self._sequence_counter)
+        else:
+            self._mmap[:] = bytes(FILE_SIZE)
+            HEADER_STRUCT.pack_into(self._mmap, 0, MAGIC, LAYOUT_VERSION)
+        self.logger.debug("Publishing latest sample to '%s' (Sequence=%d)", self._filepath, self.sequence)
+
+    @property
+    def filepath(self) -> Path:
+        return self._filepath
+
+    @property
+    def sequence(self) -> int:
+        """
+        Number of the last published sample.
+        """
+        return self._sequence_counter // 2
+
+    def publish(self, frequency:float, timestamp_ms:int, severity:int) -> int:
+        """
+        Publish the sample and return its sequence-number.
+        """
+        if self._mmap is None:
+            raise SharedSampleError(f"Shared sample '{self._filepath}' has been closed")
+        counter:int = self._sequence_counter + 1
+        SEQUENCE_STRUCT.pack_into(self._mmap, SEQUENCE_OFFSET, counter)
+        PAYLOAD_STRUCT.pack_into(self._mmap, PAYLOAD_OFFSET, frequency, timestamp_ms, time.time_ns(), severity)
+        SEQUENCE_STRUCT.pack_into(self._mmap, SEQUENCE_OFFSET, counter + 1)
+        self._sequence_counter = counter + 1
+        return self.sequence
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+class SharedSampleReader:
+    """
+    Reader of the latest sample of a `SharedSamplePublisher`, without any network-call or lock.
+    """
+    def __init__(self, filepath:str|Path, max_retries:int=10_000) -> None:
+        self._filepath:Path = Path(filepath)
+        self._max_retries:int = max(1, max_retries)
+        self._mmap:mmap.mmap|None = None
+
+        try:
+            with open(self._filepath, "rb") as _file:
+                if os.fstat(_file.fileno()).st_size < FILE_SIZE:
+                    raise SharedSampleError(f"Shared sample '{self._filepath}' is too small")
+                self._mmap = mmap.mmap(_file.fileno(), FILE_SIZE, access=mmap.ACCESS_READ)
+        except OSError as _e:
+            raise SharedSampleError(f"Couldn't open shared sample '{self._filepath}'") from _e
+        if HEADER_STRUCT.unpack_from(self._mmap, 0) != (MAGIC, LAYOUT_VERSION):
+            self.close()
+            raise SharedSampleError(f"'{self._filepath}' isn't a shared sample of layout-version {LAYOUT_VERSION}")
+
+    @property
+    def filepath(self) -> Path:
+        return self._filepath
+
+    def __enter__(self) -> "SharedSampleReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def read(self) -> LatestSample|None:
+        """
+        Get a consistent copy of the latest sample, `None` if no sample has been published yet.
+
+        Raises `SharedSampleError`, if no consistent copy could be read within `max_retries` attempts.
+        """
+        if self._mmap is None:
+            raise SharedSampleError(f"Shared sample '{self._filepath}' has been closed")
+        for _attempt in range(self._max_retries):
+            (before,) = SEQUENCE_STRUCT.unpack_from(self._mmap, SEQUENCE_OFFSET)
+            if before & 1:
+                # The writer is in the middle of a publication
+                time.sleep(0)
+                continue
+            (frequency, timestamp_ms, published_ns, severity) = PAYLOAD_STRUCT.unpack_from(self._mmap, PAYLOAD_OFFSET)
+            (after,) = SEQUENCE_STRUCT.unpack_from(self._mmap, SEQUENCE_OFFSET)
+            if before == after:
+                if before == 0:
+                    return None
+                return LatestSample(frequency, timestamp_ms, severity, before // 2, published_ns)
+        raise SharedSampleError(f"Couldn't read a consistent sample from '{self._filepath}' "
+                                f"within {self._max_retries} attempts")
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
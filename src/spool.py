@@ -0,0 +1,368 @@
+import os
+import json
+import zlib
+import time
+import struct
+import logging
+import threading
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+#
+from src.custom_exceptions import SpoolError
+
+# Every record is prefixed with the length and the CRC-32 of its payload, so torn or corrupted records are detected
+RECORD_HEADER_STRUCT:struct.Struct = struct.Struct("<II")
+SEGMENT_SUFFIX:str = ".spool"
+CHECKPOINT_FILENAME:str = "checkpoint.json"
+# New records are appended to a new segment, when the current one is larger
+SEGMENT_SIZE:int = 1024 * 1024
+
+def segment_filename(segment:int) -> str:
+    return f"{segment:010d}{SEGMENT_SUFFIX}"
+
+class SpoolPosition(NamedTuple):
+    """
+    Position in the spool: the number of the segment-file and the byte-offset within it.
+    """
+    segment: int
+    offset: int
+
+class SpoolBatch(NamedTuple):
+    """
+    Records, that have been read from the spool, and the position after the last of them (for `Spool.ack()`).
+    """
+    payloads: list[bytes]
+    position: SpoolPosition
+
+class Spool:
+    """
+    Crash-safe, append-only spool of records (e.g. samples or notifications), that haven't been processed yet.
+
+    Records are appended to numbered segment-files without any buffering in memory, so a crash of the process
+    doesn't lose anything. The costly `fsync()` is batched: the segment is synced at the next append after
+    `sync_interval` seconds (or on `sync=True`), which bounds the loss on a power-failure and keeps the
+    write-amplification of SD-cards low. Consumers read the pending records in order and acknowledge them,
+    fully acknowledged segments are deleted. The segment, that is read, is kept open, so every read only seeks
+    to the checkpoint and reads the requested records. At most `max_size` bytes are kept, the oldest segments are dropped first.
+    """
+    def __init__(self, directory:str|Path, sync_interval:float = 10.0, max_size:int = 64 * 1024 * 1024,
+                 segment_size:int = SEGMENT_SIZE) -> None:
+        self.logger:logging.Logger = logging.getLogger(__class__.__name__)
+        #
+        self._directory:Path = Path(directory)
+        self._sync_interval:float = sync_interval
+        self._max_size:int = max_size
+        self._segment_size:int = segment_size
+        self._fd:int|None = None
+        # Segment, that is read, and its open file
+        self._reader:tuple[int, BinaryIO]|None = None
+        self._segments:list[int] = []
+        self._size:int = 0
+        self._offset:int = 0
+        self._checkpoint:SpoolPosition = SpoolPosition(0, 0)
+        self._pending_count:int = 0
+        self._dropped_count:int = 0
+        self._sync_count:int = 0
+        self._unsynced:bool = False
+        self._last_sync:float = time.monotonic()
+        self._lock = threading.Lock()
+
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            self._segments = sorted(int(_filepath.name.removesuffix(SEGMENT_SUFFIX))
+                                    for _filepath in self._directory.glob(f"*{SEGMENT_SUFFIX}"))
+            self._checkpoint = self._read_checkpoint()
+            if not self._segments:
+                self._segments = [self._checkpoint.segment]
+            elif self._checkpoint.segment < self._segments[0]:
+                self._checkpoint = SpoolPosition(self._segments[0], 0)
+            self._recover()
+            self._fd = os.open(self._segment_filepath(self._segments[-1]), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        except (OSError, ValueError) as _e:
+            self.close()
+            raise SpoolError(f"Couldn't open spool '{self._directory}'") from _e
+        if self._pending_count:
+            self.logger.info("Spool '%s' has %d pending records", self._directory, self._pending_count)
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    @property
+    def pending_count(self) -> int:
+        """
+        Number of records, that haven't been acknowledged yet.
+        """
+        return self._pending_count
+
+    @property
+    def dropped_count(self) -> int:
+        """
+        Number of pending records, that have been dropped, because the spool exceeded its `max_size`.
+        """
+        return self._dropped_count
+
+    @property
+    def sync_count(self) -> int:
+        return self._sync_count
+
+    @property
+    def size(self) -> int:
+        """
+        Size of all segment-files in bytes.
+        """
+        return self._size
+
+    def _segment_filepath(self, segment:int) -> Path:
+        return self._directory / segment_filename(segment)
+
+    def _read_checkpoint(self) -> SpoolPosition:
+        try:
+            with open(self._directory / CHECKPOINT_FILENAME, "r") as _file:
+                checkpoint:dict = json.load(_file)
+            return SpoolPosition(int(checkpoint["segment"]), int(checkpoint["offset"]))
+        except FileNotFoundError:
+            return SpoolPosition(self._segments[0] if self._segments else 0, 0)
+        except (ValueError, TypeError, KeyError):
+            self.logger.warning("Ignoring invalid checkpoint of spool '%s', replaying all segments", self._directory)
+            return SpoolPosition(self._segments[0] if self._segments else 0, 0)
+
+    def _write_checkpoint(self) -> None:
+        """
+        Write the checkpoint atomically, but without syncing it: after a power-failure records may be
+        delivered again, but never lost.
+        """
+        filepath:Path = self._directory / CHECKPOINT_FILENAME
+        tmp_filepath:Path = filepath.with_name(filepath.name + ".tmp")
+        try:
+            with open(tmp_filepath, "w") as _file:
+                json.dump(self._checkpoint._asdict(), _file)
+            os.replace(tmp_filepath, filepath)
+        except OSError as _e:
+            raise SpoolError(f"Couldn't write checkpoint of spool '{self._directory}'") from _e
+
+    def _record_at(self, data:bytes, offset:int) -> bytes|None:
+        """
+        Get the payload of the record at `offset`, `None` at the end of `data` or if the record is torn or corrupted.
+        """
+        if offset + RECORD_HEADER_STRUCT.size > len(data):
+            return None
+        (length, crc) = RECORD_HEADER_STRUCT.unpack_from(data, offset)
+        payload:bytes = data[offset + RECORD_HEADER_STRUCT.size:offset + RECORD_HEADER_STRUCT.size + length]
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            return None
+        return payload
+
+    def _scan(self, data:bytes, offset:int = 0) -> tuple[int, int]:
+        """
+        Get the number of valid records in `data` from `offset` and the offset after the last of them.
+        """
+        count:int = 0
+        while (payload := self._record_at(data, offset)) is not None:
+            count += 1
+            offset += RECORD_HEADER_STRUCT.size + len(payload)
+        return (count, offset)
+
+    def _recover(self) -> None:
+        """
+        Count the pending records and truncate a torn record at the end of the last segment (e.g. after a power-failure).
+        """
+        for _segment in self._segments:
+            filepath:Path = self._segment_filepath(_segment)
+            try:
+                data:bytes = filepath.read_bytes()
+            except FileNotFoundError:
+                data = b""
+            self._size += len(data)
+            self._offset = len(data)
+            if _segment < self._checkpoint.segment:
+                continue
+            start:int = self._checkpoint.offset if _segment == self._checkpoint.segment else 0
+            (count, end) = self._scan(data, start)
+            self._pending_count += count
+            if end == len(data):
+                continue
+            if _segment == self._segments[-1]:
+                self.logger.warning("Truncating %d bytes of a torn record at the end of '%s'", len(data) - end, filepath)
+                os.truncate(filepath, end)
+                self._size -= len(data) - end
+                self._offset = end
+            else:
+                self.logger.warning("Skipping %d bytes of a corrupted record in '%s'", len(data) - end, filepath)
+
+    def append(self, payload:bytes, sync:bool = False) -> None:
+        """
+        Append a record and sync the segment, if `sync` or the last sync is more than `sync_interval` seconds ago.
+
+        Raises `SpoolError` if writing to the segment-file failed.
+        """
+        record:bytes = RECORD_HEADER_STRUCT.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._lock:
+            if self._fd is None:
+                raise SpoolError(f"Spool '{self._directory}' is closed")
+            try:
+                os.write(self._fd, record)
+            except OSError as _e:
+                raise SpoolError(f"Couldn't append to spool '{self._directory}'") from _e
+            self._offset += len(record)
+            self._size += len(record)
+            self._pending_count += 1
+            self._unsynced = True
+            if sync or time.monotonic() - self._last_sync >= self._sync_interval:
+                self._sync()
+            if self._offset >= self._segment_size:
+                self._rotate()
+
+    def sync(self) -> None:
+        """
+        Sync the appended records to the disk.
+        """
+        with self._lock:
+            self._sync()
+
+    def _sync(self) -> None:
+        self._last_sync = time.monotonic()
+        if not self._unsynced or self._fd is None:
+            return
+        try:
+            os.fsync(self._fd)
+        except OSError as _e:
+            raise SpoolError(f"Couldn't sync spool '{self._directory}'") from _e
+        self._unsynced = False
+        self._sync_count += 1
+
+    def _rotate(self) -> None:
+        """
+        Continue with a new segment and drop the oldest segments, while the spool is larger than `max_size`.
+        """
+        self._sync()
+        os.close(self._fd)
+        self._fd = None
+        self._segments.append(self._segments[-1] + 1)
+        self._offset = 0
+        try:
+            self._fd = os.open(self._segment_filepath(self._segments[-1]), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        except OSError as _e:
+            raise SpoolError(f"Couldn't create segment of spool '{self._directory}'") from _e
+        while self._size > self._max_size and len(self._segments) > 1:
+            segment:int = self._segments[0]
+            if segment >= self._checkpoint.segment:
+                (dropped, _end) = self._scan(self._segment_filepath(segment).read_bytes(),
+                                             self._checkpoint.offset if segment == self._checkpoint.segment else 0)
+                self._pending_count -= dropped
+                self._dropped_count += dropped
+                self._checkpoint = SpoolPosition(self._segments[1], 0)
+                self._write_checkpoint()
+                self.logger.warning("Spool '%s' exceeded %d bytes, dropped %d pending records",
+                                    self._directory, self._max_size, dropped)
+            self._delete_segment(segment)
+
+    def _delete_segment(self, segment:int) -> None:
+        filepath:Path = self._segment_filepath(segment)
+        try:
+            self._size -= filepath.stat().st_size
+            filepath.unlink()
+        except OSError as _e:
+            raise SpoolError(f"Couldn't delete segment '{filepath}'") from _e
+        self._segments.remove(segment)
+        if self._reader is not None and self._reader[0] == segment:
+            self._close_reader()
+
+    def _open_reader(self, segment:int) -> BinaryIO:
+        if self._reader is None or self._reader[0] != segment:
+            self._close_reader()
+            self._reader = (segment, open(self._segment_filepath(segment), "rb"))
+        return self._reader[1]
+
+    def _close_reader(self) -> None:
+        if self._reader is not None:
+            self._reader[1].close()
+            self._reader = None
+
+    def _read_record(self, file:BinaryIO, size:int) -> bytes|None:
+        """
+        Read the payload of the next record within the next `size` bytes of the file, `None` if it is torn or corrupted.
+        """
+        header:bytes = file.read(RECORD_HEADER_STRUCT.size)
+        if len(header) != RECORD_HEADER_STRUCT.size:
+            return None
+        (length, crc) = RECORD_HEADER_STRUCT.unpack(header)
+        if length > size - RECORD_HEADER_STRUCT.size:
+            return None
+        payload:bytes = file.read(length)
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            return None
+        return payload
+
+    def read(self, limit:int|None = None, max_bytes:int|None = None) -> SpoolBatch:
+        """
+        Read (at most `limit`) pending records in the order they have been appended.
+
+        With `max_bytes`, the payloads of the batch are at most this large in total,
+        except a single record, that is larger on its own.
+
+        Corrupted records (only possible after a power-failure without a synced segment) are skipped with the rest
+        of their segment. Raises `SpoolError` if reading a segment-file failed.
+        """
+        with self._lock:
+            payloads:list[bytes] = []
+            size:int = 0
+            full:bool = False
+            position:SpoolPosition = self._checkpoint
+            for _segment in self._segments:
+                if _segment < self._checkpoint.segment:
+                    continue
+                if full or (limit is not None and len(payloads) >= limit):
+                    break
+                offset:int = self._checkpoint.offset if _segment == self._checkpoint.segment else 0
+                try:
+                    _file:BinaryIO = self._open_reader(_segment)
+                    end:int = self._offset if _segment == self._segments[-1] else os.fstat(_file.fileno()).st_size
+                    _file.seek(offset)
+                    while offset < end and (limit is None or len(payloads) < limit):
+                        payload:bytes|None = self._read_record(_file, end - offset)
+                        if payload is None:
+                            self.logger.warning("Skipping %d bytes of a corrupted record in '%s'", end - offset,
+                                                self._segment_filepath(_segment))
+                            offset = end
+                            break
+                        if max_bytes is not None and payloads and size + len(payload) > max_bytes:
+                            full = True
+                            break
+                        payloads.append(payload)
+                        size += len(payload)
+                        offset += RECORD_HEADER_STRUCT.size + len(payload)
+                except OSError as _e:
+                    self._close_reader()
+                    raise SpoolError(f"Couldn't read segment '{self._segment_filepath(_segment)}'") from _e
+                position = SpoolPosition(_segment, offset)
+            return SpoolBatch(payloads=payloads, position=position)
+
+    def ack(self, batch:SpoolBatch|None = None) -> None:
+        """
+        Acknowledge the records of the batch (or all records without a batch), which will not be read again.
+
+        Segments, that have been read completely, are deleted.
+        """
+        with self._lock:
+            if batch is None:
+                (self._checkpoint, self._pending_count) = (SpoolPosition(self._segments[-1], self._offset), 0)
+            else:
+                (self._checkpoint, self._pending_count) = (batch.position, max(0, self._pending_count - len(batch.payloads)))
+            for _segment in [_segment for _segment in self._segments if _segment < self._checkpoint.segment]:
+                self._delete_segment(_segment)
+            self._write_checkpoint()
+
+    def close(self) -> None:
+        """
+        Sync and close the current segment.
+        """
+        with self._lock:
+            self._close_reader()
+            if self._fd is None:
+                return
+            try:
+                self._sync()
+            finally:
+                os.close(self._fd)
+                self._fd = None
@@ -0,0 +1,511 @@
+import os
+import json
+import mmap
+import time
+import struct
+import logging
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Iterator, NamedTuple
+#
+from src.spool import Spool, SpoolBatch
+from src.custom_exceptions import StoreError, SpoolError
+
+# One fixed-width record per sample: epoch-milliseconds (int64) + frequency in Hz (float64)
+RECORD_STRUCT:struct.Struct = struct.Struct("<qd")
+RECORD_SIZE:int = RECORD_STRUCT.size
+SEGMENT_SUFFIX:str = ".seg"
+INDEX_FILENAME:str = "index.json"
+# Stats of every full block of `BLOCK_SIZE` records of a segment are kept in a `.idx`-sidecar
+BLOCK_SIZE:int = 1024
+BLOCK_STRUCT:struct.Struct = struct.Struct("<qqdqdqd")
+BLOCK_INDEX_SUFFIX:str = ".idx"
+# Spooled samples are replayed in batches of this size
+REPLAY_BATCH_SIZE:int = 4096
+
+def segment_name(timestamp_ms:int) -> str:
+    """
+    Get the segment-filename (one segment per UTC-day) for the given epoch-milliseconds.
+    """
+    day:str = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+    return f"{day}{SEGMENT_SUFFIX}"
+
+class SegmentStats(NamedTuple):
+    """
+    Summary of (a part of) a segment, used as sparse index to skip or answer whole segments.
+
+    A `NamedTuple` keeps loading the index of thousands of segments cheap.
+    """
+    count: int
+    first_timestamp_ms: int
+    last_timestamp_ms: int
+    min_frequency: float
+    min_timestamp_ms: int
+    max_frequency: float
+    max_timestamp_ms: int
+    sum_frequency: float
+
+    @classmethod
+    def from_columns(cls, timestamps:memoryview, frequencies:memoryview) -> "SegmentStats|None":
+        """
+        Compute the stats of the given (non-empty) timestamp- and frequency-columns.
+        """
+        if not len(frequencies):
+            return None
+        values:list[float] = frequencies.tolist()
+        min_frequency:float = min(values)
+        max_frequency:float = max(values)
+        return cls(
+            count=len(values),
+            first_timestamp_ms=timestamps[0],
+            last_timestamp_ms=timestamps[-1],
+            min_frequency=min_frequency,
+            min_timestamp_ms=timestamps[values.index(min_frequency)],
+            max_frequency=max_frequency,
+            max_timestamp_ms=timestamps[values.index(max_frequency)],
+            sum_frequency=sum(values)
+        )
+
+    def merge(self, other:"SegmentStats|None") -> "SegmentStats":
+        """
+        Merge with the stats of a later part of the timeline.
+        """
+        if other is None:
+            return self
+        return SegmentStats(
+            count=self.count + other.count,
+            first_timestamp_ms=min(self.first_timestamp_ms, other.first_timestamp_ms),
+            last_timestamp_ms=max(self.last_timestamp_ms, other.last_timestamp_ms),
+            min_frequency=min(self.min_frequency, other.min_frequency),
+            min_timestamp_ms=self.min_timestamp_ms if self.min_frequency <= other.min_frequency else other.min_timestamp_ms,
+            max_frequency=max(self.max_frequency, other.max_frequency),
+            max_timestamp_ms=self.max_timestamp_ms if self.max_frequency >= other.max_frequency else other.max_timestamp_ms,
+            sum_frequency=self.sum_frequency + other.sum_frequency
+        )
+
+    @property
+    def mean_frequency(self) -> float:
+        return self.sum_frequency / self.count
+
+class Segment:
+    """
+    Read-only, memory-mapped view of a segment-file.
+
+    `timestamps` and `frequencies` are strided `memoryview`s over the mapped file,
+    so reading a segment neither parses anything nor creates a Python object per row.
+    """
+    def __init__(self, filepath:Path) -> None:
+        self._filepath:Path = filepath
+        self._mmap:mmap.mmap|None = None
+        self._view:memoryview|None = None
+        self._timestamps:memoryview|None = None
+        self._frequencies:memoryview|None = None
+        self._length:int = 0
+
+        size:int = filepath.stat().st_size
+        # Ignore a partially written (torn) record at the end of the file
+        self._length = size // RECORD_SIZE
+        if self._length == 0:
+            return
+
+        with open(filepath, "rb") as _file:
+            self._mmap = mmap.mmap(_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)[:self._length * RECORD_SIZE]
+        self._timestamps = self._view.cast("q")[0::2]
+        self._frequencies = self._view.cast("d")[1::2]
+
+    @property
+    def filepath(self) -> Path:
+        return self._filepath
+
+    @property
+    def timestamps(self) -> memoryview:
+        """
+        Sorted epoch-milliseconds of all samples in this segment.
+        """
+        return self._timestamps if self._timestamps is not None else memoryview(b"").cast("q")
+
+    @property
+    def frequencies(self) -> memoryview:
+        """
+        Frequencies in Hz of all samples in this segment.
+        """
+        return self._frequencies if self._frequencies is not None else memoryview(b"").cast("d")
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __enter__(self) -> "Segment":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        # Exported memoryviews must be released before the mmap can be closed
+        for _view in (self._timestamps, self._frequencies, self._view):
+            if _view is not None:
+                _view.release()
+        self._timestamps = self._frequencies = self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+class SampleStore:
+    """
+    Append-only time-series store for frequency-samples.
+
+    Samples are written as fixed-width binary records into one segment-file per UTC-day.
+    Timestamps within the store are strictly increasing, which keeps every segment sorted.
+
+    With a `spool`, buffered samples, that couldn't be written to their segment, are appended to the spool
+    and written before the next samples (on open or by the next flush), so the buffer stays bounded by `flush_size`.
+    Samples, that have been written, are never spooled, so the spool costs no writes while the segments are writable.
+
+    With a `sync_interval`, the segment is synced at the next write after `sync_interval` seconds (and on close),
+    so samples written right away (`flush_size=1`) survive a power-failure except for the last interval.
+    """
+    def __init__(self, directory:Path, flush_size:int=60, spool:Spool|None = None,
+                 sync_interval:float|None = None) -> None:
+        self.logger:logging.Logger = logging.getLogger(__class__.__name__)
+        #
+        self._directory:Path = Path(directory)
+        self._flush_size:int = max(1, flush_size)
+        self._buffer:bytearray = bytearray()
+        self._buffered_segment:str|None = None
+        self._last_timestamp_ms:int|None = None
+        # Timestamp of the last sample, that has been written to its segment
+        self._flushed_timestamp_ms:int|None = None
+        self._spool:Spool|None = spool
+        self._replay_pending:bool = spool is not None and spool.pending_count > 0
+        self._sync_interval:float|None = sync_interval
+        self._last_sync:float = time.monotonic()
+        # Segment-file with written, but not yet synced samples
+        self._unsynced_filepath:Path|None = None
+        self._sync_count:int = 0
+
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+        except OSError as _e:
+            raise StoreError(f"Couldn't create store-directory '{self._directory}'") from _e
+
+        segments:list[Path] = self.segment_filepaths()
+        if segments:
+            self._truncate_torn_record(segments[-1])
+            try:
+                with Segment(segments[-1]) as _segment:
+                    if len(_segment):
+                        self._last_timestamp_ms = _segment.timestamps[-1]
+            except OSError as _e:
+                raise StoreError(f"Couldn't open segment '{segments[-1]}'") from _e
+        self._flushed_timestamp_ms = self._last_timestamp_ms
+        if self._replay_pending:
+            try:
+                count:int = self.replay_spool()
+            except SpoolError as _e:
+                raise StoreError(f"Couldn't replay spool '{self._spool.directory}'") from _e
+            self.logger.info("Replayed %d spooled samples to '%s'", count, self._directory)
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    def _truncate_torn_record(self, filepath:Path) -> None:
+        """
+        Truncate a partially written record at the end of the segment (e.g. after a crash),
+        so the next appended records stay aligned.
+        """
+        try:
+            size:int = filepath.stat().st_size
+            if size % RECORD_SIZE:
+                self.logger.warning("Truncating %d bytes of a torn record at the end of '%s'", size % RECORD_SIZE, filepath)
+                os.truncate(filepath, size // RECORD_SIZE * RECORD_SIZE)
+        except OSError as _e:
+            raise StoreError(f"Couldn't truncate torn record of segment '{filepath}'") from _e
+
+    @property
+    def last_timestamp_ms(self) -> int|None:
+        return self._last_timestamp_ms
+
+    @property
+    def spool(self) -> Spool|None:
+        return self._spool
+
+    @property
+    def sync_count(self) -> int:
+        return self._sync_count
+
+    def segment_filepaths(self) -> list[Path]:
+        """
+        Get all segment-files sorted by day.
+        """
+        return sorted(self._directory.glob(f"*{SEGMENT_SUFFIX}"))
+
+    def append(self, timestamp_ms:int, frequency:float) -> bool:
+        """
+        Append a sample to the store.
+
+        Returns `False` if the sample is not newer than the last stored sample.
+        Raises `StoreError` if writing to the segment-file failed.
+        """
+        if self._last_timestamp_ms is not None and timestamp_ms <= self._last_timestamp_ms:
+            self.logger.debug("Skipped sample with timestamp=%d, which is not newer than %d",
+                              timestamp_ms, self._last_timestamp_ms)
+            return False
+
+        name:str = segment_name(timestamp_ms)
+        if self._buffered_segment is not None and name != self._buffered_segment:
+            # Rotate to a new daily segment
+            self.flush()
+
+        self._buffered_segment = name
+        self._buffer += RECORD_STRUCT.pack(timestamp_ms, frequency)
+        self._last_timestamp_ms = timestamp_ms
+
+        if len(self._buffer) >= self._flush_size * RECORD_SIZE:
+            self.flush()
+
+        return True
+
+    def flush(self) -> None:
+        """
+        Write buffered samples to their segment-file.
+
+        With a spool, the spooled samples are written first and buffered samples, that couldn't be written,
+        are spooled (raising `StoreError` nevertheless).
+        """
+        if self._spool is None:
+            self._write_buffer()
+            return
+        try:
+            if self._replay_pending:
+                self.replay_spool()
+            self._write_buffer()
+        except (StoreError, SpoolError) as _e:
+            self._spool_buffer()
+            if isinstance(_e, StoreError):
+                raise
+            raise StoreError(f"Couldn't replay spool '{self._spool.directory}'") from _e
+
+    def _spool_buffer(self) -> None:
+        """
+        Append the buffered samples as one record to the spool, they are written before the next flushed samples.
+        """
+        if not self._buffer:
+            return
+        try:
+            self._spool.append(bytes(self._buffer))
+        except SpoolError as _e:
+            raise StoreError(f"Couldn't spool {len(self._buffer) // RECORD_SIZE} samples") from _e
+        finally:
+            self._buffer.clear()
+            self._buffered_segment = None
+        self._replay_pending = True
+        self.logger.warning("Spooled samples, that couldn't be written (%d pending)", self._spool.pending_count)
+
+    def _write_buffer(self) -> None:
+        if not self._buffer:
+            return
+        self._write_records(self._buffered_segment, self._buffer)
+        self._buffer.clear()
+
+    def _write_records(self, name:str, records:bytes|bytearray) -> None:
+        filepath:Path = self._directory / name
+        if self._unsynced_filepath is not None and self._unsynced_filepath != filepath:
+            # Rotated to the next segment
+            self.sync()
+        try:
+            with open(filepath, "ab") as _file:
+                _file.write(records)
+                if self._sync_interval is not None:
+                    if time.monotonic() - self._last_sync >= self._sync_interval:
+                        os.fsync(_file.fileno())
+                        self._synced()
+                    else:
+                        self._unsynced_filepath = filepath
+        except OSError as _e:
+            raise StoreError(f"Couldn't write to segment '{filepath}'") from _e
+        self.logger.debug("Wrote %d samples to '%s'", len(records) // RECORD_SIZE, filepath)
+        (self._flushed_timestamp_ms, _frequency) = RECORD_STRUCT.unpack_from(records, len(records) - RECORD_SIZE)
+
+    def sync(self) -> None:
+        """
+        Sync the segment-file with written, but not yet synced samples to the disk.
+        """
+        if self._unsynced_filepath is None:
+            return
+        try:
+            with open(self._unsynced_filepath, "rb") as _file:
+                os.fsync(_file.fileno())
+        except OSError as _e:
+            raise StoreError(f"Couldn't sync segment '{self._unsynced_filepath}'") from _e
+        self._synced()
+
+    def _synced(self) -> None:
+        (self._unsynced_filepath, self._last_sync) = (None, time.monotonic())
+        self._sync_count += 1
+
+    def replay_spool(self) -> int:
+        """
+        Write all spooled samples, that are newer than the last flushed sample, to their segments
+        (one write per batch and segment) and acknowledge them.
+
+        Returns the number of written samples.
+        """
+        count:int = 0
+        while True:
+            batch:SpoolBatch = self._spool.read(limit=REPLAY_BATCH_SIZE)
+            if not batch.payloads:
+                break
+            (name, records) = (None, bytearray())
+            for (_timestamp_ms, _frequency) in RECORD_STRUCT.iter_unpack(b"".join(batch.payloads)):
+                if self._flushed_timestamp_ms is not None and _timestamp_ms <= self._flushed_timestamp_ms:
+                    continue
+                if name is not None and segment_name(_timestamp_ms) != name:
+                    self._write_records(name, records)
+                    records.clear()
+                name = segment_name(_timestamp_ms)
+                records += RECORD_STRUCT.pack(_timestamp_ms, _frequency)
+                count += 1
+            if records:
+                self._write_records(name, records)
+            self._spool.ack(batch)
+        self._replay_pending = False
+        if self._flushed_timestamp_ms is not None and (self._last_timestamp_ms is None
+                                                       or self._flushed_timestamp_ms > self._last_timestamp_ms):
+            self._last_timestamp_ms = self._flushed_timestamp_ms
+        return count
+
+    def close(self) -> None:
+        try:
+            self.flush()
+            self.sync()
+        finally:
+            if self._spool is not None:
+                self._spool.close()
+
+    def open_segment(self, filepath:Path) -> Segment:
+        """
+        Memory-map the given segment-file for reading.
+        """
+        try:
+            return Segment(filepath)
+        except OSError as _e:
+            raise StoreError(f"Couldn't open segment '{filepath}'") from _e
+
+    def segment_index(self) -> dict[str, SegmentStats]:
+        """
+        Get the sparse per-segment index (first/last timestamp, min/max frequency, ...).
+
+        The index is cached in the store-directory and only updated for segments that
+        have grown since, in which case only the new records are read.
+        """
+        index_filepath:Path = self._directory / INDEX_FILENAME
+        cached:dict = {}
+        try:
+            with open(index_filepath, "r") as _file:
+                cached = json.load(_file)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError):
+            self.logger.warning("Ignoring invalid segment-index '%s'", index_filepath)
+
+        index:dict[str, SegmentStats] = {}
+        # Every entry is stored as `[length, *stats]`
+        entries:dict[str, list] = {}
+        changed:bool = False
+        with os.scandir(self._directory) as _dir_entries:
+            segment_entries:list[os.DirEntry] = sorted(
+                (_entry for _entry in _dir_entries if _entry.name.endswith(SEGMENT_SUFFIX)),
+                key=lambda _entry: _entry.name
+            )
+        for _dir_entry in segment_entries:
+            name:str = _dir_entry.name
+            length:int = _dir_entry.stat().st_size // RECORD_SIZE
+            entry:list|None = cached.get(name)
+            if entry is not None and entry[0] == length:
+                index[name] = SegmentStats._make(entry[1:])
+                entries[name] = entry
+                continue
+
+            stats:SegmentStats|None = None
+            indexed_length:int = 0
+            if entry is not None and 0 < entry[0] < length:
+                stats = SegmentStats._make(entry[1:])
+                indexed_length = entry[0]
+            with self.open_segment(Path(_dir_entry.path)) as _segment:
+                tail:SegmentStats|None = SegmentStats.from_columns(
+                    _segment.timestamps[indexed_length:],
+                    _segment.frequencies[indexed_length:]
+                )
+            stats = tail if stats is None else stats.merge(tail)
+            changed = True
+            if stats is None:
+                continue
+            index[name] = stats
+            entries[name] = [length, *stats]
+
+        if changed or len(entries) != len(cached):
+            try:
+                with open(index_filepath, "w") as _file:
+                    json.dump(entries, _file)
+            except OSError:
+                self.logger.warning("Couldn't write segment-index '%s'", index_filepath)
+
+        return index
+
+    def block_index(self, segment:Segment) -> list[SegmentStats]:
+        """
+        Get the stats of every full block of `BLOCK_SIZE` records of the given segment.
+
+        Blocks are immutable once full, so the `.idx`-sidecar is append-only and
+        only blocks that have been completed since the last call are computed.
+        """
+        filepath:Path = segment.filepath.with_suffix(BLOCK_INDEX_SUFFIX)
+        try:
+            with open(filepath, "rb") as _file:
+                data:bytes = _file.read()
+        except FileNotFoundError:
+            data = b""
+        except OSError as _e:
+            raise StoreError(f"Couldn't read block-index '{filepath}'") from _e
+
+        indexed:int = len(data) // BLOCK_STRUCT.size
+        blocks:list[SegmentStats] = [
+            SegmentStats(BLOCK_SIZE, *_block)
+            for _block in BLOCK_STRUCT.iter_unpack(data[:indexed * BLOCK_STRUCT.size])
+        ]
+        full:int = len(segment) // BLOCK_SIZE
+        if indexed >= full:
+            return blocks[:full]
+
+        new_data:bytearray = bytearray()
+        for _block in range(indexed, full):
+            stats:SegmentStats = SegmentStats.from_columns(
+                segment.timestamps[_block * BLOCK_SIZE:(_block + 1) * BLOCK_SIZE],
+                segment.frequencies[_block * BLOCK_SIZE:(_block + 1) * BLOCK_SIZE]
+            )
+            blocks.append(stats)
+            new_data += BLOCK_STRUCT.pack(*stats[1:])
+        try:
+            with open(filepath, "r+b" if data else "wb") as _file:
+                # Overwrite a torn block-record at the end
+                _file.seek(indexed * BLOCK_STRUCT.size)
+                _file.write(new_data)
+        except OSError:
+            self.logger.warning("Couldn't write block-index '%s'", filepath)
+        return blocks
+
+    def iter_samples(self) -> Iterator[tuple[int, float]]:
+        """
+        Iterate over all stored samples in chronological order.
+        """
+        for _filepath in self.segment_filepaths():
+            yield from self.iter_segment_samples(_filepath)
+
+    def iter_segment_samples(self, filepath:Path) -> Iterator[tuple[int, float]]:
+        """
+        Iterate over all samples of a single segment-file.
+        """
+        with self.open_segment(filepath) as _segment:
+            yield from zip(_segment.timestamps, _segment.frequencies)
@@ -0,0 +1,61 @@
+import re
+import json
+from pathlib import Path
+from dataclasses import dataclass
+#
+from src.thresholds import ThresholdEngine
+from src.custom_exceptions import InvalidConfigError
+
+# Target-names are used in filenames of the alert-state
+TARGET_NAME_PATTERN:re.Pattern = re.compile(r"[A-Za-z0-9_.-]+")
+
+@dataclass(frozen=True)
+class Target:
+    """
+    Frequency-feed serving the XML-payload of the API (e.g. mirror, own PMU or test-rig).
+    """
+    name: str
+    url: str
+    interval: float
+    thresholds: ThresholdEngine
+
+def load_targets(filepath:Path, default_interval:float, default_thresholds:ThresholdEngine) -> list[Target]:
+    """
+    Load the targets of a JSON-file with a list of objects like:
+    ```
+    [
+        {"name": "pmu-1", "url": "http://10.0.0.5/frequenz.xml", "interval": 1.0,
+         "thresholds": {"critical_min": 49.6, "warning_min": 49.85, "warning_max": 50.15, "critical_max": 50.4}}
+    ]
+    ```
+    `interval` and `thresholds` are optional (Default=`DAEMON_POLL_INTERVAL` and the configured alert-thresholds).
+    
+    Raises `InvalidConfigError` when an invalid target is given.
+    """
+    try:
+        with open(filepath, "r") as _file:
+            data = json.load(_file)
+    except (OSError, ValueError) as _e:
+        raise InvalidConfigError(f"Couldn't load targets '{filepath}'") from _e
+    if not isinstance(data, list) or not data:
+        raise InvalidConfigError(f"Targets '{filepath}' must be a non-empty list")
+    
+    targets:list[Target] = []
+    for (_index, _target) in enumerate(data):
+        try:
+            name:str = str(_target.get("name", f"target-{_index}"))
+            url:str = _target["url"]
+            interval:float = float(_target.get("interval", default_interval))
+            thresholds:ThresholdEngine = default_thresholds
+            if "thresholds" in _target:
+                thresholds = ThresholdEngine(**{_key: float(_value) for (_key, _value) in _target["thresholds"].items()})
+        except (AttributeError, KeyError, TypeError, ValueError) as _e:
+            raise InvalidConfigError(f"Got an invalid target #{_index} in '{filepath}': {_target}") from _e
+        if not TARGET_NAME_PATTERN.fullmatch(name):
+            raise InvalidConfigError(f"Got an invalid target-name '{name}'! Only letters, digits, '_', '.' and '-' are allowed.")
+        if interval <= 0:
+            raise InvalidConfigError(f"The interval of target '{name}' must be > 0")
+        if name in (_existing.name for _existing in targets):
+            raise InvalidConfigError(f"Got a duplicate target-name '{name}'")
+        targets.append(Target(name=name, url=url, interval=interval, thresholds=thresholds))
+    return targets
@@ -0,0 +1,117 @@
+import bisect
+import math
+from array import array
+from itertools import compress, count
+from operator import ne
+from typing import Sequence
+#
+from src.config import Config
+
+# NumPy is optional and only imported by the first batch-classification, since importing it
+# takes longer than a single run of the scraper otherwise needs
+np = None
+_np_imported:bool = False
+
+def _import_numpy():
+    """
+    Get the `numpy`-module, `None` if it isn't installed.
+    """
+    global np, _np_imported
+    if not _np_imported:
+        _np_imported = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError: # pragma: no cover - NumPy is optional
+            np = None
+    return np
+
+# Severity-codes, ordered like the frequency-bands they describe
+CRITICAL_LOW:int = -2
+WARNING_LOW:int = -1
+NOMINAL:int = 0
+WARNING_HIGH:int = 1
+CRITICAL_HIGH:int = 2
+
+SEVERITY_NAMES:dict[int, str] = {
+    CRITICAL_LOW: "CRITICAL_LOW",
+    WARNING_LOW: "WARNING_LOW",
+    NOMINAL: "NOMINAL",
+    WARNING_HIGH: "WARNING_HIGH",
+    CRITICAL_HIGH: "CRITICAL_HIGH"
+}
+
+class ThresholdEngine:
+    """
+    Classify frequencies into severity-codes by the four sorted alert-thresholds.
+
+        CRITICAL_LOW  <  CRITICAL MIN  <=  WARNING_LOW  <=  WARNING MIN  <  NOMINAL  <  WARNING MAX  <=  WARNING_HIGH  <=  CRITICAL MAX  <  CRITICAL_HIGH
+
+    The WARNING-thresholds are inclusive and the CRITICAL-thresholds exclusive. This is mapped onto
+    a single sorted list of band-edges (the inclusive ones nudged to the next float), so a single
+    `bisect_right` (or `numpy.searchsorted` for batches) classifies a frequency.
+    Frequencies are expected to be finite.
+    """
+    def __init__(self, critical_min:float, warning_min:float, warning_max:float, critical_max:float) -> None:
+        if not critical_min < warning_min < warning_max < critical_max:
+            raise ValueError("Thresholds must be strictly ascending")
+        self._thresholds:tuple[float, float, float, float] = (critical_min, warning_min, warning_max, critical_max)
+        self._edges:tuple[float, float, float, float] = (
+            critical_min,
+            math.nextafter(warning_min, math.inf),
+            warning_max,
+            math.nextafter(critical_max, math.inf)
+        )
+        self._np_edges = None
+
+    @classmethod
+    def from_config(cls, config:Config) -> "ThresholdEngine":
+        return cls(
+            critical_min=config.critical_min_hz_alert_threshold,
+            warning_min=config.warning_min_hz_alert_threshold,
+            warning_max=config.warning_max_hz_alert_threshold,
+            critical_max=config.critical_max_hz_alert_threshold
+        )
+
+    @property
+    def thresholds(self) -> tuple[float, float, float, float]:
+        """
+        CRITICAL-MIN, WARNING-MIN, WARNING-MAX and CRITICAL-MAX threshold.
+        """
+        return self._thresholds
+
+    def threshold(self, severity:int) -> float|None:
+        """
+        Get the threshold, that has been reached or exceeded by a frequency of the given severity.
+        """
+        if severity == NOMINAL:
+            return None
+        return self._thresholds[severity + 2 if severity < 0 else severity + 1]
+
+    def classify(self, frequency:float) -> int:
+        """
+        Get the severity-code of a single frequency.
+        """
+        return bisect.bisect_right(self._edges, frequency) - 2
+
+    def classify_batch(self, frequencies:Sequence[float]) -> tuple[Sequence[int], Sequence[int]]:
+        """
+        Get the severity-codes of all frequencies and the indices, where the severity changes
+        compared to the previous frequency.
+
+        Uses NumPy (`int8`-array and index-array) if available, otherwise `bisect` (`array('b')` and list).
+        """
+        np = _import_numpy()
+        if np is not None:
+            if self._np_edges is None:
+                self._np_edges = np.array(self._edges)
+            values = np.asarray(frequencies, dtype=np.float64)
+            severities = (np.searchsorted(self._np_edges, values, side="right") - 2).astype(np.int8)
+            changes = np.flatnonzero(severities[1:] != severities[:-1]) + 1
+            return (severities, changes)
+
+        edges:tuple[float, float, float, float] = self._edges
+        _bisect_right = bisect.bisect_right
+        severities = array("b", [_bisect_right(edges, _frequency) - 2 for _frequency in frequencies])
+        changes:list[int] = list(compress(count(1), map(ne, severities[1:], severities[:-1])))
+        return (severities, changes)
@@ -0,0 +1,135 @@
+import time
+import logging
+import functools
+import threading
+from typing import Callable
+#
+from src.latency import LatencyHistogram
+
+logger:logging.Logger = logging.getLogger(__name__)
+
+class Span:
+    """
+    Duration of a phase (e.g. `api.request`) with optional attributes, passed to all hooks when it ends.
+    """
+    __slots__ = ("name", "attrs", "start", "duration")
+
+    def __init__(self, name:str) -> None:
+        self.name:str = name
+        self.attrs:dict = {}
+        self.start:float = 0.0
+        self.duration:float = 0.0
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        for _hook in _hooks:
+            try:
+                _hook(self)
+            except Exception:
+                logger.exception("Tracing-hook failed for span '%s'", self.name)
+        return False
+
+class _NoopSpan:
+    """
+    Shared span, that is returned while no hook is registered.
+    """
+    __slots__ = ()
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        return False
+
+_NOOP_SPAN:_NoopSpan = _NoopSpan()
+_hooks:list[Callable[[Span], None]] = []
+
+def span(name:str) -> Span|_NoopSpan:
+    """
+    Time a phase with `with span("name") as _span: ...`.
+
+    Without registered hooks a shared no-op span is returned, so a disabled span only costs a function-call.
+    """
+    if not _hooks:
+        return _NOOP_SPAN
+    return Span(name)
+
+def is_enabled() -> bool:
+    """
+    Whether any hook is registered, e.g. to skip collecting span-attributes.
+    """
+    return bool(_hooks)
+
+def traced(name:str) -> Callable:
+    """
+    Decorator, that times every call of the function as span `name`.
+    """
+    def _decorator(func:Callable) -> Callable:
+        @functools.wraps(func)
+        def _wrapper(*args, **kwargs):
+            if not _hooks:
+                return func(*args, **kwargs)
+            with Span(name):
+                return func(*args, **kwargs)
+        return _wrapper
+    return _decorator
+
+def add_hook(hook:Callable[[Span], None]) -> None:
+    """
+    Register a function, that is called with every ended span.
+    """
+    _hooks.append(hook)
+
+def remove_hook(hook:Callable[[Span], None]) -> None:
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+def log_span(finished:Span) -> None:
+    """
+    Hook, that logs every span on DEBUG-level.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    attrs:str = "".join(f" | {_key}={_value}" for (_key, _value) in finished.attrs.items())
+    logger.debug("Span %s=%.3f ms%s", finished.name, finished.duration * 1000, attrs)
+
+class PhaseStats:
+    """
+    Hook, that collects the durations of the spans in a latency-histogram per phase.
+    """
+    def __init__(self) -> None:
+        self._phases:dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def phases(self) -> dict[str, LatencyHistogram]:
+        return self._phases
+
+    def __call__(self, finished:Span) -> None:
+        histogram:LatencyHistogram|None = self._phases.get(finished.name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._phases.setdefault(finished.name, LatencyHistogram(min_latency=1e-6))
+        histogram.add(finished.duration)
+
+    def format_table(self) -> str:
+        """
+        Get a table of the count, mean, P50 and P99 (in milliseconds) of every phase.
+        """
+        lines:list[str] = [f"{'Phase':<16} {'Count':>8} {'Mean':>10} {'P50':>10} {'P99':>10}"]
+        for (_name, _histogram) in sorted(self._phases.items()):
+            lines.append(f"{_name:<16} {_histogram.count:>8} {_histogram.mean * 1000:>10.3f} "
+                         f"{_histogram.quantile(0.5) * 1000:>10.3f} {_histogram.quantile(0.99) * 1000:>10.3f}")
+        return "\n".join(lines)
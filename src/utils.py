@@ -1,8 +1,43 @@
+from __future__ import annotations
 from pathlib import Path
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import requests
 
 def get_dotenv_filepath() -> Path:
     """
     Get absolute filepath of dotenv-file.
     """
     return Path(".env")
-    
\ No newline at end of file
+
+def create_http_session(pool_maxsize:int=4) -> requests.Session:
+    """
+    Create a `requests.Session` with a keep-alive connection-pool.
+    
+    The session can be shared by the `APIHandler` and `NTFYHandler`, so that
+    long-running processes don't pay a new TCP- and TLS-handshake per request.
+    """
+    # `requests` (with `urllib3`) is only imported, when a code-path needs HTTP
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    # Surpress requests TLS-warnings
+    requests.packages.urllib3.disable_warnings()
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def timestamp_to_epoch_ms(timestamp:str) -> int:
+    """
+    Convert an ISO-8601 timestamp of the API (e.g. `2026-02-11T15:05:08+00:00`) into epoch-milliseconds.
+    
+    Raises `ValueError` if the timestamp is invalid or has no timezone.
+    """
+    parsed:datetime = datetime.fromisoformat(timestamp)
+    if parsed.tzinfo is None:
+        raise ValueError(f"Timestamp '{timestamp}' has no timezone")
+    return round(parsed.timestamp() * 1000)
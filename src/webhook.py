@@ -0,0 +1,60 @@
+import requests
+from datetime import datetime, timezone
+#
+from src.notifiers import Notifier
+from src.tracing import traced
+from src.custom_exceptions import WebhookError
+
+class WebhookNotifier(Notifier):
+    """
+    POST every notification as JSON-object (`title`, `message`, `priority`, `tags` and `ts`) to a generic webhook.
+    """
+    def __init__(self, url:str, auth_token:str|None, requests_timeout:float, requests_cert_verify:bool,
+                 session:requests.Session|None = None) -> None:
+        super().__init__(name="webhook")
+        #
+        self._url:str = url
+        self._auth_token:str|None = auth_token
+        self._requests_timeout:float = requests_timeout
+        self._requests_cert_verify:bool = requests_cert_verify
+        self._session:requests.Session = session if session is not None else requests.Session()
+
+    @property
+    def url(self) -> str:
+        return self._url
+
+    @property
+    def session(self) -> requests.Session:
+        return self._session
+
+    @traced("webhook.send")
+    def send_notification(self, title:str, message:str, priority:str, tags:str) -> bool:
+        """
+        Send HTTP-Post request with the notification to the configured webhook-URL.
+        """
+        headers:dict = {}
+        if self._auth_token:
+            headers["Authorization"] = f"Bearer {self._auth_token}"
+        try:
+            response = self._session.post(
+                url=self._url,
+                json={
+                    "title": title,
+                    "message": message,
+                    "priority": priority,
+                    "tags": tags.split(",") if tags else [],
+                    "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+                },
+                headers=headers,
+                verify=self._requests_cert_verify,
+                timeout=self._requests_timeout
+            )
+            response.raise_for_status()
+        except requests.RequestException as _e:
+            raise WebhookError(f"Webhook request-error (timeout={self._requests_timeout}s)") from _e
+        self.logger.debug("Sent out alert to '%s' with HTTP-response-code=%s", self._url, response.status_code)
+        return True
+
+    def close(self) -> None:
+        self._session.close()
+        super().close()
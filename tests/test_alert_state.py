@@ -0,0 +1,107 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / alert-state-tests
+
+"""
+import pytest
+#
+from src.alert_state import AlertStateMachine
+from src.thresholds import ThresholdEngine, CRITICAL_LOW, WARNING_LOW, NOMINAL, WARNING_HIGH
+from src.custom_exceptions import *
+
+THRESHOLDS = ThresholdEngine(49.8, 49.9, 50.1, 50.2)
+START_MS:int = 1770822308000 # 2026-02-11T15:05:08+00:00
+
+def feed(alerts:AlertStateMachine, frequencies:list[float], step_ms:int=1000) -> list[tuple[int, int]]:
+    """
+    Feed the frequencies as samples following the last one and return the `(previous, severity)` of all transitions.
+    """
+    transitions:list[tuple[int, int]] = []
+    last_timestamp_ms:int = alerts._state["last_timestamp_ms"] or START_MS - step_ms
+    for (_i, _frequency) in enumerate(frequencies, start=1):
+        transition = alerts.update(last_timestamp_ms + _i * step_ms, _frequency)
+        if transition is not None:
+            transitions.append((transition.previous, transition.severity))
+    return transitions
+
+def test_alert_only_on_transitions() -> None:
+    """
+    Test that a frequency staying below a threshold only causes one alert and one recovery.
+    """
+    alerts = AlertStateMachine(state_filepath=None, thresholds=THRESHOLDS)
+    #
+    assert feed(alerts, [50.0, 49.89, 49.88, 49.85, 49.79, 49.85, 50.0]) == [
+        (NOMINAL, WARNING_LOW),
+        (WARNING_LOW, CRITICAL_LOW),
+        (CRITICAL_LOW, WARNING_LOW),
+        (WARNING_LOW, NOMINAL)
+    ]
+
+def test_hysteresis() -> None:
+    """
+    Test that hovering around a threshold doesn't flap within the hysteresis-band.
+    """
+    alerts = AlertStateMachine(state_filepath=None, thresholds=THRESHOLDS, hysteresis=0.01)
+    #
+    assert feed(alerts, [49.89, 49.905, 49.899, 49.905, 49.91]) == [(NOMINAL, WARNING_LOW)]
+    assert alerts.severity == WARNING_LOW
+    assert feed(alerts, [49.911]) == [(WARNING_LOW, NOMINAL)]
+    # Switching sides is never held back by the hysteresis
+    assert feed(alerts, [50.1, 49.9]) == [(NOMINAL, WARNING_HIGH), (WARNING_HIGH, WARNING_LOW)]
+
+def test_debounce() -> None:
+    """
+    Test that a state has to be held for the debounce-duration, before it's entered.
+    """
+    alerts = AlertStateMachine(state_filepath=None, thresholds=THRESHOLDS, debounce_ms=2000)
+    #
+    # Short spike is ignored
+    assert feed(alerts, [50.0, 49.85, 50.0]) == []
+    assert alerts.pending_severity is None
+    # Sustained deviation is alerted once it has been held for 2 seconds
+    assert feed(alerts, [49.85, 49.85, 49.85, 49.85]) == [(NOMINAL, WARNING_LOW)]
+
+def test_state_survives_restart(tmp_path) -> None:
+    """
+    Test that the state (including a pending debounce) is restored by a new process.
+    """
+    state_filepath = tmp_path / "alert-state.json"
+    alerts = AlertStateMachine(state_filepath=state_filepath, thresholds=THRESHOLDS, debounce_ms=60_000)
+    assert alerts.update(START_MS, 49.85) is None
+    alerts.save()
+    #
+    alerts = AlertStateMachine(state_filepath=state_filepath, thresholds=THRESHOLDS, debounce_ms=60_000)
+    assert alerts.pending_severity == WARNING_LOW
+    transition = alerts.update(START_MS + 60_000, 49.86)
+    assert (transition.previous, transition.severity) == (NOMINAL, WARNING_LOW)
+    alerts.save()
+    #
+    alerts = AlertStateMachine(state_filepath=state_filepath, thresholds=THRESHOLDS, debounce_ms=60_000)
+    assert alerts.severity == WARNING_LOW
+    assert alerts.update(START_MS + 120_000, 49.85) is None
+
+def test_invalid_state_file(tmp_path) -> None:
+    """
+    Test that a corrupt state-file raises `AlertStateError`.
+    """
+    state_filepath = tmp_path / "alert-state.json"
+    state_filepath.write_text("{")
+    #
+    with pytest.raises(AlertStateError):
+        AlertStateMachine(state_filepath=state_filepath, thresholds=THRESHOLDS)
+
+def test_revert_transition(tmp_path) -> None:
+    """
+    Test that a reverted transition isn't saved and is triggered again by the next sample.
+    """
+    state_filepath = tmp_path / "alert-state.json"
+    alerts = AlertStateMachine(state_filepath=state_filepath, thresholds=THRESHOLDS, debounce_ms=2000)
+    assert feed(alerts, [49.85, 49.85]) == []
+    assert feed(alerts, [49.85]) == [(NOMINAL, WARNING_LOW)]
+    alerts.revert()
+    alerts.save()
+    assert alerts.severity == NOMINAL
+    #
+    restored = AlertStateMachine(state_filepath=state_filepath, thresholds=THRESHOLDS, debounce_ms=2000)
+    assert (restored.severity, restored.pending_severity) == (NOMINAL, WARNING_LOW)
+    assert feed(restored, [49.85]) == [(NOMINAL, WARNING_LOW)]
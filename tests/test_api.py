@@ -3,9 +3,11 @@
     eu-grid-frequency-scraper / Unit-tests / api-tests
 
 """
+import time
 import pytest
+import requests
 #
-from src.api import APIHandler
+from src.api import APIHandler, parse_api_data, _parse_api_data_etree
 from src.custom_exceptions import *
 
 def get_apihandler_obj(api_url:str) -> APIHandler:
@@ -15,6 +17,25 @@ def get_apihandler_obj(api_url:str) -> APIHandler:
         requests_cert_verify=True
     )
 
+class FakeSession:
+    """
+    Session, that answers with the given `(status_code, content, headers)`-responses and records the request-headers.
+    """
+    def __init__(self, responses:list[tuple[int, bytes, dict]]) -> None:
+        self.responses:list[tuple[int, bytes, dict]] = responses
+        self.request_headers:list[dict] = []
+
+    def get(self, url:str, headers:dict, verify:bool, timeout:int) -> requests.Response:
+        self.request_headers.append(headers)
+        (status_code, content, response_headers) = self.responses.pop(0)
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = content
+        response.headers.update(response_headers)
+        return response
+
+PAYLOAD:bytes = b"<r><f>50.043</f><z>2026-02-11T15:05:08+00:00</z></r>"
+
 def test_invalid_netzfrequenz_api_url() -> None:
     """
     Test invalid netzfrequenz API-URL.
@@ -22,4 +43,216 @@ def test_invalid_netzfrequenz_api_url() -> None:
     api_handler:APIHandler = get_apihandler_obj(api_url="https://www.netzfrequenzmessung.invalid")
     #
     with pytest.raises(APIRequestError):
-        api_handler.get_api_data()
\ No newline at end of file
+        api_handler.get_api_data()
+
+
+@pytest.mark.parametrize("content", [
+    b"<r><f>50.043</f><z>2026-02-11T15:05:08+00:00</z></r>",
+    b"<r>\n  <f>49.9</f>\n  <z>2026-02-11T15:05:09+00:00</z>\n</r>\n",
+    b"<r><z>2026-02-11T15:05:08+00:00</z><f> 50.1 </f></r>",
+    b"<?xml version=\"1.0\"?><r><f>50.043</f><z>2026-02-11T15:05:08+00:00</z></r>",
+    b"<r><f>50.043</f><!-- comment --><z>2026-02-11T15:05:08+00:00</z></r>",
+    b"<r a=\"1\"><f>50.043</f><z>2026-02-11T15:05:08&#43;00:00</z></r>"
+])
+def test_fast_parser_matches_elementtree(content:bytes) -> None:
+    """
+    Test that the fast-path parser and the `ElementTree`-fallback return the same frequency and timestamp.
+    """
+    (frequency, timestamp) = _parse_api_data_etree(content)
+    #
+    assert parse_api_data(content) == (float(frequency), timestamp)
+
+@pytest.mark.parametrize("content", [
+    b"",
+    b"<r><f>50.043</f></r>",
+    b"<r><f>abc</f><z>2026-02-11T15:05:08+00:00</z></r>",
+    b"<r><f>nan</f><z>2026-02-11T15:05:08+00:00</z></r>",
+    b"<r><f>inf</f><z>2026-02-11T15:05:08+00:00</z></r>",
+    b"<r><f>50.043</f><z>2026-02-11T15:05:08+00:00</z>",
+    b"<r><f>50.043</f><z>2026-02-11T15:05:08+00:00</z></r><r></r>"
+])
+def test_invalid_api_data(content:bytes) -> None:
+    """
+    Test that malformed, incomplete or non-finite API-data raises `APIParseError`.
+    """
+    with pytest.raises(APIParseError):
+        parse_api_data(content)
+
+def test_conditional_requests() -> None:
+    """
+    Test that validators of the API are sent back and `304`-responses are skipped as duplicates.
+    """
+    session = FakeSession([
+        (200, PAYLOAD, {"ETag": "\"abc\"", "Last-Modified": "Wed, 11 Feb 2026 15:05:08 GMT"}),
+        (304, b"", {})
+    ])
+    api_handler = APIHandler(api_url="https://netzfrequenz.invalid", requests_timeout=10,
+                             requests_cert_verify=True, session=session)
+    #
+    assert api_handler.get_new_api_data() == (50.043, "2026-02-11T15:05:08+00:00")
+    assert api_handler.get_new_api_data() is None
+    assert session.request_headers == [{}, {
+        "If-None-Match": "\"abc\"",
+        "If-Modified-Since": "Wed, 11 Feb 2026 15:05:08 GMT"
+    }]
+    assert (api_handler.not_modified_count, api_handler.duplicate_count) == (1, 1)
+    assert api_handler.bytes_saved == len(PAYLOAD)
+
+def test_duplicate_timestamps() -> None:
+    """
+    Test that responses with an unchanged timestamp are skipped, while `get_api_data` returns the last sample.
+    """
+    session = FakeSession([
+        (200, PAYLOAD, {}),
+        (200, PAYLOAD, {}),
+        (200, PAYLOAD.replace(b"50.043", b"50.044"), {}),
+        (200, PAYLOAD.replace(b"15:05:08", b"15:05:09"), {})
+    ])
+    api_handler = APIHandler(api_url="https://netzfrequenz.invalid", requests_timeout=10,
+                             requests_cert_verify=True, session=session)
+    #
+    assert api_handler.get_new_api_data() == (50.043, "2026-02-11T15:05:08+00:00")
+    assert api_handler.get_api_data() == (50.043, "2026-02-11T15:05:08+00:00")
+    assert api_handler.get_new_api_data() is None
+    assert api_handler.get_new_api_data() == (50.043, "2026-02-11T15:05:09+00:00")
+    assert session.request_headers == [{}, {}, {}, {}]
+    assert (api_handler.request_count, api_handler.duplicate_count) == (4, 2)
+
+def test_stale_timestamps() -> None:
+    """
+    Test that samples, that are older than the last sample, are dropped and counted apart from the duplicates.
+    """
+    session = FakeSession([
+        (200, PAYLOAD.replace(b"15:05:08", b"15:05:09"), {}),
+        (200, PAYLOAD, {}),
+        (200, PAYLOAD.replace(b"15:05:08+00:00", b"17:05:09+02:00"), {}),
+        (200, PAYLOAD.replace(b"15:05:08", b"15:05:10"), {})
+    ])
+    api_handler = APIHandler(api_url="https://netzfrequenz.invalid", requests_timeout=10,
+                             requests_cert_verify=True, session=session)
+    #
+    assert api_handler.get_new_api_data() == (50.043, "2026-02-11T15:05:09+00:00")
+    assert api_handler.get_new_api_data() is None
+    assert api_handler.get_new_api_data() is None
+    assert api_handler.get_api_data() == (50.043, "2026-02-11T15:05:10+00:00")
+    assert (api_handler.duplicate_count, api_handler.stale_count) == (0, 2)
+
+class EndpointSession:
+    """
+    Session, that answers every URL with its `(delay, status_code, content)` and records the requested URLs.
+    """
+    def __init__(self, endpoints:dict[str, tuple[float, int, bytes]]) -> None:
+        self.endpoints:dict[str, tuple[float, int, bytes]] = endpoints
+        self.requested_urls:list[str] = []
+
+    def get(self, url:str, headers:dict, verify:bool, timeout:int) -> requests.Response:
+        self.requested_urls.append(url)
+        (delay, status_code, content) = self.endpoints[url]
+        time.sleep(delay)
+        response = requests.Response()
+        (response.status_code, response._content) = (status_code, content)
+        return response
+
+def get_multi_apihandler_obj(session:EndpointSession, fetch_mode:str) -> APIHandler:
+    (primary, *fallbacks) = session.endpoints
+    return APIHandler(
+        api_url=primary,
+        requests_timeout=10,
+        requests_cert_verify=True,
+        session=session,
+        fallback_urls=tuple(fallbacks),
+        fetch_mode=fetch_mode,
+        hedge_delay=0.05
+    )
+
+def test_hedged_request_on_slow_primary() -> None:
+    """
+    Test that a slow primary endpoint is hedged by the next one and the first answer wins.
+    """
+    session = EndpointSession({
+        "https://primary.invalid": (1.0, 200, PAYLOAD),
+        "https://fallback.invalid": (0.0, 200, PAYLOAD.replace(b"50.043", b"50.042"))
+    })
+    api_handler = get_multi_apihandler_obj(session, "hedged")
+    #
+    _start:float = time.monotonic()
+    assert api_handler.get_new_api_data() == (50.042, "2026-02-11T15:05:08+00:00")
+    assert time.monotonic() - _start < 0.5
+    assert api_handler.hedged_count == 1
+    api_handler.close()
+
+def test_hedged_request_on_failed_primary() -> None:
+    """
+    Test that a failed primary endpoint is hedged immediately and only fails, when all endpoints failed.
+    """
+    session = EndpointSession({
+        "https://primary.invalid": (0.0, 500, b""),
+        "https://fallback.invalid": (0.0, 200, PAYLOAD)
+    })
+    api_handler = get_multi_apihandler_obj(session, "hedged")
+    api_handler._hedge_delay = 5.0
+    #
+    _start:float = time.monotonic()
+    assert api_handler.get_new_api_data() == (50.043, "2026-02-11T15:05:08+00:00")
+    assert time.monotonic() - _start < 1.0
+    #
+    session.endpoints["https://fallback.invalid"] = (0.0, 503, b"")
+    with pytest.raises(APIRequestError):
+        api_handler.get_new_api_data()
+    api_handler.close()
+
+def test_quorum_median() -> None:
+    """
+    Test that the quorum-mode takes the median frequency and the newest timestamp of a majority of the endpoints.
+    """
+    session = EndpointSession({
+        "https://a.invalid": (0.0, 200, PAYLOAD),
+        "https://b.invalid": (0.0, 200, PAYLOAD.replace(b"50.043", b"51.0")),
+        "https://c.invalid": (0.0, 200, PAYLOAD.replace(b"50.043", b"50.041").replace(b"15:05:08", b"15:05:09"))
+    })
+    api_handler = get_multi_apihandler_obj(session, "quorum")
+    #
+    assert api_handler.get_new_api_data() == (50.043, "2026-02-11T15:05:09+00:00")
+    assert sorted(session.requested_urls) == sorted(session.endpoints)
+    #
+    session.endpoints["https://a.invalid"] = (0.0, 500, b"")
+    session.endpoints["https://b.invalid"] = (0.0, 500, b"")
+    with pytest.raises(APIRequestError):
+        api_handler.get_new_api_data()
+    api_handler.close()
+
+def test_circuit_breaker_fast_fail() -> None:
+    """
+    Test that requests to an endpoint with an open circuit are skipped, and hedged to the next endpoint immediately.
+    """
+    session = EndpointSession({"https://primary.invalid": (0.0, 503, b"")})
+    api_handler = APIHandler(
+        api_url="https://primary.invalid",
+        requests_timeout=10,
+        requests_cert_verify=True,
+        session=session,
+        breaker_failure_threshold=2
+    )
+    #
+    for _ in range(2):
+        with pytest.raises(APIRequestError):
+            api_handler.get_new_api_data()
+    with pytest.raises(APICircuitOpenError):
+        api_handler.get_new_api_data()
+    assert len(session.requested_urls) == 2
+    assert api_handler.short_circuited_count == 1
+    #
+    session = EndpointSession({
+        "https://primary.invalid": (0.0, 503, b""),
+        "https://fallback.invalid": (0.0, 200, PAYLOAD)
+    })
+    api_handler = get_multi_apihandler_obj(session, "hedged")
+    api_handler._hedge_delay = 5.0
+    api_handler.endpoints[0].breaker._failure_threshold = 1
+    #
+    assert api_handler.get_new_api_data() == (50.043, "2026-02-11T15:05:08+00:00")
+    _start:float = time.monotonic()
+    assert api_handler.get_new_api_data() is None
+    assert time.monotonic() - _start < 1.0
+    assert session.requested_urls.count("https://primary.invalid") == 1
+    api_handler.close()
@@ -0,0 +1,151 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / async-api-tests
+
+"""
+import gzip
+import asyncio
+import pytest
+#
+from src.async_api import AsyncHTTPClient, AsyncAPIHandler
+from src.custom_exceptions import *
+
+PAYLOAD:bytes = b"<r><f>50.043</f><z>2026-02-11T15:05:08+00:00</z></r>"
+
+# Raw responses of the stub by request-path
+RESPONSES:dict[bytes, bytes] = {
+    b"/length": b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\nETag: \"abc\"\r\n\r\n%s" % (len(PAYLOAD), PAYLOAD),
+    b"/chunked": b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n10\r\n%s\r\n%x\r\n%s\r\n0\r\n\r\n" % (
+        PAYLOAD[:16], len(PAYLOAD) - 16, PAYLOAD[16:]
+    ),
+    b"/not-modified": b"HTTP/1.1 304 Not Modified\r\n\r\n",
+    b"/error": b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\n\r\n",
+    b"/close": b"HTTP/1.0 200 OK\r\n\r\n%s" % PAYLOAD,
+    b"/gzip": b"HTTP/1.1 200 OK\r\nContent-Encoding: gzip\r\nContent-Length: %d\r\n\r\n%s" % (
+        len(gzip.compress(PAYLOAD)), gzip.compress(PAYLOAD)
+    ),
+    b"/redirect": b"HTTP/1.1 302 Found\r\nLocation: /length\r\nContent-Length: 0\r\n\r\n",
+    b"/redirect-loop": b"HTTP/1.1 301 Moved Permanently\r\nLocation: /redirect-loop\r\nContent-Length: 0\r\n\r\n",
+    # Malformed responses
+    b"/truncated-chunk": b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n40\r\n%s" % PAYLOAD[:16],
+    b"/bad-chunk-size": b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nxyz\r\n%s\r\n0\r\n\r\n" % PAYLOAD,
+    b"/unterminated-chunk": b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n10\r\n%s" % PAYLOAD[:20],
+    b"/huge-chunk": b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nffffffff\r\n%s" % PAYLOAD,
+    b"/truncated-length": b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(PAYLOAD) + 10, PAYLOAD),
+    b"/negative-length": b"HTTP/1.1 200 OK\r\nContent-Length: -1\r\n\r\n%s" % PAYLOAD,
+    b"/missing-length": b"HTTP/1.1 200 OK\r\n\r\n%s" % PAYLOAD,
+    b"/bad-status": b"HTTP/1.1 OK\r\nContent-Length: 0\r\n\r\n",
+    b"/bad-gzip": b"HTTP/1.1 200 OK\r\nContent-Encoding: gzip\r\nContent-Length: %d\r\n\r\n%s" % (len(PAYLOAD), PAYLOAD),
+    b"/unknown-encoding": b"HTTP/1.1 200 OK\r\nContent-Encoding: br\r\nContent-Length: %d\r\n\r\n%s" % (len(PAYLOAD), PAYLOAD)
+}
+# The stub closes the connection after these responses, all others are kept alive
+CLOSING_PATHS:tuple[bytes, ...] = (b"/close", b"/truncated-chunk", b"/unterminated-chunk", b"/huge-chunk", b"/truncated-length")
+
+async def run_with_stub(test) -> None:
+    """
+    Run the test-coroutine with the URL of a stub, that answers requests by their path and records the requests.
+    """
+    requests:list[bytes] = []
+
+    async def _handle(reader:asyncio.StreamReader, writer:asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request:bytes = await reader.readuntil(b"\r\n\r\n")
+                requests.append(request)
+                path:bytes = request.split(b" ", 2)[1]
+                if path == b"/slow":
+                    await asyncio.sleep(1.0)
+                writer.write(RESPONSES.get(path, RESPONSES[b"/length"]))
+                await writer.drain()
+                if path in CLOSING_PATHS:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(_handle, "127.0.0.1", 0)
+    port:int = server.sockets[0].getsockname()[1]
+    async with server:
+        await test(f"http://127.0.0.1:{port}", requests)
+
+def test_response_framing() -> None:
+    """
+    Test `Content-Length`, chunked and close-delimited responses and the reuse of keep-alive connections.
+    """
+    async def _test(base_url:str, requests:list[bytes]) -> None:
+        client = AsyncHTTPClient(timeout=5.0)
+        for _path in ("/length", "/chunked", "/close", "/length", "/length"):
+            (status_code, headers, body) = await client.get(base_url + _path)
+            assert (status_code, body) == (200, PAYLOAD)
+        # The close-delimited response needed a new connection
+        assert client.connect_count == 2
+        client.close()
+    #
+    asyncio.run(run_with_stub(_test))
+
+def test_errors_and_timeouts() -> None:
+    """
+    Test that status-codes >= 400, timeouts and unreachable hosts raise `APIRequestError`.
+    """
+    async def _test(base_url:str, requests:list[bytes]) -> None:
+        client = AsyncHTTPClient(timeout=0.2)
+        for _url in (base_url + "/error", base_url + "/slow", "http://127.0.0.1:9/", "ftp://127.0.0.1/"):
+            with pytest.raises(APIRequestError):
+                await client.get(_url)
+        client.close()
+    #
+    asyncio.run(run_with_stub(_test))
+
+def test_conditional_requests() -> None:
+    """
+    Test that the async API-handler sends the validators and skips `304`-responses and duplicates.
+    """
+    async def _test(base_url:str, requests:list[bytes]) -> None:
+        client = AsyncHTTPClient(timeout=5.0)
+        apihandler = AsyncAPIHandler(api_url=base_url + "/length", client=client)
+        assert await apihandler.get_new_api_data() == (50.043, "2026-02-11T15:05:08+00:00")
+        assert await apihandler.get_new_api_data() is None
+        assert b"If-None-Match: \"abc\"" in requests[-1]
+        #
+        apihandler.endpoint.url = base_url + "/not-modified"
+        assert await apihandler.get_new_api_data() is None
+        assert (apihandler.duplicate_count, apihandler.not_modified_count) == (2, 1)
+        client.close()
+    #
+    asyncio.run(run_with_stub(_test))
+
+def test_redirects_and_gzip() -> None:
+    """
+    Test that redirects are followed (but not endlessly) and gzip-encoded bodies are decoded.
+    """
+    async def _test(base_url:str, requests:list[bytes]) -> None:
+        client = AsyncHTTPClient(timeout=5.0)
+        for _path in ("/gzip", "/redirect"):
+            (status_code, headers, body) = await client.get(base_url + _path)
+            assert (status_code, body) == (200, PAYLOAD)
+        assert b"Accept-Encoding: gzip" in requests[0]
+        with pytest.raises(APIRequestError):
+            await client.get(base_url + "/redirect-loop")
+        client.close()
+    #
+    asyncio.run(run_with_stub(_test))
+
+@pytest.mark.parametrize("path", [
+    "/truncated-chunk", "/bad-chunk-size", "/unterminated-chunk", "/huge-chunk", "/truncated-length",
+    "/negative-length", "/missing-length", "/bad-status", "/bad-gzip", "/unknown-encoding"
+])
+def test_malformed_responses(path:str) -> None:
+    """
+    Test that malformed responses raise `APIRequestError` instead of hanging or returning a truncated body.
+    """
+    async def _test(base_url:str, requests:list[bytes]) -> None:
+        client = AsyncHTTPClient(timeout=0.5)
+        # Reuse a keep-alive connection for the malformed response
+        assert (await client.get(base_url + "/length"))[2] == PAYLOAD
+        with pytest.raises(APIRequestError):
+            await client.get(base_url + path)
+        assert (await client.get(base_url + "/length"))[2] == PAYLOAD
+        client.close()
+    #
+    asyncio.run(run_with_stub(_test))
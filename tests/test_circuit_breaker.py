@@ -0,0 +1,69 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / circuit-breaker-tests
+
+"""
+from src.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now:float = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_open_after_consecutive_failures() -> None:
+    """
+    Test that the circuit only opens after the threshold of consecutive failures and then rejects requests.
+    """
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30.0, clock=FakeClock())
+    #
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.consecutive_failures == 0
+    #
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    assert (breaker.open_count, breaker.rejected_count) == (1, 1)
+
+def test_half_open_probe() -> None:
+    """
+    Test that a single probe is allowed after the reset-timeout, which closes or reopens the circuit.
+    """
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30.0, clock=clock)
+    breaker.allow_request()
+    breaker.record_failure()
+    #
+    clock.now = 29.9
+    assert not breaker.allow_request()
+    clock.now = 30.0
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN and breaker.is_probing
+    # Only one probe at a time
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.open_count == 2
+    #
+    clock.now = 60.0
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow_request()
+
+def test_disabled() -> None:
+    """
+    Test that a failure-threshold of 0 never opens the circuit.
+    """
+    breaker = CircuitBreaker("test", failure_threshold=0)
+    #
+    for _ in range(100):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
@@ -3,6 +3,8 @@
     eu-grid-frequency-scraper / Unit-tests / config-tests
 
 """
+import os
+import re
 import pytest
 import src.config as config 
 #
@@ -54,6 +56,30 @@ def test_invalid_ntfy_http_timeout_below_zero(monkeypatch) -> None:
     #
     with pytest.raises(InvalidConfigError):
         config.load_config()
+
+def test_invalid_daemon_poll_interval_below_zero(monkeypatch) -> None:
+    """
+    Test negative `DAEMON_POLL_INTERVAL` float
+    """
+    set_default_env(monkeypatch)
+    #
+    # negative float
+    monkeypatch.setenv("DAEMON_POLL_INTERVAL", "-0.5")
+    #
+    with pytest.raises(InvalidConfigError):
+        config.load_config()
+
+def test_invalid_ntfy_queue_size_zero(monkeypatch) -> None:
+    """
+    Test zero `NTFY_QUEUE_SIZE` integer
+    """
+    set_default_env(monkeypatch)
+    #
+    # zero integer
+    monkeypatch.setenv("NTFY_QUEUE_SIZE", "0")
+    #
+    with pytest.raises(InvalidConfigError):
+        config.load_config()
         
 def test_invalid_warning_min_hz_threshold_below_zero(monkeypatch) -> None:
     """
@@ -244,4 +270,53 @@ def test_invalid_hz_threshold_min_warning_equals_min_critical(monkeypatch) -> No
     monkeypatch.setenv("WARNING_MIN_HZ_ALERT_THRESHOLD", "1.0")
     #
     with pytest.raises(InvalidMaxMinThresholdError):
-        config.load_config()
\ No newline at end of file
+        config.load_config()
+#------------------------------------------------------------------------------------
+# Config-snapshot
+#------------------------------------------------------------------------------------
+
+def test_config_env_names_are_complete() -> None:
+    """
+    Test that the snapshot-key covers every environment-variable, that is read by `load_config()`.
+    """
+    with open(config.__file__, "r") as _file:
+        read_names:set[str] = set(re.findall(r"os\.getenv\('([A-Z_]+)'", _file.read()))
+    #
+    assert read_names == set(config.CONFIG_ENV_NAMES)
+
+def test_config_snapshot(monkeypatch, tmp_path) -> None:
+    """
+    Test that the config-snapshot is reused until the dotenv-file or a variable of the environment changes.
+    """
+    set_default_env(monkeypatch)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("ALERT_DEBOUNCE_SECONDS", "0")
+    monkeypatch.delenv("API_FALLBACK_URLS", raising=False)
+    dotenv_filepath = tmp_path / ".env"
+    dotenv_filepath.write_text('ALERT_DEBOUNCE_SECONDS="2"\nAPI_FALLBACK_URLS="https://a.invalid,https://b.invalid"\n')
+    snapshot_filepath = config.get_config_snapshot_filepath()
+    #
+    loaded = config.load_config(snapshot_filepath=snapshot_filepath)
+    assert loaded.alert_debounce_seconds == 2.0
+    assert snapshot_filepath.stat().st_mode & 0o077 == 0
+    assert loaded.api_fallback_urls == ("https://a.invalid", "https://b.invalid")
+    # The key is computed from the environment before the dotenv-file is loaded
+    monkeypatch.setenv("ALERT_DEBOUNCE_SECONDS", "0")
+    monkeypatch.delenv("API_FALLBACK_URLS")
+    #
+    # A valid snapshot is used instead of the dotenv-file
+    monkeypatch.setattr(config, "_parse_config", lambda: pytest.fail("Parsed the config despite a valid snapshot"))
+    assert config.load_config(snapshot_filepath=snapshot_filepath) == loaded
+    assert os.environ["ALERT_DEBOUNCE_SECONDS"] == "2"
+    monkeypatch.undo()
+    #
+    # A changed dotenv-file invalidates the snapshot
+    set_default_env(monkeypatch)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("ALERT_DEBOUNCE_SECONDS", "0")
+    dotenv_filepath.write_text('ALERT_DEBOUNCE_SECONDS="3"\n')
+    assert config.load_config(snapshot_filepath=snapshot_filepath).alert_debounce_seconds == 3.0
+    # A changed variable of the environment invalidates the snapshot
+    monkeypatch.setenv("ALERT_DEBOUNCE_SECONDS", "0")
+    monkeypatch.setenv("ALERT_HYSTERESIS_HZ", "0.05")
+    assert config.load_config(snapshot_filepath=snapshot_filepath).alert_hysteresis_hz == 0.05
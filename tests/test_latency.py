@@ -0,0 +1,61 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / latency-tests
+
+"""
+import pytest
+#
+from src.latency import LatencyHistogram
+
+def test_quantiles() -> None:
+    """
+    Test that the quantiles are accurate to the bucket-growth.
+    """
+    histogram = LatencyHistogram(growth=1.1)
+    for _i in range(1, 1001):
+        histogram.add(_i / 1000)
+    #
+    assert histogram.count == 1000
+    assert histogram.mean == pytest.approx(0.5005)
+    for (_q, _expected) in ((0.5, 0.5), (0.95, 0.95), (0.99, 0.99)):
+        assert _expected <= histogram.quantile(_q) <= _expected * 1.1
+
+def test_out_of_range_latencies() -> None:
+    """
+    Test that latencies below/above the range are counted in the first/last bucket.
+    """
+    histogram = LatencyHistogram(min_latency=0.001, max_latency=1.0)
+    #
+    assert histogram.quantile(0.5) is None
+    histogram.add(0.0)
+    histogram.add(1000.0)
+    assert histogram.quantile(0.0) == 0.001
+    assert histogram.quantile(1.0) >= 1.0
+
+def test_merge() -> None:
+    """
+    Test that merged histograms have the quantiles of all latencies.
+    """
+    (first, second) = (LatencyHistogram(), LatencyHistogram())
+    for _i in range(100):
+        first.add(0.01)
+        second.add(1.0)
+    #
+    first.merge(second)
+    assert first.count == 200
+    assert first.quantile(0.25) < 0.02 and first.quantile(0.75) >= 1.0
+    with pytest.raises(ValueError):
+        first.merge(LatencyHistogram(growth=2.0))
+
+def test_adaptive_timeout() -> None:
+    """
+    Test that the adaptive timeout is a multiple of the P99-latency within its bounds.
+    """
+    histogram = LatencyHistogram()
+    #
+    assert histogram.timeout(max_timeout=10.0) == 10.0
+    for _ in range(100):
+        histogram.add(0.2)
+    assert 0.6 <= histogram.timeout(max_timeout=10.0, multiplier=3.0) <= 0.6 * 1.1
+    assert histogram.timeout(max_timeout=0.5, multiplier=3.0) == 0.5
+    assert histogram.timeout(max_timeout=10.0, multiplier=1.0, min_timeout=1.0) == 1.0
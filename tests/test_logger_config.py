@@ -0,0 +1,43 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / logger-config-tests
+
+"""
+import json
+import queue
+import logging
+#
+from src.logger_config import JSONFormatter, _RecordQueueHandler
+
+def create_record(msg:str, args:tuple, exc_info=None) -> logging.LogRecord:
+    return logging.LogRecord("APIHandler", logging.WARNING, __file__, 1, msg, args, exc_info, func="_fetch")
+
+def test_json_formatter() -> None:
+    """
+    Test that records are formatted as one JSON-object per line with the lazily merged message.
+    """
+    line:str = JSONFormatter().format(create_record("Request to '%s' failed: %s", ("https://api.invalid", "timeout")))
+    #
+    assert "\n" not in line
+    entry:dict = json.loads(line)
+    assert entry["msg"] == "Request to 'https://api.invalid' failed: timeout"
+    assert (entry["level"], entry["logger"], entry["func"]) == ("WARNING", "APIHandler", "_fetch")
+    assert entry["ts"].endswith("+00:00")
+    assert "exc" not in entry
+
+def test_queued_records_keep_the_traceback_separate() -> None:
+    """
+    Test that queued records are merged on the calling thread, but still formatted with the traceback as `exc`.
+    """
+    log_queue:queue.SimpleQueue = queue.SimpleQueue()
+    handler = _RecordQueueHandler(log_queue)
+    try:
+        raise ValueError("invalid frequency")
+    except ValueError as _e:
+        handler.handle(create_record("Couldn't parse %d bytes", (52,), exc_info=(type(_e), _e, _e.__traceback__)))
+    #
+    record:logging.LogRecord = log_queue.get_nowait()
+    assert (record.msg, record.args, record.exc_info) == ("Couldn't parse 52 bytes", None, None)
+    entry:dict = json.loads(JSONFormatter().format(record))
+    assert entry["msg"] == "Couldn't parse 52 bytes"
+    assert "ValueError: invalid frequency" in entry["exc"]
@@ -0,0 +1,69 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / metrics-tests
+
+"""
+import requests
+#
+from src.api import APIHandler
+from src.latency import LatencyHistogram
+from src.metrics import MetricsExporter, histogram_family, metric_family, api_collector
+from src.thresholds import ThresholdEngine
+from src.custom_exceptions import *
+
+def test_histogram_family() -> None:
+    """
+    Test that the `le`-buckets are cumulative and end with the total count.
+    """
+    histogram = LatencyHistogram()
+    for _latency in (0.002, 0.02, 0.02, 0.2, 20.0):
+        histogram.add(_latency)
+    #
+    lines:list[str] = histogram_family("test_seconds", "Test.", [({"endpoint": "a"}, histogram)], buckets=(0.01, 0.1, 1.0))
+    assert lines[:2] == ["# HELP test_seconds Test.", "# TYPE test_seconds histogram"]
+    assert [_line.rsplit(" ", 1)[1] for _line in lines if "_bucket" in _line] == ["1", "3", "4", "5"]
+    assert 'test_seconds_bucket{endpoint="a",le="+Inf"} 5' in lines
+    assert "test_seconds_count{endpoint=\"a\"} 5" in lines
+
+def test_api_collector_counts_errors() -> None:
+    """
+    Test that failed fetches are counted by exception-class next to the successful ones.
+    """
+    class _Session:
+        def get(self, url:str, headers:dict, verify:bool, timeout:float) -> requests.Response:
+            response = requests.Response()
+            (response.status_code, response._content) = (200, self.content)
+            return response
+    session = _Session()
+    apihandler = APIHandler(api_url="https://api.invalid", requests_timeout=10, requests_cert_verify=True, session=session)
+    #
+    session.content = b"<r><f>50.043</f><z>2026-02-11T15:05:08+00:00</z></r>"
+    apihandler.get_new_api_data()
+    session.content = b"<r><f>x</f><z>2026-02-11T15:05:09+00:00</z></r>"
+    try:
+        apihandler.get_new_api_data()
+    except APIParseError:
+        pass
+    lines:list[str] = api_collector(apihandler, ThresholdEngine(49.8, 49.9, 50.1, 50.2))()
+    assert 'gridfreq_api_fetches_total{result="success"} 1' in lines
+    assert 'gridfreq_api_fetches_total{result="APIParseError"} 1' in lines
+    assert "gridfreq_frequency_hz 50.043" in lines
+    assert "gridfreq_severity 0" in lines
+    assert "gridfreq_api_parse_seconds_count 2" in lines
+
+def test_exporter_serves_metrics() -> None:
+    """
+    Test that the metrics are served on `/metrics` in the text exposition format.
+    """
+    exporter = MetricsExporter(host="127.0.0.1", port=0)
+    exporter.add_collector(lambda: metric_family("test_total", "counter", "Test.", [(None, 3)]))
+    exporter.start()
+    try:
+        url:str = f"http://127.0.0.1:{exporter.address[1]}"
+        response = requests.get(f"{url}/metrics", timeout=5)
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert "test_total 3\n" in response.text
+        assert requests.get(f"{url}/other", timeout=5).status_code == 404
+    finally:
+        exporter.stop()
@@ -0,0 +1,214 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / notifier-tests
+
+"""
+import json
+import time
+import socket
+import threading
+import requests
+import pytest
+#
+from src.notifiers import Notifier, NotificationDispatcher, FileNotifier, SyslogNotifier
+from src.webhook import WebhookNotifier
+from src.custom_exceptions import *
+
+class RecordingNotifier(Notifier):
+    """
+    Channel, that records the notifications, optionally blocks until `block` is set and fails every time with `fail`.
+    """
+    def __init__(self, name:str, block:threading.Event|None = None, fail:bool = False) -> None:
+        super().__init__(name=name)
+        self.sent:list[str] = []
+        self.block:threading.Event|None = block
+        self.fail:bool = fail
+
+    def send_notification(self, title:str, message:str, priority:str, tags:str) -> bool:
+        if self.block is not None:
+            self.block.wait()
+        if self.fail:
+            raise NotifierError(f"{self.name} is down")
+        self.sent.append(title)
+        return True
+
+class FakeResponse:
+    status_code:int = 200
+
+    def raise_for_status(self) -> None:
+        pass
+
+class FakeSession:
+    """
+    Session, that records the JSON-payloads of the POST-requests or raises `error`.
+    """
+    def __init__(self, error:Exception|None = None) -> None:
+        self.payloads:list[dict] = []
+        self.error:Exception|None = error
+
+    def post(self, url:str, json:dict, headers:dict, verify:bool, timeout:float) -> FakeResponse:
+        if self.error is not None:
+            raise self.error
+        self.payloads.append(json)
+        return FakeResponse()
+
+def test_slow_channel_does_not_delay_the_others() -> None:
+    """
+    Test that notifications are delivered to all channels in parallel, while one channel blocks.
+    """
+    block = threading.Event()
+    (fast, slow) = (RecordingNotifier("fast"), RecordingNotifier("slow", block=block))
+    dispatcher = NotificationDispatcher([fast, slow])
+    dispatcher.start()
+    #
+    _notify_start:float = time.perf_counter()
+    for _i in range(3):
+        assert dispatcher.notify(title=f"Alert {_i}", message="Message", priority="urgent", tags="warning")
+    assert time.perf_counter() - _notify_start < 0.5
+    deadline:float = time.monotonic() + 5
+    while len(fast.sent) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert fast.sent == ["Alert 0", "Alert 1", "Alert 2"]
+    assert slow.sent == []
+    block.set()
+    assert dispatcher.stop(timeout=5)
+    assert slow.sent == ["Alert 0", "Alert 1", "Alert 2"]
+    assert (fast.latencies.count, slow.latencies.count) == (3, 3)
+
+def test_failing_channel_is_counted() -> None:
+    """
+    Test that a failing channel doesn't stop the delivery to the other channels, but fails the stop.
+    """
+    (working, failing) = (RecordingNotifier("working"), RecordingNotifier("failing", fail=True))
+    dispatcher = NotificationDispatcher([working, failing])
+    dispatcher.start()
+    #
+    assert dispatcher.notify(title="Alert", message="Message", priority="urgent", tags="warning")
+    assert not dispatcher.stop(timeout=5)
+    assert (working.sent_count, working.failed_count) == (1, 0)
+    assert (failing.sent_count, failing.failed_count) == (0, 1)
+    assert failing.error_counts == {"NotifierError": 1}
+
+def test_drop_when_queue_of_channel_is_full() -> None:
+    """
+    Test that the queue of every channel is bounded, while the other channels still get every notification.
+    """
+    block = threading.Event()
+    (fast, slow) = (RecordingNotifier("fast"), RecordingNotifier("slow", block=block))
+    dispatcher = NotificationDispatcher([fast, slow], max_pending=2)
+    dispatcher.start()
+    #
+    results:list[bool] = []
+    for _i in range(6):
+        results.append(dispatcher.notify(title=f"Alert {_i}", message="Message", priority="urgent", tags="warning"))
+        deadline:float = time.monotonic() + 5
+        while len(fast.sent) <= _i and time.monotonic() < deadline:
+            time.sleep(0.01)
+    block.set()
+    assert not dispatcher.stop(timeout=5)
+    assert not all(results)
+    assert len(fast.sent) == 6
+    assert dispatcher.dropped_counts["fast"] == 0
+    assert dispatcher.dropped_counts["slow"] == 6 - len(slow.sent) > 0
+
+def test_delivery_timeout_of_blocked_channel() -> None:
+    """
+    Test that a delivery, that exceeds the delivery-timeout of its channel, is abandoned and counted,
+    and that the next notifications are dropped without a spool, while the channel is still blocked.
+    """
+    block = threading.Event()
+    (fast, slow) = (RecordingNotifier("fast"), RecordingNotifier("slow", block=block))
+    dispatcher = NotificationDispatcher([fast, slow], delivery_timeouts={"fast": 1.0, "slow": 0.1})
+    dispatcher.start()
+    #
+    for _i in range(2):
+        assert dispatcher.notify(title=f"Alert {_i}", message="Message", priority="urgent", tags="warning")
+    _stop_start:float = time.monotonic()
+    assert not dispatcher.stop(timeout=5)
+    assert time.monotonic() - _stop_start < 1.0
+    assert fast.sent == ["Alert 0", "Alert 1"]
+    assert slow.error_counts == {"DeliveryTimeout": 2}
+    assert slow.latencies.count == 2
+    assert dispatcher.dropped_counts == {"fast": 0, "slow": 1}
+    # The abandoned delivery still finishes in the background
+    block.set()
+    deadline:float = time.monotonic() + 5
+    while not slow.sent and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert slow.sent == ["Alert 0"]
+
+def test_notifier_is_abstract() -> None:
+    """
+    Test that a channel without `send_notification` can't be instantiated.
+    """
+    with pytest.raises(TypeError):
+        Notifier(name="abstract")
+
+def test_channel_with_worker_bypasses_the_queue() -> None:
+    """
+    Test that a channel with its own background-worker gets the notification directly from `notify()`.
+    """
+    class WorkerNotifier(RecordingNotifier):
+        has_worker:bool = True
+
+        def notify(self, **kwargs) -> bool:
+            self.sent.append((kwargs["title"], threading.current_thread().name))
+            return True
+
+    (worker, other) = (WorkerNotifier("worker"), RecordingNotifier("other"))
+    dispatcher = NotificationDispatcher([worker, other])
+    dispatcher.start()
+    assert dispatcher.notify(title="Alert", message="Message", priority="urgent", tags="warning")
+    assert dispatcher.stop(timeout=5)
+    assert worker.sent == [("Alert", threading.current_thread().name)]
+    assert other.sent == ["Alert"]
+
+def test_file_notifier_appends_json_lines(tmp_path) -> None:
+    """
+    Test that every notification is appended as JSON-line to the alert-file.
+    """
+    notifier = FileNotifier(filepath=str(tmp_path / "alerts" / "alerts.jsonl"))
+    assert notifier.notify(title="Alert", message="Line 1\nLine 2", priority="urgent", tags="rotating_light")
+    assert notifier.notify(title="Recovery", message="Message", priority="default", tags="white_check_mark")
+    #
+    lines:list[dict] = [json.loads(_line) for _line in (tmp_path / "alerts" / "alerts.jsonl").read_text().splitlines()]
+    assert [(_line["title"], _line["priority"]) for _line in lines] == [("Alert", "urgent"), ("Recovery", "default")]
+    assert lines[0]["message"] == "Line 1\nLine 2"
+
+def test_syslog_notifier(tmp_path) -> None:
+    """
+    Test that notifications are logged as single line to a syslog-socket and an unavailable socket fails.
+    """
+    socket_path:str = str(tmp_path / "log")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    server.bind(socket_path)
+    server.settimeout(5)
+    notifier = SyslogNotifier(address=socket_path, facility="daemon")
+    #
+    assert notifier.notify(title="CRITICAL - Alert", message="Grid frequency fell.\n\n> Current Frequency=49.7Hz",
+                           priority="urgent", tags="rotating_light")
+    line:str = server.recv(4096).decode()
+    # Facility daemon (3) * 8 + severity crit (2)
+    assert line.startswith("<26>eu-grid-frequency-scraper: CRITICAL - Alert: Grid frequency fell. | Current Frequency=49.7Hz")
+    server.close()
+    notifier.close()
+    #
+    unavailable = SyslogNotifier(address=str(tmp_path / "missing"))
+    assert not unavailable.notify(title="Alert", message="Message", priority="urgent", tags="warning")
+    assert unavailable.failed_count == 1
+
+def test_webhook_notifier() -> None:
+    """
+    Test that the webhook gets the notification as JSON and request-errors are raised as `WebhookError`.
+    """
+    session = FakeSession()
+    webhook = WebhookNotifier(url="https://webhook.invalid", auth_token=None, requests_timeout=1,
+                              requests_cert_verify=True, session=session)
+    assert webhook.notify(title="Alert", message="Message", priority="urgent", tags="rotating_light,warning")
+    assert {_key: session.payloads[0][_key] for _key in ("title", "priority", "tags")} == \
+        {"title": "Alert", "priority": "urgent", "tags": ["rotating_light", "warning"]}
+    #
+    failing = WebhookNotifier(url="https://webhook.invalid", auth_token="abc", requests_timeout=1,
+                              requests_cert_verify=True, session=FakeSession(error=requests.ConnectionError()))
+    with pytest.raises(WebhookError):
+        failing.send_notification(title="Alert", message="Message", priority="urgent", tags="warning")
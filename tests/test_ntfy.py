@@ -0,0 +1,146 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / ntfy-tests
+
+"""
+import time
+import threading
+#
+from src.ntfy import NTFYHandler
+from src.custom_exceptions import *
+
+class RecordingNTFYHandler(NTFYHandler):
+    """
+    NTFY-handler, that records the notifications instead of sending them and fails the first `failures` times.
+    """
+    def __init__(self, failures:int=0, block:threading.Event|None=None, **kwargs) -> None:
+        super().__init__(topic_url="https://ntfy.invalid", auth_token="abcdefgh",
+                         requests_timeout=1, requests_cert_verify=False, **kwargs)
+        self.sent:list[tuple[str, str]] = []
+        self.failures:int = failures
+        self.block:threading.Event|None = block
+
+    def send_notification(self, title:str, message:str, priority:str, tags:str) -> bool:
+        if self.block is not None:
+            self.block.wait()
+        if self.failures:
+            self.failures -= 1
+            raise NTFYError("NTFY request-error")
+        self.sent.append((title, message))
+        return True
+
+def test_notify_without_worker_sends_synchronously() -> None:
+    """
+    Test that notifications are sent directly, when the worker hasn't been started.
+    """
+    ntfy = RecordingNTFYHandler()
+    #
+    assert ntfy.notify(title="Title", message="Message", priority="high", tags="warning")
+    assert ntfy.sent == [("Title", "Message")]
+    assert ntfy.sent_count == 1
+
+def test_retry_with_backoff() -> None:
+    """
+    Test that failed notifications are retried and counted as failed after the last retry.
+    """
+    ntfy = RecordingNTFYHandler(failures=2, max_retries=2, retry_backoff=0.0)
+    assert ntfy.notify(title="Title", message="Message", priority="high", tags="warning")
+    assert ntfy.sent_count == 1
+    #
+    ntfy.failures = 3
+    assert not ntfy.notify(title="Title", message="Message", priority="high", tags="warning")
+    assert ntfy.failed_count == 1
+
+def test_retries_within_delivery_timeout() -> None:
+    """
+    Test that a notification is given up, when the next retry wouldn't finish within the delivery-timeout.
+    """
+    ntfy = RecordingNTFYHandler(failures=4, max_retries=3, retry_backoff=0.2, adaptive_timeout=False,
+                                delivery_timeout=1.5)
+    _start:float = time.monotonic()
+    assert not ntfy.notify(title="Title", message="Message", priority="high", tags="warning")
+    assert time.monotonic() - _start < 0.5
+    assert ntfy.failures == 2
+    assert ntfy.error_counts == {"NTFYError": 2, "DeliveryTimeout": 1}
+
+def test_notify_does_not_block() -> None:
+    """
+    Test that queuing notifications doesn't block on a slow NTFY-instance and drops them when the queue is full.
+    """
+    block = threading.Event()
+    ntfy = RecordingNTFYHandler(block=block, queue_size=2)
+    ntfy.start()
+    try:
+        _start:float = time.monotonic()
+        results:list[bool] = [
+            ntfy.notify(title=f"Title {_i}", message="Message", priority="high", tags="warning")
+            for _i in range(5)
+        ]
+        assert time.monotonic() - _start < 0.5
+        # One notification is in-flight, two are queued and the rest is dropped
+        assert results.count(False) == ntfy.dropped_count >= 2
+        assert ntfy.queue_depth <= 2
+    finally:
+        block.set()
+    assert not ntfy.stop(timeout=5)
+    assert ntfy.sent_count == 5 - ntfy.dropped_count
+    assert ntfy.queue_depth == 0
+
+def test_coalesce_burst_of_alerts() -> None:
+    """
+    Test that the first alert of a burst is sent right away and the following alerts with the same key
+    are merged into one summary with the count and extreme value.
+    """
+    ntfy = RecordingNTFYHandler(coalesce_window=0.3)
+    ntfy.start()
+    for _frequency in (49.84, 49.79, 49.82):
+        ntfy.notify(title="WARNING - LOW", message=f"Current Frequency={_frequency}Hz", priority="high",
+                    tags="warning", coalesce_key="WARNING-LOW", value=_frequency, lower_is_extreme=True)
+    ntfy.notify(title="WARNING - HIGH", message="Current Frequency=50.16Hz", priority="high",
+                tags="warning", coalesce_key="WARNING-HIGH", value=50.16)
+    time.sleep(0.1)
+    # The summary is only sent at the end of the window
+    assert [_title for (_title, _message) in ntfy.sent] == ["WARNING - LOW", "WARNING - HIGH"]
+    assert "Current Frequency=49.84Hz" in ntfy.sent[0][1]
+    time.sleep(0.5)
+    assert ntfy.stop(timeout=5)
+    #
+    assert len(ntfy.sent) == 3
+    (title, message) = ntfy.sent[2]
+    assert title == "WARNING - LOW (x2)"
+    assert "Current Frequency=49.79Hz" in message
+    assert ntfy.coalesced_count == 1
+
+def test_coalesced_summary_keeps_the_unit() -> None:
+    """
+    Test that the extreme value of a summary is given in the unit of its alerts (e.g. Hz/s of RoCoF-alerts).
+    """
+    ntfy = RecordingNTFYHandler(coalesce_window=60.0)
+    ntfy.start()
+    for _rocof in (0.6, 0.9, 0.7):
+        ntfy.notify(title="WARNING - RoCoF HIGH", message=f"Current RoCoF={_rocof}Hz/s", priority="high",
+                    tags="warning", coalesce_key="ROCOF-WARNING-HIGH", value=_rocof, unit="Hz/s")
+    for _i in range(3):
+        ntfy.notify(title="RECOVERED", message="Recovered", priority="default", tags="white_check_mark",
+                    coalesce_key="RECOVERED-FREQUENCY-WARNING-LOW")
+    time.sleep(0.1)
+    assert ntfy.stop(timeout=5)
+    #
+    messages:dict[str, str] = dict(ntfy.sent[2:])
+    assert messages["WARNING - RoCoF HIGH (x2)"].endswith("extreme value=0.9Hz/s")
+    assert messages["RECOVERED (x2)"].endswith("after the first one")
+
+def test_stop_sends_queued_notifications() -> None:
+    """
+    Test that stopping the worker sends the queued notifications and summaries without waiting for the coalesce-window.
+    """
+    ntfy = RecordingNTFYHandler(coalesce_window=60.0)
+    ntfy.start()
+    for _frequency in (49.5, 49.4):
+        ntfy.notify(title="CRITICAL - LOW", message=f"Current Frequency={_frequency}Hz", priority="urgent",
+                    tags="rotating_light", coalesce_key="CRITICAL-LOW", value=_frequency, lower_is_extreme=True)
+    #
+    _start:float = time.monotonic()
+    assert ntfy.stop(timeout=5)
+    assert time.monotonic() - _start < 1.0
+    assert ntfy.sent_count == 2
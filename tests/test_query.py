@@ -0,0 +1,63 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / query-tests
+
+"""
+import random
+import pytest
+#
+import src.store
+import src.query
+from src.store import SampleStore
+from src.query import query_range
+
+START_MS:int = 1770768000000 # 2026-02-11T00:00:00+00:00
+
+@pytest.fixture
+def store(tmp_path, monkeypatch) -> SampleStore:
+    """
+    Store with samples every 60 seconds over three days and small blocks.
+    """
+    monkeypatch.setattr(src.store, "BLOCK_SIZE", 16)
+    monkeypatch.setattr(src.query, "BLOCK_SIZE", 16)
+    #
+    store = SampleStore(directory=tmp_path)
+    _random = random.Random(42)
+    for _i in range(3 * 24 * 60):
+        store.append(START_MS + _i*60_000, round(_random.uniform(49.8, 50.2), 3))
+    store.close()
+    return store
+
+def test_query_range_matches_full_scan(store:SampleStore) -> None:
+    """
+    Test that indexed range-queries return the same results as a full scan.
+    """
+    samples:list[tuple[int, float]] = list(store.iter_samples())
+    _random = random.Random(7)
+    for _ in range(50):
+        start_ms:int = _random.randint(START_MS - 3600_000, START_MS + 3*24*3600_000)
+        end_ms:int = _random.randint(start_ms, START_MS + 4*24*3600_000)
+        expected:list[tuple[int, float]] = [(_t, _f) for (_t, _f) in samples if start_ms <= _t <= end_ms]
+        #
+        stats = query_range(store, start_ms, end_ms)
+        if not expected:
+            assert stats is None
+            continue
+        assert stats.count == len(expected)
+        assert stats.first_timestamp_ms == expected[0][0]
+        assert stats.last_timestamp_ms == expected[-1][0]
+        assert stats.min_frequency == min(_f for (_t, _f) in expected)
+        assert stats.max_frequency == max(_f for (_t, _f) in expected)
+        assert stats.sum_frequency == pytest.approx(sum(_f for (_t, _f) in expected))
+
+def test_query_range_after_append(store:SampleStore) -> None:
+    """
+    Test that the cached segment-index is updated after new samples have been appended.
+    """
+    before = query_range(store, START_MS, START_MS + 10*24*3600_000)
+    store.append(START_MS + 3*24*3600_000, 51.0)
+    store.close()
+    #
+    after = query_range(store, START_MS, START_MS + 10*24*3600_000)
+    assert after.count == before.count + 1
+    assert after.max_frequency == 51.0
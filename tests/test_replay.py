@@ -0,0 +1,87 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / replay-tests
+
+"""
+import pytest
+from datetime import datetime
+#
+from src.store import SampleStore
+from src.replay import *
+from src.custom_exceptions import *
+
+START_MS:int = 1770822308000 # 2026-02-11T15:05:08+00:00
+
+def test_format_epoch_ms() -> None:
+    """
+    Test that formatted epoch-milliseconds are parsed back to the same timestamp.
+    """
+    for _timestamp_ms in (START_MS, START_MS + 123, 0, 4102444799999):
+        formatted:str = format_epoch_ms(_timestamp_ms)
+        assert round(datetime.fromisoformat(formatted).timestamp() * 1000) == _timestamp_ms
+    assert format_epoch_ms(START_MS) == "2026-02-11T15:05:08+00:00"
+
+def test_replay_xml_payloads(tmp_path) -> None:
+    """
+    Test replaying concatenated XML-payloads of the API.
+    """
+    filepath = tmp_path / "recording.xml"
+    filepath.write_text(
+        "<r><f>50.043</f><z>2026-02-11T15:05:08+00:00</z></r>\n"
+        "<r>\n  <f>49.9</f>\n  <z>2026-02-11T15:05:09+00:00</z>\n</r>\n"
+    )
+    #
+    assert list(iter_replay_samples(filepath)) == [
+        (50.043, "2026-02-11T15:05:08+00:00"),
+        (49.9, "2026-02-11T15:05:09+00:00")
+    ]
+
+def test_replay_invalid_xml_payload(tmp_path) -> None:
+    """
+    Test that an invalid XML-payload aborts the replay with a `ReplayError`.
+    """
+    filepath = tmp_path / "recording.xml"
+    filepath.write_text("<r><f>abc</f><z>2026-02-11T15:05:08+00:00</z></r>")
+    #
+    with pytest.raises(ReplayError):
+        list(iter_replay_samples(filepath))
+
+def test_replay_csv(tmp_path) -> None:
+    """
+    Test replaying a CSV-file with header, ISO-timestamps and epoch-milliseconds.
+    """
+    filepath = tmp_path / "recording.csv"
+    filepath.write_text(f"timestamp,frequency\n2026-02-11T15:05:08+00:00,50.043\n{START_MS + 1000},49.9\n")
+    #
+    assert list(iter_replay_samples(filepath)) == [
+        (50.043, "2026-02-11T15:05:08+00:00"),
+        (49.9, "2026-02-11T15:05:09+00:00")
+    ]
+
+def test_replay_sample_store(tmp_path) -> None:
+    """
+    Test replaying the native sample-store.
+    """
+    store = SampleStore(directory=tmp_path)
+    store.append(START_MS, 50.043)
+    store.append(START_MS + 1000, 49.9)
+    store.close()
+    #
+    expected:list[tuple[float, str]] = [
+        (50.043, "2026-02-11T15:05:08+00:00"),
+        (49.9, "2026-02-11T15:05:09+00:00")
+    ]
+    assert list(iter_replay_samples(tmp_path)) == expected
+    assert list(iter_replay_samples(store.segment_filepaths()[0])) == expected
+
+def test_counting_notifier() -> None:
+    """
+    Test that the counting notification-sink counts by priority.
+    """
+    sink = CountingNotifier()
+    sink.send_notification(title="a", message="b", priority="urgent", tags="c")
+    sink.send_notification(title="a", message="b", priority="high", tags="c")
+    sink.send_notification(title="a", message="b", priority="high", tags="c")
+    #
+    assert sink.counts == {"urgent": 1, "high": 2}
+    assert sink.total == 3
@@ -0,0 +1,84 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / report-tests
+
+"""
+import pytest
+#
+from src.thresholds import ThresholdEngine
+from src.report import DailyReport, QuantileSketch
+
+START_MS:int = 1770768000000 # 2026-02-11T00:00:00+00:00
+DAY_MS:int = 24 * 3600 * 1000
+THRESHOLDS = ThresholdEngine(49.8, 49.9, 50.1, 50.2)
+
+def test_quantile_sketch_merge() -> None:
+    """
+    Test approximate quantiles of merged sketches.
+    """
+    first = QuantileSketch()
+    second = QuantileSketch()
+    for _i in range(100):
+        (first if _i % 2 else second).add(49.9 + _i / 500)
+    first.merge(second)
+    #
+    assert first.count == 100
+    assert first.quantile(0.01) == pytest.approx(49.9)
+    assert first.quantile(0.50) == pytest.approx(49.998)
+    assert first.quantile(0.99) == pytest.approx(50.096)
+
+def test_daily_report_summary_on_new_day(tmp_path) -> None:
+    """
+    Test that the summary of a day is returned with the first sample of the next day.
+    """
+    report = DailyReport(state_filepath=tmp_path / "report.json", thresholds=THRESHOLDS)
+    assert report.add(START_MS, 50.0) is None
+    assert report.add(START_MS + 60_000, 49.85) is None
+    assert report.add(START_MS + 120_000, 50.25) is None
+    assert report.add(START_MS + 180_000, 50.0) is None
+    #
+    summary:dict = report.add(START_MS + DAY_MS, 50.0)
+    assert summary["day"] == "2026-02-11"
+    assert summary["count"] == 4
+    assert (summary["min"], summary["min_timestamp_ms"]) == (49.85, START_MS + 60_000)
+    assert (summary["max"], summary["max_timestamp_ms"]) == (50.25, START_MS + 120_000)
+    assert summary["warning_excursions"] == 2
+    assert summary["critical_excursions"] == 1
+    assert summary["below_warning_min_ms"] == 60_000
+    assert summary["above_critical_max_ms"] == 60_000
+    assert report.day == "2026-02-12"
+
+def test_daily_report_survives_restart(tmp_path) -> None:
+    """
+    Test that the checkpointed state is restored by a new instance.
+    """
+    report = DailyReport(state_filepath=tmp_path / "report.json", thresholds=THRESHOLDS)
+    report.add(START_MS, 49.95)
+    report.add(START_MS + 1000, 50.05)
+    report.checkpoint()
+    #
+    restored = DailyReport(state_filepath=tmp_path / "report.json", thresholds=THRESHOLDS)
+    restored.add(START_MS + 2000, 50.0)
+    assert restored.summary()["count"] == 3
+    assert restored.summary()["p50"] == pytest.approx(50.0)
+
+def test_daily_report_rolls_over_on_the_clock(tmp_path) -> None:
+    """
+    Test that a day is finished by the clock (after the grace-period for late samples) without a sample
+    of the next day, also after a restart, and is only reported once.
+    """
+    report = DailyReport(state_filepath=tmp_path / "report.json", thresholds=THRESHOLDS)
+    report.add(START_MS, 50.0)
+    report.add(START_MS + 1000, 50.05)
+    report.checkpoint()
+    assert report.roll_over(START_MS + DAY_MS + 30_000) is None
+    #
+    restored = DailyReport(state_filepath=tmp_path / "report.json", thresholds=THRESHOLDS)
+    summary:dict = restored.roll_over(START_MS + DAY_MS + 60_000)
+    assert (summary["day"], summary["count"]) == ("2026-02-11", 2)
+    assert restored.day == "2026-02-12"
+    assert restored.roll_over(START_MS + DAY_MS + 120_000) is None
+    assert DailyReport(state_filepath=tmp_path / "report.json", thresholds=THRESHOLDS).day == "2026-02-12"
+    # An empty day isn't reported
+    assert restored.roll_over(START_MS + 2*DAY_MS + 60_000) is None
+    assert restored.add(START_MS + 2*DAY_MS + 61_000, 50.0) is None
@@ -0,0 +1,68 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / rocof-tests
+
+"""
+import random
+import statistics
+import pytest
+#
+from src.rocof import RocofWindow, rocof_threshold_engine
+from src.thresholds import CRITICAL_LOW, WARNING_LOW, NOMINAL, WARNING_HIGH, CRITICAL_HIGH
+
+START_MS:int = 1770822308000 # 2026-02-11T15:05:08+00:00
+
+def test_rocof_of_linear_ramp() -> None:
+    """
+    Test that a linear ramp with irregular sample-spacing has its exact slope as RoCoF.
+    """
+    window = RocofWindow(window_ms=5000)
+    #
+    assert window.rocof is None
+    timestamp_ms:int = START_MS
+    for _step_ms in (1000, 700, 1300, 2000, 400, 900):
+        timestamp_ms += _step_ms
+        window.push(timestamp_ms, 50.0 - 0.02 * (timestamp_ms - START_MS) / 1000)
+    assert window.rocof == pytest.approx(-0.02)
+
+def test_window_matches_naive_statistics() -> None:
+    """
+    Test that the running sums match the statistics of the samples in the window, over many evictions and rebases.
+    """
+    rng = random.Random(42)
+    window = RocofWindow(window_ms=5000, capacity=8)
+    samples:list[tuple[int, float]] = []
+    timestamp_ms:int = START_MS
+    for _ in range(1000):
+        timestamp_ms += rng.randint(200, 2000)
+        frequency:float = 50.0 + rng.uniform(-0.1, 0.1)
+        assert window.push(timestamp_ms, frequency)
+        samples = [_s for _s in samples if timestamp_ms - _s[0] <= 5000][-7:] + [(timestamp_ms, frequency)]
+        #
+        assert len(window) == len(samples)
+        frequencies:list[float] = [_f for (_, _f) in samples]
+        assert window.mean == pytest.approx(statistics.fmean(frequencies))
+        assert window.variance == pytest.approx(statistics.pvariance(frequencies), abs=1e-12)
+        if len(samples) >= 2:
+            assert window.rocof == pytest.approx(statistics.linear_regression(
+                [(_t - START_MS) / 1000 for (_t, _) in samples], frequencies).slope, abs=1e-9)
+
+def test_ignore_old_samples() -> None:
+    """
+    Test that repeated or older samples are ignored.
+    """
+    window = RocofWindow()
+    assert window.push(START_MS, 50.0)
+    assert not window.push(START_MS, 50.1)
+    assert not window.push(START_MS - 1000, 50.1)
+    assert len(window) == 1
+
+def test_rocof_thresholds() -> None:
+    """
+    Test the severities of falling and rising RoCoF-values.
+    """
+    thresholds = rocof_threshold_engine(warning=0.05, critical=0.1)
+    #
+    assert [thresholds.classify(_rocof) for _rocof in (-0.2, -0.05, 0.0, 0.05, 0.2)] == [
+        CRITICAL_LOW, WARNING_LOW, NOMINAL, WARNING_HIGH, CRITICAL_HIGH
+    ]
@@ -0,0 +1,80 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / rollup-tests
+
+"""
+import random
+import pytest
+#
+from src.thresholds import ThresholdEngine
+from src.rollup import RollupStore
+
+START_MS:int = 1770768000000 # 2026-02-11T00:00:00+00:00
+THRESHOLDS = ThresholdEngine(49.8, 49.9, 50.1, 50.2)
+
+def generate_samples(count:int, seed:int=42) -> list[tuple[int, float]]:
+    _random = random.Random(seed)
+    samples:list[tuple[int, float]] = []
+    timestamp_ms:int = START_MS
+    for _ in range(count):
+        timestamp_ms += _random.choice([1000, 2500, 61_000, 3_700_000])
+        samples.append((timestamp_ms, round(_random.uniform(49.7, 50.3), 3)))
+    return samples
+
+def test_aggregate_matches_raw_samples(tmp_path) -> None:
+    """
+    Test that aggregates of the rollups match the raw samples, also after reopening.
+    """
+    samples:list[tuple[int, float]] = generate_samples(2000)
+    rollups = RollupStore(directory=tmp_path, thresholds=THRESHOLDS)
+    for (_timestamp_ms, _frequency) in samples:
+        rollups.add(_timestamp_ms, _frequency)
+    rollups.close()
+    #
+    reopened = RollupStore(directory=tmp_path, thresholds=THRESHOLDS)
+    _random = random.Random(7)
+    for _ in range(50):
+        start_ms:int = _random.randint(START_MS, samples[-1][0]) // 1000 * 1000
+        end_ms:int = _random.randint(start_ms, samples[-1][0] + 1000) // 1000 * 1000
+        expected:list[float] = [_f for (_t, _f) in samples if start_ms <= _t < end_ms]
+        #
+        bucket = reopened.aggregate(start_ms, end_ms)
+        if not expected:
+            assert bucket is None
+            continue
+        assert bucket.count == len(expected)
+        assert bucket.min_frequency == min(expected)
+        assert bucket.max_frequency == max(expected)
+        assert bucket.sum_frequency == pytest.approx(sum(expected))
+
+def test_time_below_and_above_thresholds(tmp_path) -> None:
+    """
+    Test the time a frequency has been held below/above the thresholds.
+    """
+    rollups = RollupStore(directory=tmp_path, thresholds=THRESHOLDS, max_gap_ms=60_000)
+    rollups.add(START_MS, 49.85)
+    rollups.add(START_MS + 10_000, 49.75)
+    rollups.add(START_MS + 20_000, 50.25)
+    rollups.add(START_MS + 200_000, 50.0)
+    #
+    bucket = rollups.aggregate(START_MS, START_MS + 86400_000)
+    assert bucket.below_warning_min_ms == 20_000
+    assert bucket.below_critical_min_ms == 10_000
+    # Capped at `max_gap_ms`
+    assert bucket.above_warning_max_ms == 60_000
+    assert bucket.above_critical_max_ms == 60_000
+
+def test_rebuild_rollups(tmp_path) -> None:
+    """
+    Test that rebuilt rollups are equal to incrementally maintained ones.
+    """
+    samples:list[tuple[int, float]] = generate_samples(500)
+    rollups = RollupStore(directory=tmp_path / "incremental", thresholds=THRESHOLDS)
+    for (_timestamp_ms, _frequency) in samples:
+        rollups.add(_timestamp_ms, _frequency)
+    rollups.close()
+    #
+    rebuilt = RollupStore(directory=tmp_path / "rebuilt", thresholds=THRESHOLDS)
+    rebuilt.add(START_MS, 42.0)
+    assert rebuilt.rebuild(samples) == len(samples)
+    assert rebuilt.aggregate(START_MS, samples[-1][0] + 1) == rollups.aggregate(START_MS, samples[-1][0] + 1)
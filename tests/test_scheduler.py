@@ -0,0 +1,47 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / scheduler-tests
+
+"""
+import pytest
+#
+from src.scheduler import AdaptivePollScheduler
+from src.thresholds import ThresholdEngine
+
+THRESHOLDS = ThresholdEngine(49.8, 49.9, 50.1, 50.2)
+START_MS:int = 1770822308000 # 2026-02-11T15:05:08+00:00
+
+def get_scheduler_obj() -> AdaptivePollScheduler:
+    return AdaptivePollScheduler(thresholds=THRESHOLDS, min_interval=1.0, max_interval=30.0, distance_scale=0.05)
+
+def test_interval_by_distance() -> None:
+    """
+    Test that the interval shrinks towards the minimum, the closer the frequency is to a threshold.
+    """
+    assert get_scheduler_obj().next_interval() == 1.0
+    for (_frequency, _expected) in ((50.0, 30.0), (50.075, 15.5), (49.925, 15.5), (49.9, 1.0), (49.875, 15.5)):
+        scheduler = get_scheduler_obj()
+        scheduler.observe(START_MS, _frequency)
+        assert scheduler.next_interval() == pytest.approx(_expected)
+
+def test_interval_by_rate_of_change() -> None:
+    """
+    Test that a fast falling frequency is polled before it can cover half of the distance to the threshold.
+    """
+    scheduler = get_scheduler_obj()
+    scheduler.observe(START_MS, 50.0)
+    scheduler.observe(START_MS + 1000, 49.99)
+    # 0.09 Hz left at 0.01 Hz/s
+    assert scheduler.next_interval() == pytest.approx(4.5)
+    # Repeated samples don't change the rate
+    scheduler.observe(START_MS + 1000, 49.99)
+    assert scheduler.next_interval() == pytest.approx(4.5)
+
+def test_invalid_intervals() -> None:
+    """
+    Test that the minimum interval must be > 0 and <= the maximum interval.
+    """
+    with pytest.raises(ValueError):
+        AdaptivePollScheduler(thresholds=THRESHOLDS, min_interval=0.0, max_interval=30.0)
+    with pytest.raises(ValueError):
+        AdaptivePollScheduler(thresholds=THRESHOLDS, min_interval=10.0, max_interval=5.0)
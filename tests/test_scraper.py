@@ -0,0 +1,119 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / scraper-tests
+
+"""
+import signal
+import logging
+import pytest
+from types import SimpleNamespace
+#
+import scraper
+from src.notifiers import Notifier
+from src.thresholds import ThresholdEngine, NOMINAL, WARNING_LOW
+from src.alert_state import AlertStateMachine
+from src.custom_exceptions import *
+
+THRESHOLDS = ThresholdEngine(49.8, 49.9, 50.1, 50.2)
+START_MS:int = 1770822308000 # 2026-02-11T15:05:08+00:00
+
+class QueueingNotifier(Notifier):
+    """
+    Channel, that records the titles of the queued notifications and drops them while `full` is set.
+    """
+    def __init__(self) -> None:
+        super().__init__(name="queue")
+        self.titles:list[str] = []
+        self.full:bool = False
+
+    def send_notification(self, title:str, message:str, priority:str, tags:str) -> bool:
+        return True
+
+    def notify(self, title:str, message:str, priority:str, tags:str, **kwargs) -> bool:
+        if self.full:
+            return False
+        self.titles.append(title)
+        return True
+
+@pytest.fixture(autouse=True)
+def scraper_logger(monkeypatch) -> None:
+    # The globals of the script are only set, when it's run
+    monkeypatch.setattr(scraper, "logger", logging.getLogger("scraper"), raising=False)
+
+def test_alert_state_is_only_saved_after_queueing(tmp_path) -> None:
+    """
+    Test that a transition, whose alert has been dropped, isn't saved and is alerted again with the next sample.
+    """
+    state_filepath = tmp_path / "alert-state.json"
+    alerts = AlertStateMachine(state_filepath=state_filepath, thresholds=THRESHOLDS)
+    notifier = QueueingNotifier()
+    notifier.full = True
+    #
+    assert scraper.check_frequency_thresholds(49.85, "15:05:08", START_MS, alerts, notifier, THRESHOLDS) == WARNING_LOW
+    assert AlertStateMachine(state_filepath=state_filepath, thresholds=THRESHOLDS).severity == NOMINAL
+    notifier.full = False
+    scraper.check_frequency_thresholds(49.86, "15:05:09", START_MS + 1000, alerts, notifier, THRESHOLDS)
+    scraper.check_frequency_thresholds(49.87, "15:05:10", START_MS + 2000, alerts, notifier, THRESHOLDS)
+    assert notifier.titles == ["WARNING - Grid Frequency LOW Threshold FELL BELOW"]
+    assert AlertStateMachine(state_filepath=state_filepath, thresholds=THRESHOLDS).severity == WARNING_LOW
+
+class FakeClock:
+    """
+    Monotonic clock, that only advances by `advance()`.
+    """
+    def __init__(self) -> None:
+        self.now:float = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds:float) -> None:
+        self.now += seconds
+
+class FakeShutdownEvent:
+    """
+    Shutdown-event, that advances the clock by the waited time and is set after `waits` waits.
+    """
+    def __init__(self, clock:FakeClock, waits:int) -> None:
+        self.clock:FakeClock = clock
+        self.waits:int = waits
+        self.timeouts:list[float] = []
+
+    def is_set(self) -> bool:
+        return len(self.timeouts) >= self.waits
+
+    def set(self) -> None:
+        self.waits = len(self.timeouts)
+
+    def wait(self, timeout:float) -> bool:
+        self.timeouts.append(timeout)
+        self.clock.advance(timeout)
+        return self.is_set()
+
+def test_run_daemon_skips_overrun_deadlines(monkeypatch) -> None:
+    """
+    Test that the daemon polls once per interval on a fixed grid and skips the deadlines, that a slow iteration
+    overran, instead of bursting to catch up.
+    """
+    clock = FakeClock()
+    monkeypatch.setattr(scraper, "time", clock)
+    monkeypatch.setattr(signal, "signal", lambda signum, handler: None)
+    poll_starts:list[float] = []
+    latencies:list[float] = [0.1, 0.2, 2.5, 0.1, 0.1]
+    def _poll_once(apihandler, pipeline) -> None:
+        poll_starts.append(clock.now - 1000.0)
+        clock.advance(latencies[len(poll_starts) - 1])
+    monkeypatch.setattr(scraper, "poll_once", _poll_once)
+    apihandler = SimpleNamespace(last_sample=None, endpoints=[], request_count=0, duplicate_count=0,
+                                 not_modified_count=0, stale_count=0, hedged_count=0, bytes_saved=0,
+                                 short_circuited_count=0)
+    shutdown_event = FakeShutdownEvent(clock, waits=len(latencies))
+    #
+    scraper.run_daemon(apihandler, scraper.Pipeline(), interval=1.0, shutdown_event=shutdown_event)
+    assert len(poll_starts) == 5
+    # The third iteration overran the deadlines at 3 and 4 seconds
+    assert poll_starts == pytest.approx([0.0, 1.0, 2.0, 5.0, 6.0])
+    assert shutdown_event.timeouts == pytest.approx([0.9, 0.8, 0.5, 0.9, 0.9])
@@ -0,0 +1,69 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / shared-sample-tests
+
+"""
+import pytest
+#
+from src.shared_sample import (SharedSamplePublisher, SharedSampleReader, LatestSample,
+                               SEQUENCE_STRUCT, SEQUENCE_OFFSET, FILE_SIZE)
+from src.thresholds import NOMINAL, WARNING_LOW
+from src.custom_exceptions import SharedSampleError
+
+START_MS:int = 1770768000000 # 2026-02-11T00:00:00+00:00
+
+def test_publish_and_read_latest_sample(tmp_path) -> None:
+    """
+    Test that readers get the latest published sample with its sequence-number.
+    """
+    publisher = SharedSamplePublisher(tmp_path / "latest.sample")
+    reader = SharedSampleReader(tmp_path / "latest.sample")
+    assert reader.read() is None
+    #
+    assert publisher.publish(50.01, START_MS, NOMINAL) == 1
+    assert publisher.publish(49.89, START_MS + 1000, WARNING_LOW) == 2
+    sample:LatestSample = reader.read()
+    assert (sample.frequency, sample.timestamp_ms, sample.severity, sample.sequence) == (49.89, START_MS + 1000, WARNING_LOW, 2)
+    assert 0 <= sample.age < 60
+    reader.close()
+    publisher.close()
+
+def test_sequence_continues_after_restart(tmp_path) -> None:
+    """
+    Test that a restarted publisher continues the sequence and that an interrupted write is skipped.
+    """
+    publisher = SharedSamplePublisher(tmp_path / "latest.sample")
+    publisher.publish(50.01, START_MS, NOMINAL)
+    # Crash in the middle of the next publication: the seqlock-counter is left odd
+    SEQUENCE_STRUCT.pack_into(publisher._mmap, SEQUENCE_OFFSET, 3)
+    publisher.close()
+    #
+    restarted = SharedSamplePublisher(tmp_path / "latest.sample")
+    assert restarted.sequence == 2
+    assert restarted.publish(50.02, START_MS + 1000, NOMINAL) == 3
+    restarted.close()
+    with SharedSampleReader(tmp_path / "latest.sample") as _reader:
+        assert _reader.read().frequency == 50.02
+
+def test_reader_retries_while_writing(tmp_path) -> None:
+    """
+    Test that a reader doesn't return a sample, while the seqlock-counter signals a write in progress.
+    """
+    publisher = SharedSamplePublisher(tmp_path / "latest.sample")
+    publisher.publish(50.01, START_MS, NOMINAL)
+    SEQUENCE_STRUCT.pack_into(publisher._mmap, SEQUENCE_OFFSET, 3)
+    #
+    with SharedSampleReader(tmp_path / "latest.sample", max_retries=10) as _reader:
+        with pytest.raises(SharedSampleError):
+            _reader.read()
+    publisher.close()
+
+def test_reject_invalid_file(tmp_path) -> None:
+    """
+    Test that missing files and files of another layout are rejected.
+    """
+    with pytest.raises(SharedSampleError):
+        SharedSampleReader(tmp_path / "missing.sample")
+    (tmp_path / "invalid.sample").write_bytes(b"\x01" * FILE_SIZE)
+    with pytest.raises(SharedSampleError):
+        SharedSampleReader(tmp_path / "invalid.sample")
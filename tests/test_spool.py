@@ -0,0 +1,240 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / spool-tests
+
+"""
+import json
+import threading
+import pytest
+#
+from src.spool import Spool, SpoolBatch, SEGMENT_SUFFIX, segment_filename
+from src.store import SampleStore
+from src.notifiers import Notifier, NotificationDispatcher, FileNotifier
+from src.custom_exceptions import *
+
+START_MS:int = 1770768000000 # 2026-02-11T00:00:00+00:00
+DAY_MS:int = 24 * 3600 * 1000
+
+class FlakyNotifier(Notifier):
+    """
+    Channel, that records every request and fails while `down` is set.
+    """
+    def __init__(self) -> None:
+        super().__init__(name="flaky")
+        self.requests:list[str] = []
+        self.down = threading.Event()
+
+    def send_notification(self, title:str, message:str, priority:str, tags:str) -> bool:
+        if self.down.is_set():
+            raise NotifierError("flaky is down")
+        self.requests.append(title)
+        return True
+
+def test_read_and_ack_in_order_across_segments(tmp_path) -> None:
+    """
+    Test that records are read in order over multiple segments, which are deleted once acknowledged.
+    """
+    spool = Spool(tmp_path, sync_interval=0, segment_size=100)
+    for _i in range(30):
+        spool.append(f"record-{_i}".encode())
+    assert spool.pending_count == 30
+    assert len(list(tmp_path.glob(f"*{SEGMENT_SUFFIX}"))) > 3
+    #
+    batch:SpoolBatch = spool.read(limit=12)
+    assert batch.payloads == [f"record-{_i}".encode() for _i in range(12)]
+    spool.ack(batch)
+    assert spool.read(limit=1).payloads == [b"record-12"]
+    assert not (tmp_path / segment_filename(0)).exists()
+    spool.close()
+    # The checkpoint survives a restart
+    reopened = Spool(tmp_path)
+    assert reopened.pending_count == 18
+    assert reopened.read().payloads == [f"record-{_i}".encode() for _i in range(12, 30)]
+    reopened.ack()
+    assert (reopened.pending_count, reopened.read().payloads) == (0, [])
+    reopened.close()
+
+def test_read_only_up_to_the_limit(tmp_path) -> None:
+    """
+    Test that reads continue from the checkpoint of the open segment, while records are appended and acknowledged.
+    """
+    spool = Spool(tmp_path, segment_size=50)
+    for _i in range(10):
+        spool.append(f"record-{2*_i}".encode())
+        spool.append(f"record-{2*_i + 1}".encode())
+        batch:SpoolBatch = spool.read(limit=1)
+        assert batch.payloads == [f"record-{_i}".encode()]
+        spool.ack(batch)
+    assert spool.pending_count == 10
+    assert spool.read().payloads == [f"record-{_i}".encode() for _i in range(10, 20)]
+    spool.close()
+
+def test_read_up_to_max_bytes(tmp_path) -> None:
+    """
+    Test that a batch is bounded by the size of its payloads, but a single larger record is still read.
+    """
+    spool = Spool(tmp_path, segment_size=100)
+    for _payload in (b"a" * 40, b"b" * 40, b"c" * 40, b"d" * 200, b"e" * 10):
+        spool.append(_payload)
+    for _expected in ([b"a" * 40, b"b" * 40], [b"c" * 40], [b"d" * 200], [b"e" * 10]):
+        batch:SpoolBatch = spool.read(max_bytes=100)
+        assert batch.payloads == _expected
+        spool.ack(batch)
+    assert spool.pending_count == 0
+    spool.close()
+
+def test_torn_and_corrupted_records(tmp_path) -> None:
+    """
+    Test that a torn record at the end is truncated and a corrupted record skips the rest of its segment.
+    """
+    spool = Spool(tmp_path, segment_size=10)
+    for _payload in (b"first", b"second", b"third"):
+        spool.append(_payload)
+    spool.close()
+    # One record per segment: flip a bit of `first` and append half a record to the last (empty) segment
+    first_segment = tmp_path / segment_filename(0)
+    data = bytearray(first_segment.read_bytes())
+    data[-1] ^= 1
+    first_segment.write_bytes(data)
+    last_segment = sorted(tmp_path.glob(f"*{SEGMENT_SUFFIX}"))[-1]
+    with open(last_segment, "ab") as _file:
+        _file.write(b"\x10\x00\x00\x00half")
+    #
+    reopened = Spool(tmp_path)
+    assert reopened.read().payloads == [b"second", b"third"]
+    reopened.append(b"fourth")
+    assert reopened.read().payloads == [b"second", b"third", b"fourth"]
+    reopened.close()
+
+def test_size_is_bounded(tmp_path) -> None:
+    """
+    Test that the oldest segments (and their pending records) are dropped, when the spool exceeds its max. size.
+    """
+    spool = Spool(tmp_path, segment_size=200, max_size=1000)
+    for _i in range(500):
+        spool.append(f"record-{_i:03d}".encode())
+    assert spool.size <= 1000 + 200
+    assert spool.dropped_count > 0
+    assert spool.pending_count == 500 - spool.dropped_count
+    payloads:list[bytes] = spool.read().payloads
+    assert len(payloads) == spool.pending_count
+    assert payloads[-1] == b"record-499"
+    spool.close()
+
+def test_store_spools_only_unwritten_samples(tmp_path) -> None:
+    """
+    Test that samples, that have been written to their segment, are never spooled.
+    """
+    store = SampleStore(directory=tmp_path / "store", flush_size=1, spool=Spool(tmp_path / "spool"))
+    for _i in range(6):
+        store.append(START_MS + _i*1000, 50.0 + _i/1000)
+    # Every sample is in its segment right away, without being written to the spool or a checkpoint
+    assert list(store.iter_samples()) == [(START_MS + _i*1000, 50.0 + _i/1000) for _i in range(6)]
+    assert (store.spool.size, store.spool.pending_count) == (0, 0)
+    assert not (tmp_path / "spool" / "checkpoint.json").exists()
+    store.close()
+
+def test_store_syncs_segments_every_interval(tmp_path, monkeypatch) -> None:
+    """
+    Test that samples written right away are synced at most every sync-interval and on close.
+    """
+    store = SampleStore(directory=tmp_path / "store", flush_size=1, spool=Spool(tmp_path / "spool"), sync_interval=60.0)
+    for _i in range(6):
+        store.append(START_MS + _i*1000, 50.0)
+    assert store.sync_count == 0
+    # The interval is over
+    monkeypatch.setattr(store, "_last_sync", store._last_sync - 60.0)
+    store.append(START_MS + 6000, 50.0)
+    store.append(START_MS + 7000, 50.0)
+    assert store.sync_count == 1
+    store.close()
+    assert store.sync_count == 2
+
+def test_store_replays_samples_after_failed_flush(tmp_path, monkeypatch) -> None:
+    """
+    Test that buffered samples are spooled, when a flush failed, and written before the next samples
+    (by the next flush or on the next open).
+    """
+    store = SampleStore(directory=tmp_path / "store", flush_size=2, spool=Spool(tmp_path / "spool"))
+    write_records = store._write_records
+    def _failing_write_records(name:str, records:bytes) -> None:
+        raise StoreError("Disk unavailable")
+    monkeypatch.setattr(store, "_write_records", _failing_write_records)
+    store.append(START_MS, 50.0)
+    with pytest.raises(StoreError):
+        store.append(START_MS + 1000, 50.1)
+    assert (len(store._buffer), store.spool.pending_count) == (0, 1)
+    store.append(START_MS + 2000, 50.2)
+    with pytest.raises(StoreError):
+        store.append(START_MS + 3000, 50.3)
+    assert store.spool.pending_count == 2
+    #
+    monkeypatch.setattr(store, "_write_records", write_records)
+    store.append(START_MS + DAY_MS, 50.4)
+    store.append(START_MS + DAY_MS + 1000, 50.5)
+    assert store.spool.pending_count == 0
+    store.append(START_MS + DAY_MS + 2000, 50.6)
+    # Crash with a spooled sample
+    monkeypatch.setattr(store, "_write_records", _failing_write_records)
+    with pytest.raises(StoreError):
+        store.flush()
+    restarted = SampleStore(directory=tmp_path / "store", flush_size=2, spool=Spool(tmp_path / "spool"))
+    assert list(restarted.iter_samples()) == [
+        (START_MS + _i*1000, 50.0 + _i/10) for _i in range(4)
+    ] + [(START_MS + DAY_MS + _i*1000, 50.4 + _i/10) for _i in range(3)]
+    assert restarted.spool.pending_count == 0
+    restarted.close()
+
+def test_notifier_replays_spool_in_bulk(tmp_path) -> None:
+    """
+    Test that notifications are spooled during an outage and replayed in order with one request,
+    before the next notification is sent.
+    """
+    flaky = FlakyNotifier()
+    flaky.attach_spool(Spool(tmp_path))
+    flaky.down.set()
+    for _i in range(3):
+        assert not flaky.notify(title=f"Alert {_i}", message="Message", priority="high" if _i else "urgent", tags="warning")
+    assert (flaky.failed_count, flaky.spooled_count, flaky.spool.pending_count) == (1, 3, 3)
+    #
+    flaky.down.clear()
+    assert flaky.notify(title="Recovery", message="Message", priority="default", tags="white_check_mark")
+    assert flaky.requests == ["3 delayed notifications", "Recovery"]
+    assert (flaky.replayed_count, flaky.spool.pending_count) == (3, 0)
+    flaky.close()
+
+def test_notifier_replays_large_spool_in_bounded_batches(tmp_path) -> None:
+    """
+    Test that spooled notifications are replayed in batches, that are bounded by their size.
+    """
+    flaky = FlakyNotifier()
+    flaky.attach_spool(Spool(tmp_path))
+    flaky.down.set()
+    for _i in range(3):
+        assert not flaky.notify(title=f"Alert {_i}", message="x" * 1500, priority="high", tags="warning")
+    #
+    flaky.down.clear()
+    assert flaky.replay_spool()
+    assert flaky.requests == ["2 delayed notifications", "Alert 2"]
+    assert (flaky.replayed_count, flaky.spool.pending_count) == (3, 0)
+    flaky.close()
+
+def test_dispatcher_replays_spool_on_start(tmp_path) -> None:
+    """
+    Test that notifications, that have been spooled by the last run, are replayed on start
+    and that a file-channel appends them with their original timestamps.
+    """
+    spool = Spool(tmp_path / "spool")
+    for _i in range(2):
+        spool.append(json.dumps(Notifier.spool_record(f"Alert {_i}", "Message", "urgent", "warning")).encode())
+    spool.close()
+    alert_file = FileNotifier(filepath=str(tmp_path / "alerts.jsonl"))
+    alert_file.attach_spool(Spool(tmp_path / "spool"))
+    dispatcher = NotificationDispatcher([alert_file])
+    dispatcher.start()
+    assert dispatcher.stop(timeout=5)
+    #
+    lines:list[dict] = [json.loads(_line) for _line in (tmp_path / "alerts.jsonl").read_text().splitlines()]
+    assert [_line["title"] for _line in lines] == ["Alert 0", "Alert 1"]
+    assert alert_file.replayed_count == 2
+    dispatcher.close()
@@ -0,0 +1,63 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / store-tests
+
+"""
+#
+from src.store import SampleStore, RECORD_SIZE
+
+DAY_MS:int = 24 * 3600 * 1000
+START_MS:int = 1770768000000 # 2026-02-11T00:00:00+00:00
+
+def test_append_and_read_samples(tmp_path) -> None:
+    """
+    Test reading appended samples back from the memory-mapped segments.
+    """
+    store = SampleStore(directory=tmp_path, flush_size=2)
+    for _i in range(5):
+        assert store.append(START_MS + _i*1000, 50.0 + _i/1000)
+    store.close()
+    #
+    assert list(store.iter_samples()) == [(START_MS + _i*1000, 50.0 + _i/1000) for _i in range(5)]
+
+def test_segment_rotation_by_day(tmp_path) -> None:
+    """
+    Test that samples of different UTC-days are written into different segments.
+    """
+    store = SampleStore(directory=tmp_path)
+    store.append(START_MS, 50.0)
+    store.append(START_MS + DAY_MS, 50.1)
+    store.close()
+    #
+    assert [_path.name for _path in store.segment_filepaths()] == ["2026-02-11.seg", "2026-02-12.seg"]
+
+def test_reject_samples_out_of_order(tmp_path) -> None:
+    """
+    Test that samples which aren't newer than the last stored sample are rejected, even after reopening.
+    """
+    store = SampleStore(directory=tmp_path)
+    assert store.append(START_MS, 50.0)
+    assert not store.append(START_MS, 50.0)
+    store.close()
+    #
+    reopened = SampleStore(directory=tmp_path)
+    assert reopened.last_timestamp_ms == START_MS
+    assert not reopened.append(START_MS - 1000, 49.9)
+
+def test_ignore_torn_record(tmp_path) -> None:
+    """
+    Test that a partially written record at the end of a segment is ignored and truncated on the next open,
+    so the samples appended after it are aligned.
+    """
+    store = SampleStore(directory=tmp_path)
+    store.append(START_MS, 50.0)
+    store.close()
+    with open(store.segment_filepaths()[0], "ab") as _file:
+        _file.write(b"\x00" * (RECORD_SIZE - 1))
+    #
+    assert list(store.iter_samples()) == [(START_MS, 50.0)]
+    reopened = SampleStore(directory=tmp_path, flush_size=1)
+    for _i in range(1, 4):
+        assert reopened.append(START_MS + _i*1000, 50.0 + _i/1000)
+    reopened.close()
+    assert list(reopened.iter_samples()) == [(START_MS + _i*1000, 50.0 + _i/1000) for _i in range(4)]
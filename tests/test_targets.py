@@ -0,0 +1,46 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / targets-tests
+
+"""
+import json
+import pytest
+#
+from src.targets import load_targets
+from src.thresholds import ThresholdEngine
+from src.custom_exceptions import *
+
+THRESHOLDS = ThresholdEngine(49.6, 49.85, 50.15, 50.4)
+
+def test_load_targets(tmp_path) -> None:
+    """
+    Test that omitted intervals and thresholds fall back to the defaults.
+    """
+    filepath = tmp_path / "targets.json"
+    filepath.write_text(json.dumps([
+        {"name": "mirror", "url": "http://mirror.invalid/frequenz.xml"},
+        {"name": "pmu-1", "url": "http://pmu.invalid/frequenz.xml", "interval": 0.5,
+         "thresholds": {"critical_min": 49.0, "warning_min": 49.5, "warning_max": 50.5, "critical_max": 51.0}}
+    ]))
+    #
+    (mirror, pmu) = load_targets(filepath, default_interval=2.0, default_thresholds=THRESHOLDS)
+    assert (mirror.interval, mirror.thresholds) == (2.0, THRESHOLDS)
+    assert (pmu.interval, pmu.thresholds.thresholds) == (0.5, (49.0, 49.5, 50.5, 51.0))
+
+@pytest.mark.parametrize("targets", [
+    [],
+    [{"name": "no-url"}],
+    [{"name": "../escape", "url": "http://a.invalid"}],
+    [{"name": "a", "url": "http://a.invalid", "interval": 0}],
+    [{"name": "a", "url": "http://a.invalid"}, {"name": "a", "url": "http://b.invalid"}],
+    [{"name": "a", "url": "http://a.invalid", "thresholds": {"critical_min": 50.0}}]
+])
+def test_invalid_targets(tmp_path, targets:list) -> None:
+    """
+    Test that invalid targets raise `InvalidConfigError`.
+    """
+    filepath = tmp_path / "targets.json"
+    filepath.write_text(json.dumps(targets))
+    #
+    with pytest.raises(InvalidConfigError):
+        load_targets(filepath, default_interval=2.0, default_thresholds=THRESHOLDS)
@@ -0,0 +1,62 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / thresholds-tests
+
+"""
+import random
+import pytest
+#
+import src.thresholds
+from src.thresholds import *
+
+ENGINE = ThresholdEngine(critical_min=49.6, warning_min=49.85, warning_max=50.15, critical_max=50.4)
+
+def classify_reference(frequency:float) -> int:
+    """
+    Classification of the original if/elif-chain.
+    """
+    if frequency < 49.6:
+        return CRITICAL_LOW
+    elif frequency > 50.4:
+        return CRITICAL_HIGH
+    elif frequency <= 49.85:
+        return WARNING_LOW
+    elif frequency >= 50.15:
+        return WARNING_HIGH
+    return NOMINAL
+
+@pytest.mark.parametrize("frequency", [49.5, 49.6, 49.7, 49.85, 49.851, 50.0, 50.149, 50.15, 50.3, 50.4, 50.401])
+def test_classify_thresholds_inclusive_exclusive(frequency:float) -> None:
+    """
+    Test that WARNING-thresholds are inclusive and CRITICAL-thresholds exclusive.
+    """
+    assert ENGINE.classify(frequency) == classify_reference(frequency)
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_classify_batch(monkeypatch, use_numpy:bool) -> None:
+    """
+    Test batch-classification with and without NumPy against the single-sample path.
+    """
+    if use_numpy and src.thresholds._import_numpy() is None:
+        pytest.skip("NumPy is not installed")
+    if not use_numpy:
+        monkeypatch.setattr(src.thresholds, "_import_numpy", lambda: None)
+    engine = ThresholdEngine(*ENGINE.thresholds)
+    #
+    _random = random.Random(42)
+    frequencies:list[float] = [round(_random.uniform(49.4, 50.6), 3) for _ in range(5000)]
+    (severities, changes) = engine.classify_batch(frequencies)
+    #
+    expected:list[int] = [classify_reference(_frequency) for _frequency in frequencies]
+    assert list(severities) == expected
+    assert list(changes) == [_i for _i in range(1, len(expected)) if expected[_i] != expected[_i-1]]
+
+def test_threshold_of_severity() -> None:
+    """
+    Test the threshold, that has been crossed by a severity.
+    """
+    assert ENGINE.threshold(CRITICAL_LOW) == 49.6
+    assert ENGINE.threshold(WARNING_LOW) == 49.85
+    assert ENGINE.threshold(NOMINAL) is None
+    assert ENGINE.threshold(WARNING_HIGH) == 50.15
+    assert ENGINE.threshold(CRITICAL_HIGH) == 50.4
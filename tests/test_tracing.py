@@ -0,0 +1,58 @@
+"""
+
+    eu-grid-frequency-scraper / Unit-tests / tracing-tests
+
+"""
+import pytest
+#
+from src import tracing
+from src.tracing import Span, PhaseStats, span, traced, add_hook, remove_hook
+
+def test_disabled_spans_are_shared() -> None:
+    """
+    Test that spans are a shared no-op without hooks.
+    """
+    assert not tracing.is_enabled()
+    assert span("a") is span("b")
+
+def test_hook_receives_spans() -> None:
+    """
+    Test that hooks get the name, duration and attributes of every span (including failed ones).
+    """
+    spans:list[Span] = []
+    add_hook(spans.append)
+    try:
+        @traced("outer")
+        def _outer() -> int:
+            with span("inner") as _span:
+                _span.set(status=200)
+            return 1
+        #
+        assert _outer() == 1
+        with pytest.raises(ValueError):
+            with span("failed"):
+                raise ValueError()
+    finally:
+        remove_hook(spans.append)
+    #
+    assert [_span.name for _span in spans] == ["inner", "outer", "failed"]
+    assert spans[0].attrs == {"status": 200}
+    assert spans[1].duration >= spans[0].duration > 0
+    assert spans[2].attrs == {"error": "ValueError"}
+    assert not tracing.is_enabled()
+
+def test_phase_stats() -> None:
+    """
+    Test that the phase-statistics count the spans per phase.
+    """
+    phases = PhaseStats()
+    add_hook(phases)
+    try:
+        for _ in range(3):
+            with span("api.request"):
+                pass
+    finally:
+        remove_hook(phases)
+    #
+    assert phases.phases["api.request"].count == 3
+    assert phases.format_table().splitlines()[1].split()[:2] == ["api.request", "3"]